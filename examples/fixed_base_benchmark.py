@@ -0,0 +1,35 @@
+import random
+import time
+import timeit
+from typing import Any, Callable
+
+from vendor.starkware.crypto.signature import pedersen_hash, sign
+from x10.utils.fixed_base import get_fixed_base_tables
+
+NUMBER_OF_RUNS = 20
+
+
+def run_case(name: str, before: Callable[[], Any], after: Callable[[], Any]):
+    assert before() == after()
+
+    before_us = min(timeit.repeat(before, number=NUMBER_OF_RUNS, repeat=3)) / NUMBER_OF_RUNS * 1_000_000
+    after_us = min(timeit.repeat(after, number=NUMBER_OF_RUNS * 10, repeat=3)) / (NUMBER_OF_RUNS * 10) * 1_000_000
+
+    print(f"{name}: before={before_us:.0f}us, after={after_us:.0f}us, speedup={before_us / after_us:.1f}x")
+
+
+def main():
+    started_at = time.perf_counter()
+    tables = get_fixed_base_tables()
+    print(f"Tables loaded in {(time.perf_counter() - started_at) * 1000:.1f}ms")
+
+    first, second = random.getrandbits(251), random.getrandbits(251)
+
+    run_case("Pedersen hash", lambda: pedersen_hash(first, second), lambda: tables.pedersen_hash(first, second))
+    run_case(
+        "Sign", lambda: sign(msg_hash=first, priv_key=second), lambda: tables.sign(msg_hash=first, priv_key=second)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import time
+import timeit
+from datetime import timedelta
+from decimal import Decimal
+
+from x10.perpetual.accounts import StarkPerpetualAccount
+from x10.perpetual.amounts import (
+    ROUNDING_BUY_CONTEXT,
+    ROUNDING_FEE_CONTEXT,
+    HumanReadableAmount,
+)
+from x10.perpetual.fixed_point import FixedPointOrderAmounts
+from x10.perpetual.markets import MarketModel
+from x10.perpetual.order_factory import MarketOrderFactory
+from x10.perpetual.order_object import create_order_object
+from x10.perpetual.orders import OrderSide
+from x10.utils.date import utc_now
+
+NUMBER_OF_ORDERS = 2_000
+
+MARKET_JSON = """
+{
+    "name": "BTC-USD",
+    "assetName": "BTC",
+    "assetPrecision": 5,
+    "collateralAssetName": "USD",
+    "collateralAssetPrecision": 6,
+    "active": true,
+    "marketStats": {
+        "dailyVolume": "0", "dailyVolumeBase": "0", "dailyPriceChange": "0", "dailyLow": "0", "dailyHigh": "0",
+        "lastPrice": "0", "askPrice": "0", "bidPrice": "0", "markPrice": "0", "indexPrice": "0",
+        "fundingRate": "0", "nextFundingRate": 0, "openInterest": "0", "openInterestBase": "0"
+    },
+    "tradingConfig": {
+        "minOrderSize": "0.0001", "minOrderSizeChange": "0.00001", "minPriceChange": "0.1",
+        "maxMarketOrderValue": "1000000", "maxLimitOrderValue": "5000000", "maxPositionValue": "10000000",
+        "maxLeverage": "50.00", "maxNumOrders": "200", "limitPriceCap": "0.05", "limitPriceFloor": "0.05",
+        "riskFactorConfig": [{"upperBound": "400000", "riskFactor": "0.02"}]
+    },
+    "l2Config": {
+        "type": "STARKX",
+        "collateralId": "0x31857064564ed0ff978e687456963cba09c2c6985d8f9300a1de4962fafa054",
+        "collateralResolution": 1000000,
+        "syntheticId": "0x4254432d3600000000000000000000",
+        "syntheticResolution": 1000000
+    }
+}
+"""
+
+
+def create_account():
+    return StarkPerpetualAccount(
+        vault=10002,
+        private_key="0x7a7ff6fd3cab02ccdcd4a572563f5976f8976899b03a39773795a3c486d4986",
+        public_key="0x61c5e7e8339b7d56f197f54ea91b776776690e3232313de0f2ecbd0ef76f466",
+        api_key="dummy_api_key",
+    )
+
+
+def measure_stark_amounts(market: MarketModel, amount: Decimal, price: Decimal):
+    fee_rate = Decimal("0.0005")
+    fixed_point_amounts = FixedPointOrderAmounts(market, fee_rate)
+
+    def with_decimal():
+        collateral_amount = amount * price
+        return (
+            HumanReadableAmount(amount, market.synthetic_asset).to_stark_amount(ROUNDING_BUY_CONTEXT).value,
+            HumanReadableAmount(collateral_amount, market.collateral_asset).to_stark_amount(ROUNDING_BUY_CONTEXT).value,
+            HumanReadableAmount(fee_rate * collateral_amount, market.collateral_asset)
+            .to_stark_amount(ROUNDING_FEE_CONTEXT)
+            .value,
+        )
+
+    def with_fixed_point():
+        return fixed_point_amounts.to_stark_amounts(amount, price, True)
+
+    assert with_decimal() == with_fixed_point()
+
+    for name, convert in [("Decimal", with_decimal), ("fixed point", with_fixed_point)]:
+        elapsed = min(timeit.repeat(convert, number=NUMBER_OF_ORDERS * 10, repeat=5)) / (NUMBER_OF_ORDERS * 10)
+        print(f"Stark amounts ({name}): {elapsed * 1_000_000:.2f}us")
+
+
+def main():
+    account = create_account()
+    market = MarketModel.model_validate_json(MARKET_JSON)
+    factory = MarketOrderFactory(account, market)
+    expire_time = utc_now() + timedelta(hours=1)
+    prices = [Decimal("43000") + Decimal(level) / 10 for level in range(NUMBER_OF_ORDERS)]
+    amount = Decimal("0.001")
+
+    def measure(name: str, create_order):
+        started_at = time.perf_counter()
+        for index, price in enumerate(prices):
+            create_order(price, OrderSide.BUY if index % 2 else OrderSide.SELL)
+        elapsed = time.perf_counter() - started_at
+
+        print(
+            f"{name}: {NUMBER_OF_ORDERS / elapsed:.0f} orders/s ({elapsed / NUMBER_OF_ORDERS * 1_000_000:.1f}us/order)"
+        )
+
+    measure(
+        "create_order_object",
+        lambda price, side: create_order_object(account, market, amount, price, side, expire_time=expire_time),
+    )
+    measure(
+        "MarketOrderFactory.create_order",
+        lambda price, side: factory.create_order(amount, price, side, expire_time=expire_time),
+    )
+    measure_stark_amounts(market, amount, prices[1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import random
+import timeit
+import tracemalloc
+from decimal import Decimal
+from typing import List
+
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.markets import TradingConfigModel
+from x10.perpetual.orderbook import OrderBook, OrderBookEngine
+from x10.perpetual.orderbooks import OrderbookQuantityModel, OrderbookUpdateModel
+
+LEVELS_PER_SIDE = 500
+NUMBER_OF_BOOKS = 20
+NUMBER_OF_DELTAS = 20_000
+
+
+def create_level(price_ticks: int, qty_steps: int):
+    return OrderbookQuantityModel(price=Decimal(price_ticks).scaleb(-1), qty=Decimal(qty_steps).scaleb(-5))
+
+
+def create_snapshot(rnd: random.Random):
+    return OrderbookUpdateModel(
+        market="BTC-USD",
+        bid=[create_level(640_000 - i, rnd.randint(1, 500_000)) for i in range(LEVELS_PER_SIDE)],
+        ask=[create_level(640_001 + i, rnd.randint(1, 500_000)) for i in range(LEVELS_PER_SIDE)],
+    )
+
+
+def create_deltas(rnd: random.Random) -> List[OrderbookUpdateModel]:
+    # Changes near the top of the book, the quantities stay positive
+    return [
+        OrderbookUpdateModel(
+            market="BTC-USD",
+            bid=[create_level(640_000 - rnd.randint(0, 20), rnd.choice([1, -1])) for _ in range(3)],
+            ask=[create_level(640_001 + rnd.randint(0, 20), rnd.choice([1, -1])) for _ in range(3)],
+        )
+        for _ in range(NUMBER_OF_DELTAS)
+    ]
+
+
+def run_case(engine: OrderBookEngine, snapshot: OrderbookUpdateModel, deltas: List[OrderbookUpdateModel]):
+    # Only the tick sizes are used by the order book
+    trading_config = TradingConfigModel.model_construct(  # type: ignore[call-arg]
+        min_price_change=Decimal("0.1"), min_order_size_change=Decimal("0.00001")
+    )
+
+    def create_orderbook():
+        orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD", engine=engine, trading_config=trading_config)
+        orderbook.init_orderbook(snapshot)
+        return orderbook
+
+    # The stream clients are created before the measurement
+    orderbooks = [
+        OrderBook(TESTNET_CONFIG, "BTC-USD", engine=engine, trading_config=trading_config)
+        for _ in range(NUMBER_OF_BOOKS)
+    ]
+    tracemalloc.start()
+    for orderbook in orderbooks:
+        orderbook.init_orderbook(snapshot)
+    memory_per_book, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    memory_per_book //= NUMBER_OF_BOOKS
+
+    orderbook = create_orderbook()
+
+    def apply_deltas():
+        for delta in deltas:
+            orderbook.update_orderbook(delta)
+
+    delta_us = min(timeit.repeat(apply_deltas, number=1, repeat=3)) / len(deltas) * 1_000_000
+    best_us = min(timeit.repeat(orderbook.best_bid, number=100_000, repeat=3)) / 100_000 * 1_000_000
+    impact_us = (
+        min(
+            timeit.repeat(
+                lambda: orderbook.calculate_price_impact_qty(Decimal("5"), "BUY"),
+                number=1_000,
+                repeat=3,
+            )
+        )
+        / 1_000
+        * 1_000_000
+    )
+
+    print(
+        f"{engine.value}: memory={memory_per_book / 1024:.0f}KiB per book ({LEVELS_PER_SIDE} levels per side), "
+        f"delta={delta_us:.2f}us, best_bid={best_us:.2f}us, price_impact_qty={impact_us:.2f}us"
+    )
+
+
+def main():
+    rnd = random.Random(0)
+    snapshot = create_snapshot(rnd)
+    deltas = create_deltas(rnd)
+
+    run_case(OrderBookEngine.DECIMAL, snapshot, deltas)
+    run_case(OrderBookEngine.TICK, snapshot, deltas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import random
+import timeit
+from decimal import Decimal
+from typing import List
+
+import numpy as np
+
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbook import OrderBook
+from x10.perpetual.orderbooks import OrderbookQuantityModel, OrderbookUpdateModel
+
+LEVELS_PER_SIDE = 500
+NUMBER_OF_SIZES = 24
+NUMBER_OF_DELTAS = 200
+
+
+def walk_price_impact_qty(qty: Decimal, levels):
+    # What `calculate_price_impact_qty` used to do: walk the levels from the best price on every call
+    remaining_qty = qty
+    total_amount = Decimal(0)
+    total_spent = Decimal(0)
+    for price, available_at_price in levels:
+        take = min(remaining_qty, available_at_price)
+        if remaining_qty <= 0:
+            break
+        if available_at_price <= 0:
+            continue
+        total_spent += take * price
+        total_amount += take
+        remaining_qty -= take
+    if remaining_qty > 0:
+        return None
+    return total_spent / total_amount, total_amount
+
+
+def create_level(price_ticks: int, qty_steps: int):
+    return OrderbookQuantityModel(price=Decimal(price_ticks).scaleb(-1), qty=Decimal(qty_steps).scaleb(-5))
+
+
+def create_deltas(rnd: random.Random) -> List[OrderbookUpdateModel]:
+    # Top of the book changes, the quantities stay positive
+    return [
+        OrderbookUpdateModel(
+            market="BTC-USD",
+            bid=[create_level(640_000 - rnd.randint(0, 2), rnd.choice([1, -1])) for _ in range(3)],
+            ask=[create_level(640_001 + rnd.randint(0, 2), rnd.choice([1, -1])) for _ in range(3)],
+        )
+        for _ in range(NUMBER_OF_DELTAS)
+    ]
+
+
+def main():
+    rnd = random.Random(0)
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD")
+    orderbook.init_orderbook(
+        OrderbookUpdateModel(
+            market="BTC-USD",
+            bid=[create_level(640_000 - i, rnd.randint(1_000, 500_000)) for i in range(LEVELS_PER_SIDE)],
+            ask=[create_level(640_001 + i, rnd.randint(1_000, 500_000)) for i in range(LEVELS_PER_SIDE)],
+        )
+    )
+    deltas = create_deltas(rnd)
+    # Up to ~100 levels deep
+    sizes = [Decimal(size).quantize(Decimal("0.00001")) for size in np.geomspace(0.01, 250, NUMBER_OF_SIZES)]
+    sizes_array = np.array([float(size) for size in sizes])
+
+    def query_walk():
+        for delta in deltas:
+            orderbook.update_orderbook(delta)
+            for size in sizes:
+                walk_price_impact_qty(size, orderbook._ask_levels.levels())
+
+    def query_index():
+        for delta in deltas:
+            orderbook.update_orderbook(delta)
+            for size in sizes:
+                orderbook.calculate_price_impact_qty(size, "BUY")
+
+    def query_curve():
+        for delta in deltas:
+            orderbook.update_orderbook(delta)
+            orderbook.calculate_price_impact_qty_curve(sizes_array, "BUY")
+
+    def apply_deltas():
+        for delta in deltas:
+            orderbook.update_orderbook(delta)
+
+    def measure(run):
+        return min(timeit.repeat(run, number=1, repeat=3)) / NUMBER_OF_DELTAS * 1_000_000
+
+    delta_us = measure(apply_deltas)
+    print(f"Delta only: {delta_us:.1f}us per delta")
+
+    for name, run in [
+        (f"{NUMBER_OF_SIZES} walks", query_walk),
+        (f"{NUMBER_OF_SIZES} indexed queries", query_index),
+        (f"Curve of {NUMBER_OF_SIZES} sizes", query_curve),
+    ]:
+        print(f"{name}: {measure(run) - delta_us:.1f}us per delta")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import json
+import timeit
+from typing import Any, Callable, List, Type
+
+from x10.perpetual.orders import OpenOrderModel, PlacedOrderModel
+from x10.utils.http import WrappedApiResponse, parse_response_to_model
+
+NUMBER_OF_RUNS = 20_000
+
+
+def create_open_order_json(order_id: int):
+    return {
+        "id": order_id,
+        "accountId": 3004,
+        "externalId": str(order_id),
+        "market": "BTC-USD",
+        "type": "LIMIT",
+        "side": "BUY",
+        "status": "NEW",
+        "statusReason": None,
+        "price": "43445.1168000000000000",
+        "averagePrice": None,
+        "qty": "0.0010000000000000",
+        "filledQty": "0",
+        "reduceOnly": False,
+        "postOnly": True,
+        "payedFee": "0",
+        "createdTime": 1720689301691,
+        "updatedTime": 1720689301691,
+        "expiryTime": 1721294101691,
+    }
+
+
+def decode_before(response_body: bytes, model_class: Type[Any]):
+    # What `parse_response_to_model` used to do: decode the body to `str`
+    # and parametrize the generic response model on every call
+    return WrappedApiResponse[model_class].model_validate_json(response_body.decode())  # type: ignore[valid-type]
+
+
+def decode_after(response_body: bytes, model_class: Type[Any]):
+    return parse_response_to_model(response_body, model_class)
+
+
+def run_case(name: str, response_body: bytes, model_class: Type[Any], number: int):
+    def measure(decode: Callable[[bytes, Type[Any]], Any]):
+        decode(response_body, model_class)
+        return min(timeit.repeat(lambda: decode(response_body, model_class), number=number, repeat=5)) / number
+
+    before_us = measure(decode_before) * 1_000_000
+    after_us = measure(decode_after) * 1_000_000
+
+    print(f"{name}: before={before_us:.2f}us, after={after_us:.2f}us, speedup={before_us / after_us:.2f}x")
+
+
+def main():
+    order_ack_body = json.dumps({"status": "OK", "data": {"id": 1, "externalId": "1"}}).encode()
+    open_orders_body = json.dumps(
+        {"status": "OK", "data": [create_open_order_json(order_id) for order_id in range(50)]}
+    ).encode()
+
+    run_case("Order ack (PlacedOrderModel)", order_ack_body, PlacedOrderModel, NUMBER_OF_RUNS)
+    run_case("50 open orders (List[OpenOrderModel])", open_orders_body, List[OpenOrderModel], NUMBER_OF_RUNS // 50)
+
+
+if __name__ == "__main__":
+    main()
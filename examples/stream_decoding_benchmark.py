@@ -0,0 +1,90 @@
+import json
+import random
+import timeit
+from typing import Any, Callable
+
+from x10.perpetual.stream_client.trusted_decoders import (
+    CandlesStreamMsg,
+    OrderbookStreamMsg,
+    PublicTradesStreamMsg,
+    decode_candles_msg,
+    decode_orderbook_msg,
+    decode_public_trades_msg,
+)
+
+NUMBER_OF_MSGS = 20_000
+
+
+def create_orderbook_msg_json(rnd: random.Random, msg_type: str, levels_count: int):
+    def create_levels(mid_price: int, step: int):
+        return [
+            {"q": f"{rnd.randint(1, 100_000) / 1000:.3f}", "p": f"{mid_price + step * i}.0"}
+            for i in range(levels_count)
+        ]
+
+    return json.dumps(
+        {
+            "type": msg_type,
+            "data": {"m": "BTC-USD", "b": create_levels(62_000, -1), "a": create_levels(62_001, 1)},
+            "ts": 1728478223080,
+            "seq": 1,
+        }
+    )
+
+
+def create_public_trades_msg_json(trades_count: int):
+    trade = {"i": 1844000421446684673, "m": "BTC-USD", "S": "BUY", "tT": "TRADE", "T": 1, "p": "62126.0", "q": "0.01"}
+
+    return json.dumps({"type": "TRADE", "data": [trade] * trades_count, "ts": 1728478223080, "seq": 1})
+
+
+def run_case(name: str, raw_msg: str, msg_model_class: Any, decoder: Callable[[str], Any], number: int):
+    def measure(decode: Callable[[str], Any]):
+        decode(raw_msg)
+        return min(timeit.repeat(lambda: decode(raw_msg), number=number, repeat=5)) / number
+
+    validated_s = measure(msg_model_class.model_validate_json)
+    trusted_s = measure(decoder)
+
+    print(
+        f"{name}: validated={1 / validated_s:,.0f} msgs/s, trusted={1 / trusted_s:,.0f} msgs/s, "
+        f"speedup={validated_s / trusted_s:.2f}x"
+    )
+
+
+def main():
+    rnd = random.Random(0)
+    candles_msg = {"data": [{"o": "3458.64", "l": "3399.07", "h": "3476.89", "c": "3414.85", "v": "3.9", "T": 1}]}
+
+    run_case(
+        "Orderbook delta (5 levels per side)",
+        create_orderbook_msg_json(rnd, "DELTA", 5),
+        OrderbookStreamMsg,
+        decode_orderbook_msg,
+        NUMBER_OF_MSGS,
+    )
+    run_case(
+        "Orderbook snapshot (100 levels per side)",
+        create_orderbook_msg_json(rnd, "SNAPSHOT", 100),
+        OrderbookStreamMsg,
+        decode_orderbook_msg,
+        NUMBER_OF_MSGS // 20,
+    )
+    run_case(
+        "Public trades (3 trades)",
+        create_public_trades_msg_json(3),
+        PublicTradesStreamMsg,
+        decode_public_trades_msg,
+        NUMBER_OF_MSGS,
+    )
+    run_case(
+        "Candles",
+        json.dumps({**candles_msg, "ts": 1, "seq": 1}),
+        CandlesStreamMsg,
+        decode_candles_msg,
+        NUMBER_OF_MSGS,
+    )
+
+
+if __name__ == "__main__":
+    main()
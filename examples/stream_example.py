@@ -4,7 +4,8 @@ import signal
 
 from examples.utils import init_logging
 from x10.perpetual.configuration import TESTNET_CONFIG
-from x10.perpetual.stream_client import PerpetualStreamClient
+from x10.perpetual.stream_client import PerpetualStreamClient, StreamReconnectPolicy
+from x10.perpetual.stream_client.stream_hub import OverflowPolicy, StreamHub
 
 API_KEY = "<API_KEY>"
 
@@ -94,6 +95,41 @@ async def merge_streams_example():
     await asyncio.gather(run_producer_stream1(), run_producer_stream2(), run_consumer())
 
 
+async def stream_hub_example():
+    logger = logging.getLogger("stream_example[stream_hub_example]")
+    stream_client = PerpetualStreamClient(api_url=TESTNET_CONFIG.stream_url, reconnect_policy=StreamReconnectPolicy())
+    hub = StreamHub(stream_client)
+
+    # Both consumers share one connection. The slow analytics consumer only sees the latest update
+    # when it falls behind, so it never holds back the order book updates.
+    book_consumer = hub.subscribe_to_orderbooks("BTC-USD", name="book")
+    analytics_consumer = hub.subscribe_to_orderbooks(
+        "BTC-USD", name="analytics", max_queue_size=1, overflow_policy=OverflowPolicy.CONFLATE
+    )
+
+    async def run_book_consumer():
+        async for msg in book_consumer:
+            logger.info("Book update: %s", msg.seq)
+
+    async def run_analytics_consumer():
+        async for msg in analytics_consumer:
+            logger.info("Analytics update: %s", msg.seq)
+            await asyncio.sleep(1)
+
+    async def report_lag():
+        while True:
+            await asyncio.sleep(5)
+            for stats in hub.get_consumer_stats():
+                logger.info("Consumer %s: lag=%.3fs, dropped=%s", stats.name, stats.lag_seconds, stats.dropped)
+
+    try:
+        await asyncio.wait_for(asyncio.gather(run_book_consumer(), run_analytics_consumer(), report_lag()), 30)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        await hub.close()
+
+
 async def main():
     await iterator_example()
 
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+from multiprocessing import Process
+
+from examples.utils import init_logging
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.stream_client import PerpetualStreamClient, StreamReconnectPolicy
+from x10.perpetual.top_of_book import TopOfBookPublisher, TopOfBookTable
+from x10.perpetual.trading_client import PerpetualTradingClient
+
+MARKETS = ["BTC-USD", "ETH-USD", "SOL-USD"]
+RUN_SECONDS = 30
+
+
+def run_strategy_worker(table_name: str, market_name: str):
+    # A strategy process: no stream and no decoding, it reads the table of the publisher
+    init_logging()
+    logger = logging.getLogger(f"top_of_book_example[{market_name}]")
+    table = TopOfBookTable.attach(table_name)
+    last_seq = 0
+    reads = 0
+    read_ns = 0
+    deadline = time.monotonic() + RUN_SECONDS
+
+    try:
+        while time.monotonic() < deadline:
+            start_ns = time.perf_counter_ns()
+            top_of_book = table.read(market_name)
+            read_ns += time.perf_counter_ns() - start_ns
+            reads += 1
+
+            if top_of_book.seq != last_seq:
+                last_seq = top_of_book.seq
+                logger.info(
+                    "seq=%s bid=%s@%s ask=%s@%s mark=%s",
+                    top_of_book.seq,
+                    top_of_book.bid_qty,
+                    top_of_book.bid_price,
+                    top_of_book.ask_qty,
+                    top_of_book.ask_price,
+                    top_of_book.mark_price,
+                )
+
+            time.sleep(0.001)
+
+        logger.info("%s reads, %.2fus per read", reads, read_ns / reads / 1000)
+    finally:
+        table.close()
+
+
+async def run_publisher(table: TopOfBookTable):
+    stream_client = PerpetualStreamClient(api_url=TESTNET_CONFIG.stream_url, reconnect_policy=StreamReconnectPolicy())
+    trading_client = PerpetualTradingClient(endpoint_config=TESTNET_CONFIG)
+    publisher = TopOfBookPublisher(
+        table,
+        TESTNET_CONFIG,
+        stream_client=stream_client,
+        snapshot_provider=lambda market_name: trading_client.markets_info.get_orderbook_snapshot(
+            market_name=market_name
+        ),
+    )
+    publisher.start()
+
+    try:
+        await asyncio.wait_for(publisher.poll_mark_prices(trading_client.markets_info), RUN_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        await publisher.close()
+        await trading_client.close()
+
+
+def main():
+    init_logging()
+    table = TopOfBookTable.create(MARKETS)
+
+    try:
+        workers = [Process(target=run_strategy_worker, args=(table.name, market_name)) for market_name in MARKETS]
+        for worker in workers:
+            worker.start()
+
+        asyncio.run(run_publisher(table))
+
+        for worker in workers:
+            worker.join()
+    finally:
+        table.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,10 +15,13 @@ from x10.perpetual.accounts import StarkPerpetualAccount
 from x10.perpetual.configuration import TESTNET_CONFIG
 from x10.perpetual.orderbook import OrderBook
 from x10.perpetual.orders import OrderSide
+from x10.perpetual.simple_client.order_gateway import PipelinedOrderGateway
 from x10.perpetual.simple_client.simple_trading_client import BlockingTradingClient
 from x10.perpetual.trading_client import PerpetualTradingClient
 
 NUM_PRICE_LEVELS = 1
+# Operations in flight per market (1 runs place, cancel, place... one at a time)
+MAX_IN_FLIGHT = 4
 
 PLACE = "PLACE"
 CANCEL = "CANCEL"
@@ -90,6 +93,8 @@ async def setup_and_run(base: str = "BTC", queue: Optional[Queue] = None):
         account=stark_account,
     )
 
+    gateway = PipelinedOrderGateway(blocking_client, max_in_flight=MAX_IN_FLIGHT)
+
     markets = await blocking_client.get_markets()
     market = markets[market_name]
 
@@ -100,6 +105,15 @@ async def setup_and_run(base: str = "BTC", queue: Optional[Queue] = None):
 
     await orderbook.start_orderbook()
 
+    def put_operation(name: str):
+        def callback(task: asyncio.Task):
+            if queue is None or task.cancelled() or task.exception():
+                return
+            timed = task.result()
+            queue.put(TimedOperation(name, timed.start_nanos, timed.end_nanos, timed.operation_ms))
+
+        return callback
+
     def order_loop(idx: int, side: OrderSide, outbound_queue: Optional[Queue] = None) -> asyncio.Task:
         side_adjustment = Decimal("-1") if side == OrderSide.BUY else Decimal("1")
         base_offset = side_adjustment * Decimal("0.02")
@@ -113,30 +127,18 @@ async def setup_and_run(base: str = "BTC", queue: Optional[Queue] = None):
                         + side_adjustment * market.trading_config.min_price_change * idx,
                         market.trading_config.price_precision,
                     )
-                    timed_place = await blocking_client.create_and_place_order(
+                    # Waits while `MAX_IN_FLIGHT` operations of the market are in flight
+                    ticket = await gateway.submit_place(
                         market_name=market_name,
                         amount_of_synthetic=market.trading_config.min_order_size,
                         price=order_price,
                         side=side,
                         post_only=True,
                     )
-                    queue.put(
-                        TimedOperation(
-                            PLACE,
-                            timed_place.start_nanos,
-                            timed_place.end_nanos,
-                            timed_place.operation_ms,
-                        )
-                    )
-                    timed_cancel = await blocking_client.cancel_order(order_id=timed_place.id)
-                    queue.put(
-                        TimedOperation(
-                            CANCEL,
-                            timed_cancel.start_nanos,
-                            timed_cancel.end_nanos,
-                            timed_cancel.operation_ms,
-                        )
-                    )
+                    ticket.placed.add_done_callback(put_operation(PLACE))
+                    # Sent once the placement is confirmed
+                    cancelled = await gateway.submit_cancel(ticket)
+                    cancelled.add_done_callback(put_operation(CANCEL))
                 else:
                     print("No baseline price for market", market_name)
                     await asyncio.sleep(1)
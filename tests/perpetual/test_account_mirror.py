@@ -0,0 +1,282 @@
+import asyncio
+import contextlib
+import dataclasses
+from decimal import Decimal
+from typing import List
+
+import pytest
+import websockets
+from aiohttp import web
+from hamcrest import assert_that, equal_to
+
+from tests.perpetual.test_stream_client import get_url_from_server
+from x10.perpetual.accounts import AccountStreamDataModel
+from x10.perpetual.balances import BalanceModel
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.positions import PositionModel, PositionSide
+from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
+from x10.utils.http import WrappedApiResponse, WrappedStreamResponse
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def create_position(market, *, size="0.1", side="LONG", updated_at=1):
+    return PositionModel(
+        id=1,
+        account_id=1,
+        market=market,
+        side=side,
+        leverage=Decimal("10"),
+        size=Decimal(size),
+        value=Decimal("4344.5"),
+        open_price=Decimal("43445"),
+        mark_price=Decimal("43445"),
+        unrealised_pnl=Decimal("0"),
+        realised_pnl=Decimal("0"),
+        created_at=0,
+        updated_at=updated_at,
+    )
+
+
+def create_balance(balance, *, updated_time=1):
+    return BalanceModel(
+        collateral_name="USD",
+        balance=Decimal(balance),
+        equity=Decimal(balance),
+        available_for_trade=Decimal(balance),
+        available_for_withdrawal=Decimal(balance),
+        unrealised_pnl=Decimal("0"),
+        initial_margin=Decimal("0"),
+        margin_ratio=Decimal("0"),
+        updated_time=updated_time,
+    )
+
+
+def create_message(*, positions=None, balance=None, seq=1):
+    return WrappedStreamResponse[AccountStreamDataModel](
+        type="POSITION", data=AccountStreamDataModel(positions=positions, balance=balance), ts=1704798222748, seq=seq
+    )
+
+
+def get_markets(positions):
+    return sorted(position.market for position in positions)
+
+
+class AccountStream:
+    def __init__(self):
+        self.websockets: list = []
+
+    async def send(self, message: WrappedStreamResponse):
+        await self.websockets[-1].send(message.model_dump_json())
+
+    async def close(self):
+        await self.websockets[-1].close()
+
+
+async def wait_for(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+
+    raise AssertionError("Timed out")
+
+
+@contextlib.asynccontextmanager
+async def start_account_stream(mirror):
+    account_stream = AccountStream()
+
+    async def serve(websocket):
+        account_stream.websockets.append(websocket)
+        await websocket.wait_closed()
+
+    async with websockets.serve(serve, "127.0.0.1", 0) as server:
+        mirror.start(PerpetualStreamClient(api_url=get_url_from_server(server)), "api-key")
+        await wait_for(lambda: mirror.is_stream_live and account_stream.websockets)
+
+        yield account_stream
+
+        await mirror.close()
+
+
+@pytest.mark.asyncio
+async def test_freshness_and_staleness():
+    from x10.perpetual.trading_client.account_mirror import AccountStateMirror
+
+    clock = FakeClock()
+    mirror = AccountStateMirror(max_staleness_seconds=5, clock=clock)
+    positions = [create_position("BTC-USD"), create_position("ETH-USD", side="SHORT")]
+
+    # The REST seed alone doesn't keep the mirror up to date
+    mirror.seed_positions(positions, clock())
+    assert_that(mirror.get_positions(), equal_to(None))
+    assert_that(mirror.positions_staleness_seconds, equal_to(None))
+
+    async with start_account_stream(mirror):
+        clock.now = 1
+        mirror.seed_positions(positions, clock())
+        clock.now = 3
+        mirror.apply_event(create_message(balance=create_balance("100")))
+
+        assert_that(get_markets(mirror.get_positions()), equal_to(["BTC-USD", "ETH-USD"]))
+        assert_that(get_markets(mirror.get_positions(position_side=PositionSide.SHORT)), equal_to(["ETH-USD"]))
+        assert_that(get_markets(mirror.get_positions(market_names=["BTC-USD", "SOL-USD"])), equal_to(["BTC-USD"]))
+        # The balance from the stream is not served before a seed
+        assert_that(mirror.get_balance(), equal_to(None))
+
+        clock.now = 8
+        assert_that(mirror.positions_staleness_seconds, equal_to(5))
+        assert_that(mirror.get_positions() is not None, equal_to(True))
+
+        clock.now = 8.5
+        assert_that(mirror.get_positions(), equal_to(None))
+        assert_that((mirror.stats.hits, mirror.stats.misses), equal_to((4, 3)))
+
+
+@pytest.mark.asyncio
+async def test_gap_and_stream_end_invalidate_mirror():
+    from x10.perpetual.trading_client.account_mirror import AccountStateMirror
+
+    clock = FakeClock()
+    mirror = AccountStateMirror(clock=clock)
+
+    # Requested before the subscription
+    mirror.seed_balance(create_balance("110"), clock())
+
+    async with start_account_stream(mirror) as account_stream:
+        assert_that(mirror.get_balance(), equal_to(None))
+
+        clock.now = 1
+        mirror.seed_balance(create_balance("100"), clock())
+        await account_stream.send(create_message(seq=1))
+        await wait_for(lambda: mirror.stats.events_applied == 1)
+
+        assert_that(mirror.get_balance().balance, equal_to(Decimal("100")))
+
+        # seq 2 was lost
+        clock.now = 2
+        await account_stream.send(create_message(seq=3))
+        await wait_for(lambda: mirror.stats.events_applied == 2)
+
+        assert_that(mirror.is_stream_live, equal_to(True))
+        assert_that(mirror.get_balance(), equal_to(None))
+        assert_that(mirror.balance_staleness_seconds, equal_to(None))
+
+        mirror.seed_balance(create_balance("90", updated_time=2), requested_at=1.5)
+        assert_that(mirror.get_balance(), equal_to(None))
+
+        clock.now = 3
+        mirror.seed_balance(create_balance("80", updated_time=3), requested_at=2.5)
+        assert_that(mirror.get_balance().balance, equal_to(Decimal("80")))
+
+        # Nothing updates the mirror after the stream ends
+        await account_stream.close()
+        await wait_for(lambda: not mirror.is_stream_live)
+
+        assert_that(mirror.get_balance(), equal_to(None))
+        assert_that(mirror.stats.invalidations, equal_to(2))
+
+
+@pytest.mark.asyncio
+async def test_stream_updates_and_seed():
+    from x10.perpetual.trading_client.account_mirror import AccountStateMirror
+
+    clock = FakeClock()
+    mirror = AccountStateMirror(clock=clock)
+
+    async with start_account_stream(mirror):
+        clock.now = 1
+        mirror.seed_positions([create_position("BTC-USD"), create_position("ETH-USD")], clock())
+
+        clock.now = 2
+        mirror.apply_event(create_message(positions=[create_position("BTC-USD", size="0", updated_at=2)]))
+        # Older than the known position
+        mirror.apply_event(create_message(positions=[create_position("ETH-USD", size="0.5", updated_at=0)]))
+
+        assert_that(get_markets(mirror.get_positions()), equal_to(["ETH-USD"]))
+        assert_that(mirror.get_positions()[0].size, equal_to(Decimal("0.1")))
+
+        # The seed was requested before the stream closed BTC-USD and opened SOL-USD
+        requested_at = 1.5
+        clock.now = 3
+        mirror.apply_event(create_message(positions=[create_position("SOL-USD", updated_at=2)]))
+        mirror.seed_positions([create_position("BTC-USD")], requested_at)
+
+        assert_that(get_markets(mirror.get_positions()), equal_to(["SOL-USD"]))
+        assert_that(mirror.stats.seeds, equal_to(2))
+
+
+def serve_counted(data, counts, name):
+    async def _serve_counted(_request):
+        counts[name] = counts.get(name, 0) + 1
+        await asyncio.sleep(0.01)
+
+        return web.Response(text=data)
+
+    return _serve_counted
+
+
+@pytest.mark.asyncio
+async def test_account_module_is_served_from_mirror(aiohttp_server, create_trading_account):
+    from x10.perpetual.trading_client import PerpetualTradingClient
+    from x10.perpetual.trading_client.account_mirror import AccountStateMirror
+
+    positions = WrappedApiResponse[List[PositionModel]](
+        status="OK", data=[create_position("BTC-USD"), create_position("ETH-USD", side="SHORT")]
+    )
+    balance = WrappedApiResponse[BalanceModel](status="OK", data=create_balance("100"))
+    counts: dict = {}
+
+    app = web.Application()
+    app.router.add_get("/user/positions", serve_counted(positions.model_dump_json(), counts, "positions"))
+    app.router.add_get("/user/balance", serve_counted(balance.model_dump_json(), counts, "balance"))
+
+    server = await aiohttp_server(app)
+    url = f"http://{server.host}:{server.port}"
+
+    clock = FakeClock()
+    mirror = AccountStateMirror(clock=clock)
+    endpoint_config = dataclasses.replace(TESTNET_CONFIG, api_base_url=url)
+    trading_client = PerpetualTradingClient(
+        endpoint_config=endpoint_config, stark_account=create_trading_account(), account_mirror=mirror
+    )
+
+    # Without the stream every call goes to REST
+    await trading_client.account.get_balance()
+    await trading_client.account.get_balance()
+
+    assert_that(counts, equal_to({"balance": 2}))
+
+    async with start_account_stream(mirror):
+        clock.now = 1
+
+        # Concurrent misses share one request
+        responses = await asyncio.gather(
+            trading_client.account.get_positions(market_names=["ETH-USD"]),
+            trading_client.account.get_positions(),
+        )
+        assert_that(
+            [get_markets(response.data) for response in responses], equal_to([["ETH-USD"], ["BTC-USD", "ETH-USD"]])
+        )
+
+        cached = await trading_client.account.get_positions(position_side=PositionSide.LONG)
+        await trading_client.account.get_balance()
+        cached_balance = await trading_client.account.get_balance()
+
+        assert_that(cached.status, equal_to("OK"))
+        assert_that(get_markets(cached.data), equal_to(["BTC-USD"]))
+        assert_that(cached_balance.data.balance, equal_to(Decimal("100")))
+        assert_that(counts, equal_to({"positions": 1, "balance": 3}))
+
+        clock.now = 10
+        await trading_client.account.get_positions()
+
+        assert_that(counts["positions"], equal_to(2))
+
+    await trading_client.close()
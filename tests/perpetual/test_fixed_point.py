@@ -0,0 +1,71 @@
+import decimal
+import random
+from decimal import Decimal
+
+from hamcrest import assert_that, equal_to, none
+
+from x10.perpetual.amounts import (
+    ROUNDING_BUY_CONTEXT,
+    ROUNDING_FEE_CONTEXT,
+    ROUNDING_SELL_CONTEXT,
+    HumanReadableAmount,
+)
+from x10.perpetual.fixed_point import FixedPointOrderAmounts
+
+
+def to_stark_amounts_with_decimal(market, synthetic_amount: Decimal, price: Decimal, fee_rate: Decimal, is_buying):
+    rounding_context = ROUNDING_BUY_CONTEXT if is_buying else ROUNDING_SELL_CONTEXT
+    collateral_amount = synthetic_amount * price
+
+    return (
+        HumanReadableAmount(synthetic_amount, market.synthetic_asset).to_stark_amount(rounding_context).value,
+        HumanReadableAmount(collateral_amount, market.collateral_asset).to_stark_amount(rounding_context).value,
+        HumanReadableAmount(fee_rate * collateral_amount, market.collateral_asset)
+        .to_stark_amount(ROUNDING_FEE_CONTEXT)
+        .value,
+    )
+
+
+def test_fixed_point_amounts_match_decimal_rounding(create_btc_usd_market):
+    btc_usd_market = create_btc_usd_market()
+    fee_rate = Decimal("0.00025")
+    fixed_point_amounts = FixedPointOrderAmounts(btc_usd_market, fee_rate)
+    rng = random.Random(42)
+
+    for _ in range(2000):
+        synthetic_amount = Decimal(rng.randint(1, 10**7)) * btc_usd_market.trading_config.min_order_size_change
+        price = Decimal(rng.randint(1, 10**7)) * btc_usd_market.trading_config.min_price_change
+        is_buying = rng.random() < 0.5
+
+        assert_that(
+            fixed_point_amounts.to_stark_amounts(synthetic_amount, price, is_buying),
+            equal_to(to_stark_amounts_with_decimal(btc_usd_market, synthetic_amount, price, fee_rate, is_buying)),
+        )
+
+
+def test_fixed_point_amounts_reject_unaligned_values(create_btc_usd_market):
+    btc_usd_market = create_btc_usd_market()
+    fixed_point_amounts = FixedPointOrderAmounts(btc_usd_market, Decimal("0.0005"))
+
+    assert_that(fixed_point_amounts.to_stark_amounts(Decimal("0.000001"), Decimal("100"), True), none())
+    assert_that(fixed_point_amounts.to_stark_amounts(Decimal("0.001"), Decimal("100.01"), True), none())
+    assert_that(fixed_point_amounts.to_stark_amounts(Decimal("-0.001"), Decimal("100"), True), none())
+    assert_that(fixed_point_amounts.to_stark_amounts(Decimal("1E+30"), Decimal("100"), True), none())
+    assert_that(
+        fixed_point_amounts.to_stark_amounts(Decimal("0.00100000"), Decimal("43445.10"), False),
+        equal_to((1000, 43445100, 21723)),
+    )
+
+
+def test_fixed_point_amounts_respect_current_context_precision(create_btc_usd_market):
+    btc_usd_market = create_btc_usd_market()
+    fixed_point_amounts = FixedPointOrderAmounts(btc_usd_market, Decimal("0.0005"))
+
+    # `amount * price` of the `Decimal` path is rounded in the current context
+    with decimal.localcontext(prec=8):
+        assert_that(fixed_point_amounts.to_stark_amounts(Decimal("0.001"), Decimal("43445.1"), True), none())
+
+    assert_that(
+        fixed_point_amounts.to_stark_amounts(Decimal("0.001"), Decimal("43445.1"), True),
+        equal_to((1000, 43445100, 21723)),
+    )
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from hamcrest import assert_that, equal_to
+
+from x10.perpetual.simple_client.order_correlation import OrderCorrelationRegistry
+
+
+@pytest.mark.asyncio
+async def test_waiter_gets_event():
+    registry: OrderCorrelationRegistry[str, int] = OrderCorrelationRegistry()
+    registry.register("order-1")
+
+    asyncio.get_running_loop().call_soon(registry.resolve, "order-1", 42)
+    value = await registry.wait("order-1", 1)
+    registry.release("order-1")
+
+    stats = registry.stats
+    assert_that(value, equal_to(42))
+    assert_that("order-1" in registry, equal_to(False))
+    assert_that((stats.waiters, stats.resolved, stats.buffered_events), equal_to((0, 1, 0)))
+
+
+@pytest.mark.asyncio
+async def test_early_event_is_kept_for_waiter_registered_later():
+    registry: OrderCorrelationRegistry[int, str] = OrderCorrelationRegistry()
+    registry.resolve(1, "first")
+    registry.resolve(1, "second")
+
+    assert_that(registry.stats.buffered_events, equal_to(1))
+
+    registry.register(1)
+    value = await registry.wait(1, 1)
+    registry.release(1)
+
+    assert_that(value, equal_to("first"))
+    assert_that(registry.stats.buffered_events, equal_to(0))
+
+
+@pytest.mark.asyncio
+async def test_early_events_expire_and_are_bounded():
+    registry: OrderCorrelationRegistry[int, int] = OrderCorrelationRegistry(
+        early_event_ttl_seconds=0.01, max_early_events=2
+    )
+
+    for key in range(3):
+        registry.resolve(key, key)
+
+    assert_that((registry.stats.buffered_events, registry.stats.dropped_events), equal_to((2, 1)))
+
+    await asyncio.sleep(0.02)
+
+    assert_that((registry.stats.buffered_events, registry.stats.expired_events), equal_to((0, 2)))
+
+
+@pytest.mark.asyncio
+async def test_timeout_removes_waiter():
+    registry: OrderCorrelationRegistry[int, int] = OrderCorrelationRegistry()
+    registry.register(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        try:
+            await registry.wait(1, 0.01)
+        finally:
+            registry.release(1)
+
+    stats = registry.stats
+    assert_that((stats.waiters, stats.timeouts), equal_to((0, 1)))
+
+
+@pytest.mark.asyncio
+async def test_waiters_of_same_key_share_event():
+    registry: OrderCorrelationRegistry[int, int] = OrderCorrelationRegistry()
+
+    assert_that(registry.register(1), equal_to(True))
+    assert_that(registry.register(1), equal_to(False))
+
+    # The timeout of one waiter doesn't cancel the event of the other
+    with pytest.raises(asyncio.TimeoutError):
+        await registry.wait(1, 0.01)
+    registry.release(1)
+
+    waiting = asyncio.create_task(registry.wait(1, 1))
+    await asyncio.sleep(0)
+    registry.resolve(1, 7)
+
+    assert_that(await waiting, equal_to(7))
+    registry.release(1)
+    assert_that(registry.stats.waiters, equal_to(0))
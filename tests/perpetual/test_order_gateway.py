@@ -0,0 +1,129 @@
+import asyncio
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Dict, List
+
+import pytest
+from hamcrest import assert_that, equal_to
+
+from x10.utils.stats import get_percentile
+
+
+class FakeBlockingClient:
+    def __init__(self, confirm_placements: bool = False):
+        self.confirm_placements = confirm_placements
+        self.calls: List[str] = []
+        self.placements: Dict[int, asyncio.Event] = {}
+        self.next_order_id = 1
+
+    async def create_and_place_order(self, market_name, amount_of_synthetic, price, side, post_only=False):
+        order_id = self.next_order_id
+        self.next_order_id += 1
+        self.calls.append(f"place {order_id}")
+        self.placements[order_id] = asyncio.Event()
+        if self.confirm_placements:
+            self.placements[order_id].set()
+        start_nanos = time.time_ns()
+        await self.placements[order_id].wait()
+
+        return SimpleNamespace(id=order_id, start_nanos=start_nanos, end_nanos=time.time_ns(), operation_ms=1.0)
+
+    async def cancel_order(self, order_id):
+        self.calls.append(f"cancel {order_id}")
+        now = time.time_ns()
+
+        return SimpleNamespace(start_nanos=now, end_nanos=now, operation_ms=2.0)
+
+
+def create_gateway(client: FakeBlockingClient, **kwargs):
+    from x10.perpetual.simple_client.order_gateway import PipelinedOrderGateway
+
+    return PipelinedOrderGateway(client, **kwargs)  # type: ignore[arg-type]
+
+
+async def submit_place(gateway):
+    from x10.perpetual.orders import OrderSide
+
+    return await gateway.submit_place("BTC-USD", Decimal("0.001"), Decimal("43000"), OrderSide.BUY)
+
+
+def test_get_percentile():
+    values = [float(value) for value in range(1, 101)]
+
+    assert_that(get_percentile(values, 50), equal_to(50))
+    assert_that(get_percentile(values, 99), equal_to(99))
+    assert_that(get_percentile(values, 100), equal_to(100))
+    assert_that(get_percentile([5.0], 1), equal_to(5))
+
+
+@pytest.mark.asyncio
+async def test_submit_waits_for_free_slot():
+    from x10.perpetual.simple_client.order_gateway import OrderOperationType
+
+    client = FakeBlockingClient()
+    gateway = create_gateway(client, max_in_flight=2)
+
+    await submit_place(gateway)
+    await submit_place(gateway)
+    third = asyncio.create_task(submit_place(gateway))
+    await asyncio.sleep(0.01)
+
+    assert_that(third.done(), equal_to(False))
+    assert_that(gateway.get_in_flight("BTC-USD"), equal_to(2))
+
+    client.placements[1].set()
+    ticket = await asyncio.wait_for(third, 1)
+
+    for placement in client.placements.values():
+        placement.set()
+    await gateway.close()
+
+    stats = gateway.stats[OrderOperationType.PLACE]
+    assert_that((await ticket.placed).id, equal_to(3))
+    assert_that((stats.submitted, stats.completed, stats.throttled), equal_to((3, 3, 1)))
+    assert_that(gateway.get_in_flight("BTC-USD"), equal_to(0))
+
+
+@pytest.mark.asyncio
+async def test_cancel_is_sent_after_placement():
+    client = FakeBlockingClient()
+    gateway = create_gateway(client, max_in_flight=4)
+
+    first = await submit_place(gateway)
+    second = await submit_place(gateway)
+    cancelled = await gateway.submit_cancel(first)
+    await asyncio.sleep(0.01)
+
+    assert_that(client.calls, equal_to(["place 1", "place 2"]))
+    assert_that(await gateway.submit_cancel(first), equal_to(cancelled))
+
+    client.placements[1].set()
+    await cancelled
+    client.placements[2].set()
+    await gateway.close()
+
+    assert_that(second.placed.done(), equal_to(True))
+    assert_that(client.calls, equal_to(["place 1", "place 2", "cancel 1"]))
+
+
+@pytest.mark.asyncio
+async def test_windows_are_reported():
+    from x10.perpetual.simple_client.order_gateway import OrderOperationType
+
+    reports = []
+    client = FakeBlockingClient(confirm_placements=True)
+    gateway = create_gateway(client, report_interval_seconds=60, report_callback=reports.append)
+
+    for _ in range(3):
+        ticket = await submit_place(gateway)
+        await gateway.submit_cancel(ticket)
+
+    await gateway.close()
+
+    assert_that(
+        [report.operation for report in reports], equal_to([OrderOperationType.PLACE, OrderOperationType.CANCEL])
+    )
+    assert_that(
+        [(report.count, report.errors, report.p50_ms) for report in reports], equal_to([(3, 0, 1.0), (3, 0, 2.0)])
+    )
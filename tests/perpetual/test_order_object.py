@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from decimal import Decimal
 
@@ -238,3 +239,106 @@ async def test_external_order_id(mocker: MockerFixture, create_trading_account,
             }
         ),
     )
+
+
+@freeze_time("2024-01-05 01:08:56.860694")
+@pytest.mark.parametrize("use_threads", [True, False])
+def test_create_order_objects_batch(mocker: MockerFixture, create_trading_account, create_btc_usd_market, use_threads):
+    mocker.patch("x10.utils.starkex.generate_nonce", return_value=FROZEN_NONCE)
+
+    from x10.perpetual.order_object import (
+        OrderSpec,
+        create_order_object,
+        create_order_objects,
+    )
+    from x10.utils.starkex import create_signing_executor
+
+    trading_account = create_trading_account()
+    btc_usd_market = create_btc_usd_market()
+    order_specs = [
+        OrderSpec(
+            market=btc_usd_market,
+            amount_of_synthetic=Decimal("0.001"),
+            price=Decimal("43445") + level,
+            side=OrderSide.BUY if level % 2 else OrderSide.SELL,
+            expire_time=utc_now() + timedelta(days=14),
+            order_external_id=f"level-{level}" if level == 3 else None,
+        )
+        for level in range(5)
+    ]
+
+    with create_signing_executor(max_workers=2, use_threads=use_threads) as executor:
+        orders = create_order_objects(trading_account, order_specs, executor=executor)
+
+    expected_orders = [
+        create_order_object(
+            account=trading_account,
+            market=spec.market,
+            amount_of_synthetic=spec.amount_of_synthetic,
+            price=spec.price,
+            side=spec.side,
+            expire_time=spec.expire_time,
+            order_external_id=spec.order_external_id,
+        )
+        for spec in order_specs
+    ]
+
+    assert_that(
+        [order.to_api_request_json() for order in orders],
+        equal_to([order.to_api_request_json() for order in expected_orders]),
+    )
+    assert_that(orders[3].id, equal_to("level-3"))
+
+
+def test_process_pool_signs_in_calling_process():
+    from x10.utils.starkex import create_signing_executor, hash_and_sign_orders
+
+    hash_params = [(1, 2, 1, 2, 100 + index, 200, 1, 3, 4, 5) for index in range(4)]
+    signed_in = set()
+
+    # A closure cannot be pickled, the process pool workers only get the hash params
+    def signer(order_hash: int):
+        signed_in.add(os.getpid())
+        return order_hash, 0
+
+    with create_signing_executor(max_workers=2) as executor:
+        signed_hashes = hash_and_sign_orders(hash_params, signer, executor=executor, chunk_size=1)
+
+    assert_that(signed_hashes, equal_to(hash_and_sign_orders(hash_params, signer)))
+    assert_that(signed_in, equal_to({os.getpid()}))
+
+
+@freeze_time("2024-01-05 01:08:56.860694")
+@pytest.mark.parametrize("side", [OrderSide.BUY, OrderSide.SELL])
+def test_market_order_factory(mocker: MockerFixture, create_trading_account, create_btc_usd_market, side):
+    mocker.patch("x10.utils.starkex.generate_nonce", return_value=FROZEN_NONCE)
+
+    from x10.perpetual.order_factory import MarketOrderFactory
+    from x10.perpetual.order_object import create_order_object
+
+    trading_account = create_trading_account()
+    btc_usd_market = create_btc_usd_market()
+    factory = MarketOrderFactory(trading_account, btc_usd_market)
+
+    for price in [Decimal("43445.11680000"), Decimal("0.1"), Decimal("99999.9")]:
+        order_obj = factory.create_order(
+            amount_of_synthetic=Decimal("0.00123"),
+            price=price,
+            side=side,
+            post_only=True,
+            previous_order_id="previous_custom_id",
+            expire_time=utc_now() + timedelta(days=14),
+        )
+        expected_order_obj = create_order_object(
+            account=trading_account,
+            market=btc_usd_market,
+            amount_of_synthetic=Decimal("0.00123"),
+            price=price,
+            side=side,
+            post_only=True,
+            previous_order_id="previous_custom_id",
+            expire_time=utc_now() + timedelta(days=14),
+        )
+
+        assert_that(order_obj.to_api_request_json(), equal_to(expected_order_obj.to_api_request_json()))
+        assert_that(order_obj.model_dump(), equal_to(expected_order_obj.model_dump()))
@@ -0,0 +1,143 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from hamcrest import assert_that, equal_to
+
+from x10.perpetual.accounts import AccountStreamDataModel
+from x10.perpetual.order_state_store import OrderStateStore
+from x10.perpetual.orders import OpenOrderModel, OrderSide, OrderStatus
+from x10.perpetual.stream_client.perpetual_stream_connection import (
+    StreamGap,
+    StreamGapReason,
+)
+from x10.utils.http import WrappedApiResponse, WrappedStreamResponse
+
+
+def create_order(order_id, status, *, updated_time=1, side="BUY", market="BTC-USD", filled_qty="0"):
+    return OpenOrderModel(
+        id=order_id,
+        account_id=1,
+        external_id=f"external-{order_id}",
+        market=market,
+        type="LIMIT",
+        side=side,
+        status=status,
+        price=Decimal("43445"),
+        qty=Decimal("0.003"),
+        filled_qty=Decimal(filled_qty),
+        reduce_only=False,
+        post_only=False,
+        created_time=0,
+        updated_time=updated_time,
+    )
+
+
+def create_message(orders, message_type="ORDER"):
+    return WrappedStreamResponse[AccountStreamDataModel](
+        type=message_type, data=AccountStreamDataModel(orders=orders), ts=1704798222748, seq=1
+    )
+
+
+def get_ids(orders):
+    return sorted(order.id for order in orders)
+
+
+def test_partial_fills_and_terminal_states():
+    store = OrderStateStore()
+    store.apply_event(
+        create_message(
+            [
+                create_order(1, "NEW"),
+                create_order(2, "NEW", side="SELL"),
+                create_order(3, "NEW", market="ETH-USD"),
+            ]
+        )
+    )
+    store.apply_order(create_order(1, "PARTIALLY_FILLED", updated_time=2, filled_qty="0.001"))
+
+    assert_that(len(store), equal_to(3))
+    assert_that(get_ids(store.get_open_orders("BTC-USD")), equal_to([1, 2]))
+    assert_that(get_ids(store.get_open_orders("BTC-USD", OrderSide.SELL)), equal_to([2]))
+    assert_that(get_ids(store.get_open_orders(side=OrderSide.BUY)), equal_to([1, 3]))
+    assert_that(store.get_order_by_external_id("external-1").filled_qty, equal_to(Decimal("0.001")))
+
+    store.apply_order(create_order(1, "FILLED", updated_time=3, filled_qty="0.003"))
+    # Older than the known state
+    store.apply_order(create_order(1, "PARTIALLY_FILLED", updated_time=2, filled_qty="0.001"))
+    store.apply_order(create_order(3, "CANCELLED", updated_time=2))
+
+    assert_that(get_ids(store.get_open_orders()), equal_to([2]))
+    assert_that(store.get_open_orders("ETH-USD"), equal_to([]))
+    assert_that(store.get_order(1).status, equal_to(OrderStatus.FILLED.value))
+    assert_that(store.stats.stale_updates, equal_to(1))
+
+
+def test_terminal_orders_are_bounded():
+    store = OrderStateStore(max_terminal_orders=1)
+    store.apply_order(create_order(1, "CANCELLED"))
+    store.apply_order(create_order(2, "CANCELLED"))
+
+    assert_that(store.get_order_by_external_id("external-1"), equal_to(None))
+    assert_that(store.get_order_by_external_id("external-2").id, equal_to(2))
+
+
+@pytest.mark.asyncio
+async def test_wait_for_status():
+    store = OrderStateStore()
+    store.apply_order(create_order(1, "NEW"))
+
+    assert_that((await store.wait_for_status("external-1", [OrderStatus.NEW])).id, equal_to(1))
+
+    filled = asyncio.create_task(store.wait_for_status("external-1", [OrderStatus.FILLED]))
+    terminal = asyncio.create_task(store.wait_for_terminal("external-1"))
+    await asyncio.sleep(0)
+    store.apply_order(create_order(1, "PARTIALLY_FILLED", updated_time=2))
+
+    assert_that(filled.done(), equal_to(False))
+
+    store.apply_order(create_order(1, "CANCELLED", updated_time=3))
+
+    # A terminal state ends the wait for any status
+    assert_that((await filled).status, equal_to(OrderStatus.CANCELLED.value))
+    assert_that((await terminal).status, equal_to(OrderStatus.CANCELLED.value))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await store.wait_for_status("external-2", [OrderStatus.NEW], timeout_seconds=0.01)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_after_gap():
+    response_sent = asyncio.Event()
+    release_response = asyncio.Event()
+
+    async def get_open_orders():
+        response_sent.set()
+        await release_response.wait()
+        return WrappedApiResponse[list](
+            status="OK", data=[create_order(2, "PARTIALLY_FILLED", updated_time=2), create_order(4, "NEW")]
+        )
+
+    store = OrderStateStore(open_orders_provider=get_open_orders)
+    store.apply_event(create_message([create_order(1, "NEW"), create_order(2, "NEW")]))
+
+    store.on_stream_gap(StreamGap(reason=StreamGapReason.RECONNECT, last_seq=1, seq=10))
+    await response_sent.wait()
+    # Placed while the open orders are requested
+    store.apply_order(create_order(3, "NEW"))
+    release_response.set()
+    await asyncio.sleep(0.01)
+
+    assert_that(store.is_reconciling, equal_to(False))
+    assert_that(get_ids(store.get_open_orders()), equal_to([2, 3, 4]))
+    assert_that(store.get_order(2).status, equal_to(OrderStatus.PARTIALLY_FILLED.value))
+    assert_that((store.stats.reconciled_added, store.stats.reconciled_removed), equal_to((1, 1)))
+
+
+def test_snapshot_replaces_open_orders():
+    store = OrderStateStore()
+    store.apply_event(create_message([create_order(1, "NEW"), create_order(2, "NEW")]))
+    store.apply_event(create_message([create_order(2, "NEW"), create_order(3, "NEW")], message_type="SNAPSHOT"))
+
+    assert_that(get_ids(store.get_open_orders("BTC-USD", OrderSide.BUY)), equal_to([2, 3]))
+    assert_that(store.get_order_by_external_id("external-1"), equal_to(None))
@@ -0,0 +1,127 @@
+from decimal import Decimal
+
+from hamcrest import assert_that, equal_to
+from pytest_mock import MockerFixture
+
+from x10.perpetual.order_trace import OrderStage, OrderTrace, OrderTracer
+from x10.perpetual.orders import OpenOrderModel, OrderSide, OrderStatus, OrderType
+
+FROZEN_NONCE = 1473459052
+MS = 1_000_000
+
+
+def create_open_order(external_id: str, status: OrderStatus):
+    return OpenOrderModel(
+        id=1,
+        account_id=1,
+        external_id=external_id,
+        market="BTC-USD",
+        type=OrderType.LIMIT,
+        side=OrderSide.BUY,
+        status=status,
+        price=Decimal("43445"),
+        qty=Decimal("0.001"),
+        reduce_only=False,
+        post_only=True,
+        created_time=0,
+        updated_time=0,
+    )
+
+
+def create_placed_trace(tracer: OrderTracer, external_id: str, network_ms: int) -> OrderTrace:
+    trace = tracer.start("BTC-USD")
+    start_ns = trace.timestamps[OrderStage.INTENT]
+
+    for offset_ms, stage in enumerate(
+        [OrderStage.AMOUNTS_CONVERTED, OrderStage.HASHED, OrderStage.SIGNED, OrderStage.SERIALIZED], start=1
+    ):
+        trace.mark(stage, start_ns + offset_ms * MS)
+
+    trace.mark(OrderStage.REQUEST_SENT, start_ns + 10 * MS)
+    trace.mark(OrderStage.RESPONSE_RECEIVED, start_ns + (10 + network_ms) * MS)
+    tracer.track(external_id, trace)
+
+    return trace
+
+
+def test_trace_is_finished_on_terminal_update():
+    traces = []
+    tracer = OrderTracer(traces.append)
+    trace = create_placed_trace(tracer, "order-1", network_ms=5)
+
+    tracer.on_order_update(create_open_order("order-1", OrderStatus.NEW))
+
+    assert_that(traces, equal_to([]))
+    assert_that(tracer.get_percentiles()[OrderStage.FIRST_STREAM_EVENT].count, equal_to(1))
+
+    tracer.on_order_update(create_open_order("order-1", OrderStatus.FILLED))
+    tracer.on_order_update(create_open_order("order-1", OrderStatus.FILLED))
+
+    assert_that(traces, equal_to([trace]))
+    assert_that(trace.terminal_status, equal_to(OrderStatus.FILLED))
+    assert_that(tracer.get_trace("order-1"), equal_to(None))
+    latencies = trace.get_stage_latencies_ms()
+    assert_that(
+        [latencies[stage] for stage in [OrderStage.HASHED, OrderStage.REQUEST_SENT, OrderStage.RESPONSE_RECEIVED]],
+        equal_to([1.0, 6.0, 5.0]),
+    )
+    assert_that(tracer.get_percentiles()[OrderStage.FIRST_STREAM_EVENT].count, equal_to(1))
+    assert_that(tracer.get_percentiles()[OrderStage.TERMINAL].count, equal_to(1))
+
+
+def test_percentiles_are_rolling():
+    tracer = OrderTracer(window_size=100)
+
+    for index in range(200):
+        create_placed_trace(tracer, f"order-{index}", network_ms=index + 1)
+        tracer.finish(f"order-{index}")
+
+    percentiles = tracer.get_percentiles()[OrderStage.RESPONSE_RECEIVED]
+
+    assert_that(
+        (percentiles.count, percentiles.p50_ms, percentiles.p90_ms, percentiles.p99_ms),
+        equal_to((100, 150.0, 190.0, 199.0)),
+    )
+
+
+def test_oldest_open_trace_is_evicted():
+    traces = []
+    tracer = OrderTracer(traces.append, max_open_traces=1)
+    first = create_placed_trace(tracer, "order-1", network_ms=1)
+    create_placed_trace(tracer, "order-2", network_ms=1)
+
+    assert_that(traces, equal_to([first]))
+    assert_that(tracer.get_trace("order-1"), equal_to(None))
+
+
+def test_order_creation_marks_stages(mocker: MockerFixture, create_trading_account, create_btc_usd_market):
+    mocker.patch("x10.utils.starkex.generate_nonce", return_value=FROZEN_NONCE)
+
+    from x10.perpetual.order_factory import MarketOrderFactory
+    from x10.perpetual.order_object import create_order_object
+
+    trading_account = create_trading_account()
+    btc_usd_market = create_btc_usd_market()
+    tracer = OrderTracer()
+
+    for create_order in [
+        lambda trace: create_order_object(
+            account=trading_account,
+            market=btc_usd_market,
+            amount_of_synthetic=Decimal("0.001"),
+            price=Decimal("43445"),
+            side=OrderSide.BUY,
+            trace=trace,
+        ),
+        lambda trace: MarketOrderFactory(trading_account, btc_usd_market).create_order(
+            Decimal("0.001"), Decimal("43445"), OrderSide.BUY, trace=trace
+        ),
+    ]:
+        trace = tracer.start("BTC-USD")
+        create_order(trace)
+
+        assert_that(
+            list(trace.timestamps),
+            equal_to([OrderStage.INTENT, OrderStage.AMOUNTS_CONVERTED, OrderStage.HASHED, OrderStage.SIGNED]),
+        )
+        assert_that(sorted(trace.timestamps.values()), equal_to(list(trace.timestamps.values())))
@@ -0,0 +1,164 @@
+import random
+from decimal import Decimal
+
+import pytest
+from hamcrest import assert_that, equal_to, none
+
+from tests.perpetual.test_orderbook_depth import create_random_update
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbook import BookDepth, OrderBook, OrderBookEngine
+from x10.perpetual.orderbooks import OrderbookQuantityModel, OrderbookUpdateModel
+
+
+def scan_imbalance(orderbook: OrderBook, levels_count: int):
+    bid_amount = sum((amount for _, amount in list(orderbook._bid_levels.levels())[:levels_count]), Decimal(0))
+    ask_amount = sum((amount for _, amount in list(orderbook._ask_levels.levels())[:levels_count]), Decimal(0))
+    return (bid_amount - ask_amount) / (bid_amount + ask_amount)
+
+
+def scan_depth_within_bps(orderbook: OrderBook, bps: Decimal):
+    mid_price = orderbook.mid_price()
+    assert mid_price is not None
+    distance = mid_price * bps / 10_000
+    return BookDepth(
+        bid_amount=sum(
+            (amount for price, amount in orderbook._bid_levels.levels() if price >= mid_price - distance), Decimal(0)
+        ),
+        ask_amount=sum(
+            (amount for price, amount in orderbook._ask_levels.levels() if price <= mid_price + distance), Decimal(0)
+        ),
+    )
+
+
+@pytest.mark.parametrize("engine", [OrderBookEngine.DECIMAL, OrderBookEngine.TICK])
+def test_metrics_match_full_book_scan(engine, create_btc_usd_market):
+    rnd = random.Random(2)
+    orderbook = OrderBook(
+        TESTNET_CONFIG, "BTC-USD", engine=engine, trading_config=create_btc_usd_market().trading_config
+    )
+    orderbook.init_orderbook(create_random_update(rnd, 50))
+
+    for _ in range(20):
+        orderbook.update_orderbook(create_random_update(rnd, 5))
+        best_bid = orderbook.best_bid()
+        best_ask = orderbook.best_ask()
+
+        assert_that(
+            orderbook.microprice(),
+            equal_to(
+                (best_bid.price * best_ask.amount + best_ask.price * best_bid.amount)
+                / (best_bid.amount + best_ask.amount)
+            ),
+        )
+        for levels_count in [1, 5, 1000]:
+            assert_that(orderbook.imbalance(levels_count), equal_to(scan_imbalance(orderbook, levels_count)))
+        for bps in [Decimal(0), Decimal("0.5"), Decimal(2), Decimal(10), Decimal(1000)]:
+            assert_that(orderbook.depth_within_bps(bps), equal_to(scan_depth_within_bps(orderbook, bps)))
+
+
+@pytest.mark.parametrize("engine", [OrderBookEngine.DECIMAL, OrderBookEngine.TICK])
+def test_metrics_are_maintained_with_the_deltas(engine, create_btc_usd_market):
+    rnd = random.Random(3)
+    orderbook = OrderBook(
+        TESTNET_CONFIG, "BTC-USD", engine=engine, trading_config=create_btc_usd_market().trading_config
+    )
+    orderbook.init_orderbook(create_random_update(rnd, 30))
+
+    def random_levels(levels):
+        levels = list(levels)
+        changes = []
+        for price, amount in rnd.sample(levels, min(3, len(levels))):
+            # Remove the level or change its quantity
+            qty = -amount if rnd.random() < 0.4 else Decimal(rnd.randint(-50, 50)).scaleb(-5)
+            changes.append(OrderbookQuantityModel(price=price, qty=qty))
+        return changes
+
+    for _ in range(200):
+        # Indexes of different depths, from the best level only to the whole book
+        levels_count = rnd.choice([1, 3, 10, 1000])
+        assert_that(orderbook.imbalance(levels_count), equal_to(scan_imbalance(orderbook, levels_count)))
+
+        update = create_random_update(rnd, rnd.randint(0, 2))
+        update.bid.extend(random_levels(orderbook._bid_levels.levels()))
+        update.ask.extend(random_levels(orderbook._ask_levels.levels()))
+        update.ask.append(OrderbookQuantityModel(price=Decimal("6410.5"), qty=Decimal(0)))
+        orderbook.update_orderbook(update)
+
+    assert_that(orderbook.depth_within_bps(Decimal(50)), equal_to(scan_depth_within_bps(orderbook, Decimal(50))))
+
+
+def test_metric_watches_skip_the_deltas_below_the_indexed_levels():
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD")
+    evaluations = []
+
+    def metric(ob: OrderBook):
+        evaluations.append(None)
+        return ob.imbalance(2)
+
+    orderbook.add_metric_change_callback(metric, lambda value: None, Decimal("0.1"))
+    orderbook.init_orderbook(
+        OrderbookUpdateModel(
+            market="BTC-USD",
+            bid=[OrderbookQuantityModel(price=Decimal(price), qty=Decimal(1)) for price in [100, 99, 98, 97]],
+            ask=[OrderbookQuantityModel(price=Decimal(price), qty=Decimal(1)) for price in [101, 102, 103, 104]],
+        )
+    )
+
+    def update_bid(price: int, qty: str):
+        orderbook.update_orderbook(
+            OrderbookUpdateModel(
+                market="BTC-USD", bid=[OrderbookQuantityModel(price=Decimal(price), qty=Decimal(qty))], ask=[]
+            )
+        )
+
+    update_bid(97, "1")
+    update_bid(96, "1")
+    assert_that(len(evaluations), equal_to(1))
+
+    update_bid(99, "1")
+    assert_that(len(evaluations), equal_to(2))
+
+    # 98 moves into the first 2 levels
+    update_bid(99, "-2")
+    update_bid(98, "1")
+    assert_that(len(evaluations), equal_to(4))
+    assert_that(orderbook.imbalance(2), equal_to(scan_imbalance(orderbook, 2)))
+
+
+def test_metrics_of_empty_book():
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD")
+
+    assert_that(orderbook.microprice(), none())
+    assert_that(orderbook.imbalance(5), none())
+    assert_that(orderbook.depth_within_bps(Decimal(10)), none())
+
+
+def test_metric_change_callback_threshold():
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD")
+    values = []
+    watch = orderbook.add_metric_change_callback(lambda ob: ob.imbalance(), values.append, Decimal("0.2"))
+
+    def update_best_bid(qty: str):
+        orderbook.update_orderbook(
+            OrderbookUpdateModel(
+                market="BTC-USD", bid=[OrderbookQuantityModel(price=Decimal(100), qty=Decimal(qty))], ask=[]
+            )
+        )
+
+    orderbook.init_orderbook(
+        OrderbookUpdateModel(
+            market="BTC-USD",
+            bid=[OrderbookQuantityModel(price=Decimal(100), qty=Decimal(1))],
+            ask=[OrderbookQuantityModel(price=Decimal(101), qty=Decimal(1))],
+        )
+    )
+    # Imbalances 1/3, 1.1/3.1 (not reported, moved by less than 0.2 from 1/3) and 4.1/6.1
+    update_best_bid("1")
+    update_best_bid("0.1")
+    update_best_bid("3")
+
+    assert_that(values, equal_to([Decimal(0), Decimal(1) / 3, Decimal("4.1") / Decimal("6.1")]))
+
+    orderbook.remove_metric_change_callback(watch)
+    update_best_bid("-4")
+    assert_that(len(values), equal_to(3))
@@ -0,0 +1,89 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from hamcrest import assert_that, equal_to
+
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbook import OrderBook
+from x10.perpetual.orderbooks import OrderbookQuantityModel, OrderbookUpdateModel
+
+
+def create_bid_update(price: int):
+    return OrderbookUpdateModel(
+        market="BTC-USD", bid=[OrderbookQuantityModel(price=Decimal(price), qty=Decimal(1))], ask=[]
+    )
+
+
+def test_sync_callbacks_are_called_inline_by_default():
+    prices = []
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD", best_bid_change_callback=lambda entry: prices.append(entry.price))
+
+    for price in [100, 101, 102]:
+        orderbook.update_orderbook(create_bid_update(price))
+
+    assert_that(prices, equal_to([100, 101, 102]))
+    assert_that(orderbook.best_bid_callback_stats.calls, equal_to(3))
+
+
+@pytest.mark.asyncio
+async def test_changes_are_coalesced_within_window():
+    prices = []
+    orderbook = OrderBook(
+        TESTNET_CONFIG,
+        "BTC-USD",
+        best_bid_change_callback=lambda entry: prices.append(entry.price),
+        callback_window_seconds=0.01,
+    )
+
+    for price in [100, 101, 102]:
+        orderbook.update_orderbook(create_bid_update(price))
+
+    assert_that(prices, equal_to([]))
+    await asyncio.sleep(0.05)
+    orderbook.update_orderbook(create_bid_update(103))
+    await asyncio.sleep(0.05)
+
+    stats = orderbook.best_bid_callback_stats
+    assert_that(prices, equal_to([102, 103]))
+    assert_that((stats.changes, stats.calls, stats.coalesced), equal_to((4, 2, 2)))
+    assert_that(stats.max_delay_seconds >= 0.01, equal_to(True))
+
+
+@pytest.mark.asyncio
+async def test_async_callback_gets_latest_change_after_it_completes():
+    prices = []
+    release = asyncio.Event()
+
+    async def callback(entry):
+        prices.append(entry.price)
+        await release.wait()
+
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD", best_bid_change_callback=callback)
+
+    orderbook.update_orderbook(create_bid_update(100))
+    await asyncio.sleep(0.01)
+    # The callback is still running
+    for price in [101, 102, 103]:
+        orderbook.update_orderbook(create_bid_update(price))
+    release.set()
+    await asyncio.sleep(0.01)
+
+    stats = orderbook.best_bid_callback_stats
+    assert_that(prices, equal_to([100, 103]))
+    assert_that((stats.calls, stats.coalesced), equal_to((2, 2)))
+    assert_that(stats.max_duration_seconds > 0, equal_to(True))
+
+
+@pytest.mark.asyncio
+async def test_coalesced_callback_errors_are_counted():
+    def callback(entry):
+        raise ValueError("Callback failed")
+
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD", best_bid_change_callback=callback, callback_window_seconds=0)
+
+    orderbook.update_orderbook(create_bid_update(100))
+    await asyncio.sleep(0.01)
+
+    assert_that(orderbook.best_bid_callback_stats.errors, equal_to(1))
+    orderbook.stop_orderbook()
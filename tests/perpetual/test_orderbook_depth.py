@@ -0,0 +1,167 @@
+import itertools
+import random
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from hamcrest import assert_that, close_to, equal_to, none
+
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbook import ImpactDetails, OrderBook, OrderBookEngine
+from x10.perpetual.orderbooks import OrderbookQuantityModel, OrderbookUpdateModel
+
+
+def walk_price_impact_qty(qty: Decimal, levels):
+    # The linear walk the depth index replaces
+    remaining_qty = qty
+    total_amount = Decimal(0)
+    total_spent = Decimal(0)
+    for price, available_at_price in levels:
+        take = min(remaining_qty, available_at_price)
+        if remaining_qty <= 0:
+            break
+        if available_at_price <= 0:
+            continue
+        total_spent += take * price
+        total_amount += take
+        remaining_qty -= take
+    if remaining_qty > 0:
+        return None
+    return ImpactDetails(price=total_spent / total_amount, amount=total_amount)
+
+
+def walk_price_impact_notional(notional: Decimal, levels):
+    remaining_to_spend = notional
+    total_amount = Decimal(0)
+    weighted_sum = Decimal(0)
+    for price, available_at_price in levels:
+        amount_to_purchase = min(remaining_to_spend / price, available_at_price)
+        if remaining_to_spend <= 0:
+            break
+        if available_at_price <= 0:
+            continue
+        weighted_sum += amount_to_purchase * price
+        total_amount += amount_to_purchase
+        remaining_to_spend -= amount_to_purchase * price
+    if remaining_to_spend > 0:
+        return None
+    return ImpactDetails(price=weighted_sum / total_amount, amount=total_amount)
+
+
+def create_random_update(rnd: random.Random, levels_count: int):
+    def create_levels(prices):
+        return [
+            OrderbookQuantityModel(price=Decimal(price).scaleb(-1), qty=Decimal(rnd.randint(1, 100_000)).scaleb(-5))
+            for price in prices
+        ]
+
+    return OrderbookUpdateModel(
+        market="BTC-USD",
+        bid=create_levels(rnd.sample(range(63_900, 64_000), levels_count)),
+        ask=create_levels(rnd.sample(range(64_001, 64_100), levels_count)),
+    )
+
+
+@pytest.mark.parametrize("engine", [OrderBookEngine.DECIMAL, OrderBookEngine.TICK])
+def test_price_impact_matches_linear_walk(engine, create_btc_usd_market):
+    rnd = random.Random(engine.value)
+    orderbook = OrderBook(
+        TESTNET_CONFIG, "BTC-USD", engine=engine, trading_config=create_btc_usd_market().trading_config
+    )
+    orderbook.init_orderbook(create_random_update(rnd, 50))
+
+    for _ in range(20):
+        # The index is updated with the delta
+        orderbook.update_orderbook(create_random_update(rnd, 5))
+
+        for side, levels in [("BUY", orderbook._ask_levels), ("SELL", orderbook._bid_levels)]:
+            for qty in [Decimal("0.00001"), Decimal("0.5"), Decimal("3.14159"), Decimal("12"), Decimal("1000")]:
+                assert_that(
+                    orderbook.calculate_price_impact_qty(qty, side),
+                    equal_to(walk_price_impact_qty(qty, levels.levels())),
+                )
+            for notional in [Decimal("1"), Decimal("12345.6"), Decimal("777777"), Decimal("10000000")]:
+                assert_that(
+                    orderbook.calculate_price_impact_notional(notional, side),
+                    equal_to(walk_price_impact_notional(notional, levels.levels())),
+                )
+
+
+@pytest.mark.parametrize("engine", [OrderBookEngine.DECIMAL, OrderBookEngine.TICK])
+def test_deeper_query_after_delta_below_indexed_levels(engine, create_btc_usd_market):
+    trading_config = create_btc_usd_market().trading_config
+    rnd = random.Random(5)
+
+    def create_bids(levels):
+        return OrderbookUpdateModel(
+            market="BTC-USD", bid=[OrderbookQuantityModel(price=price, qty=qty) for price, qty in levels], ask=[]
+        )
+
+    for _ in range(50):
+        orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD", engine=engine, trading_config=trading_config)
+        orderbook.init_orderbook(create_bids([(Decimal(price), Decimal(1)) for price in range(991, 1001)]))
+        # Indexes the first levels only
+        orderbook.calculate_price_impact_qty(Decimal(3), "SELL")
+
+        below_price = Decimal(rnd.randint(991, 996))
+        orderbook.update_orderbook(create_bids([(below_price, Decimal(rnd.choice([-1, 1])))]))
+
+        fresh_orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD", engine=engine, trading_config=trading_config)
+        fresh_orderbook.init_orderbook(create_bids(list(orderbook._bid_levels.levels())))
+
+        for qty in [Decimal(8), Decimal(10)]:
+            assert_that(
+                orderbook.calculate_price_impact_qty(qty, "SELL"),
+                equal_to(fresh_orderbook.calculate_price_impact_qty(qty, "SELL")),
+            )
+        assert_that(orderbook.imbalance(10), equal_to(fresh_orderbook.imbalance(10)))
+
+
+@pytest.mark.parametrize("engine", [OrderBookEngine.DECIMAL, OrderBookEngine.TICK])
+def test_price_impact_curve(engine, create_btc_usd_market):
+    rnd = random.Random(1)
+    orderbook = OrderBook(
+        TESTNET_CONFIG, "BTC-USD", engine=engine, trading_config=create_btc_usd_market().trading_config
+    )
+    orderbook.init_orderbook(create_random_update(rnd, 50))
+    qtys = np.array([0.1, 0.5, 1, 2.5, 5, 10, 1000, 0, -1])
+    notionals = qtys * 64_000
+
+    for side, _ in itertools.product(["BUY", "SELL"], range(5)):
+        # The arrays of the curve are updated with the delta
+        orderbook.update_orderbook(create_random_update(rnd, 5))
+        best_price = float(orderbook.best_ask().price if side == "BUY" else orderbook.best_bid().price)
+        qty_curve = orderbook.calculate_price_impact_qty_curve(qtys, side)
+        notional_curve = orderbook.calculate_price_impact_notional_curve(notionals, side)
+
+        for index, qty in enumerate(qtys):
+            impact = orderbook.calculate_price_impact_qty(Decimal(qty), side)
+            if impact is None:
+                assert_that(np.isnan(qty_curve.average_prices[index]), equal_to(True))
+                assert_that(np.isnan(qty_curve.amounts[index]), equal_to(True))
+            else:
+                assert_that(qty_curve.average_prices[index], close_to(float(impact.price), 1e-6))
+                assert_that(qty_curve.amounts[index], close_to(float(impact.amount), 1e-9))
+
+                slippage_bps = (float(impact.price) - best_price) / best_price * 10_000
+                assert_that(
+                    qty_curve.slippage_bps[index], close_to(slippage_bps if side == "BUY" else -slippage_bps, 1e-6)
+                )
+                assert_that(qty_curve.slippage_bps[index] >= 0, equal_to(True))
+
+            impact = orderbook.calculate_price_impact_notional(Decimal(notionals[index]), side)
+            if impact is None:
+                assert_that(np.isnan(notional_curve.average_prices[index]), equal_to(True))
+            else:
+                assert_that(notional_curve.average_prices[index], close_to(float(impact.price), 1e-6))
+                assert_that(notional_curve.amounts[index], close_to(float(impact.amount), 1e-9))
+
+    assert_that(orderbook.calculate_price_impact_qty_curve(qtys, "INVALID"), none())
+
+
+def test_price_impact_curve_of_empty_book():
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD")
+    curve = orderbook.calculate_price_impact_qty_curve(np.array([1.0, 2.0]), "BUY")
+
+    assert_that(np.isnan(curve.average_prices).all(), equal_to(True))
+    assert_that(np.isnan(curve.slippage_bps).all(), equal_to(True))
@@ -0,0 +1,138 @@
+import random
+from decimal import Decimal
+
+import pytest
+from hamcrest import assert_that, equal_to, none, same_instance
+
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbook import OrderBook, OrderBookEngine, OrderBookEntry
+from x10.perpetual.orderbooks import OrderbookQuantityModel, OrderbookUpdateModel
+
+
+def create_update(bid, ask):
+    return OrderbookUpdateModel(
+        market="BTC-USD",
+        bid=[OrderbookQuantityModel(price=Decimal(price), qty=Decimal(qty)) for price, qty in bid],
+        ask=[OrderbookQuantityModel(price=Decimal(price), qty=Decimal(qty)) for price, qty in ask],
+    )
+
+
+def create_orderbook(engine: OrderBookEngine, trading_config, callbacks_log: list):
+    return OrderBook(
+        TESTNET_CONFIG,
+        "BTC-USD",
+        # The DECIMAL engine passes its (mutable) level entry, the values are logged at the time of the call
+        best_ask_change_callback=lambda entry: callbacks_log.append(("ask", entry.price, entry.amount)),
+        best_bid_change_callback=lambda entry: callbacks_log.append(("bid", entry.price, entry.amount)),
+        engine=engine,
+        trading_config=trading_config,
+    )
+
+
+def test_tick_engine_matches_decimal_engine(create_btc_usd_market):
+    trading_config = create_btc_usd_market().trading_config
+    rnd = random.Random(0)
+    decimal_log: list = []
+    tick_log: list = []
+    decimal_orderbook = create_orderbook(OrderBookEngine.DECIMAL, trading_config, decimal_log)
+    tick_orderbook = create_orderbook(OrderBookEngine.TICK, trading_config, tick_log)
+
+    def random_levels(prices_from: int, quantities: dict):
+        levels = []
+        for price in rnd.sample(range(prices_from, prices_from + 50), 5):
+            existing_qty = quantities.get(price, 0)
+            # Remove the level, change or add it
+            qty = -existing_qty if existing_qty and rnd.random() < 0.3 else rnd.randint(1, 100_000)
+            quantities[price] = existing_qty + qty
+            levels.append((f"{price / 10:.1f}", f"{qty / 100_000:.5f}"))
+        return levels
+
+    snapshot = create_update([("6400.0", "1.5")], [("6406.0", "0.25")])
+    decimal_orderbook.init_orderbook(snapshot)
+    tick_orderbook.init_orderbook(snapshot)
+    bid_quantities = {64_000: 150_000}
+    ask_quantities = {64_060: 25_000}
+
+    for _ in range(500):
+        update = create_update(random_levels(63_960, bid_quantities), random_levels(64_055, ask_quantities))
+        decimal_orderbook.update_orderbook(update)
+        tick_orderbook.update_orderbook(update)
+
+        assert_that(tick_orderbook.best_bid(), equal_to(decimal_orderbook.best_bid()))
+        assert_that(tick_orderbook.best_ask(), equal_to(decimal_orderbook.best_ask()))
+
+    for side in ["BUY", "SELL"]:
+        for amount in [Decimal("0.5"), Decimal("3"), Decimal("1000")]:
+            assert_that(
+                tick_orderbook.calculate_price_impact_qty(amount, side),
+                equal_to(decimal_orderbook.calculate_price_impact_qty(amount, side)),
+            )
+            assert_that(
+                tick_orderbook.calculate_price_impact_notional(amount * 6400, side),
+                equal_to(decimal_orderbook.calculate_price_impact_notional(amount * 6400, side)),
+            )
+
+    assert_that(tick_log, equal_to(decimal_log))
+
+
+def test_tick_engine_levels(create_btc_usd_market):
+    callbacks_log: list = []
+    orderbook = create_orderbook(OrderBookEngine.TICK, create_btc_usd_market().trading_config, callbacks_log)
+
+    assert_that(orderbook.best_bid(), none())
+    assert_that(orderbook.best_ask(), none())
+
+    orderbook.init_orderbook(create_update([("100.0", "1"), ("99.5", "2")], [("101", "0.5")]))
+    orderbook.update_orderbook(create_update([("100.1", "1"), ("100.0", "-1")], [("101", "-0.5"), ("101.2", "3")]))
+
+    assert_that(orderbook.best_bid(), equal_to(OrderBookEntry(price=Decimal("100.1"), amount=Decimal("1"))))
+    assert_that(orderbook.best_ask(), equal_to(OrderBookEntry(price=Decimal("101.2"), amount=Decimal("3"))))
+    assert_that(
+        callbacks_log,
+        equal_to(
+            [
+                ("bid", Decimal("100.1"), Decimal("1")),
+                ("ask", Decimal("101.2"), Decimal("3")),
+            ]
+        ),
+    )
+
+    # The levels are validated before the book is changed
+    with pytest.raises(ValueError):
+        orderbook.update_orderbook(create_update([("100.2", "1"), ("100.05", "1")], []))
+
+    assert_that(
+        list(orderbook._bid_levels.levels()),
+        equal_to([(Decimal("100.1"), Decimal("1")), (Decimal("99.5"), Decimal("2"))]),
+    )
+
+    # The best entry is kept until the best level changes
+    best_bid = orderbook.best_bid()
+    assert_that(orderbook.best_bid(), same_instance(best_bid))
+
+    orderbook.update_orderbook(create_update([("100.1", "0.5")], []))
+
+    assert_that(orderbook.best_bid(), equal_to(OrderBookEntry(price=Decimal("100.1"), amount=Decimal("1.5"))))
+
+
+def test_prices_compatibility_accessors(create_btc_usd_market):
+    trading_config = create_btc_usd_market().trading_config
+    decimal_orderbook = create_orderbook(OrderBookEngine.DECIMAL, trading_config, [])
+    tick_orderbook = create_orderbook(OrderBookEngine.TICK, trading_config, [])
+    snapshot = create_update([("100.0", "1"), ("99.5", "2")], [("101", "0.5")])
+    decimal_orderbook.init_orderbook(snapshot)
+    tick_orderbook.init_orderbook(snapshot)
+
+    assert_that(list(decimal_orderbook._bid_prices.keys()), equal_to([Decimal("99.5"), Decimal("100.0")]))
+    assert_that(
+        decimal_orderbook._ask_prices[Decimal("101")],
+        equal_to(OrderBookEntry(price=Decimal("101"), amount=Decimal("0.5"))),
+    )
+
+    with pytest.raises(AttributeError):
+        tick_orderbook._bid_prices
+
+
+def test_tick_engine_requires_trading_config():
+    with pytest.raises(ValueError):
+        create_orderbook(OrderBookEngine.TICK, None, [])
@@ -0,0 +1,124 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+import websockets
+from hamcrest import assert_that, equal_to, none
+
+from tests.perpetual.test_stream_client import get_url_from_server
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbook import OrderBookEngine
+from x10.perpetual.orderbook_manager import OrderBookManager
+from x10.perpetual.orderbooks import OrderbookQuantityModel, OrderbookUpdateModel
+from x10.perpetual.stream_client import PerpetualStreamClient
+from x10.utils.http import WrappedStreamResponse
+
+
+def create_message(seq: int, msg_type: str, market: str, bid_price: str, bid_qty: str):
+    return WrappedStreamResponse[OrderbookUpdateModel](
+        type=msg_type,  # type: ignore[arg-type]
+        data=OrderbookUpdateModel(
+            market=market,
+            bid=[OrderbookQuantityModel(qty=Decimal(bid_qty), price=Decimal(bid_price))],
+            ask=[],
+        ),
+        ts=1704798222748,
+        seq=seq,
+    ).model_dump_json()
+
+
+async def wait_until(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+
+    raise AssertionError("Condition not met")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", [OrderBookEngine.DECIMAL, OrderBookEngine.TICK])
+async def test_manager_shares_one_connection_between_markets(engine, create_btc_usd_market):
+    messages = [
+        create_message(1, "SNAPSHOT", "BTC-USD", "43547", "1"),
+        create_message(2, "SNAPSHOT", "ETH-USD", "2200", "3"),
+        create_message(3, "SNAPSHOT", "SOL-USD", "100", "5"),
+        create_message(4, "DELTA", "BTC-USD", "43547", "-0.5"),
+        create_message(5, "DELTA", "ETH-USD", "2201", "2"),
+    ]
+    connections = []
+
+    async def serve(websocket):
+        connections.append(websocket)
+        for message in messages:
+            await websocket.send(message)
+        await websocket.wait_closed()
+
+    trading_config = create_btc_usd_market().trading_config
+
+    async with websockets.serve(serve, "127.0.0.1", 0) as server:
+        manager = OrderBookManager(
+            TESTNET_CONFIG,
+            stream_client=PerpetualStreamClient(api_url=get_url_from_server(server)),
+            engine=engine,
+            trading_configs={"BTC-USD": trading_config, "ETH-USD": trading_config},
+        )
+        btc_orderbook = manager.acquire("BTC-USD")
+        eth_orderbook = manager.acquire("ETH-USD")
+
+        assert_that(manager.acquire("BTC-USD"), equal_to(btc_orderbook))
+        assert_that(manager.get_reference_count("BTC-USD"), equal_to(2))
+
+        await wait_until(lambda: len(eth_orderbook._bid_levels) == 2)
+
+        assert_that(btc_orderbook.best_bid().amount, equal_to(Decimal("0.5")))
+        assert_that(eth_orderbook.best_bid().amount, equal_to(Decimal("2")))
+        assert_that(len(eth_orderbook._bid_levels), equal_to(2))
+        if engine == OrderBookEngine.TICK:
+            # The market without a trading config is skipped
+            assert_that(manager.get_orderbook("SOL-USD"), none())
+        else:
+            assert_that(manager.get_orderbook("SOL-USD").best_bid().amount, equal_to(Decimal("5")))
+        assert_that(len(connections), equal_to(1))
+
+        manager.release("BTC-USD")
+        manager.release("ETH-USD")
+        await asyncio.sleep(0.05)
+        assert_that(connections[0].closed, equal_to(False))
+
+        manager.release("BTC-USD")
+        await asyncio.wait_for(connections[0].wait_closed(), 1)
+        assert_that(manager.get_orderbook("BTC-USD"), none())
+
+        with pytest.raises(ValueError):
+            manager.release("BTC-USD")
+
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_manager_reopens_failed_stream():
+    connections = []
+
+    async def serve(websocket):
+        connections.append(websocket)
+        await websocket.send(create_message(1, "SNAPSHOT", "BTC-USD", "43547", str(len(connections))))
+        if len(connections) == 1:
+            # A client without a reconnect policy fails on the closed connection
+            await websocket.close()
+        else:
+            await websocket.wait_closed()
+
+    async with websockets.serve(serve, "127.0.0.1", 0) as server:
+        manager = OrderBookManager(
+            TESTNET_CONFIG, stream_client=PerpetualStreamClient(api_url=get_url_from_server(server))
+        )
+        orderbook = manager.acquire("BTC-USD")
+
+        await wait_until(lambda: len(connections) == 2 and orderbook.is_synced)
+
+        # Unsynced while the stream was down, then rebuilt from the snapshot of the new connection
+        assert_that(orderbook.resync_stats.resyncs_by_reason, equal_to({"RECONNECT": 1}))
+        assert_that(orderbook.best_bid().amount, equal_to(Decimal("2")))
+
+        await manager.close()
@@ -1,12 +1,15 @@
 import decimal
 from unittest import TestCase
 
+from tests.fixtures.markets import create_btc_usd_market, get_btc_usd_market_json_data
 from x10.perpetual.configuration import TESTNET_CONFIG
-from x10.perpetual.orderbook import OrderBook
+from x10.perpetual.orderbook import OrderBook, OrderBookEngine
 from x10.perpetual.orderbooks import OrderbookUpdateModel
 
 
 class TestOrderBook(TestCase):
+    engine = OrderBookEngine.DECIMAL
+
     def setUp(self):
         self.endpoint_config = TESTNET_CONFIG
         self.market_name = "dummy-market"
@@ -15,6 +18,8 @@ class TestOrderBook(TestCase):
             self.market_name,
             best_ask_change_callback=None,
             best_bid_change_callback=None,
+            engine=self.engine,
+            trading_config=create_btc_usd_market(get_btc_usd_market_json_data()).trading_config,
         )
         self.populate_dummy_data()
 
@@ -197,3 +202,7 @@ class TestOrderBook(TestCase):
         qty = decimal.Decimal("1")
         result = self.orderbook.calculate_price_impact_qty(qty, "INVALID_SIDE")
         self.assertIsNone(result, "Result should be None for invalid side.")
+
+
+class TestTickOrderBook(TestOrderBook):
+    engine = OrderBookEngine.TICK
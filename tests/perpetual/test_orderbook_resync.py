@@ -0,0 +1,256 @@
+import asyncio
+import dataclasses
+from decimal import Decimal
+
+import pytest
+import websockets
+from hamcrest import assert_that, equal_to, none
+
+from tests.perpetual.test_stream_client import get_url_from_server
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbook import OrderBook, OrderBookEngine, OrderBookResyncReason
+from x10.perpetual.orderbooks import OrderbookQuantityModel, OrderbookUpdateModel
+from x10.perpetual.stream_client import StreamGap, StreamGapReason
+from x10.utils.http import ResponseStatus, WrappedApiResponse, WrappedStreamResponse
+
+
+def create_update(bid, ask):
+    return OrderbookUpdateModel(
+        market="BTC-USD",
+        bid=[OrderbookQuantityModel(price=Decimal(price), qty=Decimal(qty)) for price, qty in bid],
+        ask=[OrderbookQuantityModel(price=Decimal(price), qty=Decimal(qty)) for price, qty in ask],
+    )
+
+
+def create_event(msg_type: str, update: OrderbookUpdateModel, seq: int = 1):
+    return WrappedStreamResponse[OrderbookUpdateModel](
+        type=msg_type, data=update, ts=1704798222748, seq=seq  # type: ignore[arg-type]
+    )
+
+
+SNAPSHOT = create_update([("100", "1"), ("99", "2")], [("101", "1"), ("102", "2")])
+
+
+def create_orderbook(engine=OrderBookEngine.DECIMAL, trading_config=None, snapshot_provider=None):
+    orderbook = OrderBook(
+        TESTNET_CONFIG, "BTC-USD", engine=engine, trading_config=trading_config, snapshot_provider=snapshot_provider
+    )
+    orderbook.apply_event(create_event("SNAPSHOT", SNAPSHOT))
+    return orderbook
+
+
+def test_init_orderbook_clears_existing_levels():
+    orderbook = create_orderbook()
+    orderbook.init_orderbook(create_update([("98", "1")], [("103", "1")]))
+
+    assert_that(list(orderbook._bid_levels.levels()), equal_to([(Decimal("98"), Decimal("1"))]))
+    assert_that(list(orderbook._ask_levels.levels()), equal_to([(Decimal("103"), Decimal("1"))]))
+
+
+def test_crossed_book_waits_for_stream_snapshot():
+    orderbook = create_orderbook()
+
+    orderbook.apply_event(create_event("DELTA", create_update([("101", "1")], [])))
+
+    assert_that(orderbook.is_synced, equal_to(False))
+    assert_that(orderbook.needs_stream_snapshot, equal_to(True))
+    assert_that(orderbook.best_bid(), none())
+
+    orderbook.apply_event(create_event("DELTA", create_update([("99", "1")], [])))
+    orderbook.apply_event(create_event("SNAPSHOT", SNAPSHOT))
+
+    stats = orderbook.resync_stats
+    assert_that(orderbook.is_synced, equal_to(True))
+    assert_that(orderbook.best_bid().price, equal_to(Decimal("100")))
+    assert_that(
+        (stats.resyncs_count, stats.resyncs_by_reason, stats.dropped_deltas),
+        equal_to((1, {"CROSSED": 1}, 1)),
+    )
+    assert_that(stats.last_duration_seconds > 0, equal_to(True))
+
+
+def test_reconnect_gap_waits_for_the_snapshot_of_the_stream():
+    orderbook = create_orderbook()
+
+    orderbook.on_stream_gap(StreamGap(reason=StreamGapReason.RECONNECT, last_seq=1, seq=1))
+
+    assert_that(orderbook.is_synced, equal_to(False))
+    assert_that(orderbook.needs_stream_snapshot, equal_to(False))
+
+    orderbook.apply_event(create_event("SNAPSHOT", SNAPSHOT))
+
+    assert_that(orderbook.is_synced, equal_to(True))
+    assert_that(orderbook.resync_stats.resyncs_by_reason, equal_to({"RECONNECT": 1}))
+
+
+def create_snapshot_provider():
+    snapshot_requested = asyncio.Event()
+    snapshot_response = asyncio.get_running_loop().create_future()
+
+    async def snapshot_provider(market_name: str):
+        snapshot_requested.set()
+        return await snapshot_response
+
+    return snapshot_provider, snapshot_requested, snapshot_response
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", [OrderBookEngine.DECIMAL, OrderBookEngine.TICK])
+async def test_negative_quantity_resyncs_from_rest_snapshot(engine, create_btc_usd_market):
+    snapshot_provider, snapshot_requested, snapshot_response = create_snapshot_provider()
+    orderbook = create_orderbook(engine, create_btc_usd_market().trading_config, snapshot_provider)
+
+    orderbook.apply_event(create_event("DELTA", create_update([("99", "-3")], [])))
+    await snapshot_requested.wait()
+
+    assert_that(orderbook.needs_stream_snapshot, equal_to(False))
+    assert_that(orderbook.best_bid(), none())
+
+    snapshot_response.set_result(WrappedApiResponse[OrderbookUpdateModel](status=ResponseStatus.OK, data=SNAPSHOT))
+    await asyncio.sleep(0)
+
+    stats = orderbook.resync_stats
+    assert_that(orderbook.is_synced, equal_to(True))
+    assert_that(list(orderbook._bid_levels.levels()), equal_to([(Decimal("100"), 1), (Decimal("99"), 2)]))
+    assert_that(
+        (stats.resyncs_count, stats.last_reason, stats.discarded_snapshots),
+        equal_to((1, OrderBookResyncReason.NEGATIVE_QUANTITY, 0)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_rest_snapshot_received_after_deltas_falls_back_to_stream_snapshot():
+    snapshot_provider, snapshot_requested, snapshot_response = create_snapshot_provider()
+    orderbook = create_orderbook(snapshot_provider=snapshot_provider)
+
+    orderbook.apply_event(create_event("DELTA", create_update([("99", "-3")], [])))
+    await snapshot_requested.wait()
+
+    # Already included in the REST snapshot (99 @ 2 + 1), it must not be applied on top of it
+    orderbook.apply_event(create_event("DELTA", create_update([("99", "1")], []), seq=3))
+    snapshot_response.set_result(
+        WrappedApiResponse[OrderbookUpdateModel](
+            status=ResponseStatus.OK, data=create_update([("100", "1"), ("99", "3")], [("101", "1")])
+        )
+    )
+    await asyncio.sleep(0)
+
+    stats = orderbook.resync_stats
+    assert_that(orderbook.is_synced, equal_to(False))
+    assert_that(orderbook.needs_stream_snapshot, equal_to(True))
+    assert_that((stats.dropped_deltas, stats.discarded_snapshots), equal_to((1, 1)))
+
+    orderbook.apply_event(create_event("SNAPSHOT", create_update([("100", "1"), ("99", "3")], [("101", "1")]), seq=1))
+
+    assert_that(orderbook.is_synced, equal_to(True))
+    assert_that(list(orderbook._bid_levels.levels()), equal_to([(Decimal("100"), 1), (Decimal("99"), 3)]))
+
+
+@pytest.mark.asyncio
+async def test_failed_rest_snapshot_falls_back_to_stream_snapshot():
+    async def snapshot_provider(market_name: str):
+        raise ValueError("Unavailable")
+
+    orderbook = create_orderbook(snapshot_provider=snapshot_provider)
+
+    orderbook.on_stream_gap(StreamGap(reason=StreamGapReason.GAP, last_seq=1, seq=3))
+    await asyncio.sleep(0)
+
+    assert_that(orderbook.needs_stream_snapshot, equal_to(True))
+    assert_that(orderbook.resync_stats.failed_snapshot_requests, equal_to(1))
+
+
+@pytest.mark.asyncio
+async def test_orderbook_reconnects_for_new_snapshot():
+    connections = []
+
+    async def serve(websocket):
+        connections.append(websocket)
+        await websocket.send(create_event("SNAPSHOT", SNAPSHOT, seq=1).model_dump_json())
+        if len(connections) == 1:
+            await websocket.send(create_event("DELTA", create_update([], [("100", "1")]), seq=2).model_dump_json())
+        await websocket.wait_closed()
+
+    async with websockets.serve(serve, "127.0.0.1", 0) as server:
+        orderbook = OrderBook(dataclasses.replace(TESTNET_CONFIG, stream_url=get_url_from_server(server)), "BTC-USD")
+        await orderbook.start_orderbook()
+
+        for _ in range(100):
+            if len(connections) == 2 and orderbook.is_synced:
+                break
+            await asyncio.sleep(0.01)
+
+        assert_that(len(connections), equal_to(2))
+        assert_that(orderbook.best_ask().price, equal_to(Decimal("101")))
+        assert_that(orderbook.resync_stats.resyncs_by_reason, equal_to({"CROSSED": 1}))
+
+        orderbook.stop_orderbook()
+
+
+def test_unaligned_delta_resyncs(create_btc_usd_market):
+    orderbook = create_orderbook(OrderBookEngine.TICK, create_btc_usd_market().trading_config)
+
+    orderbook.apply_event(create_event("DELTA", create_update([("99", "1"), ("100.123456", "1")], []), seq=2))
+
+    assert_that(orderbook.is_synced, equal_to(False))
+    assert_that(orderbook.needs_stream_snapshot, equal_to(True))
+    assert_that(orderbook.resync_stats.resyncs_by_reason, equal_to({"UNALIGNED_LEVEL": 1}))
+
+    orderbook.apply_event(create_event("SNAPSHOT", SNAPSHOT, seq=1))
+
+    assert_that(orderbook.is_synced, equal_to(True))
+    assert_that(list(orderbook._bid_levels.levels()), equal_to([(Decimal("100"), 1), (Decimal("99"), 2)]))
+
+
+def test_unaligned_snapshot_is_rejected(create_btc_usd_market):
+    orderbook = create_orderbook(OrderBookEngine.TICK, create_btc_usd_market().trading_config)
+
+    orderbook.apply_event(create_event("SNAPSHOT", create_update([("100", "1")], [("101", "1.0000000001")]), seq=1))
+
+    # Not resynced again, the next snapshot would be the same
+    assert_that(orderbook.is_synced, equal_to(False))
+    assert_that(orderbook.needs_stream_snapshot, equal_to(False))
+    assert_that(orderbook.best_bid(), none())
+    assert_that(orderbook.resync_stats.rejected_snapshots, equal_to(1))
+
+    orderbook.apply_event(create_event("SNAPSHOT", SNAPSHOT, seq=1))
+
+    assert_that(orderbook.is_synced, equal_to(True))
+    assert_that(orderbook.best_ask().price, equal_to(Decimal("101")))
+
+
+@pytest.mark.asyncio
+async def test_orderbook_stream_survives_unaligned_delta(create_btc_usd_market):
+    connections = []
+
+    async def serve(websocket):
+        connections.append(websocket)
+        await websocket.send(create_event("SNAPSHOT", SNAPSHOT, seq=1).model_dump_json())
+        if len(connections) == 1:
+            await websocket.send(
+                create_event("DELTA", create_update([("100.123456", "1")], []), seq=2).model_dump_json()
+            )
+        else:
+            await websocket.send(create_event("DELTA", create_update([("100", "2")], []), seq=2).model_dump_json())
+        await websocket.wait_closed()
+
+    async with websockets.serve(serve, "127.0.0.1", 0) as server:
+        orderbook = OrderBook(
+            dataclasses.replace(TESTNET_CONFIG, stream_url=get_url_from_server(server)),
+            "BTC-USD",
+            engine=OrderBookEngine.TICK,
+            trading_config=create_btc_usd_market().trading_config,
+        )
+        task = await orderbook.start_orderbook()
+
+        for _ in range(100):
+            if len(connections) == 2 and orderbook.is_synced and orderbook.best_bid().amount == 3:
+                break
+            await asyncio.sleep(0.01)
+
+        assert_that(task.done(), equal_to(False))
+        assert_that(len(connections), equal_to(2))
+        assert_that(orderbook.best_bid().amount, equal_to(Decimal("3")))
+        assert_that(orderbook.resync_stats.resyncs_by_reason, equal_to({"UNALIGNED_LEVEL": 1}))
+
+        orderbook.stop_orderbook()
@@ -154,3 +154,97 @@ async def test_candle_stream():
                 }
             ),
         )
+
+
+def serve_connections(*connection_messages, hang_after_messages=False):
+    connections = []
+
+    async def _serve(websocket):
+        messages = connection_messages[min(len(connections), len(connection_messages) - 1)]
+        connections.append(websocket)
+
+        for message in messages:
+            await websocket.send(message)
+
+        if hang_after_messages and len(connections) == 1:
+            await websocket.wait_closed()
+
+    return _serve
+
+
+def create_orderbook_messages(create_orderbook_message, *seqs: int):
+    message_model = create_orderbook_message()
+    return [message_model.model_copy(update={"seq": seq}).model_dump_json() for seq in seqs]
+
+
+@pytest.mark.asyncio
+async def test_resilient_stream_reconnects_and_reports_gap(create_orderbook_message):
+    from x10.perpetual.stream_client import (
+        PerpetualStreamClient,
+        StreamGap,
+        StreamGapReason,
+        StreamReconnectPolicy,
+    )
+
+    handler = serve_connections(
+        create_orderbook_messages(create_orderbook_message, 1, 2),
+        create_orderbook_messages(create_orderbook_message, 1, 2),
+    )
+    gaps = []
+
+    async with websockets.serve(handler, "127.0.0.1", 0) as server:
+        stream_client = PerpetualStreamClient(
+            api_url=get_url_from_server(server),
+            reconnect_policy=StreamReconnectPolicy(base_delay_seconds=0.01),
+        )
+        stream = await stream_client.subscribe_to_orderbooks(gap_callback=gaps.append)
+        seqs = [(await stream.recv()).seq for _ in range(4)]
+        await stream.close()
+
+        assert_that(seqs, equal_to([1, 2, 1, 2]))
+        assert_that(gaps, equal_to([StreamGap(reason=StreamGapReason.RECONNECT, last_seq=2, seq=1)]))
+        assert_that(stream.reconnects_count, equal_to(1))
+
+
+@pytest.mark.asyncio
+async def test_resilient_stream_reconnects_stale_stream(create_orderbook_message):
+    from x10.perpetual.stream_client import PerpetualStreamClient, StreamReconnectPolicy
+
+    handler = serve_connections(
+        create_orderbook_messages(create_orderbook_message, 1),
+        create_orderbook_messages(create_orderbook_message, 1),
+        hang_after_messages=True,
+    )
+
+    async with websockets.serve(handler, "127.0.0.1", 0) as server:
+        stream_client = PerpetualStreamClient(
+            api_url=get_url_from_server(server),
+            reconnect_policy=StreamReconnectPolicy(base_delay_seconds=0.01, stale_timeout_seconds=0.2),
+        )
+        stream = await stream_client.subscribe_to_orderbooks()
+        await stream.recv()
+        await stream.recv()
+        await stream.close()
+
+        assert_that(stream.reconnects_count, equal_to(1))
+        assert_that(stream.closed, equal_to(True))
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_seq_gaps(create_orderbook_message):
+    from x10.perpetual.stream_client import PerpetualStreamClient, StreamGapReason
+
+    handler = serve_connections(create_orderbook_messages(create_orderbook_message, 1, 2, 5, 3))
+    gaps = []
+
+    async with websockets.serve(handler, "127.0.0.1", 0) as server:
+        stream_client = PerpetualStreamClient(api_url=get_url_from_server(server))
+        stream = await stream_client.subscribe_to_orderbooks(gap_callback=gaps.append)
+        for _ in range(4):
+            await stream.recv()
+        await stream.close()
+
+        assert_that(
+            [(gap.reason, gap.last_seq, gap.seq) for gap in gaps],
+            equal_to([(StreamGapReason.GAP, 2, 5), (StreamGapReason.RESET, 5, 3)]),
+        )
@@ -0,0 +1,162 @@
+import asyncio
+from decimal import Decimal
+from typing import List
+
+import pytest
+import websockets
+from hamcrest import assert_that, equal_to
+
+from tests.perpetual.test_stream_client import get_url_from_server
+from x10.perpetual.stream_client import PerpetualStreamClient
+from x10.perpetual.stream_client.stream_hub import (
+    OverflowPolicy,
+    StreamConsumer,
+    StreamHub,
+)
+
+
+def create_consumer(overflow_policy: OverflowPolicy, max_queue_size: int = 2):
+    return StreamConsumer(
+        "key",
+        lambda _: None,
+        max_queue_size=max_queue_size,
+        overflow_policy=overflow_policy,
+        gap_callback=None,
+        name=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_consumer_drop_oldest():
+    consumer = create_consumer(OverflowPolicy.DROP_OLDEST)
+
+    for event in range(4):
+        await consumer.put(event)
+
+    assert_that([await consumer.get(), await consumer.get()], equal_to([2, 3]))
+    assert_that(consumer.stats.dropped, equal_to(2))
+
+
+@pytest.mark.asyncio
+async def test_consumer_conflate():
+    consumer = create_consumer(OverflowPolicy.CONFLATE)
+
+    await consumer.put(0)
+    await consumer.put(1)
+
+    # The pending event is replaced although the queue is not full
+    assert_that(consumer.stats.queued, equal_to(1))
+    assert_that(await consumer.get(), equal_to(1))
+
+    for event in range(2, 5):
+        await consumer.put(event)
+
+    assert_that(await consumer.get(), equal_to(4))
+    assert_that(consumer.stats.dropped, equal_to(3))
+
+
+@pytest.mark.asyncio
+async def test_consumer_block():
+    consumer = create_consumer(OverflowPolicy.BLOCK, max_queue_size=1)
+
+    await consumer.put(0)
+    blocked_put = asyncio.ensure_future(consumer.put(1))
+    await asyncio.sleep(0.01)
+
+    assert_that(blocked_put.done(), equal_to(False))
+    assert_that(consumer.stats.queued, equal_to(1))
+
+    assert_that(await consumer.get(), equal_to(0))
+    await blocked_put
+    assert_that(await consumer.get(), equal_to(1))
+    assert_that(consumer.stats.dropped, equal_to(0))
+
+
+@pytest.mark.asyncio
+async def test_hub_shares_one_connection_between_consumers(create_orderbook_message):
+    message_model = create_orderbook_message()
+    connections = []
+
+    async def serve(websocket):
+        connections.append(websocket)
+        for seq in range(1, 4):
+            await websocket.send(message_model.model_copy(update={"seq": seq}).model_dump_json())
+        await websocket.wait_closed()
+
+    async with websockets.serve(serve, "127.0.0.1", 0) as server:
+        hub = StreamHub(PerpetualStreamClient(api_url=get_url_from_server(server)))
+        book_consumer = hub.subscribe_to_orderbooks("BTC-USD", name="book")
+        analytics_consumer = hub.subscribe_to_orderbooks(
+            "BTC-USD", name="analytics", max_queue_size=1, overflow_policy=OverflowPolicy.CONFLATE
+        )
+
+        book_seqs = [(await book_consumer.get()).seq for _ in range(3)]
+        await asyncio.sleep(0.05)
+        analytics_seqs = [(await analytics_consumer.get()).seq]
+
+        assert_that(book_seqs, equal_to([1, 2, 3]))
+        assert_that(analytics_seqs, equal_to([3]))
+        assert_that(len(connections), equal_to(1))
+        assert_that(
+            [(stats.name, stats.delivered, stats.dropped) for stats in hub.get_consumer_stats()],
+            equal_to([("book", 3, 0), ("analytics", 1, 2)]),
+        )
+
+        await hub.close()
+        await asyncio.wait_for(connections[0].wait_closed(), 1)
+
+
+@pytest.mark.asyncio
+async def test_demux_routes_one_stream_by_market():
+    from x10.perpetual.orders import OrderSide
+    from x10.perpetual.stream_client.stream_demux import create_public_trades_demux
+    from x10.perpetual.trades import PublicTradeModel, TradeType
+    from x10.utils.http import WrappedStreamResponse
+
+    def create_trade(trade_id: int, market: str):
+        return PublicTradeModel(
+            id=trade_id,
+            market=market,
+            side=OrderSide.BUY,
+            trade_type=TradeType.TRADE,
+            timestamp=1701563440000,
+            price=Decimal("1"),
+            qty=Decimal("1"),
+        )
+
+    messages = [
+        WrappedStreamResponse[List[PublicTradeModel]](data=trades, ts=1701563440000, seq=seq)
+        for seq, trades in enumerate(
+            [
+                [create_trade(1, "BTC-USD")],
+                [create_trade(2, "ETH-USD"), create_trade(3, "BTC-USD"), create_trade(4, "SOL-USD")],
+                [create_trade(5, "ETH-USD")],
+            ],
+            start=1,
+        )
+    ]
+    connections = []
+
+    async def serve(websocket):
+        connections.append(websocket)
+        for message in messages:
+            await websocket.send(message.model_dump_json(by_alias=True))
+        await websocket.wait_closed()
+
+    async with websockets.serve(serve, "127.0.0.1", 0) as server:
+        demux = create_public_trades_demux(PerpetualStreamClient(api_url=get_url_from_server(server)))
+        btc_consumer = demux.subscribe("BTC-USD")
+        eth_consumer = demux.subscribe("ETH-USD")
+
+        btc_events = [await btc_consumer.get() for _ in range(2)]
+        eth_events = [await eth_consumer.get() for _ in range(2)]
+
+        assert_that([[trade.id for trade in event.data] for event in btc_events], equal_to([[1], [3]]))
+        assert_that([[trade.id for trade in event.data] for event in eth_events], equal_to([[2], [5]]))
+        assert_that([event.seq for event in eth_events], equal_to([2, 3]))
+        assert_that(len(connections), equal_to(1))
+
+        btc_consumer.close()
+        eth_consumer.close()
+        await asyncio.wait_for(connections[0].wait_closed(), 1)
+        await demux.close()
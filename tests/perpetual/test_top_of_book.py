@@ -0,0 +1,144 @@
+import asyncio
+import math
+import multiprocessing
+from decimal import Decimal
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+import websockets
+from hamcrest import assert_that, calling, equal_to, raises
+
+from tests.perpetual.test_stream_client import get_url_from_server
+from x10.errors import X10Error
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbooks import OrderbookQuantityModel, OrderbookUpdateModel
+from x10.perpetual.stream_client import PerpetualStreamClient
+from x10.utils.http import WrappedStreamResponse
+
+
+def read_in_other_process(table_name: str, results: multiprocessing.Queue):
+    from x10.perpetual.top_of_book import TopOfBookTable
+
+    table = TopOfBookTable.attach(table_name)
+    results.put((table.read("ETH-USD"), table.read_all()["seq"].tolist()))
+    table.close()
+
+
+def test_table_is_shared_between_processes():
+    from x10.perpetual.top_of_book import TopOfBook, TopOfBookTable
+
+    table = TopOfBookTable.create(["BTC-USD", "ETH-USD"])
+
+    try:
+        table.write("ETH-USD", seq=7, ts=1000, bid_price=2200.5, bid_qty=3, ask_price=2201, ask_qty=0.5)
+        table.write_mark_price("ETH-USD", 2200.75)
+
+        results: multiprocessing.Queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=read_in_other_process, args=(table.name, results))
+        process.start()
+        top_of_book, seqs = results.get(timeout=10)
+        process.join()
+
+        assert_that(
+            top_of_book,
+            equal_to(
+                TopOfBook(
+                    market="ETH-USD",
+                    seq=7,
+                    ts=1000,
+                    bid_price=2200.5,
+                    bid_qty=3,
+                    ask_price=2201,
+                    ask_qty=0.5,
+                    mark_price=2200.75,
+                )
+            ),
+        )
+        assert_that(seqs, equal_to([0, 7]))
+        assert_that(math.isnan(table.read("BTC-USD").bid_price), equal_to(True))
+    finally:
+        table.close()
+
+
+def test_rows_being_written_are_not_read():
+    from x10.perpetual.top_of_book import HEADER_DTYPE, ROW_DTYPE, TopOfBookTable
+
+    table = TopOfBookTable.create(["BTC-USD", "ETH-USD"])
+    shm = shared_memory.SharedMemory(name=table.name)
+    rows = np.ndarray((2,), dtype=ROW_DTYPE, buffer=shm.buf, offset=HEADER_DTYPE.itemsize)
+
+    try:
+        table.write("BTC-USD", seq=1, ts=1000, bid_price=1, bid_qty=1, ask_price=2, ask_qty=1)
+        # The writer is in the middle of writing the row
+        rows["version"][0] += 1
+
+        assert_that(calling(table.read).with_args("BTC-USD", max_retries=10), raises(X10Error))
+        assert_that(calling(table.read_all).with_args(max_retries=10), raises(X10Error))
+        assert_that(table.read("ETH-USD").seq, equal_to(0))
+
+        rows["version"][0] += 1
+        assert_that(table.read("BTC-USD").seq, equal_to(1))
+    finally:
+        del rows
+        shm.close()
+        table.close()
+
+
+@pytest.mark.asyncio
+async def test_publisher_writes_top_of_book():
+    # Imports the trading client, after the other tests patched the nonces
+    from x10.perpetual.top_of_book import TopOfBook, TopOfBookPublisher, TopOfBookTable
+
+    message = WrappedStreamResponse[OrderbookUpdateModel](
+        type="SNAPSHOT",  # type: ignore[arg-type]
+        data=OrderbookUpdateModel(
+            market="BTC-USD",
+            bid=[OrderbookQuantityModel(qty=Decimal("0.5"), price=Decimal("43547"))],
+            ask=[OrderbookQuantityModel(qty=Decimal("0.25"), price=Decimal("43548"))],
+        ),
+        ts=1704798222748,
+        seq=3,
+    )
+
+    async def serve(websocket):
+        await websocket.send(
+            message.model_copy(update={"data": message.data.model_copy(update={"market": "ETH-USD"})}).model_dump_json()
+        )
+        await websocket.send(message.model_dump_json())
+        await websocket.wait_closed()
+
+    table = TopOfBookTable.create(["BTC-USD"])
+
+    try:
+        async with websockets.serve(serve, "127.0.0.1", 0) as server:
+            publisher = TopOfBookPublisher(
+                table, TESTNET_CONFIG, stream_client=PerpetualStreamClient(api_url=get_url_from_server(server))
+            )
+            publisher.start()
+            publisher.update_mark_price("BTC-USD", Decimal("43547.5"))
+
+            for _ in range(100):
+                if table.read("BTC-USD").seq:
+                    break
+                await asyncio.sleep(0.01)
+
+            await publisher.close()
+
+        assert_that(
+            table.read("BTC-USD"),
+            equal_to(
+                TopOfBook(
+                    market="BTC-USD",
+                    seq=3,
+                    ts=1704798222748,
+                    bid_price=43547,
+                    bid_qty=0.5,
+                    ask_price=43548,
+                    ask_qty=0.25,
+                    mark_price=43547.5,
+                )
+            ),
+        )
+    finally:
+        table.close()
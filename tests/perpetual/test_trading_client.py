@@ -1,4 +1,6 @@
+import asyncio
 import dataclasses
+from decimal import Decimal
 from typing import List
 
 import pytest
@@ -170,3 +172,167 @@ async def test_get_asset_operations(aiohttp_server, create_asset_operations, cre
             ]
         ),
     )
+
+
+@pytest.mark.asyncio
+async def test_modules_share_one_session(aiohttp_server, create_btc_usd_market, create_trading_account):
+    from x10.perpetual.trading_client import PerpetualTradingClient
+
+    expected_markets = WrappedApiResponse[List[MarketModel]].model_validate(
+        {"status": "OK", "data": [create_btc_usd_market().model_dump()]}
+    )
+
+    app = web.Application()
+    app.router.add_get("/info/markets", serve_data(expected_markets.model_dump_json()))
+
+    server = await aiohttp_server(app)
+    url = f"http://{server.host}:{server.port}"
+
+    endpoint_config = dataclasses.replace(TESTNET_CONFIG, api_base_url=url)
+    trading_client = PerpetualTradingClient(endpoint_config=endpoint_config, stark_account=create_trading_account())
+    await trading_client.markets_info.get_markets()
+
+    session = await trading_client.markets_info.get_session()
+    module_sessions = [
+        await trading_client.info.get_session(),
+        await trading_client.account.get_session(),
+        await trading_client.orders.get_session(),
+    ]
+
+    assert_that(all(module_session is session for module_session in module_sessions), equal_to(True))
+
+    await trading_client.close()
+
+    assert_that(session.closed, equal_to(True))
+    assert_that((await trading_client.account.get_session()) is not session, equal_to(True))
+    await trading_client.close()
+
+
+@pytest.mark.asyncio
+async def test_iter_asset_operations(aiohttp_server, create_asset_operations, create_trading_account):
+    from x10.perpetual.trading_client import PerpetualTradingClient
+
+    operations = create_asset_operations()
+    pages = {
+        None: {
+            "status": "OK",
+            "data": [operations[0].model_dump(mode="json")],
+            "pagination": {"cursor": 1, "count": 1},
+        },
+        "1": {"status": "OK", "data": [operations[1].model_dump(mode="json")], "pagination": {"cursor": 2, "count": 1}},
+        "2": {"status": "OK", "data": [], "pagination": {"count": 0}},
+    }
+    requested_cursors = []
+
+    async def serve_page(request: web.Request):
+        cursor = request.query.get("cursor")
+        requested_cursors.append(cursor)
+        return web.json_response(pages[cursor])
+
+    app = web.Application()
+    app.router.add_get("/user/assetOperations", serve_page)
+
+    server = await aiohttp_server(app)
+    url = f"http://{server.host}:{server.port}"
+
+    endpoint_config = dataclasses.replace(TESTNET_CONFIG, api_base_url=url)
+    trading_client = PerpetualTradingClient(endpoint_config=endpoint_config, stark_account=create_trading_account())
+    streamed_operations = [operation async for operation in trading_client.account.iter_asset_operations(limit=1)]
+    await trading_client.close()
+
+    assert_that(streamed_operations, equal_to(operations))
+    assert_that(requested_cursors, equal_to([None, "1", "2"]))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_market_lookups_share_one_request(aiohttp_server, create_btc_usd_market):
+    from x10.perpetual.trading_client import PerpetualTradingClient
+
+    expected_markets = WrappedApiResponse[List[MarketModel]].model_validate(
+        {"status": "OK", "data": [create_btc_usd_market().model_dump()]}
+    )
+    requests_count = 0
+
+    async def serve_markets(_request):
+        nonlocal requests_count
+        requests_count += 1
+        await asyncio.sleep(0.05)
+        return web.Response(text=expected_markets.model_dump_json())
+
+    app = web.Application()
+    app.router.add_get("/info/markets", serve_markets)
+
+    server = await aiohttp_server(app)
+    url = f"http://{server.host}:{server.port}"
+
+    endpoint_config = dataclasses.replace(TESTNET_CONFIG, api_base_url=url)
+    trading_client = PerpetualTradingClient(endpoint_config=endpoint_config)
+
+    markets = await asyncio.gather(*[trading_client.markets_info.get_markets() for _ in range(5)])
+    assert_that(requests_count, equal_to(1))
+    assert_that(markets[0].data, has_length(1))
+
+    markets_by_name = await asyncio.gather(*[trading_client.metadata_cache.get_markets_by_name() for _ in range(5)])
+    assert_that(requests_count, equal_to(2))
+    assert_that(list(markets_by_name[0].keys()), equal_to(["BTC-USD"]))
+
+    await trading_client.metadata_cache.get_markets_by_name()
+    assert_that(requests_count, equal_to(2))
+
+    trading_client.metadata_cache.invalidate()
+    await trading_client.metadata_cache.get_markets_by_name()
+    assert_that(requests_count, equal_to(3))
+
+    await trading_client.close()
+
+
+@pytest.mark.asyncio
+async def test_place_order_sends_serialized_order_with_trace(
+    aiohttp_server, create_btc_usd_market, create_trading_account
+):
+    from x10.perpetual.order_trace import OrderStage, OrderTracer
+    from x10.perpetual.orders import OrderSide
+    from x10.perpetual.trading_client import PerpetualTradingClient
+
+    expected_markets = WrappedApiResponse[List[MarketModel]].model_validate(
+        {"status": "OK", "data": [create_btc_usd_market().model_dump()]}
+    )
+    received_orders = []
+
+    async def serve_order(request: web.Request):
+        received_orders.append((request.content_type, await request.json()))
+        return web.json_response({"status": "OK", "data": {"id": 1, "external_id": "order-1"}})
+
+    app = web.Application()
+    app.router.add_get("/info/markets", serve_data(expected_markets.model_dump_json()))
+    app.router.add_post("/user/order", serve_order)
+
+    server = await aiohttp_server(app)
+    url = f"http://{server.host}:{server.port}"
+
+    endpoint_config = dataclasses.replace(TESTNET_CONFIG, api_base_url=url)
+    trading_client = PerpetualTradingClient(endpoint_config=endpoint_config, stark_account=create_trading_account())
+    trace = OrderTracer().start("BTC-USD")
+    placed_order = await trading_client.place_order(
+        "BTC-USD", Decimal("0.001"), Decimal("43445"), OrderSide.BUY, trace=trace
+    )
+    await trading_client.close()
+
+    content_type, order_json = received_orders[0]
+    assert_that(placed_order.data.external_id, equal_to("order-1"))
+    assert_that(content_type, equal_to("application/json"))
+    assert_that((order_json["market"], order_json["qty"], order_json["side"]), equal_to(("BTC-USD", "0.001", "BUY")))
+    assert_that(
+        list(trace.timestamps),
+        equal_to(
+            [
+                OrderStage.INTENT,
+                OrderStage.AMOUNTS_CONVERTED,
+                OrderStage.HASHED,
+                OrderStage.SIGNED,
+                OrderStage.SERIALIZED,
+                OrderStage.REQUEST_SENT,
+                OrderStage.RESPONSE_RECEIVED,
+            ]
+        ),
+    )
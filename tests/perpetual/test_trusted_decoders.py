@@ -0,0 +1,150 @@
+import json
+
+import pytest
+import websockets
+from hamcrest import assert_that, equal_to, instance_of
+from pydantic import BaseModel, ValidationError
+
+from tests.perpetual.test_stream_client import get_url_from_server, serve_message
+from x10.perpetual.stream_client import trusted_decoders
+from x10.perpetual.stream_client.trusted_decoders import (
+    CandlesStreamMsg,
+    OrderbookStreamMsg,
+    PublicTradesStreamMsg,
+    decode_candles_msg,
+    decode_orderbook_msg,
+    decode_public_trades_msg,
+)
+
+PUBLIC_TRADES_MSG = {
+    "type": "TRADE",
+    "data": [
+        {
+            "i": 1844000421446684673,
+            "m": "BTC-USD",
+            "S": "SELL",
+            "tT": "TRADE",
+            "T": 1728478223000,
+            "p": "62126.0",
+            "q": "0.00001",
+        },
+        {
+            "i": 1844000421446684674,
+            "m": "BTC-USD",
+            "S": "BUY",
+            "tT": "LIQUIDATION",
+            "T": 1728478223001,
+            "p": "62127",
+            "q": "1.5",
+        },
+    ],
+    "ts": 1728478223080,
+    "seq": 12,
+}
+CANDLES_MSG = {
+    "data": [
+        {"o": "3458.64", "l": "3399.07", "h": "3476.89", "c": "3414.85", "v": "3.938", "T": 1721106000000},
+        {"o": "3414.85", "l": "3414.85", "h": "3414.85", "c": "3414.85", "T": 1721106060000},
+    ],
+    "ts": 1721283121979,
+    "seq": 1,
+}
+
+
+def get_pydantic_state(model):
+    if isinstance(model, list):
+        return [get_pydantic_state(item) for item in model]
+
+    if not isinstance(model, BaseModel):
+        return model
+
+    return (
+        type(model),
+        model.model_fields_set,
+        model.__pydantic_extra__,
+        model.__pydantic_private__,
+        {name: get_pydantic_state(value) for name, value in model.__dict__.items()},
+    )
+
+
+def assert_decoded_as_validated(decoder, msg_model_class, raw_msg: str):
+    decoded = decoder(raw_msg)
+    validated = msg_model_class.model_validate_json(raw_msg)
+
+    assert_that(decoded, instance_of(msg_model_class))
+    assert_that(decoded, equal_to(validated))
+    assert_that(get_pydantic_state(decoded), equal_to(get_pydantic_state(validated)))
+    assert_that(decoded.to_api_request_json(), equal_to(validated.to_api_request_json()))
+    assert_that(decoded.model_dump(exclude_unset=True), equal_to(validated.model_dump(exclude_unset=True)))
+
+
+def test_pydantic_model_internals():
+    # The pinned pydantic version has the internals the trusted decoders set up (see `_construct`)
+    assert_that(
+        BaseModel.__slots__,
+        equal_to(("__dict__", "__pydantic_fields_set__", "__pydantic_extra__", "__pydantic_private__")),
+    )
+    assert_that(trusted_decoders._supports_direct_construction(), equal_to(True))
+
+
+def test_unsupported_pydantic_falls_back_to_validation(monkeypatch, create_orderbook_message):
+    monkeypatch.setattr(trusted_decoders, "PYDANTIC_VERSION", "3.0.0")
+    decoder = trusted_decoders._create_trusted_decoder(OrderbookStreamMsg, trusted_decoders._decode_orderbook)
+
+    assert_that(decoder, equal_to(OrderbookStreamMsg.model_validate_json))
+    assert_decoded_as_validated(decoder, OrderbookStreamMsg, create_orderbook_message().model_dump_json(by_alias=True))
+
+
+def test_decode_orderbook_msg(create_orderbook_message):
+    raw_msg = create_orderbook_message().model_dump_json(by_alias=True)
+
+    assert_decoded_as_validated(decode_orderbook_msg, OrderbookStreamMsg, raw_msg)
+    assert_decoded_as_validated(decode_orderbook_msg, OrderbookStreamMsg, raw_msg.encode())
+
+
+@pytest.mark.parametrize(
+    "decoder, msg_model_class, msg",
+    [
+        (decode_public_trades_msg, PublicTradesStreamMsg, PUBLIC_TRADES_MSG),
+        (decode_candles_msg, CandlesStreamMsg, CANDLES_MSG),
+        # Numbers instead of strings
+        (
+            decode_candles_msg,
+            CandlesStreamMsg,
+            {**CANDLES_MSG, "data": [{"o": 3458.64, "l": 3399, "h": 3476.89, "c": 0.0001, "v": 1e-05, "T": 1}]},
+        ),
+        # Unexpected type, error without data
+        (decode_orderbook_msg, OrderbookStreamMsg, {"type": "NEW_TYPE", "error": "Some error", "ts": 1, "seq": 2}),
+    ],
+)
+def test_decode_msg(decoder, msg_model_class, msg):
+    assert_decoded_as_validated(decoder, msg_model_class, json.dumps(msg))
+
+
+def test_decode_unexpected_msg_falls_back_to_validation():
+    unknown_side_msg = {**PUBLIC_TRADES_MSG, "data": [{**PUBLIC_TRADES_MSG["data"][0], "S": "UNKNOWN_SIDE"}]}
+    missing_field_msg = {**CANDLES_MSG, "data": [{"o": "1", "l": "1", "h": "1", "T": 1721106000000}]}
+
+    with pytest.raises(ValidationError):
+        decode_public_trades_msg(json.dumps(unknown_side_msg))
+    with pytest.raises(ValidationError):
+        decode_candles_msg(json.dumps(missing_field_msg))
+
+    # Full aliases are accepted by the validation only
+    full_aliases_msg = {**CANDLES_MSG, "data": [{"open": "1", "low": "1", "high": "2", "close": "2", "timestamp": 1}]}
+    assert_decoded_as_validated(decode_candles_msg, CandlesStreamMsg, json.dumps(full_aliases_msg))
+
+
+@pytest.mark.asyncio
+async def test_orderbook_stream_with_trusted_decoding(create_orderbook_message):
+    from x10.perpetual.stream_client import PerpetualStreamClient
+
+    message_model = create_orderbook_message()
+
+    async with websockets.serve(serve_message(message_model.model_dump_json()), "127.0.0.1", 0) as server:
+        stream_client = PerpetualStreamClient(api_url=get_url_from_server(server), trusted_decoding=True)
+        stream = await stream_client.subscribe_to_orderbooks()
+        msg = await stream.recv()
+        await stream.close()
+
+        assert_that(msg, equal_to(message_model))
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from hamcrest import assert_that, equal_to
+
+from x10.utils.cache import SingleFlight, TtlCache
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    single_flight: SingleFlight[str, int] = SingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*[single_flight.run("key", load) for _ in range(10)])
+
+    assert_that(results, equal_to([42] * 10))
+    assert_that(len(calls), equal_to(1))
+    assert_that(single_flight.in_flight_count, equal_to(0))
+
+
+@pytest.mark.asyncio
+async def test_single_flight_call_survives_caller_cancellation():
+    single_flight: SingleFlight[str, int] = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        return 42
+
+    first_caller = asyncio.create_task(single_flight.run("key", load))
+    second_caller = asyncio.create_task(single_flight.run("key", load))
+    await asyncio.sleep(0)
+    first_caller.cancel()
+
+    assert_that(await second_caller, equal_to(42))
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_expires_and_invalidates_entries():
+    now = [0.0]
+    loaded_keys = []
+
+    async def load(key: str):
+        loaded_keys.append(key)
+        return f"{key}-{len(loaded_keys)}"
+
+    cache: TtlCache[str, str] = TtlCache(load, ttl_seconds=10, clock=lambda: now[0])
+
+    assert_that(await cache.get("a"), equal_to("a-1"))
+    assert_that(await cache.get("a"), equal_to("a-1"))
+
+    now[0] = 11
+    assert_that(await cache.get("a"), equal_to("a-2"))
+
+    cache.invalidate("a")
+    assert_that(await cache.get("a"), equal_to("a-3"))
+
+    await cache.refresh()
+    assert_that(await cache.get("a"), equal_to("a-4"))
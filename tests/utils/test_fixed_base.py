@@ -0,0 +1,38 @@
+import os
+
+from hamcrest import assert_that, equal_to
+
+from vendor.starkware.crypto.signature import pedersen_hash, sign
+from x10.utils.fixed_base import CACHE_FILE_BYTES, FixedBaseTables
+
+PRIVATE_KEY = 0x7A7FF6FD3CAB02CCDCD4A572563F5976F8976899B03A39773795A3C486D4986
+MSG_HASH = 0x2C5B2A7F1E3D9F4F0B8E66AD5A5E4C7B3C0A79F9A5D6D2E1C0B7A6F5E4D3C2B
+
+
+def test_fixed_base_tables_match_reference_implementation(tmp_path):
+    cache_file_path = str(tmp_path / "fixed_base_tables.bin")
+
+    tables = FixedBaseTables.load(cache_file_path)
+    assert_that(os.path.getsize(cache_file_path), equal_to(CACHE_FILE_BYTES))
+
+    # The second load maps the persisted file
+    mapped_tables = FixedBaseTables.load(cache_file_path)
+
+    for first, second in [(0, 0), (1, 2), (MSG_HASH, PRIVATE_KEY), (2**251 + 17, 2**248)]:
+        assert_that(mapped_tables.pedersen_hash(first, second), equal_to(pedersen_hash(first, second)))
+
+    assert_that(tables.pedersen_hash(MSG_HASH), equal_to(pedersen_hash(MSG_HASH)))
+    assert_that(
+        mapped_tables.sign(msg_hash=MSG_HASH, priv_key=PRIVATE_KEY),
+        equal_to(sign(msg_hash=MSG_HASH, priv_key=PRIVATE_KEY)),
+    )
+
+
+def test_fixed_base_tables_rebuild_invalid_cache_file(tmp_path):
+    cache_file_path = tmp_path / "fixed_base_tables.bin"
+    cache_file_path.write_bytes(b"corrupted")
+
+    tables = FixedBaseTables.load(str(cache_file_path))
+
+    assert_that(cache_file_path.stat().st_size, equal_to(CACHE_FILE_BYTES))
+    assert_that(tables.pedersen_hash(1, 2), equal_to(pedersen_hash(1, 2)))
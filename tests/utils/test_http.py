@@ -1,8 +1,10 @@
 from enum import Enum
+from typing import List
 
-from hamcrest import assert_that, equal_to, raises
+from hamcrest import assert_that, equal_to, raises, same_instance
 
-from x10.utils.http import get_url
+from x10.perpetual.orders import PlacedOrderModel
+from x10.utils.http import get_response_model, get_url, parse_response_to_model
 
 
 class _QueryParamEnum(Enum):
@@ -37,3 +39,18 @@ def test_generate_valid_url_from_template():
     assert_that(get_url("/info/candles/<market?>"), equal_to("/info/candles"))
     assert_that(get_url("/info/candles/<market?>", market="BTC-USD"), equal_to("/info/candles/BTC-USD"))
     assert_that(get_url("/info/candles/<market?>", market=None), equal_to("/info/candles"))
+
+
+def test_response_models_are_cached_per_type():
+    assert_that(get_response_model(PlacedOrderModel), same_instance(get_response_model(PlacedOrderModel)))
+    assert_that(get_response_model(List[PlacedOrderModel]), same_instance(get_response_model(List[PlacedOrderModel])))
+
+
+def test_parse_response_from_bytes():
+    response_body = b'{"status": "OK", "data": [{"id": 1, "externalId": "ext-1"}]}'
+
+    response = parse_response_to_model(response_body, List[PlacedOrderModel])
+
+    assert_that(response.status, equal_to("OK"))
+    assert_that(response.data, equal_to([PlacedOrderModel(id=1, external_id="ext-1")]))
+    assert_that(response, equal_to(parse_response_to_model(response_body.decode(), List[PlacedOrderModel])))
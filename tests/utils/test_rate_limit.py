@@ -0,0 +1,77 @@
+import pytest
+from hamcrest import assert_that, calling, equal_to, raises
+
+from x10.utils.rate_limit import (
+    BackoffPolicy,
+    EndpointClass,
+    RateLimitBudget,
+    RateLimitException,
+    RequestScheduler,
+    RequestSchedulerStats,
+    TokenBucket,
+    classify_request,
+)
+
+API_URL = "https://api.testnet.extended.exchange/api/v1"
+
+
+def test_classify_request():
+    assert_that(classify_request("POST", f"{API_URL}/user/order"), equal_to(EndpointClass.ORDER_ENTRY))
+    assert_that(classify_request("DELETE", f"{API_URL}/user/order/123"), equal_to(EndpointClass.CANCEL))
+    assert_that(classify_request("DELETE", f"{API_URL}/user/order?externalId=abc"), equal_to(EndpointClass.CANCEL))
+    assert_that(classify_request("POST", f"{API_URL}/user/order/massCancel"), equal_to(EndpointClass.CANCEL))
+    assert_that(
+        classify_request("GET", f"{API_URL}/user/positions?market=BTC-USD"), equal_to(EndpointClass.ACCOUNT_READ)
+    )
+    assert_that(classify_request("GET", f"{API_URL}/info/markets"), equal_to(EndpointClass.MARKET_INFO))
+    assert_that(classify_request("PATCH", f"{API_URL}/user/leverage"), equal_to(EndpointClass.OTHER))
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_when_burst_is_exhausted():
+    bucket = TokenBucket(RateLimitBudget(rate=1000, burst=2))
+
+    assert_that(await bucket.acquire(), equal_to(False))
+    assert_that(await bucket.acquire(), equal_to(False))
+    assert_that(await bucket.acquire(), equal_to(True))
+
+    bucket.drain()
+    assert_that(await bucket.acquire(), equal_to(True))
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_rate_limited_requests():
+    scheduler = RequestScheduler(backoff_policy=BackoffPolicy(max_retries=3, base_delay_seconds=0.001))
+    responses = [RateLimitException("429"), RateLimitException("429"), "OK"]
+
+    async def send_request():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    result = await scheduler.schedule("POST", f"{API_URL}/user/order", send_request)
+
+    assert_that(result, equal_to("OK"))
+    assert_that(
+        scheduler.stats[EndpointClass.ORDER_ENTRY],
+        equal_to(RequestSchedulerStats(queued=2, throttled=2, retried=2)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_scheduler_gives_up_after_max_retries():
+    scheduler = RequestScheduler(backoff_policy=BackoffPolicy(max_retries=1, base_delay_seconds=0.001))
+
+    async def send_request():
+        raise RateLimitException("429")
+
+    with pytest.raises(RateLimitException):
+        await scheduler.schedule("GET", f"{API_URL}/info/markets", send_request)
+
+    assert_that(scheduler.stats[EndpointClass.MARKET_INFO].throttled, equal_to(2))
+    assert_that(scheduler.stats[EndpointClass.MARKET_INFO].retried, equal_to(1))
+
+
+def test_token_bucket_rejects_invalid_budget():
+    assert_that(calling(TokenBucket).with_args(RateLimitBudget(rate=0, burst=1)), raises(AssertionError))
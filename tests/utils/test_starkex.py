@@ -0,0 +1,43 @@
+from hamcrest import assert_that, equal_to
+
+from x10.utils.starkex import get_limit_order_msg, get_limit_order_msg_prefix
+
+SYNTHETIC_ASSET_ID = 0x4254432D3600000000000000000000
+COLLATERAL_ASSET_ID = 0x31857064564ED0FF978E687456963CBA09C2C6985D8F9300A1DE4962FAFA054
+
+
+def test_limit_order_msg_prefix_is_reused_per_market_and_side():
+    hash_calls = []
+
+    def hash_function(first: int, second: int) -> int:
+        hash_calls.append((first, second))
+        return (first * 31 + second) % 2**251
+
+    def get_msg(is_buying_synthetic: int, nonce: int):
+        return get_limit_order_msg(
+            SYNTHETIC_ASSET_ID,
+            COLLATERAL_ASSET_ID,
+            is_buying_synthetic,
+            COLLATERAL_ASSET_ID,
+            1000,
+            43445116,
+            21723,
+            nonce,
+            10002,
+            474000,
+            hash_function=hash_function,
+        )
+
+    buy_msg = get_msg(1, nonce=1)
+    assert_that(len(hash_calls), equal_to(4))
+
+    assert_that(get_msg(1, nonce=1), equal_to(buy_msg))
+    get_msg(1, nonce=2)
+    assert_that(len(hash_calls), equal_to(8))
+
+    get_msg(0, nonce=1)
+    assert_that(len(hash_calls), equal_to(12))
+    assert_that(
+        get_limit_order_msg_prefix(COLLATERAL_ASSET_ID, SYNTHETIC_ASSET_ID, COLLATERAL_ASSET_ID, hash_function),
+        equal_to(hash_function(hash_function(COLLATERAL_ASSET_ID, SYNTHETIC_ASSET_ID), COLLATERAL_ASSET_ID)),
+    )
@@ -0,0 +1,157 @@
+import decimal
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from x10.perpetual.amounts import (
+    ROUNDING_BUY_CONTEXT,
+    ROUNDING_FEE_CONTEXT,
+    ROUNDING_SELL_CONTEXT,
+)
+from x10.perpetual.markets import MarketModel
+
+# Precision of the rounding contexts, the products `amount * price` and `fee_rate * collateral` of the `Decimal`
+# path are computed in the current (thread-local) context, so its precision is checked on every conversion
+ROUNDING_CONTEXTS_PREC = min(ROUNDING_BUY_CONTEXT.prec, ROUNDING_SELL_CONTEXT.prec, ROUNDING_FEE_CONTEXT.prec)
+
+MAX_CACHED_FIXED_POINT_AMOUNTS = 1024
+
+# Synthetic, collateral and fee amounts
+StarkAmounts = Tuple[int, int, int]
+
+
+def get_decimal_places(value: Decimal) -> int:
+    exponent = value.normalize().as_tuple().exponent
+    assert isinstance(exponent, int)
+
+    return max(0, -exponent)
+
+
+def to_scaled_int(value: Decimal, decimal_places: int) -> Optional[int]:
+    """
+    Returns `value * 10^decimal_places` if it is an integer, `None` otherwise.
+    """
+
+    if not value.is_finite():
+        return None
+
+    numerator, denominator = value.as_integer_ratio()
+    scaled_numerator = numerator * 10**decimal_places
+
+    if scaled_numerator % denominator:
+        return None
+
+    return scaled_numerator // denominator
+
+
+def get_max_exact_value() -> int:
+    """
+    While every intermediate product fits into the `Decimal` precision, the `Decimal` arithmetic is exact and rounds
+    only once, in `to_integral`, so integer arithmetic gives the same result.
+    """
+
+    return 10 ** min(ROUNDING_CONTEXTS_PREC, decimal.getcontext().prec)
+
+
+def div_round_up(numerator: int, denominator: int) -> int:
+    return -(-numerator // denominator)
+
+
+def div_round_down(numerator: int, denominator: int) -> int:
+    return numerator // denominator
+
+
+class FixedPointOrderAmounts:
+    """
+    Converts order amounts of one market to stark amounts with integer arithmetic.
+
+    Quantities and prices aligned to `min_order_size_change` and `min_price_change` are scaled to integers, so
+    the conversion takes a few integer operations instead of `Decimal` arithmetic in the rounding contexts.
+    The results are identical to `HumanReadableAmount.to_stark_amount` with the BUY/SELL/FEE rounding contexts.
+    Returns `None` when the integer path can't guarantee that (inputs which are not aligned, non-positive
+    values, negative fee rate, values beyond the `Decimal` precision), callers then fall back to `Decimal`.
+    """
+
+    __enabled: bool
+    __quantity_places: int
+    __price_places: int
+    __fee_rate: int
+    __synthetic_resolution: int
+    __collateral_resolution: int
+    __synthetic_divisor: int
+    __collateral_divisor: int
+    __fee_divisor: int
+
+    def __init__(self, market: MarketModel, fee_rate: Decimal):
+        super().__init__()
+
+        fee_rate_places = get_decimal_places(fee_rate)
+        scaled_fee_rate = to_scaled_int(fee_rate, fee_rate_places)
+
+        self.__enabled = scaled_fee_rate is not None and scaled_fee_rate >= 0
+        self.__quantity_places = get_decimal_places(market.trading_config.min_order_size_change)
+        self.__price_places = get_decimal_places(market.trading_config.min_price_change)
+        self.__fee_rate = scaled_fee_rate or 0
+        self.__synthetic_resolution = market.l2_config.synthetic_resolution
+        self.__collateral_resolution = market.l2_config.collateral_resolution
+        self.__synthetic_divisor = 10**self.__quantity_places
+        self.__collateral_divisor = 10 ** (self.__quantity_places + self.__price_places)
+        self.__fee_divisor = 10 ** (self.__quantity_places + self.__price_places + fee_rate_places)
+
+    def to_stark_amounts(
+        self, synthetic_amount: Decimal, price: Decimal, is_buying_synthetic: bool
+    ) -> Optional[StarkAmounts]:
+        if not self.__enabled:
+            return None
+
+        quantity = to_scaled_int(synthetic_amount, self.__quantity_places)
+        scaled_price = to_scaled_int(price, self.__price_places)
+
+        if quantity is None or scaled_price is None or quantity <= 0 or scaled_price <= 0:
+            return None
+
+        synthetic = quantity * self.__synthetic_resolution
+        collateral = quantity * scaled_price * self.__collateral_resolution
+        fee = collateral * self.__fee_rate
+
+        max_exact_value = get_max_exact_value()
+
+        if synthetic >= max_exact_value or collateral >= max_exact_value or fee >= max_exact_value:
+            return None
+
+        # BUY rounds up, SELL rounds down, the fee always rounds up
+        div_round = div_round_up if is_buying_synthetic else div_round_down
+
+        return (
+            div_round(synthetic, self.__synthetic_divisor),
+            div_round(collateral, self.__collateral_divisor),
+            div_round_up(fee, self.__fee_divisor),
+        )
+
+
+__fixed_point_amounts_cache: Dict[Tuple[str, Decimal, Decimal, int, int, Decimal], FixedPointOrderAmounts] = {}
+
+
+def get_fixed_point_order_amounts(market: MarketModel, fee_rate: Decimal) -> FixedPointOrderAmounts:
+    """
+    Returns the `FixedPointOrderAmounts` of the market and fee rate, cached by the market settings they depend on.
+    """
+
+    trading_config = market.trading_config
+    l2_config = market.l2_config
+    key = (
+        market.name,
+        trading_config.min_order_size_change,
+        trading_config.min_price_change,
+        l2_config.synthetic_resolution,
+        l2_config.collateral_resolution,
+        fee_rate,
+    )
+    fixed_point_amounts = __fixed_point_amounts_cache.get(key)
+
+    if fixed_point_amounts is None:
+        if len(__fixed_point_amounts_cache) >= MAX_CACHED_FIXED_POINT_AMOUNTS:
+            __fixed_point_amounts_cache.clear()
+
+        fixed_point_amounts = __fixed_point_amounts_cache[key] = FixedPointOrderAmounts(market, fee_rate)
+
+    return fixed_point_amounts
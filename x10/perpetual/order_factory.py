@@ -0,0 +1,184 @@
+import math
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from x10.perpetual.accounts import StarkPerpetualAccount
+from x10.perpetual.amounts import (
+    ROUNDING_BUY_CONTEXT,
+    ROUNDING_FEE_CONTEXT,
+    ROUNDING_SELL_CONTEXT,
+)
+from x10.perpetual.fees import DEFAULT_FEES, TradingFeeModel
+from x10.perpetual.fixed_point import FixedPointOrderAmounts, StarkAmounts
+from x10.perpetual.markets import MarketModel
+from x10.perpetual.order_trace import OrderStage, OrderTrace
+from x10.perpetual.orders import (
+    OrderSide,
+    OrderType,
+    PerpetualOrderModel,
+    SelfTradeProtectionLevel,
+    SettlementSignatureModel,
+    StarkDebuggingOrderAmountsModel,
+    StarkSettlementModel,
+    TimeInForce,
+)
+from x10.utils.date import to_epoch_millis, utc_now
+from x10.utils.starkex import SECONDS_IN_HOUR, generate_nonce, hash_order_params
+
+DEFAULT_EXPIRATION = timedelta(hours=8)
+SETTLEMENT_EXPIRATION_BUFFER = timedelta(days=14)
+
+
+class MarketOrderFactory:
+    """
+    Creates signed limit orders for one market and fee tier, e.g. to re-quote the market at a high rate.
+
+    Produces the same orders as `create_order_object`, but everything which depends only on the market and the fees
+    (asset ids, resolutions, rounding contexts, the settlement model) is prepared once, every amount is converted to
+    its stark representation once (with integer arithmetic for tick-aligned inputs, see `FixedPointOrderAmounts`),
+    and the order models are built without re-validating the already typed values.
+    Create a new factory when the market config or the fee tier changes.
+    """
+
+    __account: StarkPerpetualAccount
+    __market: MarketModel
+    __fees: TradingFeeModel
+    __synthetic_id: int
+    __collateral_id: int
+    __synthetic_resolution: Decimal
+    __collateral_resolution: Decimal
+    __fee_rate: Decimal
+    __position_id: int
+    __collateral_position: Decimal
+    __fixed_point_amounts: FixedPointOrderAmounts
+
+    def __init__(
+        self,
+        account: StarkPerpetualAccount,
+        market: MarketModel,
+        fees: Optional[TradingFeeModel] = None,
+    ):
+        super().__init__()
+
+        self.__account = account
+        self.__market = market
+        self.__fees = fees or account.trading_fee.get(market.name, DEFAULT_FEES)
+        self.__synthetic_id = int(market.l2_config.synthetic_id, base=16)
+        self.__collateral_id = int(market.l2_config.collateral_id, base=16)
+        self.__synthetic_resolution = Decimal(market.l2_config.synthetic_resolution)
+        self.__collateral_resolution = Decimal(market.l2_config.collateral_resolution)
+        self.__fee_rate = self.__fees.taker_fee_rate
+        self.__position_id = account.vault
+        self.__collateral_position = Decimal(account.vault)
+        self.__fixed_point_amounts = FixedPointOrderAmounts(market, self.__fee_rate)
+
+    @property
+    def market(self) -> MarketModel:
+        return self.__market
+
+    @property
+    def fees(self) -> TradingFeeModel:
+        return self.__fees
+
+    def create_order(
+        self,
+        amount_of_synthetic: Decimal,
+        price: Decimal,
+        side: OrderSide,
+        post_only: bool = False,
+        previous_order_id: Optional[str] = None,
+        expire_time: Optional[datetime] = None,
+        order_external_id: Optional[str] = None,
+        time_in_force: TimeInForce = TimeInForce.GTT,
+        self_trade_protection_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT,
+        trace: Optional[OrderTrace] = None,
+    ) -> PerpetualOrderModel:
+        """
+        :param trace: Receives the times of the amounts conversion, hashing and signing (see `OrderTracer`).
+        """
+
+        if expire_time is None:
+            expire_time = utc_now() + DEFAULT_EXPIRATION
+
+        nonce = generate_nonce()
+        is_buying_synthetic = side == OrderSide.BUY
+        stark_amounts = self.__fixed_point_amounts.to_stark_amounts(amount_of_synthetic, price, is_buying_synthetic)
+
+        if stark_amounts is None:
+            stark_amounts = self.__to_stark_amounts(amount_of_synthetic, price, is_buying_synthetic)
+
+        (synthetic_amount_stark, collateral_amount_stark, fee_amount_stark) = stark_amounts
+
+        if trace:
+            trace.mark(OrderStage.AMOUNTS_CONVERTED)
+
+        expire_time_with_buffer = expire_time + SETTLEMENT_EXPIRATION_BUFFER
+        order_hash = hash_order_params(
+            (
+                self.__synthetic_id,
+                self.__collateral_id,
+                1 if is_buying_synthetic else 0,
+                self.__collateral_id,
+                synthetic_amount_stark,
+                collateral_amount_stark,
+                fee_amount_stark,
+                nonce,
+                self.__position_id,
+                math.ceil(expire_time_with_buffer.timestamp() / SECONDS_IN_HOUR),
+            )
+        )
+        if trace:
+            trace.mark(OrderStage.HASHED)
+
+        (order_signature_r, order_signature_s) = self.__account.sign(order_hash)
+
+        if trace:
+            trace.mark(OrderStage.SIGNED)
+
+        # The values are already of the model types, so the models are built without validation. Enums are
+        # stored by value, same as validated models do (see `use_enum_values` in `X10BaseModel`).
+        settlement = StarkSettlementModel.model_construct(
+            signature=SettlementSignatureModel.model_construct(r=order_signature_r, s=order_signature_s),
+            stark_key=self.__account.public_key,
+            collateral_position=self.__collateral_position,
+        )
+        debugging_amounts = StarkDebuggingOrderAmountsModel.model_construct(
+            collateral_amount=Decimal(collateral_amount_stark),
+            fee_amount=Decimal(fee_amount_stark),
+            synthetic_amount=Decimal(synthetic_amount_stark),
+        )
+
+        return PerpetualOrderModel.model_construct(
+            id=str(order_hash) if order_external_id is None else order_external_id,
+            market=self.__market.name,
+            type=OrderType.LIMIT.value,  # type: ignore[arg-type]
+            side=side.value,  # type: ignore[arg-type]
+            qty=amount_of_synthetic,
+            price=price,
+            post_only=post_only,
+            time_in_force=time_in_force.value,  # type: ignore[arg-type]
+            expiry_epoch_millis=to_epoch_millis(expire_time),
+            fee=self.__fee_rate,
+            self_trade_protection_level=self_trade_protection_level.value,  # type: ignore[arg-type]
+            nonce=Decimal(nonce),
+            cancel_id=previous_order_id,
+            settlement=settlement,
+            debugging_amounts=debugging_amounts,
+        )
+
+    def __to_stark_amounts(self, synthetic_amount: Decimal, price: Decimal, is_buying_synthetic: bool) -> StarkAmounts:
+        # Same operations (and `Decimal` contexts) as `HumanReadableAmount.to_stark_amount`
+        rounding_context = ROUNDING_BUY_CONTEXT if is_buying_synthetic else ROUNDING_SELL_CONTEXT
+        collateral_amount = synthetic_amount * price
+        fee_amount = self.__fee_rate * collateral_amount
+
+        synthetic_amount_stark = rounding_context.multiply(synthetic_amount, self.__synthetic_resolution)
+        collateral_amount_stark = rounding_context.multiply(collateral_amount, self.__collateral_resolution)
+        fee_amount_stark = ROUNDING_FEE_CONTEXT.multiply(fee_amount, self.__collateral_resolution)
+
+        return (
+            int(synthetic_amount_stark.to_integral(context=rounding_context)),
+            int(collateral_amount_stark.to_integral(context=rounding_context)),
+            int(fee_amount_stark.to_integral(context=ROUNDING_FEE_CONTEXT)),
+        )
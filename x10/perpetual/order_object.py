@@ -1,6 +1,8 @@
+from concurrent.futures import Executor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Callable, Optional, Tuple
+from typing import Callable, List, Optional, Sequence, Tuple
 
 from x10.perpetual.accounts import StarkPerpetualAccount
 from x10.perpetual.amounts import (
@@ -11,7 +13,9 @@ from x10.perpetual.amounts import (
     StarkOrderAmounts,
 )
 from x10.perpetual.fees import DEFAULT_FEES, TradingFeeModel
+from x10.perpetual.fixed_point import get_fixed_point_order_amounts
 from x10.perpetual.markets import MarketModel
+from x10.perpetual.order_trace import OrderStage, OrderTrace
 from x10.perpetual.orders import (
     OrderSide,
     OrderType,
@@ -23,7 +27,46 @@ from x10.perpetual.orders import (
     TimeInForce,
 )
 from x10.utils.date import to_epoch_millis, utc_now
-from x10.utils.starkex import generate_nonce, hash_order
+from x10.utils.starkex import (
+    LimitOrderHashParams,
+    generate_nonce,
+    get_order_hash_params,
+    get_order_hash_params_from_stark_amounts,
+    hash_and_sign_orders,
+    hash_order_params,
+)
+
+
+@dataclass
+class OrderSpec:
+    """
+    Parameters of a single order for `create_order_objects`, same as the arguments of `create_order_object`.
+    """
+
+    market: MarketModel
+    amount_of_synthetic: Decimal
+    price: Decimal
+    side: OrderSide
+    post_only: bool = False
+    previous_order_id: Optional[str] = None
+    expire_time: Optional[datetime] = None
+    order_external_id: Optional[str] = None
+    time_in_force: TimeInForce = TimeInForce.GTT
+    self_trade_protection_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT
+
+
+@dataclass
+class _PreparedOrder:
+    market: MarketModel
+    synthetic_amount: Decimal
+    price: Decimal
+    side: OrderSide
+    nonce: int
+    expire_time: datetime
+    fee_rate: Decimal
+    collateral_position_id: int
+    debugging_amounts: StarkDebuggingOrderAmountsModel
+    hash_params: LimitOrderHashParams
 
 
 def create_order_object(
@@ -38,9 +81,14 @@ def create_order_object(
     order_external_id: Optional[str] = None,
     time_in_force: TimeInForce = TimeInForce.GTT,
     self_trade_protection_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT,
+    trace: Optional[OrderTrace] = None,
 ) -> PerpetualOrderModel:
     """
     Creates an order object to be placed on the exchange using the `place_order` method.
+
+    Tick-aligned amounts are converted with integer arithmetic (see `FixedPointOrderAmounts`), others with `Decimal`.
+
+    :param trace: Receives the times of the amounts conversion, hashing and signing (see `OrderTracer`).
     """
     fees = account.trading_fee.get(market.name, DEFAULT_FEES)
 
@@ -60,8 +108,56 @@ def create_order_object(
         order_external_id=order_external_id,
         time_in_force=time_in_force,
         self_trade_protection_level=self_trade_protection_level,
+        trace=trace,
+    )
+
+
+def create_order_objects(
+    account: StarkPerpetualAccount,
+    order_specs: Sequence[OrderSpec],
+    *,
+    executor: Optional[Executor] = None,
+) -> List[PerpetualOrderModel]:
+    """
+    Creates a batch of order objects, e.g. to re-quote a ladder of price levels at once.
+
+    Hashing and signing are spread over `executor` (see `x10.utils.starkex.create_signing_executor`),
+    without it the orders are signed one by one in the calling thread.
+    """
+
+    prepared_orders = [
+        __prepare_order(
+            spec.market,
+            spec.amount_of_synthetic,
+            spec.price,
+            spec.side,
+            account.vault,
+            account.trading_fee.get(spec.market.name, DEFAULT_FEES),
+            spec.expire_time,
+        )
+        for spec in order_specs
+    ]
+    signed_hashes = hash_and_sign_orders(
+        [prepared_order.hash_params for prepared_order in prepared_orders],
+        account.sign,
+        executor=executor,
     )
 
+    return [
+        __build_order_model(
+            prepared_order,
+            order_hash,
+            signature,
+            account.public_key,
+            post_only=spec.post_only,
+            previous_order_external_id=spec.previous_order_id,
+            order_external_id=spec.order_external_id,
+            time_in_force=spec.time_in_force,
+            self_trade_protection_level=spec.self_trade_protection_level,
+        )
+        for spec, prepared_order, (order_hash, signature) in zip(order_specs, prepared_orders, signed_hashes)
+    ]
+
 
 def __create_order_object(
     market: MarketModel,
@@ -79,15 +175,88 @@ def __create_order_object(
     order_external_id: Optional[str] = None,
     time_in_force: TimeInForce = TimeInForce.GTT,
     self_trade_protection_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT,
+    trace: Optional[OrderTrace] = None,
 ) -> PerpetualOrderModel:
     if exact_only:
         raise NotImplementedError("`exact_only` option is not supported yet")
 
+    prepared_order = __prepare_order(market, synthetic_amount, price, side, collateral_position_id, fees, expire_time)
+
+    if trace:
+        trace.mark(OrderStage.AMOUNTS_CONVERTED)
+
+    order_hash = hash_order_params(prepared_order.hash_params)
+
+    if trace:
+        trace.mark(OrderStage.HASHED)
+
+    signature = signer(order_hash)
+
+    if trace:
+        trace.mark(OrderStage.SIGNED)
+
+    return __build_order_model(
+        prepared_order,
+        order_hash,
+        signature,
+        public_key,
+        post_only=post_only,
+        previous_order_external_id=previous_order_external_id,
+        order_external_id=order_external_id,
+        time_in_force=time_in_force,
+        self_trade_protection_level=self_trade_protection_level,
+    )
+
+
+def __prepare_order(
+    market: MarketModel,
+    synthetic_amount: Decimal,
+    price: Decimal,
+    side: OrderSide,
+    collateral_position_id: int,
+    fees: TradingFeeModel,
+    expire_time: Optional[datetime] = None,
+) -> _PreparedOrder:
     if expire_time is None:
         expire_time = utc_now() + timedelta(hours=8)
 
     nonce = generate_nonce()
     is_buying_synthetic = side == OrderSide.BUY
+    stark_amounts = get_fixed_point_order_amounts(market, fees.taker_fee_rate).to_stark_amounts(
+        synthetic_amount, price, is_buying_synthetic
+    )
+
+    if stark_amounts is not None:
+        (synthetic_amount_stark, collateral_amount_stark, fee_amount_stark) = stark_amounts
+        debugging_amounts = StarkDebuggingOrderAmountsModel(
+            collateral_amount=Decimal(collateral_amount_stark),
+            fee_amount=Decimal(fee_amount_stark),
+            synthetic_amount=Decimal(synthetic_amount_stark),
+        )
+        hash_params = get_order_hash_params_from_stark_amounts(
+            int(market.synthetic_asset.settlement_external_id, base=16),
+            int(market.collateral_asset.settlement_external_id, base=16),
+            is_buying_synthetic,
+            stark_amounts,
+            nonce,
+            collateral_position_id,
+            expire_time,
+        )
+
+        return _PreparedOrder(
+            market=market,
+            synthetic_amount=synthetic_amount,
+            price=price,
+            side=side,
+            nonce=nonce,
+            expire_time=expire_time,
+            fee_rate=fees.taker_fee_rate,
+            collateral_position_id=collateral_position_id,
+            debugging_amounts=debugging_amounts,
+            hash_params=hash_params,
+        )
+
+    # Not tick-aligned (or beyond the exact precision), converted with `Decimal` arithmetic
     rounding_context = ROUNDING_BUY_CONTEXT if is_buying_synthetic else ROUNDING_SELL_CONTEXT
 
     collateral_amount_human = HumanReadableAmount(synthetic_amount * price, market.collateral_asset)
@@ -111,7 +280,7 @@ def __create_order_object(
         synthetic_amount=Decimal(amounts.synthetic_amount_internal.to_stark_amount(amounts.rounding_context).value),
     )
 
-    order_hash = hash_order(
+    hash_params = get_order_hash_params(
         amounts=amounts,
         is_buying_synthetic=is_buying_synthetic,
         nonce=nonce,
@@ -119,30 +288,56 @@ def __create_order_object(
         expiration_timestamp=expire_time,
     )
 
-    (order_signature_r, order_signature_s) = signer(order_hash)
+    return _PreparedOrder(
+        market=market,
+        synthetic_amount=synthetic_amount_human.value,
+        price=price,
+        side=side,
+        nonce=nonce,
+        expire_time=expire_time,
+        fee_rate=amounts.fee_rate,
+        collateral_position_id=collateral_position_id,
+        debugging_amounts=debugging_amounts,
+        hash_params=hash_params,
+    )
+
+
+def __build_order_model(
+    prepared_order: _PreparedOrder,
+    order_hash: int,
+    signature: Tuple[int, int],
+    public_key: int,
+    *,
+    post_only: bool,
+    previous_order_external_id: Optional[str],
+    order_external_id: Optional[str],
+    time_in_force: TimeInForce,
+    self_trade_protection_level: SelfTradeProtectionLevel,
+) -> PerpetualOrderModel:
+    (order_signature_r, order_signature_s) = signature
     settlement = StarkSettlementModel(
         signature=SettlementSignatureModel(r=order_signature_r, s=order_signature_s),
         stark_key=public_key,
-        collateral_position=Decimal(collateral_position_id),
+        collateral_position=Decimal(prepared_order.collateral_position_id),
     )
 
     order_id = str(order_hash) if order_external_id is None else order_external_id
     order = PerpetualOrderModel(
         id=order_id,
-        market=market.name,
+        market=prepared_order.market.name,
         type=OrderType.LIMIT,
-        side=side,
-        qty=synthetic_amount_human.value,
-        price=price,
+        side=prepared_order.side,
+        qty=prepared_order.synthetic_amount,
+        price=prepared_order.price,
         post_only=post_only,
         time_in_force=time_in_force,
-        expiry_epoch_millis=to_epoch_millis(expire_time),
-        fee=amounts.fee_rate,
+        expiry_epoch_millis=to_epoch_millis(prepared_order.expire_time),
+        fee=prepared_order.fee_rate,
         self_trade_protection_level=self_trade_protection_level,
-        nonce=Decimal(nonce),
+        nonce=Decimal(prepared_order.nonce),
         cancel_id=previous_order_external_id,
         settlement=settlement,
-        debugging_amounts=debugging_amounts,
+        debugging_amounts=prepared_order.debugging_amounts,
     )
 
     return order
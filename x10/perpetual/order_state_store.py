@@ -0,0 +1,374 @@
+import asyncio
+import dataclasses
+from collections import OrderedDict
+from typing import (
+    Awaitable,
+    Callable,
+    Collection,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    cast,
+)
+
+from x10.perpetual.accounts import AccountStreamDataModel
+from x10.perpetual.orders import (
+    TERMINAL_ORDER_STATUSES,
+    OpenOrderModel,
+    OrderSide,
+    OrderStatus,
+)
+from x10.perpetual.stream_client.perpetual_stream_connection import (
+    PerpetualStreamConnection,
+    StreamGap,
+)
+from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
+from x10.utils.http import StreamDataType, WrappedApiResponse, WrappedStreamResponse
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+DEFAULT_MAX_TERMINAL_ORDERS = 10_000
+
+# Fetches the open orders of the account (e.g. `AccountModule.get_open_orders`)
+OpenOrdersProvider = Callable[[], Awaitable[WrappedApiResponse[List[OpenOrderModel]]]]
+
+
+@dataclasses.dataclass
+class OrderStateStoreStats:
+    updates_applied: int = 0
+    # Updates older than the known state of the order
+    stale_updates: int = 0
+    reconciliations: int = 0
+    failed_reconciliations: int = 0
+    # Open orders missing in the store, added by a reconciliation
+    reconciled_added: int = 0
+    # Orders of the store which were not open anymore, removed by a reconciliation
+    reconciled_removed: int = 0
+
+
+def _get_side(order: OpenOrderModel) -> str:
+    # Enums are stored by value (see `use_enum_values` in `X10BaseModel`)
+    return cast(str, order.side)
+
+
+@dataclasses.dataclass
+class _StatusWaiter:
+    statuses: FrozenSet[str]
+    future: asyncio.Future
+
+
+class OrderStateStore:
+    """
+    In-memory view of the open orders of the account, fed by the account stream (see `apply_event`), indexed by id,
+    external id, market and side.
+
+    An update replaces the known state of the order unless it is older (`updated_time`), so a partially filled order
+    carries its latest `filled_qty`. Orders in a terminal state leave the open orders and are kept (the latest
+    `max_terminal_orders`) for the lookups and the waiters.
+
+    The gaps of the stream lose updates, the store is then reconciled against the open orders of `open_orders_provider`
+    (a stream snapshot reconciles it too).
+    """
+
+    __open_orders_provider: Optional[OpenOrdersProvider]
+    __max_terminal_orders: int
+    __open_orders: Dict[int, OpenOrderModel]
+    __terminal_orders: "OrderedDict[int, OpenOrderModel]"
+    __ids_by_external_id: Dict[str, int]
+    __ids_by_market: Dict[str, Dict[str, Set[int]]]
+    __waiters: Dict[str, List[_StatusWaiter]]
+    __stats: OrderStateStoreStats
+    __reconcile_task: Optional[asyncio.Task]
+    __reconcile_again: bool
+    __updated_during_reconcile: Optional[Set[int]]
+    __stream_task: Optional[asyncio.Task]
+
+    def __init__(
+        self,
+        *,
+        open_orders_provider: Optional[OpenOrdersProvider] = None,
+        max_terminal_orders: int = DEFAULT_MAX_TERMINAL_ORDERS,
+    ):
+        """
+        :param open_orders_provider: Fetches the open orders to reconcile the store against after the gaps of the
+        stream.
+        :param max_terminal_orders: Number of the latest orders in a terminal state kept in the store.
+        """
+
+        super().__init__()
+
+        self.__open_orders_provider = open_orders_provider
+        self.__max_terminal_orders = max_terminal_orders
+        self.__open_orders = {}
+        self.__terminal_orders = OrderedDict()
+        self.__ids_by_external_id = {}
+        self.__ids_by_market = {}
+        self.__waiters = {}
+        self.__stats = OrderStateStoreStats()
+        self.__reconcile_task = None
+        self.__reconcile_again = False
+        self.__updated_during_reconcile = None
+        self.__stream_task = None
+
+    @property
+    def stats(self) -> OrderStateStoreStats:
+        return self.__stats
+
+    @property
+    def is_reconciling(self) -> bool:
+        return self.__reconcile_task is not None
+
+    def __len__(self) -> int:
+        return len(self.__open_orders)
+
+    def get_order(self, order_id: int) -> Optional[OpenOrderModel]:
+        """
+        Returns the latest state of an open or recently finished order.
+        """
+
+        return self.__open_orders.get(order_id) or self.__terminal_orders.get(order_id)
+
+    def get_order_by_external_id(self, external_id: str) -> Optional[OpenOrderModel]:
+        order_id = self.__ids_by_external_id.get(external_id)
+
+        return self.get_order(order_id) if order_id is not None else None
+
+    def get_open_orders(
+        self, market_name: Optional[str] = None, side: Optional[OrderSide] = None
+    ) -> List[OpenOrderModel]:
+        if market_name is None:
+            orders: Iterable[OpenOrderModel] = self.__open_orders.values()
+        else:
+            ids_by_side = self.__ids_by_market.get(market_name, {})
+            ids: Iterable[int] = (
+                ids_by_side.get(side.value, ())
+                if side
+                else (order_id for ids in ids_by_side.values() for order_id in ids)
+            )
+            orders = (self.__open_orders[order_id] for order_id in ids)
+
+        if side and market_name is None:
+            return [order for order in orders if order.side == side.value]
+
+        return list(orders)
+
+    def apply_event(self, event: WrappedStreamResponse[AccountStreamDataModel]):
+        """
+        Applies the orders of an account stream message, a snapshot of the orders replaces the open orders.
+        """
+
+        if event.data is None or event.data.orders is None:
+            return
+
+        if event.type == StreamDataType.SNAPSHOT.value:
+            self.__reconcile(event.data.orders, updated_ids=set())
+            return
+
+        for order in event.data.orders:
+            self.apply_order(order)
+
+    def apply_order(self, order: OpenOrderModel):
+        known_order = self.get_order(order.id)
+
+        if known_order is not None and (
+            known_order.updated_time > order.updated_time
+            or (known_order.status in TERMINAL_ORDER_STATUSES and order.status not in TERMINAL_ORDER_STATUSES)
+        ):
+            self.__stats.stale_updates += 1
+            return
+
+        self.__stats.updates_applied += 1
+
+        if self.__updated_during_reconcile is not None:
+            self.__updated_during_reconcile.add(order.id)
+
+        self.__remove_open_order(order.id)
+        self.__ids_by_external_id[order.external_id] = order.id
+
+        if order.status in TERMINAL_ORDER_STATUSES:
+            self.__terminal_orders[order.id] = order
+            self.__terminal_orders.move_to_end(order.id)
+            self.__evict_terminal_orders()
+        else:
+            self.__open_orders[order.id] = order
+            self.__ids_by_market.setdefault(order.market, {}).setdefault(_get_side(order), set()).add(order.id)
+
+        self.__notify_waiters(order)
+
+    async def wait_for_status(
+        self, external_id: str, statuses: Collection[OrderStatus], timeout_seconds: Optional[float] = None
+    ) -> OpenOrderModel:
+        """
+        Waits until the order is in one of `statuses` (returns right away if it already is) or in a terminal state,
+        and returns its state. Raises `asyncio.TimeoutError` after `timeout_seconds`.
+        """
+
+        status_values = frozenset(status.value for status in statuses)
+        order = self.get_order_by_external_id(external_id)
+
+        if order is not None and (order.status in status_values or order.status in TERMINAL_ORDER_STATUSES):
+            return order
+
+        waiter = _StatusWaiter(status_values, asyncio.get_running_loop().create_future())
+        self.__waiters.setdefault(external_id, []).append(waiter)
+
+        try:
+            return await asyncio.wait_for(waiter.future, timeout_seconds)
+        finally:
+            waiters = self.__waiters.get(external_id, [])
+
+            if waiter in waiters:
+                waiters.remove(waiter)
+
+            if not waiters:
+                self.__waiters.pop(external_id, None)
+
+    async def wait_for_terminal(self, external_id: str, timeout_seconds: Optional[float] = None) -> OpenOrderModel:
+        return await self.wait_for_status(external_id, (), timeout_seconds)
+
+    def on_stream_gap(self, gap: StreamGap):
+        """
+        Gap callback of the account stream.
+        """
+
+        LOGGER.warning("Account stream gap (%s), reconciling the open orders", gap.reason.value)
+        self.reconcile()
+
+    def reconcile(self):
+        """
+        Reconciles the store against the open orders of `open_orders_provider` (in the background).
+        """
+
+        if self.__open_orders_provider is None:
+            return
+
+        if self.__reconcile_task is not None:
+            # The running request may have been sent before the missed updates
+            self.__reconcile_again = True
+            return
+
+        self.__reconcile_task = asyncio.get_running_loop().create_task(self.__request_open_orders())
+
+    def start(self, stream_client: PerpetualStreamClient, api_key: str):
+        """
+        Subscribes to the account stream of `api_key` and applies its messages until `close`.
+        """
+
+        if self.__stream_task is None:
+            self.__stream_task = asyncio.get_running_loop().create_task(self.__run_stream(stream_client, api_key))
+
+    async def close(self):
+        tasks = [task for task in [self.__stream_task, self.__reconcile_task] if task is not None]
+        self.__stream_task = None
+        self.__reconcile_task = None
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __run_stream(self, stream_client: PerpetualStreamClient, api_key: str):
+        stream: Optional[PerpetualStreamConnection] = None
+
+        try:
+            stream = connected_stream = await stream_client.subscribe_to_account_updates(
+                api_key, gap_callback=self.on_stream_gap
+            )
+            self.reconcile()
+
+            async for event in connected_stream:
+                self.apply_event(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER.error("Account stream failed: %s", e)
+        finally:
+            if stream is not None and not stream.closed:
+                await stream.close()
+
+    async def __request_open_orders(self):
+        assert self.__open_orders_provider
+
+        while True:
+            self.__reconcile_again = False
+            self.__updated_during_reconcile = set()
+
+            try:
+                response = await self.__open_orders_provider()
+                open_orders = response.data
+                assert open_orders is not None, "Empty open orders response"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.error("Failed to fetch the open orders: %s", e)
+                self.__stats.failed_reconciliations += 1
+                open_orders = None
+
+            updated_ids, self.__updated_during_reconcile = self.__updated_during_reconcile, None
+
+            if open_orders is not None:
+                self.__reconcile(open_orders, updated_ids=updated_ids)
+
+            if not self.__reconcile_again:
+                break
+
+        self.__reconcile_task = None
+
+    def __reconcile(self, open_orders: List[OpenOrderModel], *, updated_ids: Set[int]):
+        self.__stats.reconciliations += 1
+        open_ids = {order.id for order in open_orders}
+
+        for order_id in list(self.__open_orders):
+            # Orders updated by the stream meanwhile are newer than the snapshot
+            if order_id not in open_ids and order_id not in updated_ids:
+                self.__remove_open_order(order_id)
+                self.__stats.reconciled_removed += 1
+
+        for order in open_orders:
+            if self.get_order(order.id) is None:
+                self.__stats.reconciled_added += 1
+
+            self.apply_order(order)
+
+    def __remove_open_order(self, order_id: int):
+        order = self.__open_orders.pop(order_id, None)
+
+        if order is None:
+            return
+
+        side = _get_side(order)
+        ids_by_side = self.__ids_by_market[order.market]
+        ids = ids_by_side[side]
+        ids.discard(order_id)
+
+        if not ids:
+            del ids_by_side[side]
+
+        if not ids_by_side:
+            del self.__ids_by_market[order.market]
+
+        if order_id not in self.__terminal_orders and self.__ids_by_external_id.get(order.external_id) == order_id:
+            del self.__ids_by_external_id[order.external_id]
+
+    def __evict_terminal_orders(self):
+        while len(self.__terminal_orders) > self.__max_terminal_orders:
+            order_id, order = self.__terminal_orders.popitem(last=False)
+
+            if self.__ids_by_external_id.get(order.external_id) == order_id and order_id not in self.__open_orders:
+                del self.__ids_by_external_id[order.external_id]
+
+    def __notify_waiters(self, order: OpenOrderModel):
+        waiters = self.__waiters.get(order.external_id)
+
+        if not waiters:
+            return
+
+        is_terminal = order.status in TERMINAL_ORDER_STATUSES
+
+        for waiter in waiters:
+            if not waiter.future.done() and (is_terminal or order.status in waiter.statuses):
+                waiter.future.set_result(order)
@@ -0,0 +1,208 @@
+import dataclasses
+import time
+from collections import OrderedDict, deque
+from enum import Enum
+from typing import Callable, Deque, Dict, Optional, Set
+
+from x10.perpetual.orders import TERMINAL_ORDER_STATUSES, OpenOrderModel, OrderStatus
+from x10.utils.log import get_logger
+from x10.utils.stats import get_percentile
+
+LOGGER = get_logger(__name__)
+
+DEFAULT_WINDOW_SIZE = 1000
+DEFAULT_MAX_OPEN_TRACES = 10_000
+
+
+class OrderStage(Enum):
+    INTENT = "INTENT"
+    AMOUNTS_CONVERTED = "AMOUNTS_CONVERTED"
+    HASHED = "HASHED"
+    SIGNED = "SIGNED"
+    SERIALIZED = "SERIALIZED"
+    REQUEST_SENT = "REQUEST_SENT"
+    RESPONSE_RECEIVED = "RESPONSE_RECEIVED"
+    FIRST_STREAM_EVENT = "FIRST_STREAM_EVENT"
+    TERMINAL = "TERMINAL"
+
+
+# The latency of a stage is measured from the stage it follows. The HTTP response and the first stream event both
+# follow the request (the event often arrives before the response), `REQUEST_SENT` includes the rate limiter wait.
+STAGE_PREDECESSORS: Dict[OrderStage, OrderStage] = {
+    OrderStage.AMOUNTS_CONVERTED: OrderStage.INTENT,
+    OrderStage.HASHED: OrderStage.AMOUNTS_CONVERTED,
+    OrderStage.SIGNED: OrderStage.HASHED,
+    OrderStage.SERIALIZED: OrderStage.SIGNED,
+    OrderStage.REQUEST_SENT: OrderStage.SERIALIZED,
+    OrderStage.RESPONSE_RECEIVED: OrderStage.REQUEST_SENT,
+    OrderStage.FIRST_STREAM_EVENT: OrderStage.REQUEST_SENT,
+    OrderStage.TERMINAL: OrderStage.FIRST_STREAM_EVENT,
+}
+
+
+@dataclasses.dataclass
+class OrderTrace:
+    """
+    Monotonic timestamps (`time.perf_counter_ns`) of the stages of an order, from the intent to the terminal state.
+    """
+
+    market: str
+    external_id: Optional[str] = None
+    timestamps: Dict[OrderStage, int] = dataclasses.field(default_factory=dict)
+    terminal_status: Optional[OrderStatus] = None
+
+    def mark(self, stage: OrderStage, timestamp_ns: Optional[int] = None):
+        """
+        Records the time of a stage, only the first time is kept.
+        """
+
+        if stage not in self.timestamps:
+            self.timestamps[stage] = time.perf_counter_ns() if timestamp_ns is None else timestamp_ns
+
+    def get_stage_latency_ms(self, stage: OrderStage) -> Optional[float]:
+        predecessor = STAGE_PREDECESSORS.get(stage)
+        end_ns = self.timestamps.get(stage)
+        start_ns = self.timestamps.get(predecessor) if predecessor else None
+
+        if end_ns is None or start_ns is None:
+            return None
+
+        return (end_ns - start_ns) / 1_000_000
+
+    def get_stage_latencies_ms(self) -> Dict[OrderStage, float]:
+        latencies = {stage: self.get_stage_latency_ms(stage) for stage in STAGE_PREDECESSORS}
+
+        return {stage: latency for stage, latency in latencies.items() if latency is not None}
+
+
+@dataclasses.dataclass(frozen=True)
+class StageLatencyPercentiles:
+    count: int
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+
+
+OrderTraceSink = Callable[[OrderTrace], None]
+
+
+@dataclasses.dataclass
+class _TrackedTrace:
+    trace: OrderTrace
+    recorded_stages: Set[OrderStage] = dataclasses.field(default_factory=set)
+
+
+class OrderTracer:
+    """
+    Collects the traces of the orders: the order creation and the REST client mark the stages of a trace passed to
+    them, the tracer marks the stream stages from the account stream updates (see `on_order_update`).
+
+    Finished traces (terminal state or evicted) are passed to the sink. The latencies of the stages are recorded as
+    soon as they are known, the percentiles are computed over the last `window_size` latencies of every stage.
+    """
+
+    __sink: Optional[OrderTraceSink]
+    __max_open_traces: int
+    __open_traces: "OrderedDict[str, _TrackedTrace]"
+    __latencies: Dict[OrderStage, Deque[float]]
+
+    def __init__(
+        self,
+        sink: Optional[OrderTraceSink] = None,
+        *,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        max_open_traces: int = DEFAULT_MAX_OPEN_TRACES,
+    ):
+        """
+        :param sink: Called with every finished trace (e.g. to log or export it).
+        :param window_size: Number of the latest latencies of every stage the percentiles are computed over.
+        :param max_open_traces: Maximum number of traces waiting for their terminal state, the oldest trace is
+        finished (without the terminal stage) when a new trace doesn't fit.
+        """
+
+        super().__init__()
+
+        self.__sink = sink
+        self.__max_open_traces = max_open_traces
+        self.__open_traces = OrderedDict()
+        self.__latencies = {stage: deque(maxlen=window_size) for stage in STAGE_PREDECESSORS}
+
+    def start(self, market_name: str) -> OrderTrace:
+        trace = OrderTrace(market=market_name)
+        trace.mark(OrderStage.INTENT)
+
+        return trace
+
+    def track(self, external_id: str, trace: OrderTrace):
+        """
+        Starts matching the account stream updates of the order to the trace.
+        """
+
+        trace.external_id = external_id
+        self.__open_traces[external_id] = _TrackedTrace(trace)
+
+        while len(self.__open_traces) > self.__max_open_traces:
+            _, evicted = self.__open_traces.popitem(last=False)
+            self.__finish(evicted)
+
+    def get_trace(self, external_id: str) -> Optional[OrderTrace]:
+        tracked = self.__open_traces.get(external_id)
+
+        return tracked.trace if tracked else None
+
+    def on_order_update(self, order: OpenOrderModel):
+        tracked = self.__open_traces.get(order.external_id)
+
+        if tracked is None:
+            return
+
+        trace = tracked.trace
+        trace.mark(OrderStage.FIRST_STREAM_EVENT)
+
+        if order.status in TERMINAL_ORDER_STATUSES:
+            trace.mark(OrderStage.TERMINAL)
+            trace.terminal_status = OrderStatus(order.status)
+            self.finish(order.external_id)
+        else:
+            self.__record(tracked)
+
+    def finish(self, external_id: str):
+        """
+        Stops tracking the order (e.g. when the placement failed) and passes the trace to the sink.
+        """
+
+        tracked = self.__open_traces.pop(external_id, None)
+
+        if tracked is not None:
+            self.__finish(tracked)
+
+    def get_percentiles(self) -> Dict[OrderStage, StageLatencyPercentiles]:
+        percentiles = {}
+
+        for stage, latencies in self.__latencies.items():
+            sorted_latencies = sorted(latencies)
+            percentiles[stage] = StageLatencyPercentiles(
+                count=len(sorted_latencies),
+                p50_ms=get_percentile(sorted_latencies, 50),
+                p90_ms=get_percentile(sorted_latencies, 90),
+                p99_ms=get_percentile(sorted_latencies, 99),
+            )
+
+        return percentiles
+
+    def __record(self, tracked: _TrackedTrace):
+        for stage, latency in tracked.trace.get_stage_latencies_ms().items():
+            if stage not in tracked.recorded_stages:
+                tracked.recorded_stages.add(stage)
+                self.__latencies[stage].append(latency)
+
+    def __finish(self, tracked: _TrackedTrace):
+        self.__record(tracked)
+
+        if self.__sink is None:
+            return
+
+        try:
+            self.__sink(tracked.trace)
+        except Exception as e:
+            LOGGER.error("Order trace sink failed: %s", e)
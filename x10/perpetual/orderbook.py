@@ -1,29 +1,101 @@
 import asyncio
 import dataclasses
 import decimal
-from typing import Callable, Iterable, Tuple
+import time
+from enum import Enum
+from typing import Awaitable, Callable, Dict, List, Optional
 
+import numpy as np
 from sortedcontainers import SortedDict  # type: ignore[import-untyped]
 
 from x10.perpetual.configuration import EndpointConfig
+from x10.perpetual.markets import TradingConfigModel
+from x10.perpetual.orderbook_callbacks import (
+    BestPriceCallback,
+    BestPriceCallbackStats,
+    BestPriceNotifier,
+)
+from x10.perpetual.orderbook_depth import (
+    DepthIndex,
+    SlippageCurve,
+    calculate_slippage_curve,
+)
+from x10.perpetual.orderbook_levels import (  # noqa: F401
+    DecimalOrderBookLevels,
+    OrderBookEngine,
+    OrderBookEntry,
+    OrderBookLevels,
+    UnalignedLevelError,
+    create_orderbook_levels,
+)
 from x10.perpetual.orderbooks import OrderbookUpdateModel
+from x10.perpetual.stream_client.perpetual_stream_connection import (
+    StreamGap,
+    StreamGapReason,
+)
 from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
-from x10.utils.http import StreamDataType
+from x10.utils.http import StreamDataType, WrappedApiResponse, WrappedStreamResponse
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+SnapshotProvider = Callable[[str], Awaitable[WrappedApiResponse[OrderbookUpdateModel]]]
 
 
 @dataclasses.dataclass
-class OrderBookEntry:
+class ImpactDetails:
     price: decimal.Decimal
     amount: decimal.Decimal
 
-    def __repr__(self) -> str:
-        return f"OrderBookEntry(price={self.price}, amount={self.amount})"
+
+@dataclasses.dataclass
+class BookDepth:
+    bid_amount: decimal.Decimal
+    ask_amount: decimal.Decimal
+
+
+OrderBookMetric = Callable[["OrderBook"], Optional[decimal.Decimal]]
 
 
 @dataclasses.dataclass
-class ImpactDetails:
-    price: decimal.Decimal
-    amount: decimal.Decimal
+class MetricWatch:
+    metric: OrderBookMetric
+    callback: Callable[[decimal.Decimal], None]
+    threshold: decimal.Decimal
+    # Value passed to the callback last time
+    last_value: Optional[decimal.Decimal] = None
+
+
+class OrderBookResyncReason(Enum):
+    # The stream reconnected, the book is rebuilt from the snapshot sent after the reconnect
+    RECONNECT = "RECONNECT"
+    # `seq` of the stream jumped (messages were lost) or went backwards
+    GAP = "GAP"
+    # The best bid is at or above the best ask (crossed or locked book)
+    CROSSED = "CROSSED"
+    NEGATIVE_QUANTITY = "NEGATIVE_QUANTITY"
+    # A price or a quantity of a delta isn't aligned to the tick sizes (TICK engine)
+    UNALIGNED_LEVEL = "UNALIGNED_LEVEL"
+    MANUAL = "MANUAL"
+
+
+@dataclasses.dataclass
+class OrderBookResyncStats:
+    resyncs_count: int = 0
+    resyncs_by_reason: Dict[str, int] = dataclasses.field(default_factory=dict)
+    last_reason: Optional[OrderBookResyncReason] = None
+    # From the detection to the snapshot being applied
+    last_duration_seconds: float = 0
+    max_duration_seconds: float = 0
+    total_duration_seconds: float = 0
+    # Deltas received during the resyncs, the snapshot replaces them
+    dropped_deltas: int = 0
+    failed_snapshot_requests: int = 0
+    # REST snapshots received after deltas of the stream, the book waited for a stream snapshot instead
+    discarded_snapshots: int = 0
+    # Snapshots with levels not aligned to the tick sizes (TICK engine), the book waits for a snapshot of a new stream
+    # connection
+    rejected_snapshots: int = 0
 
 
 class OrderBook:
@@ -31,15 +103,24 @@ class OrderBook:
     async def create(
         endpoint_config: EndpointConfig,
         market_name: str,
-        best_ask_change_callback: Callable[[OrderBookEntry], None] | None = None,
-        best_bid_change_callback: Callable[[OrderBookEntry], None] | None = None,
+        best_ask_change_callback: BestPriceCallback | None = None,
+        best_bid_change_callback: BestPriceCallback | None = None,
         start=False,
+        *,
+        engine: OrderBookEngine = OrderBookEngine.DECIMAL,
+        trading_config: Optional[TradingConfigModel] = None,
+        snapshot_provider: Optional[SnapshotProvider] = None,
+        callback_window_seconds: Optional[float] = None,
     ) -> "OrderBook":
         ob = OrderBook(
             endpoint_config,
             market_name,
             best_ask_change_callback,
             best_bid_change_callback,
+            engine=engine,
+            trading_config=trading_config,
+            snapshot_provider=snapshot_provider,
+            callback_window_seconds=callback_window_seconds,
         )
         if start:
             await ob.start_orderbook()
@@ -49,74 +130,313 @@ class OrderBook:
         self,
         endpoint_config: EndpointConfig,
         market_name: str,
-        best_ask_change_callback: Callable[[OrderBookEntry], None] | None = None,
-        best_bid_change_callback: Callable[[OrderBookEntry], None] | None = None,
+        best_ask_change_callback: BestPriceCallback | None = None,
+        best_bid_change_callback: BestPriceCallback | None = None,
+        *,
+        engine: OrderBookEngine = OrderBookEngine.DECIMAL,
+        trading_config: Optional[TradingConfigModel] = None,
+        snapshot_provider: Optional[SnapshotProvider] = None,
+        callback_window_seconds: Optional[float] = None,
     ) -> None:
+        """
+        :param engine: Storage of the price levels. `OrderBookEngine.DECIMAL` has the lowest update latency.
+        `OrderBookEngine.TICK` keeps the levels as integers in arrays: several times less memory (e.g. for many books
+        per process), but slower deltas. It requires the `trading_config` of the market.
+        :param snapshot_provider: Fetches a REST snapshot to resync the book from, e.g.
+        `lambda market_name: trading_client.markets_info.get_orderbook_snapshot(market_name=market_name)`.
+        Without it (or when the REST snapshot can't be used, see `resync`) the book is resynced from a new stream
+        connection.
+        :param callback_window_seconds: Coalesces the changes of the best bid/ask: the callbacks are called at most once
+        per window, with the latest best price, outside of the stream loop. Without it the callbacks are called inline
+        on every change (coroutine function callbacks are always coalesced, see `BestPriceNotifier`).
+        """
+
         self.__stream_client = PerpetualStreamClient(api_url=endpoint_config.stream_url)
         self.__market_name = market_name
         self.__task: asyncio.Task | None = None
-        self._bid_prices: SortedDict[decimal.Decimal, OrderBookEntry] = SortedDict()
-        self._ask_prices: SortedDict[decimal.Decimal, OrderBookEntry] = SortedDict()
+        self._bid_levels: OrderBookLevels = create_orderbook_levels(engine, True, trading_config)
+        self._ask_levels: OrderBookLevels = create_orderbook_levels(engine, False, trading_config)
+        self.__bid_depth = DepthIndex(self._bid_levels, True)
+        self.__ask_depth = DepthIndex(self._ask_levels, False)
         self.best_ask_change_callback = best_ask_change_callback
         self.best_bid_change_callback = best_bid_change_callback
+        self.__best_bid_notifier = BestPriceNotifier(callback_window_seconds)
+        self.__best_ask_notifier = BestPriceNotifier(callback_window_seconds)
+        self.__snapshot_provider = snapshot_provider
+        self.__snapshot_task: asyncio.Task | None = None
+        # The stream sends a snapshot when it connects
+        self.__synced = False
+        self.__snapshot_expected = True
+        self.__resync_started_at: float | None = None
+        self.__deltas_while_requesting = False
+        self.__resync_stats = OrderBookResyncStats()
+        self.__metric_watches: List[MetricWatch] = []
 
-    def update_orderbook(self, data: OrderbookUpdateModel):
-        best_bid_before_update = self.best_bid()
-        for bid in data.bid:
-            if bid.price in self._bid_prices:
-                existing_bid_entry: OrderBookEntry = self._bid_prices.get(bid.price)
-                existing_bid_entry.amount = existing_bid_entry.amount + bid.qty
-                if existing_bid_entry.amount == 0:
-                    del self._bid_prices[bid.price]
-            else:
-                self._bid_prices[bid.price] = OrderBookEntry(
-                    price=bid.price,
-                    amount=bid.qty,
-                )
-        now_best_bid = self.best_bid()
-        if now_best_bid and best_bid_before_update != now_best_bid:
-            if self.best_bid_change_callback:
-                self.best_bid_change_callback(now_best_bid)
-
-        best_ask_before_update = self.best_ask()
-        for ask in data.ask:
-            if ask.price in self._ask_prices:
-                existing_ask_entry: OrderBookEntry = self._ask_prices.get(ask.price)
-                existing_ask_entry.amount = existing_ask_entry.amount + ask.qty
-                if existing_ask_entry.amount == 0:
-                    del self._ask_prices[ask.price]
+    @property
+    def is_synced(self) -> bool:
+        return self.__synced
+
+    @property
+    def needs_stream_snapshot(self) -> bool:
+        """
+        `True` if the book waits for a snapshot that only a new stream connection sends (the owner of the stream
+        should reconnect).
+        """
+
+        return not self.__synced and self.__snapshot_task is None and not self.__snapshot_expected
+
+    @property
+    def resync_stats(self) -> OrderBookResyncStats:
+        return self.__resync_stats
+
+    @property
+    def best_bid_callback_stats(self) -> BestPriceCallbackStats:
+        return self.__best_bid_notifier.stats
+
+    @property
+    def best_ask_callback_stats(self) -> BestPriceCallbackStats:
+        return self.__best_ask_notifier.stats
+
+    @property
+    def _bid_prices(self) -> SortedDict:
+        """
+        Compatibility accessor of the bid levels by price (`SortedDict[Decimal, OrderBookEntry]`, read only), only
+        for `OrderBookEngine.DECIMAL`. Prefer `best_bid`, `get_depth` and the other methods of the book.
+        """
+
+        return self.__get_prices(self._bid_levels)
+
+    @property
+    def _ask_prices(self) -> SortedDict:
+        """
+        Compatibility accessor of the ask levels by price, see `_bid_prices`.
+        """
+
+        return self.__get_prices(self._ask_levels)
+
+    def apply_event(self, event: WrappedStreamResponse[OrderbookUpdateModel]):
+        """
+        Applies an event of the orderbooks stream. The book is resynced when a delta leaves it crossed, locked or with
+        a negative quantity, the deltas received while it is resynced are dropped.
+        """
+
+        data = event.data
+
+        if data is None:
+            return
+
+        if event.type == StreamDataType.SNAPSHOT.value:
+            self.__apply_snapshot(data)
+        elif event.type == StreamDataType.DELTA.value:
+            if self.__synced:
+                self.__apply_delta(data)
             else:
-                self._ask_prices[ask.price] = OrderBookEntry(
-                    price=ask.price,
-                    amount=ask.qty,
-                )
-        now_best_ask = self.best_ask()
-        if now_best_ask and best_ask_before_update != now_best_ask:
-            if self.best_ask_change_callback:
-                self.best_ask_change_callback(now_best_ask)
+                if self.__snapshot_task is not None:
+                    self.__deltas_while_requesting = True
+                self.__resync_stats.dropped_deltas += 1
+
+    def on_stream_gap(self, gap: StreamGap):
+        """
+        Gap callback of the orderbooks stream.
+        """
+
+        if gap.reason == StreamGapReason.RECONNECT:
+            self.resync(OrderBookResyncReason.RECONNECT)
+        else:
+            self.resync(OrderBookResyncReason.GAP)
+
+    def resync(self, reason: OrderBookResyncReason = OrderBookResyncReason.MANUAL):
+        """
+        Clears the book and rebuilds it from a snapshot: the REST snapshot of `snapshot_provider` or the next stream
+        snapshot (see `needs_stream_snapshot`).
+
+        The REST snapshot has no `seq` to tell which deltas of the stream it includes, and the deltas add to the
+        quantities of the levels. So it is only applied if no delta was received while it was requested, otherwise the
+        book waits for a stream snapshot (e.g. of a quiet market, or right after the stream paused).
+        """
+
+        LOGGER.warning("Resyncing the %s order book: %s", self.__market_name, reason.value)
+
+        stats = self.__resync_stats
+        stats.resyncs_count += 1
+        stats.resyncs_by_reason[reason.value] = stats.resyncs_by_reason.get(reason.value, 0) + 1
+        stats.last_reason = reason
+
+        if self.__resync_started_at is None:
+            self.__resync_started_at = time.perf_counter()
+
+        self.__synced = False
+        self.__cancel_snapshot_request()
+        self.__clear_levels()
+
+        # After a reconnect the stream sends a snapshot anyway
+        self.__snapshot_expected = reason == OrderBookResyncReason.RECONNECT
+
+        if not self.__snapshot_expected and self.__snapshot_provider:
+            self.__snapshot_task = asyncio.get_running_loop().create_task(self.__request_snapshot())
+
+    async def __request_snapshot(self):
+        assert self.__snapshot_provider
+
+        try:
+            response = await self.__snapshot_provider(self.__market_name)
+            snapshot = response.data
+            assert snapshot is not None, "Empty order book snapshot"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Falls back to a stream snapshot
+            LOGGER.error("Failed to fetch the %s order book snapshot: %s", self.__market_name, e)
+            self.__resync_stats.failed_snapshot_requests += 1
+            self.__snapshot_task = None
+            return
+
+        self.__snapshot_task = None
+
+        if self.__deltas_while_requesting:
+            # Falls back to a stream snapshot, the deltas may or may not be included in the REST snapshot
+            LOGGER.warning("Discarded the %s order book snapshot received after deltas", self.__market_name)
+            self.__resync_stats.discarded_snapshots += 1
+            self.__deltas_while_requesting = False
+            return
+
+        self.__apply_snapshot(snapshot)
+
+    @staticmethod
+    def __get_prices(levels: OrderBookLevels) -> SortedDict:
+        if not isinstance(levels, DecimalOrderBookLevels):
+            raise AttributeError("The levels by price are only available with the DECIMAL order book engine")
+
+        return levels.prices
+
+    def __cancel_snapshot_request(self):
+        if self.__snapshot_task:
+            self.__snapshot_task.cancel()
+            self.__snapshot_task = None
+
+        self.__deltas_while_requesting = False
+
+    def __clear_levels(self):
+        self._bid_levels.clear()
+        self._ask_levels.clear()
+        self.__bid_depth.reset()
+        self.__ask_depth.reset()
+
+    def __apply_snapshot(self, data: OrderbookUpdateModel):
+        self.__cancel_snapshot_request()
+
+        try:
+            self.init_orderbook(data)
+        except UnalignedLevelError as e:
+            # Not resynced, the next snapshot would be the same
+            LOGGER.error("Rejected the %s order book snapshot: %s", self.__market_name, e)
+            self.__resync_stats.rejected_snapshots += 1
+            self.__clear_levels()
+            self.__synced = False
+            self.__snapshot_expected = True
+            return
+
+        self.__synced = True
+        self.__snapshot_expected = False
+
+        if self.__resync_started_at is not None:
+            duration = time.perf_counter() - self.__resync_started_at
+            self.__resync_started_at = None
+
+            stats = self.__resync_stats
+            stats.last_duration_seconds = duration
+            stats.max_duration_seconds = max(stats.max_duration_seconds, duration)
+            stats.total_duration_seconds += duration
+
+            LOGGER.info("Resynced the %s order book in %.3fs", self.__market_name, duration)
+
+        # Not resynced again, the next snapshot would be the same
+        inconsistency = self.__find_inconsistency()
+        if inconsistency:
+            LOGGER.warning("The %s order book snapshot is inconsistent: %s", self.__market_name, inconsistency.value)
+
+    def __apply_delta(self, data: OrderbookUpdateModel):
+        try:
+            best_changed = self.update_orderbook(data)
+        except UnalignedLevelError as e:
+            LOGGER.error("Rejected the %s order book delta: %s", self.__market_name, e)
+            self.resync(OrderBookResyncReason.UNALIGNED_LEVEL)
+            return
+
+        inconsistency = self.__find_inconsistency(best_changed)
+
+        if inconsistency:
+            self.resync(inconsistency)
+
+    def __find_inconsistency(self, best_changed: bool = True) -> OrderBookResyncReason | None:
+        if self._bid_levels.has_negative_levels() or self._ask_levels.has_negative_levels():
+            return OrderBookResyncReason.NEGATIVE_QUANTITY
+
+        # The book can only become crossed when a best price changes
+        if not best_changed:
+            return None
+
+        best_bid = self._bid_levels.best()
+        best_ask = self._ask_levels.best()
+
+        if best_bid and best_ask and best_bid.price >= best_ask.price:
+            return OrderBookResyncReason.CROSSED
+
+        return None
+
+    def update_orderbook(self, data: OrderbookUpdateModel) -> bool:
+        """
+        Returns `True` if the best bid or the best ask changed.
+        """
+
+        bid_changed = self._bid_levels.update_levels(data.bid)
+        bid_depth_changed = self.__bid_depth.update(data.bid)
+        if bid_changed:
+            now_best_bid = self.best_bid()
+            if now_best_bid and self.best_bid_change_callback:
+                self.__best_bid_notifier.notify(self.best_bid_change_callback, now_best_bid)
+
+        ask_changed = self._ask_levels.update_levels(data.ask)
+        ask_depth_changed = self.__ask_depth.update(data.ask)
+        if ask_changed:
+            now_best_ask = self.best_ask()
+            if now_best_ask and self.best_ask_change_callback:
+                self.__best_ask_notifier.notify(self.best_ask_change_callback, now_best_ask)
+
+        # The metrics read the indexed levels only, the deltas below them can't change the values
+        if self.__metric_watches and (bid_depth_changed or ask_depth_changed):
+            self.__notify_metric_watches()
+
+        return bid_changed or ask_changed
 
     def init_orderbook(self, data: OrderbookUpdateModel):
-        for bid in data.bid:
-            self._bid_prices[bid.price] = OrderBookEntry(
-                price=bid.price,
-                amount=bid.qty,
-            )
-        for ask in data.ask:
-            self._ask_prices[ask.price] = OrderBookEntry(
-                price=ask.price,
-                amount=ask.qty,
-            )
+        self._bid_levels.clear()
+        self._ask_levels.clear()
+        self._bid_levels.init_levels(data.bid)
+        self._ask_levels.init_levels(data.ask)
+        self.__bid_depth.reset()
+        self.__ask_depth.reset()
+
+        if self.__metric_watches:
+            self.__notify_metric_watches()
 
     async def start_orderbook(self) -> asyncio.Task:
         loop = asyncio.get_running_loop()
 
         async def inner():
-            async with self.__stream_client.subscribe_to_orderbooks(self.__market_name) as stream:
-                async for event in stream:
-                    if event.type == StreamDataType.SNAPSHOT.value:
-                        self.init_orderbook(event.data)
-                    elif event.type == StreamDataType.DELTA.value:
-                        self.update_orderbook(event.data)
+            while True:
+                async with self.__stream_client.subscribe_to_orderbooks(
+                    self.__market_name, gap_callback=self.on_stream_gap
+                ) as stream:
+                    async for event in stream:
+                        self.apply_event(event)
+
+                        if self.needs_stream_snapshot:
+                            break
+                    else:
+                        return
+
+                LOGGER.info("Reconnecting the %s orderbook stream for a new snapshot", self.__market_name)
 
         self.__task = loop.create_task(inner())
         return self.__task
@@ -126,28 +446,122 @@ class OrderBook:
             self.__task.cancel()
             self.__task = None
 
+        self.__cancel_snapshot_request()
+        self.__best_bid_notifier.cancel()
+        self.__best_ask_notifier.cancel()
+
     def best_bid(self) -> OrderBookEntry | None:
-        try:
-            entry = self._bid_prices.peekitem(-1)
-            return entry[1]
-        except IndexError:
-            return None
+        return self._bid_levels.best()
 
     def best_ask(self) -> OrderBookEntry | None:
-        try:
-            entry = self._ask_prices.peekitem(0)
-            return entry[1]
-        except IndexError:
+        return self._ask_levels.best()
+
+    # The metrics read the top of the book or the depth indexes, which are built only as deep as the metrics and the
+    # price impact queries need and then maintained with the deltas (see `DepthIndex`), so the metrics of the top
+    # levels cost a few operations per delta instead of a scan of the book.
+    def mid_price(self) -> decimal.Decimal | None:
+        best_bid = self.best_bid()
+        best_ask = self.best_ask()
+
+        if not best_bid or not best_ask:
             return None
 
-    def __price_impact_notional(
-        self, notional: decimal.Decimal, levels: Iterable[Tuple[decimal.Decimal, OrderBookEntry]]
-    ):
-        remaining_to_spend = notional
-        total_amount = decimal.Decimal(0)
-        weighted_sum = decimal.Decimal(0)
-        for price, entry in levels:
-            available_at_price = entry.amount
+        return (best_bid.price + best_ask.price) / 2
+
+    def microprice(self) -> decimal.Decimal | None:
+        """
+        Mid price weighted by the quantities of the best levels (closer to the side with the smaller quantity).
+        """
+
+        best_bid = self.best_bid()
+        best_ask = self.best_ask()
+
+        if not best_bid or not best_ask:
+            return None
+
+        total_amount = best_bid.amount + best_ask.amount
+
+        if total_amount <= 0:
+            return None
+
+        return (best_bid.price * best_ask.amount + best_ask.price * best_bid.amount) / total_amount
+
+    def imbalance(self, levels_count: int = 1) -> decimal.Decimal | None:
+        """
+        `(bid quantity - ask quantity) / (bid quantity + ask quantity)` of the first `levels_count` levels of both
+        sides, from -1 (only asks) to 1 (only bids).
+        """
+
+        bid_amount = self.__bid_depth.cumulative_amount_of_levels(levels_count)
+        ask_amount = self.__ask_depth.cumulative_amount_of_levels(levels_count)
+        total_amount = bid_amount + ask_amount
+
+        if total_amount <= 0:
+            return None
+
+        return (bid_amount - ask_amount) / total_amount
+
+    def depth_within_bps(self, bps: decimal.Decimal) -> BookDepth | None:
+        """
+        Quantities of the levels within `bps` basis points of the mid price.
+        """
+
+        mid_price = self.mid_price()
+
+        if mid_price is None:
+            return None
+
+        distance = mid_price * bps / 10_000
+
+        return BookDepth(
+            bid_amount=self.__bid_depth.cumulative_amount_to_price(mid_price - distance),
+            ask_amount=self.__ask_depth.cumulative_amount_to_price(mid_price + distance),
+        )
+
+    def add_metric_change_callback(
+        self, metric: OrderBookMetric, callback: Callable[[decimal.Decimal], None], threshold: decimal.Decimal
+    ) -> MetricWatch:
+        """
+        Calls `callback` with the value of `metric` (e.g. `lambda ob: ob.imbalance(5)`) after the changes of the book
+        which move it by at least `threshold` from the value reported last time.
+
+        The watches are evaluated after the snapshots and the deltas which change the levels read by the metrics of
+        the book (the best levels and the levels indexed for the depth queries), so `metric` must read the book
+        through these methods.
+        """
+
+        watch = MetricWatch(metric=metric, callback=callback, threshold=threshold)
+        self.__metric_watches.append(watch)
+
+        return watch
+
+    def remove_metric_change_callback(self, watch: MetricWatch):
+        self.__metric_watches.remove(watch)
+
+    def __notify_metric_watches(self):
+        # The best levels are indexed too, so that the deltas changing them are detected
+        self.__bid_depth.cumulative_amount_of_levels(1)
+        self.__ask_depth.cumulative_amount_of_levels(1)
+
+        for watch in self.__metric_watches:
+            value = watch.metric(self)
+
+            if value is None:
+                continue
+
+            if watch.last_value is None or abs(value - watch.last_value) >= watch.threshold:
+                watch.last_value = value
+                watch.callback(value)
+
+    # Both walks start at the level where the cumulative depth reaches the requested size (a binary search over the
+    # depth index), the levels before it are taken in full. The results are the same as of walking all the levels.
+    # The walks stop as soon as the size is filled, without fetching the next level.
+    def __price_impact_notional(self, notional: decimal.Decimal, depth: DepthIndex):
+        start = depth.find_by_notional(notional)
+        remaining_to_spend = notional - depth.cumulative_notional(start)
+        total_amount = depth.cumulative_amount(start)
+        weighted_sum = depth.cumulative_notional(start)
+        for price, available_at_price in depth.levels(start):
             amount_to_purchase = min(remaining_to_spend / price, available_at_price)
             if remaining_to_spend <= 0:
                 break
@@ -158,18 +572,20 @@ class OrderBook:
             weighted_sum += take * price
             total_amount += take
             remaining_to_spend -= spent
+            if remaining_to_spend <= 0:
+                break
 
         if remaining_to_spend > 0:
             return None
         average_price = weighted_sum / total_amount
         return ImpactDetails(price=average_price, amount=total_amount)
 
-    def __price_impact_qty(self, qty: decimal.Decimal, levels: Iterable[Tuple[decimal.Decimal, OrderBookEntry]]):
-        remaining_qty = qty
-        total_amount = decimal.Decimal(0)
-        total_spent = decimal.Decimal(0)
-        for price, entry in levels:
-            available_at_price = entry.amount
+    def __price_impact_qty(self, qty: decimal.Decimal, depth: DepthIndex):
+        start = depth.find_by_amount(qty)
+        remaining_qty = qty - depth.cumulative_amount(start)
+        total_amount = depth.cumulative_amount(start)
+        total_spent = depth.cumulative_notional(start)
+        for price, available_at_price in depth.levels(start):
             take = min(remaining_qty, available_at_price)
             if remaining_qty <= 0:
                 break
@@ -178,6 +594,8 @@ class OrderBook:
             total_spent += take * price
             total_amount += take
             remaining_qty -= take
+            if remaining_qty <= 0:
+                break
 
         if remaining_qty > 0:
             return None
@@ -188,24 +606,52 @@ class OrderBook:
         if notional <= 0:
             return None
         if side == "SELL":
-            if not self._bid_prices:
+            if not self._bid_levels:
                 return None
-            return self.__price_impact_notional(notional, reversed(self._bid_prices.items()))
+            return self.__price_impact_notional(notional, self.__bid_depth)
         elif side == "BUY":
-            if not self._ask_prices:
+            if not self._ask_levels:
                 return None
-            return self.__price_impact_notional(notional, self._ask_prices.items())
+            return self.__price_impact_notional(notional, self.__ask_depth)
         return None
 
     def calculate_price_impact_qty(self, qty: decimal.Decimal, side: str) -> ImpactDetails | None:
         if qty <= 0:
             return None
         if side == "SELL":
-            if not self._bid_prices:
+            if not self._bid_levels:
                 return None
-            return self.__price_impact_qty(qty, reversed(self._bid_prices.items()))
+            return self.__price_impact_qty(qty, self.__bid_depth)
         elif side == "BUY":
-            if not self._ask_prices:
+            if not self._ask_levels:
                 return None
-            return self.__price_impact_qty(qty, self._ask_prices.items())
+            return self.__price_impact_qty(qty, self.__ask_depth)
+        return None
+
+    def calculate_price_impact_notional_curve(self, notionals: np.ndarray, side: str) -> SlippageCurve | None:
+        """
+        Price impact of every notional in `notionals` in one call, as float64 arrays (see `SlippageCurve`).
+        """
+
+        if side == "SELL":
+            return calculate_slippage_curve(
+                self.__bid_depth, notionals, True, False, self.__best_price(self.best_bid())
+            )
+        elif side == "BUY":
+            return calculate_slippage_curve(self.__ask_depth, notionals, True, True, self.__best_price(self.best_ask()))
+        return None
+
+    def calculate_price_impact_qty_curve(self, qtys: np.ndarray, side: str) -> SlippageCurve | None:
+        """
+        Price impact of every quantity in `qtys` in one call, as float64 arrays (see `SlippageCurve`).
+        """
+
+        if side == "SELL":
+            return calculate_slippage_curve(self.__bid_depth, qtys, False, False, self.__best_price(self.best_bid()))
+        elif side == "BUY":
+            return calculate_slippage_curve(self.__ask_depth, qtys, False, True, self.__best_price(self.best_ask()))
         return None
+
+    @staticmethod
+    def __best_price(entry: OrderBookEntry | None) -> decimal.Decimal | None:
+        return entry.price if entry else None
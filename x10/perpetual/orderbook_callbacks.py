@@ -0,0 +1,155 @@
+import asyncio
+import dataclasses
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+from x10.perpetual.orderbook_levels import OrderBookEntry
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+# A function or a coroutine function
+BestPriceCallback = Callable[[OrderBookEntry], Optional[Awaitable[None]]]
+
+
+@dataclasses.dataclass
+class BestPriceCallbackStats:
+    # Changes of the best price
+    changes: int = 0
+    calls: int = 0
+    # Changes replaced by a later change before the callback was called
+    coalesced: int = 0
+    # Exceptions of the deferred callbacks (inline callbacks raise to the stream loop)
+    errors: int = 0
+    total_duration_seconds: float = 0
+    max_duration_seconds: float = 0
+    # From the change to the call of the callback
+    total_delay_seconds: float = 0
+    max_delay_seconds: float = 0
+
+
+class BestPriceNotifier:
+    """
+    Calls the best bid or best ask change callback of an order book.
+
+    Without a window, sync callbacks are called inline (the stream loop waits for them). With a window (or with a
+    coroutine function callback) the changes are coalesced: the callback is called once per window with the latest
+    best price, and an async callback runs as a task, the changes during its run are coalesced into one call after it.
+    """
+
+    __window_seconds: Optional[float]
+    __stats: BestPriceCallbackStats
+    __pending: Optional[Tuple[BestPriceCallback, OrderBookEntry, float]]
+    __handle: Optional[asyncio.TimerHandle]
+    __task: Optional[asyncio.Task]
+    __last_callback: Optional[BestPriceCallback]
+    __last_callback_is_async: bool
+
+    def __init__(self, window_seconds: Optional[float] = None):
+        super().__init__()
+
+        self.__window_seconds = window_seconds
+        self.__stats = BestPriceCallbackStats()
+        self.__pending = None
+        self.__handle = None
+        self.__task = None
+        self.__last_callback = None
+        self.__last_callback_is_async = False
+
+    @property
+    def stats(self) -> BestPriceCallbackStats:
+        return self.__stats
+
+    def notify(self, callback: BestPriceCallback, entry: OrderBookEntry):
+        changed_at = time.perf_counter()
+        self.__stats.changes += 1
+
+        if self.__window_seconds is None and not self.__is_async(callback):
+            self.__call(callback, entry, changed_at)
+            return
+
+        if self.__pending is not None:
+            self.__stats.coalesced += 1
+
+        # The entries of the DECIMAL engine are updated in place
+        self.__pending = (callback, OrderBookEntry(price=entry.price, amount=entry.amount), changed_at)
+
+        if self.__handle is None and self.__task is None:
+            self.__schedule()
+
+    def cancel(self):
+        if self.__handle:
+            self.__handle.cancel()
+            self.__handle = None
+
+        if self.__task:
+            self.__task.cancel()
+            self.__task = None
+
+        self.__pending = None
+
+    def __is_async(self, callback: BestPriceCallback) -> bool:
+        if callback is not self.__last_callback:
+            self.__last_callback = callback
+            self.__last_callback_is_async = asyncio.iscoroutinefunction(callback)
+
+        return self.__last_callback_is_async
+
+    def __schedule(self):
+        self.__handle = asyncio.get_running_loop().call_later(self.__window_seconds or 0, self.__flush)
+
+    def __flush(self):
+        self.__handle = None
+
+        if self.__pending is None:
+            return
+
+        callback, entry, changed_at = self.__pending
+        self.__pending = None
+
+        if self.__is_async(callback):
+            self.__task = asyncio.get_running_loop().create_task(self.__call_async(callback, entry, changed_at))
+            return
+
+        try:
+            self.__call(callback, entry, changed_at)
+        except Exception as e:
+            LOGGER.error("Best price callback failed: %s", e)
+            self.__stats.errors += 1
+
+    def __call(self, callback: BestPriceCallback, entry: OrderBookEntry, changed_at: float):
+        started_at = time.perf_counter()
+
+        try:
+            callback(entry)
+        finally:
+            self.__record_call(changed_at, started_at)
+
+    async def __call_async(self, callback: BestPriceCallback, entry: OrderBookEntry, changed_at: float):
+        started_at = time.perf_counter()
+
+        try:
+            await callback(entry)  # type: ignore[misc]
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER.error("Best price callback failed: %s", e)
+            self.__stats.errors += 1
+        finally:
+            self.__record_call(changed_at, started_at)
+
+        self.__task = None
+
+        if self.__pending is not None:
+            self.__schedule()
+
+    def __record_call(self, changed_at: float, started_at: float):
+        duration = time.perf_counter() - started_at
+        delay = started_at - changed_at
+
+        stats = self.__stats
+        stats.calls += 1
+        stats.total_duration_seconds += duration
+        stats.max_duration_seconds = max(stats.max_duration_seconds, duration)
+        stats.total_delay_seconds += delay
+        stats.max_delay_seconds = max(stats.max_delay_seconds, delay)
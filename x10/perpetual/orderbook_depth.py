@@ -0,0 +1,345 @@
+import dataclasses
+import decimal
+import operator
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from x10.perpetual.orderbook_levels import OrderBookLevels
+from x10.perpetual.orderbooks import OrderbookQuantityModel
+
+
+@dataclasses.dataclass
+class SlippageCurve:
+    """
+    Price impact of a vector of order sizes (float64 arrays, `nan` where the book doesn't have enough liquidity).
+    """
+
+    # Requested sizes (quantities or notionals)
+    sizes: np.ndarray
+    # Filled quantities
+    amounts: np.ndarray
+    average_prices: np.ndarray
+    # Distance of the average price from the best price, positive means worse than the best price
+    slippage_bps: np.ndarray
+
+
+class DepthIndex:
+    """
+    Cumulative quantities and notionals of one side of an order book, from the best price.
+
+    The index is built lazily, only as deep as the queries need. The deltas of the book are applied to the indexed
+    levels in place and the cumulative sums are truncated at the first changed level, the next query recomputes them
+    from there. So a delta costs a binary search per level, and the recomputation is shared by all the deltas between
+    two queries. It is reset only by the snapshots.
+    """
+
+    __levels: OrderBookLevels
+    __is_bid: bool
+    __source: Optional[Iterator[Tuple[decimal.Decimal, decimal.Decimal]]]
+    __exhausted: bool
+    __prices: List[decimal.Decimal]
+    __amounts: List[decimal.Decimal]
+    # Sums of the first N levels (levels without a positive quantity are skipped, same as the price impact does), up
+    # to the first changed level after a delta, see `__complete_sums`
+    __cumulative_amounts: List[decimal.Decimal]
+    __cumulative_notionals: List[decimal.Decimal]
+    # `__prices` and `__amounts` as floats, kept in sync with the changes of the levels for `as_arrays`
+    __float_prices: List[float]
+    __float_amounts: List[float]
+    __arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]
+
+    def __init__(self, levels: OrderBookLevels, is_bid: bool):
+        super().__init__()
+
+        self.__levels = levels
+        self.__is_bid = is_bid
+        self.reset()
+
+    def reset(self):
+        self.__source = None
+        self.__exhausted = False
+        self.__prices = []
+        self.__amounts = []
+        self.__cumulative_amounts = [decimal.Decimal(0)]
+        self.__cumulative_notionals = [decimal.Decimal(0)]
+        self.__float_prices = []
+        self.__float_amounts = []
+        self.__arrays = None
+
+    def update(self, levels: List[OrderbookQuantityModel]) -> bool:
+        """
+        Applies the quantity changes of a delta (already applied to the `OrderBookLevels`, with the same semantics:
+        the levels with zero quantity are removed). Returns `True` if any indexed level changed.
+        """
+
+        prices = self.__prices
+        amounts = self.__amounts
+        float_prices = self.__float_prices
+        float_amounts = self.__float_amounts
+        first_changed_index: Optional[int] = None
+
+        if levels:
+            # The iterator of the levels doesn't survive their changes (below the indexed levels too), it is created
+            # again after the indexed levels
+            self.__source = None
+
+        for level in levels:
+            if self.__is_bid:
+                # The bid prices are descending
+                index = bisect_left(prices, -level.price, key=operator.neg)
+            else:
+                index = bisect_left(prices, level.price)
+
+            if index < len(prices) and prices[index] == level.price:
+                amount = amounts[index] + level.qty
+
+                if amount == 0:
+                    del prices[index]
+                    del amounts[index]
+                    del float_prices[index]
+                    del float_amounts[index]
+                else:
+                    amounts[index] = amount
+                    float_amounts[index] = float(amount)
+            elif level.qty != 0 and (index < len(prices) or self.__exhausted):
+                prices.insert(index, level.price)
+                amounts.insert(index, level.qty)
+                float_prices.insert(index, float(level.price))
+                float_amounts.insert(index, float(level.qty))
+            else:
+                # Below the indexed levels
+                continue
+
+            if first_changed_index is None or index < first_changed_index:
+                first_changed_index = index
+
+        if first_changed_index is None:
+            return False
+
+        # The sums of the levels before the first changed level are kept
+        kept_sums_count = first_changed_index + 1
+        del self.__cumulative_amounts[kept_sums_count:]
+        del self.__cumulative_notionals[kept_sums_count:]
+        self.__arrays = None
+
+        return True
+
+    def find_by_amount(self, amount: decimal.Decimal) -> int:
+        """
+        Returns the index of the level at which the cumulative quantity reaches `amount`
+        (the number of levels if the book is too thin).
+        """
+
+        self.__complete_sums()
+
+        if self.__cumulative_amounts[-1] < amount:
+            self.__extend(self.__cumulative_amounts, amount)
+
+        return bisect_left(self.__cumulative_amounts, amount, lo=1) - 1
+
+    def find_by_notional(self, notional: decimal.Decimal) -> int:
+        """
+        Returns the index of the level at which the cumulative notional reaches `notional`
+        (the number of levels if the book is too thin).
+        """
+
+        self.__complete_sums()
+
+        if self.__cumulative_notionals[-1] < notional:
+            self.__extend(self.__cumulative_notionals, notional)
+
+        return bisect_left(self.__cumulative_notionals, notional, lo=1) - 1
+
+    def cumulative_amount(self, index: int) -> decimal.Decimal:
+        self.__complete_sums()
+        return self.__cumulative_amounts[index]
+
+    def cumulative_amount_of_levels(self, levels_count: int) -> decimal.Decimal:
+        """
+        Returns the quantity of the first `levels_count` levels.
+        """
+
+        self.__complete_sums()
+
+        while len(self.__prices) < levels_count and self.__extend_by_level():
+            pass
+
+        return self.__cumulative_amounts[min(levels_count, len(self.__prices))]
+
+    def cumulative_amount_to_price(self, limit_price: decimal.Decimal) -> decimal.Decimal:
+        """
+        Returns the quantity of the levels priced at `limit_price` or better.
+        """
+
+        self.__complete_sums()
+
+        prices = self.__prices
+
+        if self.__is_bid:
+            while (not prices or prices[-1] >= limit_price) and self.__extend_by_level():
+                pass
+            # The bid prices are descending
+            levels_count = bisect_right(prices, -limit_price, key=operator.neg)
+        else:
+            while (not prices or prices[-1] <= limit_price) and self.__extend_by_level():
+                pass
+            levels_count = bisect_right(prices, limit_price)
+
+        return self.__cumulative_amounts[levels_count]
+
+    def cumulative_notional(self, index: int) -> decimal.Decimal:
+        self.__complete_sums()
+        return self.__cumulative_notionals[index]
+
+    def levels(self, start: int) -> Iterator[Tuple[decimal.Decimal, decimal.Decimal]]:
+        """
+        Prices and quantities from the level `start`.
+        """
+
+        index = start
+
+        while index < len(self.__prices) or self.__extend_by_level():
+            yield self.__prices[index], self.__amounts[index]
+            index += 1
+
+    def as_arrays(self, max_amount: float, max_notional: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the prices, the cumulative quantities and the cumulative notionals (with the leading zero) as float64
+        arrays, deep enough to cover `max_amount` and `max_notional`.
+
+        The sums are computed with numpy from the float levels: only the changed levels are converted from `Decimal`,
+        and the `Decimal` sums aren't recomputed after the deltas unless the index has to be extended.
+        """
+
+        arrays = self.__arrays
+
+        if arrays is None or len(arrays[0]) != len(self.__prices):
+            arrays = self.__arrays = self.__create_arrays()
+
+        if not self.__exhausted and (arrays[1][-1] < max_amount or arrays[2][-1] < max_notional):
+            self.find_by_amount(decimal.Decimal(max_amount))
+            self.find_by_notional(decimal.Decimal(max_notional))
+            arrays = self.__arrays = self.__create_arrays()
+
+        return arrays
+
+    def __create_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        levels_count = len(self.__float_prices)
+        prices = np.array(self.__float_prices, dtype=np.float64)
+        # Levels without a positive quantity are skipped, same as the cumulative sums
+        amounts = np.maximum(np.array(self.__float_amounts, dtype=np.float64), 0)
+        cumulative_amounts = np.zeros(levels_count + 1)
+        cumulative_notionals = np.zeros(levels_count + 1)
+        np.cumsum(amounts, out=cumulative_amounts[1:])
+        np.cumsum(amounts * prices, out=cumulative_notionals[1:])
+
+        return prices, cumulative_amounts, cumulative_notionals
+
+    def __extend_by_level(self) -> bool:
+        self.__complete_sums()
+        # The cumulative quantity never decreases, so this stops after one level
+        return self.__extend(self.__cumulative_amounts, self.__cumulative_amounts[-1])
+
+    def __extend(self, cumulative: List[decimal.Decimal], target: decimal.Decimal) -> bool:
+        """
+        Adds levels until `cumulative` reaches `target` or the levels run out. Returns `False` if there were no more
+        levels.
+        """
+
+        if self.__exhausted:
+            return False
+
+        prices = self.__prices
+        amounts = self.__amounts
+        levels_count = len(prices)
+
+        if self.__source is None:
+            self.__source = islice(self.__levels.levels(), levels_count, None)
+
+        for price, amount in self.__source:
+            prices.append(price)
+            amounts.append(amount)
+            self.__float_prices.append(float(price))
+            self.__float_amounts.append(float(amount))
+            self.__append_cumulative(len(prices) - 1)
+
+            if cumulative[-1] >= target:
+                return True
+
+        self.__exhausted = True
+
+        return len(prices) > levels_count
+
+    def __complete_sums(self):
+        """
+        Recomputes the cumulative sums truncated by the deltas.
+        """
+
+        sums_count = len(self.__cumulative_amounts)
+
+        if sums_count <= len(self.__prices):
+            self.__append_cumulative(sums_count - 1)
+
+    def __append_cumulative(self, start: int):
+        """
+        Appends the cumulative sums of the indexed levels from `start`.
+        """
+
+        prices = self.__prices
+        amounts = self.__amounts
+        cumulative_amounts = self.__cumulative_amounts
+        cumulative_notionals = self.__cumulative_notionals
+        cumulative_amount = cumulative_amounts[-1]
+        cumulative_notional = cumulative_notionals[-1]
+
+        for index in range(start, len(prices)):
+            amount = amounts[index]
+
+            if amount > 0:
+                cumulative_amount += amount
+                cumulative_notional += amount * prices[index]
+
+            cumulative_amounts.append(cumulative_amount)
+            cumulative_notionals.append(cumulative_notional)
+
+
+def calculate_slippage_curve(
+    depth: DepthIndex, sizes: np.ndarray, is_notional: bool, is_buy: bool, best_price: Optional[decimal.Decimal]
+) -> SlippageCurve:
+    sizes = np.asarray(sizes, dtype=np.float64)
+    max_size = float(np.nanmax(sizes, initial=0))
+    prices, cumulative_amounts, cumulative_notionals = depth.as_arrays(
+        0 if is_notional else max_size, max_size if is_notional else 0
+    )
+    cumulative = cumulative_notionals if is_notional else cumulative_amounts
+
+    # Level at which each size is reached, `len(prices)` if the book is too thin
+    indexes = np.searchsorted(cumulative[1:], sizes, side="left")
+    fillable = (sizes > 0) & (indexes < len(prices))
+    level_indexes = np.minimum(indexes, max(len(prices) - 1, 0))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        level_prices = prices[level_indexes] if len(prices) else np.full(sizes.shape, np.nan)
+        # `cumulative[indexes]` are the sums of the levels before the level at which each size is reached
+        remaining = sizes - cumulative[indexes]
+
+        if is_notional:
+            amounts = cumulative_amounts[indexes] + remaining / level_prices
+            average_prices = sizes / amounts
+        else:
+            amounts = sizes
+            average_prices = (cumulative_notionals[indexes] + remaining * level_prices) / sizes
+
+        amounts = np.where(fillable, amounts, np.nan)
+        average_prices = np.where(fillable, average_prices, np.nan)
+
+        if best_price is None:
+            slippage_bps = np.full(sizes.shape, np.nan)
+        else:
+            direction = 1 if is_buy else -1
+            slippage_bps = direction * (average_prices - float(best_price)) / float(best_price) * 10_000
+
+    return SlippageCurve(sizes=sizes, amounts=amounts, average_prices=average_prices, slippage_bps=slippage_bps)
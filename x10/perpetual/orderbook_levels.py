@@ -0,0 +1,307 @@
+import dataclasses
+import decimal
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from enum import Enum
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sortedcontainers import SortedDict  # type: ignore[import-untyped]
+
+from x10.perpetual.fixed_point import get_decimal_places
+from x10.perpetual.markets import TradingConfigModel
+from x10.perpetual.orderbooks import OrderbookQuantityModel
+
+
+@dataclasses.dataclass
+class OrderBookEntry:
+    price: decimal.Decimal
+    amount: decimal.Decimal
+
+    def __repr__(self) -> str:
+        return f"OrderBookEntry(price={self.price}, amount={self.amount})"
+
+
+class OrderBookEngine(Enum):
+    # `SortedDict` of `Decimal` prices with an `OrderBookEntry` per level
+    DECIMAL = "DECIMAL"
+    # Sorted arrays of integer prices and quantities (scaled by the market tick sizes), no objects per level: several
+    # times less memory, but slower deltas (the levels are converted from `Decimal`), DECIMAL has the lowest latency
+    TICK = "TICK"
+
+
+class UnalignedLevelError(ValueError):
+    """
+    A price or a quantity has more decimal places than the tick sizes of the TICK order book engine.
+    """
+
+
+class OrderBookLevels(ABC):
+    """
+    One side of an order book.
+    """
+
+    @abstractmethod
+    def init_levels(self, levels: List[OrderbookQuantityModel]):
+        """
+        Sets the quantities of the levels (snapshot).
+        """
+
+    @abstractmethod
+    def update_levels(self, levels: List[OrderbookQuantityModel]) -> bool:
+        """
+        Adds the quantities to the levels (delta), levels with zero quantity are removed.
+        Returns `True` if the best price changed.
+        """
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def best(self) -> Optional[OrderBookEntry]:
+        ...
+
+    @abstractmethod
+    def has_negative_levels(self) -> bool:
+        """
+        Returns `True` if any level has a negative quantity (the book is corrupted, e.g. a delta was missed).
+        """
+
+    @abstractmethod
+    def levels(self) -> Iterable[Tuple[decimal.Decimal, decimal.Decimal]]:
+        """
+        Prices and quantities, from the best price to the worst.
+        """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class DecimalOrderBookLevels(OrderBookLevels):
+    __prices: SortedDict
+    __is_bid: bool
+    __negative_levels_count: int
+
+    def __init__(self, is_bid: bool):
+        super().__init__()
+
+        self.__prices = SortedDict()
+        self.__is_bid = is_bid
+        self.__negative_levels_count = 0
+
+    @property
+    def prices(self) -> SortedDict:
+        """
+        The levels by price (`SortedDict[Decimal, OrderBookEntry]`), read only.
+        """
+
+        return self.__prices
+
+    def init_levels(self, levels: List[OrderbookQuantityModel]):
+        for level in levels:
+            self.__prices[level.price] = OrderBookEntry(price=level.price, amount=level.qty)
+
+        self.__negative_levels_count = sum(1 for entry in self.__prices.values() if entry.amount < 0)
+
+    def update_levels(self, levels: List[OrderbookQuantityModel]) -> bool:
+        best_before_update = self.best()
+        negative_levels_count = self.__negative_levels_count
+
+        for level in levels:
+            existing_entry: Optional[OrderBookEntry] = self.__prices.get(level.price)
+
+            if existing_entry is not None:
+                if existing_entry.amount < 0:
+                    negative_levels_count -= 1
+                existing_entry.amount = existing_entry.amount + level.qty
+                if existing_entry.amount == 0:
+                    del self.__prices[level.price]
+                elif existing_entry.amount < 0:
+                    negative_levels_count += 1
+            elif level.qty != 0:
+                self.__prices[level.price] = OrderBookEntry(price=level.price, amount=level.qty)
+                if level.qty < 0:
+                    negative_levels_count += 1
+
+        self.__negative_levels_count = negative_levels_count
+
+        # The entries are updated in place, so this compares the best prices (and the presence of the best level)
+        return best_before_update != self.best()
+
+    def clear(self):
+        self.__prices.clear()
+        self.__negative_levels_count = 0
+
+    def best(self) -> Optional[OrderBookEntry]:
+        if not self.__prices:
+            return None
+
+        return self.__prices.peekitem(-1 if self.__is_bid else 0)[1]
+
+    def has_negative_levels(self) -> bool:
+        return self.__negative_levels_count > 0
+
+    def levels(self) -> Iterable[Tuple[decimal.Decimal, decimal.Decimal]]:
+        entries = reversed(self.__prices.values()) if self.__is_bid else self.__prices.values()
+
+        return ((entry.price, entry.amount) for entry in entries)
+
+    def __len__(self) -> int:
+        return len(self.__prices)
+
+
+class TickOrderBookLevels(OrderBookLevels):
+    """
+    Keeps the levels in two arrays of 64-bit integers: the prices in `min_price_change` decimal places and the
+    quantities in `min_order_size_change` decimal places, ~16 bytes per level. The prices are sorted so that the best
+    price is the last element (ask prices are stored negated), updates near the top of the book move only a few
+    elements. The `OrderBookEntry` of the best level is created on access and kept until the best level changes, the
+    other levels are converted back on access.
+
+    The `Decimal` to integer conversion of every level of a delta costs more than the `SortedDict` update of
+    `DecimalOrderBookLevels`, so the deltas are slower (see `examples/orderbook_engine_benchmark.py`). Use it to keep
+    many books in memory, not for the lowest update latency.
+    """
+
+    __keys: array
+    __quantities: array
+    __sign: int
+    __price_places: int
+    __quantity_places: int
+    __price_scale: decimal.Decimal
+    __quantity_scale: decimal.Decimal
+    __negative_levels_count: int
+    __best_entry: Optional[Tuple[int, int, OrderBookEntry]]
+
+    def __init__(self, is_bid: bool, trading_config: TradingConfigModel):
+        super().__init__()
+
+        self.__keys = array("q")
+        self.__quantities = array("q")
+        self.__sign = 1 if is_bid else -1
+        self.__price_places = get_decimal_places(trading_config.min_price_change)
+        self.__quantity_places = get_decimal_places(trading_config.min_order_size_change)
+        # Bids are keyed by the scaled price, asks by the negated scaled price
+        self.__price_scale = decimal.Decimal(self.__sign * 10**self.__price_places)
+        self.__quantity_scale = decimal.Decimal(10**self.__quantity_places)
+        self.__negative_levels_count = 0
+        self.__best_entry = None
+
+    def init_levels(self, levels: List[OrderbookQuantityModel]):
+        keys = self.__keys
+        quantities = self.__quantities
+
+        for key, quantity in self.__convert_levels(levels):
+            index = bisect_left(keys, key)
+
+            if index < len(keys) and keys[index] == key:
+                quantities[index] = quantity
+            else:
+                keys.insert(index, key)
+                quantities.insert(index, quantity)
+
+        self.__negative_levels_count = sum(1 for quantity in quantities if quantity < 0)
+
+    def update_levels(self, levels: List[OrderbookQuantityModel]) -> bool:
+        keys = self.__keys
+        quantities = self.__quantities
+        best_key_before_update = keys[-1] if keys else None
+        negative_levels_count = self.__negative_levels_count
+
+        # All the levels are converted (and validated) before the book is changed
+        for key, quantity in self.__convert_levels(levels):
+            index = bisect_left(keys, key)
+
+            if index < len(keys) and keys[index] == key:
+                if quantities[index] < 0:
+                    negative_levels_count -= 1
+
+                quantity += quantities[index]
+
+                if quantity == 0:
+                    del keys[index]
+                    del quantities[index]
+                else:
+                    quantities[index] = quantity
+            elif quantity != 0:
+                keys.insert(index, key)
+                quantities.insert(index, quantity)
+
+            if quantity < 0:
+                negative_levels_count += 1
+
+        self.__negative_levels_count = negative_levels_count
+
+        return best_key_before_update != (keys[-1] if keys else None)
+
+    def clear(self):
+        del self.__keys[:]
+        del self.__quantities[:]
+        self.__negative_levels_count = 0
+        self.__best_entry = None
+
+    def best(self) -> Optional[OrderBookEntry]:
+        keys = self.__keys
+
+        if not keys:
+            return None
+
+        key = keys[-1]
+        quantity = self.__quantities[-1]
+        best_entry = self.__best_entry
+
+        if best_entry is None or best_entry[0] != key or best_entry[1] != quantity:
+            entry = OrderBookEntry(price=self.__to_price(key), amount=self.__to_qty(quantity))
+            best_entry = self.__best_entry = (key, quantity, entry)
+
+        return best_entry[2]
+
+    def has_negative_levels(self) -> bool:
+        return self.__negative_levels_count > 0
+
+    def levels(self) -> Iterator[Tuple[decimal.Decimal, decimal.Decimal]]:
+        for index in range(len(self.__keys) - 1, -1, -1):
+            yield self.__to_price(self.__keys[index]), self.__to_qty(self.__quantities[index])
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def __convert_levels(self, levels: List[OrderbookQuantityModel]) -> List[Tuple[int, int]]:
+        price_scale = self.__price_scale
+        quantity_scale = self.__quantity_scale
+        converted_levels = []
+
+        for level in levels:
+            scaled_price = level.price * price_scale
+            scaled_qty = level.qty * quantity_scale
+            key = int(scaled_price)
+            quantity = int(scaled_qty)
+
+            if key != scaled_price:
+                raise UnalignedLevelError(f"Price {level.price} has more than {self.__price_places} decimal places")
+            if quantity != scaled_qty:
+                raise UnalignedLevelError(f"Quantity {level.qty} has more than {self.__quantity_places} decimal places")
+
+            converted_levels.append((key, quantity))
+
+        return converted_levels
+
+    def __to_price(self, key: int) -> decimal.Decimal:
+        return decimal.Decimal(self.__sign * key).scaleb(-self.__price_places)
+
+    def __to_qty(self, quantity: int) -> decimal.Decimal:
+        return decimal.Decimal(quantity).scaleb(-self.__quantity_places)
+
+
+def create_orderbook_levels(
+    engine: OrderBookEngine, is_bid: bool, trading_config: Optional[TradingConfigModel]
+) -> OrderBookLevels:
+    if engine == OrderBookEngine.TICK:
+        if trading_config is None:
+            raise ValueError("`trading_config` of the market is required for the TICK order book engine")
+
+        return TickOrderBookLevels(is_bid, trading_config)
+
+    return DecimalOrderBookLevels(is_bid)
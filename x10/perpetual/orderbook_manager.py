@@ -0,0 +1,239 @@
+import asyncio
+import random
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from x10.perpetual.configuration import EndpointConfig
+from x10.perpetual.markets import TradingConfigModel
+from x10.perpetual.orderbook import (
+    OrderBook,
+    OrderBookEngine,
+    OrderBookResyncReason,
+    OrderBookResyncStats,
+    SnapshotProvider,
+)
+from x10.perpetual.orderbooks import OrderbookUpdateModel
+from x10.perpetual.stream_client.perpetual_stream_connection import (
+    PerpetualStreamConnection,
+    StreamGap,
+    StreamReconnectPolicy,
+)
+from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
+from x10.utils.http import WrappedStreamResponse
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+OrderBookUpdateCallback = Callable[[OrderBook, WrappedStreamResponse[OrderbookUpdateModel]], None]
+
+# Delays before reopening the stream after it failed (e.g. a client without a reconnect policy, or giving up)
+REOPEN_BASE_DELAY_SECONDS = 0.5
+REOPEN_MAX_DELAY_SECONDS = 30
+
+
+class OrderBookManager:
+    """
+    Maintains the order books of many markets from one all-markets orderbooks stream, instead of one connection per
+    market.
+
+    The books are reference counted: the components asking for the same market share one `OrderBook`, the connection
+    is opened with the first reference and closed with the last one. While the connection is open the books of all
+    markets of the stream are kept up to date (the exchange sends the snapshots of the markets when the connection
+    opens), so a market acquired later is ready right away. `OrderBookEngine.TICK` keeps the memory of the books low,
+    at the cost of slower deltas (see `OrderBook`).
+
+    The books are resynced on the gaps of the stream and on inconsistencies (see `OrderBook.apply_event`), from REST
+    snapshots with a `snapshot_provider`, otherwise the stream is reconnected for new snapshots of all markets. If the
+    stream fails, the books are unsynced until the stream is reopened (while any book is acquired) and sends their
+    snapshots again.
+    """
+
+    __endpoint_config: EndpointConfig
+    __stream_client: PerpetualStreamClient
+    __engine: OrderBookEngine
+    __trading_configs: Dict[str, TradingConfigModel]
+    __snapshot_provider: Optional[SnapshotProvider]
+    __update_callback: Optional[OrderBookUpdateCallback]
+    __orderbooks: Dict[str, OrderBook]
+    __references: Dict[str, int]
+    __task: Optional[asyncio.Task]
+
+    def __init__(
+        self,
+        endpoint_config: EndpointConfig,
+        *,
+        stream_client: Optional[PerpetualStreamClient] = None,
+        engine: OrderBookEngine = OrderBookEngine.DECIMAL,
+        trading_configs: Optional[Dict[str, TradingConfigModel]] = None,
+        snapshot_provider: Optional[SnapshotProvider] = None,
+        update_callback: Optional[OrderBookUpdateCallback] = None,
+    ):
+        """
+        :param stream_client: Client of the shared stream (e.g. with trusted decoding). The default client reconnects
+        with the default `StreamReconnectPolicy`.
+        :param engine: Storage of the price levels of the books. With `OrderBookEngine.TICK` only the markets of
+        `trading_configs` are maintained.
+        :param trading_configs: Trading configs of the markets, by market name.
+        :param snapshot_provider: Fetches the REST snapshots to resync the books from (see `OrderBook`).
+        :param update_callback: Called with the book and the event after every event applied to a book.
+        """
+
+        super().__init__()
+
+        self.__endpoint_config = endpoint_config
+        self.__stream_client = stream_client or PerpetualStreamClient(
+            api_url=endpoint_config.stream_url, reconnect_policy=StreamReconnectPolicy()
+        )
+        self.__engine = engine
+        self.__trading_configs = trading_configs or {}
+        self.__snapshot_provider = snapshot_provider
+        self.__update_callback = update_callback
+        self.__orderbooks = {}
+        self.__references = {}
+        self.__task = None
+
+    def acquire(self, market_name: str) -> OrderBook:
+        """
+        Returns the shared order book of the market (empty until the snapshot of the market is received).
+        Every call must be paired with `release`.
+        """
+
+        orderbook = self.__orderbooks.get(market_name) or self.__create_orderbook(market_name)
+
+        if orderbook is None:
+            raise ValueError(f"Trading config of the market {market_name} is required for the TICK order book engine")
+
+        self.__references[market_name] = self.__references.get(market_name, 0) + 1
+
+        if self.__task is None:
+            self.__task = asyncio.get_running_loop().create_task(self.__run_stream())
+
+        return orderbook
+
+    def release(self, market_name: str):
+        references = self.__references.get(market_name, 0) - 1
+
+        if references < 0:
+            raise ValueError(f"Order book of the market {market_name} is not acquired")
+
+        if references:
+            self.__references[market_name] = references
+        else:
+            del self.__references[market_name]
+
+        if not self.__references:
+            self.__stop()
+
+    @contextmanager
+    def orderbook(self, market_name: str) -> Iterator[OrderBook]:
+        orderbook = self.acquire(market_name)
+
+        try:
+            yield orderbook
+        finally:
+            self.release(market_name)
+
+    def get_orderbook(self, market_name: str) -> Optional[OrderBook]:
+        return self.__orderbooks.get(market_name)
+
+    def get_reference_count(self, market_name: str) -> int:
+        return self.__references.get(market_name, 0)
+
+    def get_resync_stats(self) -> Dict[str, OrderBookResyncStats]:
+        return {market_name: orderbook.resync_stats for market_name, orderbook in self.__orderbooks.items()}
+
+    async def close(self):
+        task = self.__task
+        self.__references.clear()
+        self.__stop()
+
+        if task:
+            await asyncio.gather(task, return_exceptions=True)
+
+    def __stop(self):
+        if self.__task:
+            self.__task.cancel()
+            self.__task = None
+
+        # The snapshots are only received when the connection opens
+        self.__orderbooks.clear()
+
+    def __create_orderbook(self, market_name: str) -> Optional[OrderBook]:
+        trading_config = self.__trading_configs.get(market_name)
+
+        if self.__engine == OrderBookEngine.TICK and trading_config is None:
+            return None
+
+        orderbook = OrderBook(
+            self.__endpoint_config,
+            market_name,
+            engine=self.__engine,
+            trading_config=trading_config,
+            snapshot_provider=self.__snapshot_provider,
+        )
+        self.__orderbooks[market_name] = orderbook
+
+        return orderbook
+
+    async def __run_stream(self):
+        orderbooks = self.__orderbooks
+        update_callback = self.__update_callback
+        stream: Optional[PerpetualStreamConnection] = None
+        failures_count = 0
+
+        def on_gap(gap: StreamGap):
+            for orderbook in orderbooks.values():
+                orderbook.on_stream_gap(gap)
+
+        try:
+            while True:
+                failed = False
+
+                try:
+                    stream = connected_stream = await self.__stream_client.subscribe_to_orderbooks(gap_callback=on_gap)
+
+                    async for event in connected_stream:
+                        failures_count = 0
+                        data = event.data
+
+                        if data is None:
+                            continue
+
+                        orderbook = orderbooks.get(data.market) or self.__create_orderbook(data.market)
+
+                        if orderbook is None:
+                            continue
+
+                        orderbook.apply_event(event)
+
+                        if update_callback:
+                            update_callback(orderbook, event)
+
+                        if orderbook.needs_stream_snapshot:
+                            LOGGER.info("Reconnecting the orderbooks stream for new snapshots (%s)", data.market)
+                            break
+                    else:
+                        LOGGER.error("Orderbooks stream closed")
+                        failed = True
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    LOGGER.error("Orderbooks stream failed: %s", e)
+                    failed = True
+                finally:
+                    if stream is not None and not stream.closed:
+                        await stream.close()
+
+                    stream = None
+
+                if failed:
+                    # The deltas are lost until the stream is reopened, which sends the snapshots of all markets
+                    for orderbook in orderbooks.values():
+                        orderbook.resync(OrderBookResyncReason.RECONNECT)
+
+                    cap = min(REOPEN_MAX_DELAY_SECONDS, REOPEN_BASE_DELAY_SECONDS * 2**failures_count)
+                    failures_count += 1
+                    await asyncio.sleep(random.uniform(0, cap))
+        finally:
+            if self.__task is asyncio.current_task():
+                self.__task = None
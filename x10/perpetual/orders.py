@@ -41,6 +41,17 @@ class OrderStatus(Enum):
     REJECTED = "REJECTED"
 
 
+# Statuses after which an order doesn't change anymore (by value, see `use_enum_values` in `X10BaseModel`)
+TERMINAL_ORDER_STATUSES = frozenset(
+    {
+        OrderStatus.FILLED.value,
+        OrderStatus.CANCELLED.value,
+        OrderStatus.EXPIRED.value,
+        OrderStatus.REJECTED.value,
+    }
+)
+
+
 class OrderStatusReason(Enum):
     # Technical status
     UNKNOWN = "UNKNOWN"
@@ -0,0 +1,158 @@
+import asyncio
+import dataclasses
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Tuple, TypeVar
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+DEFAULT_EARLY_EVENT_TTL_SECONDS = 10
+DEFAULT_MAX_EARLY_EVENTS = 10_000
+
+
+@dataclasses.dataclass
+class OrderCorrelationStats:
+    # Keys with at least one waiter
+    waiters: int = 0
+    # Events received before their waiter was registered, kept for the TTL
+    buffered_events: int = 0
+    resolved: int = 0
+    timeouts: int = 0
+    expired_events: int = 0
+    # Buffered events dropped because the buffer was full
+    dropped_events: int = 0
+
+
+@dataclasses.dataclass
+class _Waiter(Generic[ValueType]):
+    future: asyncio.Future
+    count: int
+
+
+class OrderCorrelationRegistry(Generic[KeyType, ValueType]):
+    """
+    Correlates the operations waiting for a stream event (e.g. a placed order waiting for its update) with the events,
+    by key (external id, order id), with one future per key.
+
+    An event without a waiter is kept for `early_event_ttl_seconds`, so a waiter registered after its event still gets
+    it. Waiters are removed with `release` (in a `finally` block), the future of a key is dropped with its last waiter.
+    """
+
+    __waiters: Dict[KeyType, _Waiter[ValueType]]
+    __early_events: "OrderedDict[KeyType, Tuple[ValueType, float]]"
+    __early_event_ttl_seconds: float
+    __max_early_events: int
+    __stats: OrderCorrelationStats
+
+    def __init__(
+        self,
+        *,
+        early_event_ttl_seconds: float = DEFAULT_EARLY_EVENT_TTL_SECONDS,
+        max_early_events: int = DEFAULT_MAX_EARLY_EVENTS,
+    ):
+        super().__init__()
+
+        self.__waiters = {}
+        self.__early_events = OrderedDict()
+        self.__early_event_ttl_seconds = early_event_ttl_seconds
+        self.__max_early_events = max_early_events
+        self.__stats = OrderCorrelationStats()
+
+    @property
+    def stats(self) -> OrderCorrelationStats:
+        self.__purge_expired_events(time.monotonic())
+        self.__stats.waiters = len(self.__waiters)
+        self.__stats.buffered_events = len(self.__early_events)
+
+        return self.__stats
+
+    def __contains__(self, key: KeyType) -> bool:
+        return key in self.__waiters
+
+    def register(self, key: KeyType) -> bool:
+        """
+        Adds a waiter for the event of `key`. Returns `True` for the first waiter of the key.
+        """
+
+        waiter = self.__waiters.get(key)
+
+        if waiter is not None:
+            waiter.count += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self.__waiters[key] = _Waiter(future=future, count=1)
+        self.__purge_expired_events(time.monotonic())
+        early_event = self.__early_events.pop(key, None)
+
+        if early_event is not None:
+            future.set_result(early_event[0])
+            self.__stats.resolved += 1
+
+        return True
+
+    async def wait(self, key: KeyType, timeout_seconds: float) -> ValueType:
+        """
+        Waits for the event of a registered key.
+        """
+
+        future = self.__waiters[key].future
+
+        try:
+            # Other waiters of the key share the future
+            return await asyncio.wait_for(asyncio.shield(future), timeout_seconds)
+        except asyncio.TimeoutError:
+            self.__stats.timeouts += 1
+            raise
+
+    def release(self, key: KeyType):
+        waiter = self.__waiters.get(key)
+
+        if waiter is None:
+            return
+
+        waiter.count -= 1
+
+        if waiter.count <= 0:
+            del self.__waiters[key]
+            waiter.future.cancel()
+
+    def resolve(self, key: KeyType, value: ValueType):
+        """
+        Passes the event of `key` to its waiters, or keeps it for a waiter registered later. Only the first event of a
+        key is kept.
+        """
+
+        waiter = self.__waiters.get(key)
+
+        if waiter is not None:
+            if not waiter.future.done():
+                waiter.future.set_result(value)
+                self.__stats.resolved += 1
+            return
+
+        now = time.monotonic()
+        self.__purge_expired_events(now)
+
+        if key in self.__early_events:
+            return
+
+        self.__early_events[key] = (value, now + self.__early_event_ttl_seconds)
+
+        while len(self.__early_events) > self.__max_early_events:
+            self.__early_events.popitem(last=False)
+            self.__stats.dropped_events += 1
+
+    def __purge_expired_events(self, now: float):
+        # The TTL is the same for all events, so the oldest events expire first
+        early_events = self.__early_events
+
+        while early_events:
+            _, (_, expires_at) = next(iter(early_events.items()))
+
+            if expires_at > now:
+                break
+
+            early_events.popitem(last=False)
+            self.__stats.expired_events += 1
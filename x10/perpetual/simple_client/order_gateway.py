@@ -0,0 +1,280 @@
+import asyncio
+import dataclasses
+import time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Set
+
+from x10.perpetual.orders import OrderSide
+from x10.perpetual.simple_client.simple_trading_client import (
+    BlockingTradingClient,
+    TimedCancel,
+    TimedOpenOrderModel,
+)
+from x10.utils.log import get_logger
+from x10.utils.stats import get_percentile
+
+LOGGER = get_logger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 4
+NANOS_IN_SECOND = 1_000_000_000
+
+
+class OrderOperationType(Enum):
+    PLACE = "PLACE"
+    CANCEL = "CANCEL"
+
+
+@dataclasses.dataclass(frozen=True)
+class OperationWindowStats:
+    operation: OrderOperationType
+    start_nanos: int
+    end_nanos: int
+    count: int
+    errors: int
+    # Completed operations per second
+    throughput: float
+    # From the request to the account stream update (see `BlockingTradingClient`)
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+@dataclasses.dataclass
+class OrderGatewayStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    # Submits which waited for a free slot of the market
+    throttled: int = 0
+
+
+OperationWindowCallback = Callable[[OperationWindowStats], None]
+
+
+@dataclasses.dataclass
+class OrderTicket:
+    """
+    An order submitted with `PipelinedOrderGateway.submit_place`, pass it to `submit_cancel`.
+    """
+
+    market_name: str
+    placed: "asyncio.Task[TimedOpenOrderModel]"
+    cancelled: "Optional[asyncio.Task[TimedCancel]]" = None
+
+
+class _OperationWindow:
+    __operation: OrderOperationType
+    __interval_nanos: int
+    __start_nanos: Optional[int]
+    __latencies: List[float]
+    __errors: int
+
+    def __init__(self, operation: OrderOperationType, interval_seconds: float):
+        super().__init__()
+
+        self.__operation = operation
+        self.__interval_nanos = int(interval_seconds * NANOS_IN_SECOND)
+        self.__start_nanos = None
+        self.__latencies = []
+        self.__errors = 0
+
+    def record(self, start_nanos: int, end_nanos: int, latency_ms: Optional[float]) -> Optional[OperationWindowStats]:
+        if self.__start_nanos is None:
+            self.__start_nanos = start_nanos
+
+        if latency_ms is None:
+            self.__errors += 1
+        else:
+            self.__latencies.append(latency_ms)
+
+        if end_nanos - self.__start_nanos < self.__interval_nanos:
+            return None
+
+        return self.flush(end_nanos)
+
+    def flush(self, end_nanos: int) -> Optional[OperationWindowStats]:
+        if self.__start_nanos is None:
+            return None
+
+        latencies = sorted(self.__latencies)
+        duration_seconds = max(end_nanos - self.__start_nanos, 1) / NANOS_IN_SECOND
+        stats = OperationWindowStats(
+            operation=self.__operation,
+            start_nanos=self.__start_nanos,
+            end_nanos=end_nanos,
+            count=len(latencies),
+            errors=self.__errors,
+            throughput=len(latencies) / duration_seconds,
+            p50_ms=get_percentile(latencies, 50),
+            p90_ms=get_percentile(latencies, 90),
+            p99_ms=get_percentile(latencies, 99),
+            max_ms=get_percentile(latencies, 100),
+        )
+        self.__start_nanos = None
+        self.__latencies = []
+        self.__errors = 0
+
+        return stats
+
+
+class PipelinedOrderGateway:
+    """
+    Places and cancels orders through a `BlockingTradingClient` with up to `max_in_flight` operations in flight per
+    market, instead of one operation at a time.
+
+    `submit_place` and `submit_cancel` return once the operation is sent, and wait for a free slot of the market while
+    the window is full (backpressure). The cancel of a ticket is sent after the placement of the order is confirmed,
+    so it never overtakes the placement.
+
+    The latencies are aggregated into windows of `report_interval_seconds`, the stats of every window (throughput and
+    percentiles) are passed to `report_callback`.
+    """
+
+    __client: BlockingTradingClient
+    __max_in_flight: int
+    __report_callback: Optional[OperationWindowCallback]
+    __slots: Dict[str, asyncio.Semaphore]
+    __in_flight: Dict[str, int]
+    __windows: Dict[OrderOperationType, _OperationWindow]
+    __stats: Dict[OrderOperationType, OrderGatewayStats]
+    __tasks: Set[asyncio.Task]
+
+    def __init__(
+        self,
+        client: BlockingTradingClient,
+        *,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        report_interval_seconds: float = 1,
+        report_callback: Optional[OperationWindowCallback] = None,
+    ):
+        """
+        :param max_in_flight: Maximum number of operations (placements and cancels) in flight per market.
+        :param report_interval_seconds: Duration of the reported windows.
+        :param report_callback: Called with the stats of every window of every operation type.
+        """
+
+        super().__init__()
+
+        if max_in_flight < 1:
+            raise ValueError("`max_in_flight` must be positive")
+
+        self.__client = client
+        self.__max_in_flight = max_in_flight
+        self.__report_callback = report_callback
+        self.__slots = {}
+        self.__in_flight = {}
+        self.__windows = {
+            operation: _OperationWindow(operation, report_interval_seconds) for operation in OrderOperationType
+        }
+        self.__stats = {operation: OrderGatewayStats() for operation in OrderOperationType}
+        self.__tasks = set()
+
+    @property
+    def stats(self) -> Dict[OrderOperationType, OrderGatewayStats]:
+        return self.__stats
+
+    def get_in_flight(self, market_name: str) -> int:
+        return self.__in_flight.get(market_name, 0)
+
+    async def submit_place(
+        self,
+        market_name: str,
+        amount_of_synthetic: Decimal,
+        price: Decimal,
+        side: OrderSide,
+        post_only: bool = False,
+    ) -> OrderTicket:
+        await self.__acquire_slot(market_name, OrderOperationType.PLACE)
+        placed = self.__start(
+            market_name,
+            OrderOperationType.PLACE,
+            self.__client.create_and_place_order(
+                market_name=market_name,
+                amount_of_synthetic=amount_of_synthetic,
+                price=price,
+                side=side,
+                post_only=post_only,
+            ),
+        )
+
+        return OrderTicket(market_name=market_name, placed=placed)
+
+    async def submit_cancel(self, ticket: OrderTicket) -> "asyncio.Task[TimedCancel]":
+        if ticket.cancelled is not None:
+            return ticket.cancelled
+
+        await self.__acquire_slot(ticket.market_name, OrderOperationType.CANCEL)
+        ticket.cancelled = self.__start(ticket.market_name, OrderOperationType.CANCEL, self.__cancel(ticket))
+
+        return ticket.cancelled
+
+    async def close(self):
+        """
+        Waits for the operations in flight and reports the last windows.
+        """
+
+        if self.__tasks:
+            await asyncio.gather(*self.__tasks, return_exceptions=True)
+
+        end_nanos = time.time_ns()
+
+        for window in self.__windows.values():
+            self.__report(window.flush(end_nanos))
+
+    async def __acquire_slot(self, market_name: str, operation: OrderOperationType):
+        slots = self.__slots.get(market_name)
+
+        if slots is None:
+            slots = self.__slots[market_name] = asyncio.Semaphore(self.__max_in_flight)
+
+        if slots.locked():
+            self.__stats[operation].throttled += 1
+
+        await slots.acquire()
+        self.__in_flight[market_name] = self.__in_flight.get(market_name, 0) + 1
+        self.__stats[operation].submitted += 1
+
+    def __start(self, market_name: str, operation: OrderOperationType, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(self.__run(market_name, operation, coro))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+        return task
+
+    async def __run(self, market_name: str, operation: OrderOperationType, coro: Coroutine[Any, Any, Any]):
+        start_nanos = time.time_ns()
+
+        try:
+            result = await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER.error("%s on %s failed: %s", operation.value, market_name, e)
+            self.__stats[operation].failed += 1
+            self.__report(self.__windows[operation].record(start_nanos, time.time_ns(), None))
+            raise
+        finally:
+            self.__in_flight[market_name] -= 1
+            self.__slots[market_name].release()
+
+        self.__stats[operation].completed += 1
+        self.__report(self.__windows[operation].record(result.start_nanos, result.end_nanos, result.operation_ms))
+
+        return result
+
+    async def __cancel(self, ticket: OrderTicket) -> TimedCancel:
+        # Other awaiters of the placement are not cancelled with the cancel
+        placed_order = await asyncio.shield(ticket.placed)
+
+        return await self.__client.cancel_order(order_id=placed_order.id)
+
+    def __report(self, stats: Optional[OperationWindowStats]):
+        if stats is None or self.__report_callback is None:
+            return
+
+        try:
+            self.__report_callback(stats)
+        except Exception as e:
+            LOGGER.error("Report callback failed: %s", e)
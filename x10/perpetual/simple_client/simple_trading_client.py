@@ -2,35 +2,37 @@ import asyncio
 import dataclasses
 import time
 from decimal import Decimal
-from typing import Awaitable, Dict, Union, cast
+from typing import Dict, Optional, Tuple, Union
 
 from x10.perpetual.accounts import AccountStreamDataModel, StarkPerpetualAccount
 from x10.perpetual.configuration import EndpointConfig
 from x10.perpetual.markets import MarketModel
 from x10.perpetual.order_object import create_order_object
+from x10.perpetual.order_trace import OrderTracer
 from x10.perpetual.orders import (
     OpenOrderModel,
     OrderSide,
     OrderStatus,
     PerpetualOrderModel,
 )
+from x10.perpetual.simple_client.order_correlation import (
+    DEFAULT_EARLY_EVENT_TTL_SECONDS,
+    OrderCorrelationRegistry,
+    OrderCorrelationStats,
+)
 from x10.perpetual.stream_client.perpetual_stream_connection import (
     PerpetualStreamConnection,
 )
 from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
+from x10.perpetual.trading_client.account_module import AccountModule
 from x10.perpetual.trading_client.markets_information_module import (
     MarketsInformationModule,
 )
+from x10.perpetual.trading_client.metadata_cache import MarketMetadataCache
 from x10.perpetual.trading_client.order_management_module import OrderManagementModule
-from x10.utils.http import WrappedStreamResponse
-
+from x10.utils.http import ClientSessionProvider, WrappedStreamResponse
 
-async def condition_to_awaitable(condition: asyncio.Condition) -> Awaitable:
-    async def __inner():
-        async with condition:
-            await condition.wait()
-
-    return await __inner()
+DEFAULT_TIMEOUT_SECONDS = 5
 
 
 class TimedOpenOrderModel(OpenOrderModel):
@@ -58,64 +60,71 @@ class TimedCancel:
     operation_ms: float
 
 
-@dataclasses.dataclass
-class OrderWaiter:
-    condition: asyncio.Condition
-    open_order: None | TimedOpenOrderModel
-    start_nanos: int
-
-
-@dataclasses.dataclass
-class CancelWaiter:
-    condition: asyncio.Condition
-    start_nanos: int
-    end_nanos: int | None
-
-
 class BlockingTradingClient:
-    def __init__(self, endpoint_config: EndpointConfig, account: StarkPerpetualAccount):
+    def __init__(
+        self,
+        endpoint_config: EndpointConfig,
+        account: StarkPerpetualAccount,
+        *,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        early_event_ttl_seconds: float = DEFAULT_EARLY_EVENT_TTL_SECONDS,
+        tracer: Optional[OrderTracer] = None,
+    ):
+        """
+        :param timeout_seconds: How long to wait for the account stream update of a placed or cancelled order.
+        :param early_event_ttl_seconds: How long an account stream update is kept for an order which isn't awaited
+        (yet), e.g. an update received before the cancel of the order is requested.
+        :param tracer: Traces the stages of the placed orders, from the creation to the terminal state.
+        """
+
         self.__endpoint_config = endpoint_config
         self.__account = account
-        self.__market_module = MarketsInformationModule(endpoint_config, api_key=account.api_key)
-        self.__orders_module = OrderManagementModule(endpoint_config, api_key=account.api_key)
-        self.__markets: Union[None, Dict[str, MarketModel]] = None
+        self.__session_provider = ClientSessionProvider()
+        self.__market_module = MarketsInformationModule(
+            endpoint_config, api_key=account.api_key, session_provider=self.__session_provider
+        )
+        self.__orders_module = OrderManagementModule(
+            endpoint_config, api_key=account.api_key, session_provider=self.__session_provider
+        )
+        self.__account_module = AccountModule(
+            endpoint_config, api_key=account.api_key, stark_account=account, session_provider=self.__session_provider
+        )
+        self.__metadata_cache = MarketMetadataCache(self.__market_module, self.__account_module)
         self.__stream_client: PerpetualStreamClient = PerpetualStreamClient(api_url=endpoint_config.stream_url)
         self.__account_stream: Union[
             None,
             PerpetualStreamConnection[WrappedStreamResponse[AccountStreamDataModel]],
         ] = None
-        self.__order_waiters: Dict[str, OrderWaiter] = {}
-        self.__cancel_waiters: Dict[int, CancelWaiter] = {}
+        self.__timeout_seconds = timeout_seconds
+        self.__tracer = tracer
+        # Updates of the placed orders by external id, end times of the cancels by order id
+        self.__order_waiters: OrderCorrelationRegistry[str, Tuple[OpenOrderModel, int]] = OrderCorrelationRegistry(
+            early_event_ttl_seconds=early_event_ttl_seconds
+        )
+        self.__cancel_waiters: OrderCorrelationRegistry[int, int] = OrderCorrelationRegistry(
+            early_event_ttl_seconds=early_event_ttl_seconds
+        )
         self.__orders_task: Union[None, asyncio.Task] = None
         self.__stream_lock = asyncio.Lock()
 
+    @property
+    def order_waiters_stats(self) -> OrderCorrelationStats:
+        return self.__order_waiters.stats
+
+    @property
+    def cancel_waiters_stats(self) -> OrderCorrelationStats:
+        return self.__cancel_waiters.stats
+
     async def handle_cancel(self, order_id: int):
-        if order_id not in self.__cancel_waiters:
-            return
-        cancel_waiter = self.__cancel_waiters.get(order_id)
-        if not cancel_waiter:
-            return
-        if cancel_waiter.condition:
-            async with cancel_waiter.condition:
-                cancel_waiter.end_nanos = time.time_ns()
-                cancel_waiter.condition.notify_all()
+        self.__cancel_waiters.resolve(order_id, time.time_ns())
 
     async def handle_update(self, order: OpenOrderModel):
-        if order.external_id not in self.__order_waiters:
-            return
-        order_waiter = self.__order_waiters.get(order.external_id)
-        if not order_waiter:
-            return
-        if order_waiter.condition:
-            async with order_waiter.condition:
-                order_waiter.open_order = TimedOpenOrderModel(
-                    start_nanos=order_waiter.start_nanos,
-                    end_nanos=time.time_ns(),
-                    open_order=order,
-                )
-                order_waiter.condition.notify_all()
+        self.__order_waiters.resolve(order.external_id, (order, time.time_ns()))
 
     async def handle_order(self, order: OpenOrderModel):
+        if self.__tracer:
+            self.__tracer.on_order_update(order)
+
         if order.status == OrderStatus.CANCELLED.value:
             await self.handle_cancel(order.id)
         else:
@@ -129,40 +138,29 @@ class BlockingTradingClient:
                 await self.handle_order(order)
 
     async def cancel_order(self, order_id: int) -> TimedCancel:
-        awaitable: Awaitable
-        if order_id in self.__cancel_waiters:
-            awaitable = condition_to_awaitable(self.__cancel_waiters[order_id].condition)
-        else:
-            self.__cancel_waiters[order_id] = CancelWaiter(
-                asyncio.Condition(), start_nanos=time.time_ns(), end_nanos=None
-            )
-            cancel_task = asyncio.create_task(self.__orders_module.cancel_order(order_id))
-            awaitable = asyncio.gather(
-                cancel_task,
-                asyncio.wait_for(condition_to_awaitable(self.__cancel_waiters[order_id].condition), 5),
-                return_exceptions=False,
-            )
+        start_nanos = time.time_ns()
+        # Concurrent cancels of the same order share the request
+        is_first_waiter = self.__cancel_waiters.register(order_id)
+
+        try:
+            if is_first_waiter:
+                _, end_nanos = await asyncio.gather(
+                    self.__orders_module.cancel_order(order_id),
+                    self.__cancel_waiters.wait(order_id, self.__timeout_seconds),
+                )
+            else:
+                end_nanos = await self.__cancel_waiters.wait(order_id, self.__timeout_seconds)
+        finally:
+            self.__cancel_waiters.release(order_id)
 
-        cancel_waiter = self.__cancel_waiters[order_id]
-        end_nanos = None
-        if cancel_waiter.end_nanos:
-            end_nanos = cancel_waiter.end_nanos
-        else:
-            await awaitable
-            end_nanos = self.__cancel_waiters[order_id].end_nanos
-        del self.__cancel_waiters[order_id]
-        end_nanos = cast(int, end_nanos)
         return TimedCancel(
-            start_nanos=cancel_waiter.start_nanos,
+            start_nanos=start_nanos,
             end_nanos=end_nanos,
-            operation_ms=(end_nanos - cancel_waiter.start_nanos) / 1_000_000,
+            operation_ms=(end_nanos - start_nanos) / 1_000_000,
         )
 
     async def get_markets(self) -> Dict[str, MarketModel]:
-        if not self.__markets:
-            markets = await self.__market_module.get_markets()
-            self.__markets = {m.name: m for m in markets.data}
-        return self.__markets
+        return await self.__metadata_cache.get_markets_by_name()
 
     async def create_and_place_order(
         self,
@@ -184,6 +182,7 @@ class BlockingTradingClient:
                 self.__orders_task = asyncio.create_task(self.___order_stream())
             self.__stream_lock.release()
 
+        trace = self.__tracer.start(market_name) if self.__tracer else None
         order: PerpetualOrderModel = create_order_object(
             account=self.__account,
             market=market,
@@ -192,24 +191,29 @@ class BlockingTradingClient:
             side=side,
             post_only=post_only,
             previous_order_id=previous_order_id,
+            trace=trace,
         )
 
         if order.id in self.__order_waiters:
             raise ValueError(f"order with {order.id} hash already placed")
 
-        self.__order_waiters[order.id] = OrderWaiter(asyncio.Condition(), None, start_nanos=time.time_ns())
-        placed_order_task = asyncio.create_task(self.__orders_module.place_order(order))
-        order_waiter = self.__order_waiters[order.id]
-        if order_waiter.open_order:
-            return order_waiter.open_order
-        async with order_waiter.condition:
-            await asyncio.gather(
-                placed_order_task,
-                asyncio.wait_for(order_waiter.condition.wait(), 5),
-                return_exceptions=False,
+        start_nanos = time.time_ns()
+        self.__order_waiters.register(order.id)
+
+        if self.__tracer and trace:
+            self.__tracer.track(order.id, trace)
+
+        try:
+            _, (open_order, end_nanos) = await asyncio.gather(
+                self.__orders_module.place_order(order, trace=trace),
+                self.__order_waiters.wait(order.id, self.__timeout_seconds),
             )
-            open_model = self.__order_waiters[order.id].open_order
-            del self.__order_waiters[order.id]
-            if not open_model:
-                raise ValueError("No Fill or Placement received for order")
-            return open_model
+        except Exception:
+            # The incomplete trace shows the stage the placement got stuck in
+            if self.__tracer:
+                self.__tracer.finish(order.id)
+            raise
+        finally:
+            self.__order_waiters.release(order.id)
+
+        return TimedOpenOrderModel(start_nanos=start_nanos, end_nanos=end_nanos, open_order=open_order)
@@ -1,3 +1,8 @@
+from x10.perpetual.stream_client.perpetual_stream_connection import (  # noqa: F401
+    StreamGap,
+    StreamGapReason,
+    StreamReconnectPolicy,
+)
 from x10.perpetual.stream_client.stream_client import (  # noqa: F401
     PerpetualStreamClient,
 )
@@ -1,8 +1,13 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from enum import Enum
 from types import TracebackType
-from typing import AsyncIterator, Generic, Optional, Type, TypeVar
+from typing import AsyncIterator, Callable, Generic, Optional, Type, TypeVar, Union
 
 import websockets
 from websockets import WebSocketClientProtocol
+from websockets.exceptions import ConnectionClosed, WebSocketException
 
 from x10.config import USER_AGENT
 from x10.utils.http import RequestHeader
@@ -12,28 +17,91 @@ from x10.utils.model import X10BaseModel
 LOGGER = get_logger(__name__)
 
 StreamMsgResponseType = TypeVar("StreamMsgResponseType", bound=X10BaseModel)
+StreamMsgDecoder = Callable[[Union[str, bytes]], StreamMsgResponseType]
+
+
+@dataclass(frozen=True)
+class StreamReconnectPolicy:
+    # Number of consecutive failed reconnects before the error is raised to the consumer, `None` -- retry forever
+    max_attempts: Optional[int] = None
+    base_delay_seconds: float = 0.5
+    max_delay_seconds: float = 30
+    # The stream is considered stale (and is reconnected) if no message is received for this long
+    stale_timeout_seconds: Optional[float] = 60
+    # Keepalive pings, the connection is dropped if a pong doesn't arrive within `ping_timeout_seconds`
+    ping_interval_seconds: Optional[float] = 20
+    ping_timeout_seconds: Optional[float] = 20
+
+
+class StreamGapReason(Enum):
+    # `seq` jumped forward, messages were lost
+    GAP = "GAP"
+    # `seq` went backwards without a reconnect, the server restarted the stream
+    RESET = "RESET"
+    # The stream was reconnected, messages sent in between were lost
+    RECONNECT = "RECONNECT"
+
+
+@dataclass(frozen=True)
+class StreamGap:
+    reason: StreamGapReason
+    # `seq` of the last message before the gap, `None` if no message was received yet
+    last_seq: Optional[int]
+    # `seq` of the first message after the gap
+    seq: int
 
 
 class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
+    """
+    Stream of messages of one subscription.
+
+    With a `reconnect_policy` the connection is resilient: a dropped or stale connection is re-established (which
+    also re-subscribes, the subscription is defined by the stream URL) and the consumer keeps receiving messages.
+    `gap_callback` is invoked before the first message after a reconnect or a `seq` discontinuity, so that
+    consumers which keep state (e.g. an order book) can resync.
+
+    `msg_decoder` replaces the validation of the messages with `msg_model_class`, e.g. with a trusted decoder.
+    """
+
     __stream_url: str
     __msg_model_class: Type[StreamMsgResponseType]
+    __msg_decoder: StreamMsgDecoder
     __api_key: Optional[str]
     __msgs_count: int
     __websocket: Optional[WebSocketClientProtocol]
+    __reconnect_policy: Optional[StreamReconnectPolicy]
+    __gap_callback: Optional[Callable[[StreamGap], None]]
+    __closing: bool
+    __reconnected: bool
+    __reconnects_count: int
+    __gaps_count: int
+    __last_seq: Optional[int]
 
     def __init__(
         self,
         stream_url: str,
         msg_model_class: Type[StreamMsgResponseType],
         api_key: Optional[str],
+        *,
+        reconnect_policy: Optional[StreamReconnectPolicy] = None,
+        gap_callback: Optional[Callable[[StreamGap], None]] = None,
+        msg_decoder: Optional[StreamMsgDecoder] = None,
     ):
         super().__init__()
 
         self.__stream_url = stream_url
         self.__msg_model_class = msg_model_class
+        self.__msg_decoder = msg_decoder or msg_model_class.model_validate_json
         self.__api_key = api_key
         self.__msgs_count = 0
         self.__websocket = None
+        self.__reconnect_policy = reconnect_policy
+        self.__gap_callback = gap_callback
+        self.__closing = False
+        self.__reconnected = False
+        self.__reconnects_count = 0
+        self.__gaps_count = 0
+        self.__last_seq = None
 
     async def send(self, data):
         await self.__websocket.send(data)
@@ -43,9 +111,14 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
 
     async def close(self):
         assert self.__websocket is not None
-        assert not self.__websocket.closed
 
-        await self.__websocket.close()
+        self.__closing = True
+
+        if self.__reconnect_policy is None:
+            assert not self.__websocket.closed
+
+        if not self.__websocket.closed:
+            await self.__websocket.close()
 
         LOGGER.debug("Stream closed: %s", self.__stream_url)
 
@@ -53,10 +126,21 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
     def msgs_count(self):
         return self.__msgs_count
 
+    @property
+    def reconnects_count(self):
+        return self.__reconnects_count
+
+    @property
+    def gaps_count(self):
+        return self.__gaps_count
+
     @property
     def closed(self):
         assert self.__websocket is not None
 
+        if self.__reconnect_policy is not None:
+            return self.__closing
+
         return self.__websocket.closed
 
     def __aiter__(self) -> AsyncIterator[StreamMsgResponseType]:
@@ -65,7 +149,7 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
     async def __anext__(self) -> StreamMsgResponseType:
         assert self.__websocket is not None
 
-        if self.__websocket.closed:
+        if self.closed:
             raise StopAsyncIteration
 
         return await self.__receive()
@@ -73,10 +157,85 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
     async def __receive(self) -> StreamMsgResponseType:
         assert self.__websocket is not None
 
-        data = await self.__websocket.recv()
+        if self.__reconnect_policy is None:
+            data = await self.__websocket.recv()
+        else:
+            data = await self.__receive_resilient(self.__reconnect_policy)
+
         self.__msgs_count += 1
+        msg = self.__msg_decoder(data)
+        self.__check_seq(msg)
+
+        return msg
+
+    async def __receive_resilient(self, policy: StreamReconnectPolicy):
+        while True:
+            assert self.__websocket is not None
+
+            try:
+                return await asyncio.wait_for(self.__websocket.recv(), policy.stale_timeout_seconds)
+            except (ConnectionClosed, asyncio.TimeoutError) as e:
+                if self.__closing:
+                    raise
+
+                if isinstance(e, asyncio.TimeoutError):
+                    LOGGER.warning("Stream is stale, reconnecting: %s", self.__stream_url)
+                else:
+                    LOGGER.warning("Stream connection lost, reconnecting: %s (%s)", self.__stream_url, e)
 
-        return self.__msg_model_class.model_validate_json(data)
+                await self.__reconnect(policy)
+
+    async def __reconnect(self, policy: StreamReconnectPolicy):
+        assert self.__websocket is not None
+
+        if not self.__websocket.closed:
+            await self.__websocket.close()
+
+        attempt = 0
+
+        while True:
+            # "Full jitter" backoff, so that many clients dropped at once don't reconnect in lockstep
+            cap = min(policy.max_delay_seconds, policy.base_delay_seconds * 2**attempt)
+            await asyncio.sleep(random.uniform(0, cap))
+
+            try:
+                await self.__connect()
+                break
+            except (OSError, asyncio.TimeoutError, WebSocketException) as e:
+                attempt += 1
+
+                if policy.max_attempts is not None and attempt >= policy.max_attempts:
+                    raise
+
+                LOGGER.warning("Failed to reconnect to stream %s, attempt #%s: %s", self.__stream_url, attempt, e)
+
+        self.__reconnects_count += 1
+        self.__reconnected = True
+
+    def __check_seq(self, msg: StreamMsgResponseType):
+        seq = getattr(msg, "seq", None)
+
+        if seq is None:
+            return
+
+        gap_reason = None
+
+        if self.__reconnected:
+            gap_reason = StreamGapReason.RECONNECT
+            self.__reconnected = False
+        elif self.__last_seq is not None and seq != self.__last_seq + 1:
+            gap_reason = StreamGapReason.GAP if seq > self.__last_seq else StreamGapReason.RESET
+
+        if gap_reason is not None:
+            self.__gaps_count += 1
+            LOGGER.warning(
+                "Stream %s: %s after seq %s, received seq %s", self.__stream_url, gap_reason.value, self.__last_seq, seq
+            )
+
+            if self.__gap_callback:
+                self.__gap_callback(StreamGap(reason=gap_reason, last_seq=self.__last_seq, seq=seq))
+
+        self.__last_seq = seq
 
     def __await__(self):
         return self.__await_impl__().__await__()
@@ -94,6 +253,11 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
         await self.close()
 
     async def __await_impl__(self):
+        await self.__connect()
+
+        return self
+
+    async def __connect(self):
         extra_headers = {
             RequestHeader.USER_AGENT.value: USER_AGENT,
         }
@@ -101,8 +265,14 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
         if self.__api_key is not None:
             extra_headers[RequestHeader.API_KEY.value] = self.__api_key
 
-        self.__websocket = await websockets.connect(self.__stream_url, extra_headers=extra_headers)
+        if self.__reconnect_policy is None:
+            self.__websocket = await websockets.connect(self.__stream_url, extra_headers=extra_headers)
+        else:
+            self.__websocket = await websockets.connect(
+                self.__stream_url,
+                extra_headers=extra_headers,
+                ping_interval=self.__reconnect_policy.ping_interval_seconds,
+                ping_timeout=self.__reconnect_policy.ping_timeout_seconds,
+            )
 
         LOGGER.debug("Connected to stream: %s", self.__stream_url)
-
-        return self
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Type
+from typing import Callable, Dict, List, Optional, Type
 
 from x10.perpetual.accounts import AccountStreamDataModel
 from x10.perpetual.candles import CandleInterval, CandleModel, CandleType
@@ -6,7 +6,15 @@ from x10.perpetual.funding_rates import FundingRateModel
 from x10.perpetual.orderbooks import OrderbookUpdateModel
 from x10.perpetual.stream_client.perpetual_stream_connection import (
     PerpetualStreamConnection,
+    StreamGap,
+    StreamMsgDecoder,
     StreamMsgResponseType,
+    StreamReconnectPolicy,
+)
+from x10.perpetual.stream_client.trusted_decoders import (
+    decode_candles_msg,
+    decode_orderbook_msg,
+    decode_public_trades_msg,
 )
 from x10.perpetual.trades import PublicTradeModel
 from x10.utils.http import WrappedStreamResponse, get_url
@@ -18,37 +26,77 @@ class PerpetualStreamClient:
     """
 
     __api_url: str
+    __reconnect_policy: Optional[StreamReconnectPolicy]
+    __trusted_decoding: bool
+
+    def __init__(
+        self,
+        *,
+        api_url: str,
+        reconnect_policy: Optional[StreamReconnectPolicy] = None,
+        trusted_decoding: bool = False,
+    ):
+        """
+        :param reconnect_policy: Makes all streams of the client reconnect (and re-subscribe) automatically.
+        :param trusted_decoding: Decodes the orderbooks, public trades and candles messages without the pydantic
+        validation (the messages of the exchange are trusted to match the models). The models are equal to the
+        validated ones, unexpected messages are still validated. Other streams are always validated.
+        """
 
-    def __init__(self, *, api_url: str):
         super().__init__()
 
         self.__api_url = api_url
+        self.__reconnect_policy = reconnect_policy
+        self.__trusted_decoding = trusted_decoding
 
-    def subscribe_to_orderbooks(self, market_name: Optional[str] = None):
+    def subscribe_to_orderbooks(
+        self, market_name: Optional[str] = None, *, gap_callback: Optional[Callable[[StreamGap], None]] = None
+    ):
         """
         https://api.docs.extended.exchange/#orderbooks-stream
         """
 
         url = self.__get_url("/orderbooks/<market?>", market=market_name)
-        return self.__connect(url, WrappedStreamResponse[OrderbookUpdateModel])
+        return self.__connect(
+            url,
+            WrappedStreamResponse[OrderbookUpdateModel],
+            gap_callback=gap_callback,
+            trusted_decoder=decode_orderbook_msg,
+        )
 
-    def subscribe_to_public_trades(self, market_name: Optional[str] = None):
+    def subscribe_to_public_trades(
+        self, market_name: Optional[str] = None, *, gap_callback: Optional[Callable[[StreamGap], None]] = None
+    ):
         """
         https://api.docs.extended.exchange/#trades-stream
         """
 
         url = self.__get_url("/publicTrades/<market?>", market=market_name)
-        return self.__connect(url, WrappedStreamResponse[List[PublicTradeModel]])
+        return self.__connect(
+            url,
+            WrappedStreamResponse[List[PublicTradeModel]],
+            gap_callback=gap_callback,
+            trusted_decoder=decode_public_trades_msg,
+        )
 
-    def subscribe_to_funding_rates(self, market_name: Optional[str] = None):
+    def subscribe_to_funding_rates(
+        self, market_name: Optional[str] = None, *, gap_callback: Optional[Callable[[StreamGap], None]] = None
+    ):
         """
         https://api.docs.extended.exchange/#funding-rates-stream
         """
 
         url = self.__get_url("/funding/<market?>", market=market_name)
-        return self.__connect(url, WrappedStreamResponse[FundingRateModel])
-
-    def subscribe_to_candles(self, market_name: str, candle_type: CandleType, interval: CandleInterval):
+        return self.__connect(url, WrappedStreamResponse[FundingRateModel], gap_callback=gap_callback)
+
+    def subscribe_to_candles(
+        self,
+        market_name: str,
+        candle_type: CandleType,
+        interval: CandleInterval,
+        *,
+        gap_callback: Optional[Callable[[StreamGap], None]] = None,
+    ):
         """
         https://api.docs.extended.exchange/#candles-stream
         """
@@ -61,23 +109,35 @@ class PerpetualStreamClient:
                 "interval": interval,
             },
         )
-        return self.__connect(url, WrappedStreamResponse[List[CandleModel]])
+        return self.__connect(
+            url, WrappedStreamResponse[List[CandleModel]], gap_callback=gap_callback, trusted_decoder=decode_candles_msg
+        )
 
-    def subscribe_to_account_updates(self, api_key: str):
+    def subscribe_to_account_updates(self, api_key: str, *, gap_callback: Optional[Callable[[StreamGap], None]] = None):
         """
         https://api.docs.extended.exchange/#account-updates-stream
         """
 
         url = self.__get_url("/account")
-        return self.__connect(url, WrappedStreamResponse[AccountStreamDataModel], api_key)
+        return self.__connect(url, WrappedStreamResponse[AccountStreamDataModel], api_key, gap_callback=gap_callback)
 
     def __get_url(self, path: str, *, query: Optional[Dict[str, str | List[str]]] = None, **path_params) -> str:
         return get_url(f"{self.__api_url}{path}", query=query, **path_params)
 
-    @staticmethod
     def __connect(
+        self,
         stream_url: str,
         msg_model_class: Type[StreamMsgResponseType],
         api_key: Optional[str] = None,
+        *,
+        gap_callback: Optional[Callable[[StreamGap], None]] = None,
+        trusted_decoder: Optional[StreamMsgDecoder] = None,
     ) -> PerpetualStreamConnection[StreamMsgResponseType]:
-        return PerpetualStreamConnection(stream_url, msg_model_class, api_key)
+        return PerpetualStreamConnection(
+            stream_url,
+            msg_model_class,
+            api_key,
+            reconnect_policy=self.__reconnect_policy,
+            gap_callback=gap_callback,
+            msg_decoder=trusted_decoder if self.__trusted_decoding else None,
+        )
@@ -0,0 +1,203 @@
+import asyncio
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Tuple
+
+from x10.perpetual.funding_rates import FundingRateModel
+from x10.perpetual.orderbooks import OrderbookUpdateModel
+from x10.perpetual.stream_client.perpetual_stream_connection import (
+    PerpetualStreamConnection,
+    StreamGap,
+)
+from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
+from x10.perpetual.stream_client.stream_hub import (
+    DEFAULT_MAX_QUEUE_SIZE,
+    EventType,
+    GapCallback,
+    OverflowPolicy,
+    StreamConsumer,
+    StreamConsumerStats,
+)
+from x10.perpetual.trades import PublicTradeModel
+from x10.utils.http import WrappedStreamResponse
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+# Splits a message of the all-markets stream into the events of the markets
+MarketSplitter = Callable[[Any], Iterable[Tuple[str, EventType]]]
+
+
+class MarketStreamDemux(Generic[EventType]):
+    """
+    Shares one all-markets stream between per-market consumers.
+
+    The events of the stream are routed by market to the consumers of the market (every consumer has its own bounded
+    queue, see `StreamConsumer`), the events of markets without consumers are skipped. The connection is opened with
+    the first consumer and closed with the last one. Gaps of the stream are reported to all consumers.
+    """
+
+    __open_stream: Callable[[GapCallback], PerpetualStreamConnection]
+    __split: MarketSplitter
+    __consumers: Dict[str, List[StreamConsumer[EventType]]]
+    __task: Optional[asyncio.Task]
+
+    def __init__(self, open_stream: Callable[[GapCallback], PerpetualStreamConnection], split: MarketSplitter):
+        """
+        :param open_stream: Creates the all-markets stream connection (it receives the gap callback to pass to the
+        `subscribe_to_*` method).
+        :param split: Returns the `(market name, event)` pairs of a message of the stream.
+        """
+
+        super().__init__()
+
+        self.__open_stream = open_stream
+        self.__split = split
+        self.__consumers = {}
+        self.__task = None
+
+    def subscribe(
+        self,
+        market_name: str,
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        gap_callback: Optional[GapCallback] = None,
+        name: Optional[str] = None,
+    ) -> StreamConsumer[EventType]:
+        consumer: StreamConsumer[EventType] = StreamConsumer(
+            market_name,
+            self.__remove_consumer,
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            gap_callback=gap_callback,
+            name=name,
+        )
+        self.__consumers.setdefault(market_name, []).append(consumer)
+
+        if self.__task is None:
+            self.__task = asyncio.get_running_loop().create_task(self.__run_stream())
+
+        return consumer
+
+    def get_consumer_stats(self) -> List[StreamConsumerStats]:
+        return [consumer.stats for consumers in self.__consumers.values() for consumer in consumers]
+
+    async def close(self):
+        task = self.__task
+
+        for consumers in list(self.__consumers.values()):
+            for consumer in list(consumers):
+                consumer.close()
+
+        if task:
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def __run_stream(self):
+        def on_gap(gap: StreamGap):
+            for consumers in self.__consumers.values():
+                for consumer in consumers:
+                    consumer.notify_gap(gap)
+
+        error: Optional[BaseException] = None
+        stream: Optional[PerpetualStreamConnection] = None
+
+        try:
+            stream = connected_stream = await self.__open_stream(on_gap)
+
+            async for msg in connected_stream:
+                for market_name, event in self.__split(msg):
+                    consumers = self.__consumers.get(market_name)
+
+                    if not consumers:
+                        continue
+
+                    # A consumer with `OverflowPolicy.BLOCK` can suspend the loop, consumers may come and go meanwhile
+                    for consumer in list(consumers):
+                        await consumer.put(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER.error("Stream failed: %s", e)
+            error = e
+        finally:
+            if stream is not None and not stream.closed:
+                await stream.close()
+
+            if self.__task is asyncio.current_task():
+                self.__task = None
+                consumers_by_market, self.__consumers = self.__consumers, {}
+
+                for consumers in consumers_by_market.values():
+                    for consumer in consumers:
+                        consumer.finish(error)
+
+    def __remove_consumer(self, consumer: StreamConsumer):
+        market_name = str(consumer.stats.key)
+        consumers = self.__consumers.get(market_name, [])
+
+        if consumer in consumers:
+            consumers.remove(consumer)
+
+        if not consumers:
+            self.__consumers.pop(market_name, None)
+
+        if not self.__consumers and self.__task:
+            self.__task.cancel()
+            self.__task = None
+
+
+def split_by_data_market(msg: WrappedStreamResponse) -> Iterable[Tuple[str, WrappedStreamResponse]]:
+    """
+    Routes the whole message by the `market` of its data (orderbooks, funding rates).
+    """
+
+    if msg.data is None:
+        return ()
+
+    return ((msg.data.market, msg),)
+
+
+def split_public_trades(
+    msg: WrappedStreamResponse[List[PublicTradeModel]],
+) -> Iterable[Tuple[str, WrappedStreamResponse[List[PublicTradeModel]]]]:
+    """
+    Routes the trades by market, a message with the trades of several markets is split into one message per market.
+    """
+
+    if not msg.data:
+        return ()
+
+    market_name = msg.data[0].market
+
+    if all(trade.market == market_name for trade in msg.data):
+        return ((market_name, msg),)
+
+    trades_by_market: Dict[str, List[PublicTradeModel]] = {}
+
+    for trade in msg.data:
+        trades_by_market.setdefault(trade.market, []).append(trade)
+
+    return [(market, msg.model_copy(update={"data": trades})) for market, trades in trades_by_market.items()]
+
+
+def create_orderbooks_demux(
+    stream_client: PerpetualStreamClient,
+) -> MarketStreamDemux[WrappedStreamResponse[OrderbookUpdateModel]]:
+    return MarketStreamDemux(
+        lambda on_gap: stream_client.subscribe_to_orderbooks(gap_callback=on_gap), split_by_data_market
+    )
+
+
+def create_public_trades_demux(
+    stream_client: PerpetualStreamClient,
+) -> MarketStreamDemux[WrappedStreamResponse[List[PublicTradeModel]]]:
+    return MarketStreamDemux(
+        lambda on_gap: stream_client.subscribe_to_public_trades(gap_callback=on_gap), split_public_trades
+    )
+
+
+def create_funding_rates_demux(
+    stream_client: PerpetualStreamClient,
+) -> MarketStreamDemux[WrappedStreamResponse[FundingRateModel]]:
+    return MarketStreamDemux(
+        lambda on_gap: stream_client.subscribe_to_funding_rates(gap_callback=on_gap), split_by_data_market
+    )
@@ -0,0 +1,376 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import (
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from x10.perpetual.accounts import AccountStreamDataModel
+from x10.perpetual.candles import CandleInterval, CandleModel, CandleType
+from x10.perpetual.funding_rates import FundingRateModel
+from x10.perpetual.orderbooks import OrderbookUpdateModel
+from x10.perpetual.stream_client.perpetual_stream_connection import (
+    PerpetualStreamConnection,
+    StreamGap,
+)
+from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
+from x10.perpetual.trades import PublicTradeModel
+from x10.utils.http import WrappedStreamResponse
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+EventType = TypeVar("EventType")
+GapCallback = Callable[[StreamGap], None]
+
+DEFAULT_MAX_QUEUE_SIZE = 1000
+
+
+class OverflowPolicy(Enum):
+    # The stream waits until the consumer catches up (all consumers of the stream are held back)
+    BLOCK = "BLOCK"
+    # The oldest queued event is dropped
+    DROP_OLDEST = "DROP_OLDEST"
+    # Only the latest event is kept, a new event replaces the pending one (whatever `max_queue_size` is)
+    CONFLATE = "CONFLATE"
+
+
+@dataclass
+class StreamConsumerStats:
+    key: Hashable
+    name: Optional[str]
+    received: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    # Number of events waiting in the queue
+    queued: int = 0
+    # Age of the oldest queued event
+    lag_seconds: float = 0
+
+
+class StreamConsumer(Generic[EventType]):
+    """
+    Consumer of a `StreamHub` stream with its own bounded queue. Iterate it to receive the events.
+    """
+
+    __queue: Deque[Tuple[float, EventType]]
+    __max_queue_size: int
+    __overflow_policy: OverflowPolicy
+    __gap_callback: Optional[GapCallback]
+    __stats: StreamConsumerStats
+    __not_empty: asyncio.Event
+    __not_full: asyncio.Event
+    __finished: bool
+    __error: Optional[BaseException]
+    __on_close: Callable[["StreamConsumer"], None]
+
+    def __init__(
+        self,
+        key: Hashable,
+        on_close: Callable[["StreamConsumer"], None],
+        *,
+        max_queue_size: int,
+        overflow_policy: OverflowPolicy,
+        gap_callback: Optional[GapCallback],
+        name: Optional[str],
+    ):
+        super().__init__()
+
+        assert max_queue_size >= 1
+
+        self.__queue = deque()
+        self.__max_queue_size = max_queue_size
+        self.__overflow_policy = overflow_policy
+        self.__gap_callback = gap_callback
+        self.__stats = StreamConsumerStats(key=key, name=name)
+        self.__not_empty = asyncio.Event()
+        self.__not_full = asyncio.Event()
+        self.__finished = False
+        self.__error = None
+        self.__on_close = on_close
+
+    @property
+    def stats(self) -> StreamConsumerStats:
+        self.__stats.queued = len(self.__queue)
+        self.__stats.lag_seconds = time.monotonic() - self.__queue[0][0] if self.__queue else 0
+
+        return self.__stats
+
+    async def put(self, event: EventType):
+        """
+        Called by the hub for every event of the stream.
+        """
+
+        if self.__finished:
+            return
+
+        self.__stats.received += 1
+
+        if self.__overflow_policy == OverflowPolicy.CONFLATE:
+            self.__stats.dropped += len(self.__queue)
+            self.__queue.clear()
+        elif len(self.__queue) >= self.__max_queue_size:
+            if self.__overflow_policy == OverflowPolicy.BLOCK:
+                while len(self.__queue) >= self.__max_queue_size and not self.__finished:
+                    self.__not_full.clear()
+                    await self.__not_full.wait()
+            else:
+                self.__queue.popleft()
+                self.__stats.dropped += 1
+
+        self.__queue.append((time.monotonic(), event))
+        self.__not_empty.set()
+
+    def notify_gap(self, gap: StreamGap):
+        if self.__gap_callback:
+            self.__gap_callback(gap)
+
+    def finish(self, error: Optional[BaseException] = None):
+        """
+        Called by the hub when the stream ends. Queued events are still delivered, then the iteration stops
+        (or `error` is raised).
+        """
+
+        self.__finished = True
+        self.__error = error
+        self.__not_empty.set()
+        self.__not_full.set()
+
+    async def get(self) -> EventType:
+        while not self.__queue:
+            if self.__finished:
+                if self.__error:
+                    raise self.__error
+                raise StopAsyncIteration
+
+            self.__not_empty.clear()
+            await self.__not_empty.wait()
+
+        _, event = self.__queue.popleft()
+        self.__stats.delivered += 1
+        self.__not_full.set()
+
+        return event
+
+    def close(self):
+        self.__queue.clear()
+        self.finish()
+        self.__on_close(self)
+
+    def __aiter__(self) -> AsyncIterator[EventType]:
+        return self
+
+    async def __anext__(self) -> EventType:
+        return await self.get()
+
+
+class StreamHub:
+    """
+    Shares one stream connection per subscription key between any number of consumers.
+
+    Every consumer gets its own bounded queue, so a slow consumer only affects the others if it uses
+    `OverflowPolicy.BLOCK`. The connection is opened with the first consumer of a key and closed with the last one.
+    Use a `PerpetualStreamClient` with a reconnect policy to keep the shared streams alive.
+    """
+
+    __stream_client: PerpetualStreamClient
+    __consumers: Dict[Hashable, List[StreamConsumer]]
+    __tasks: Dict[Hashable, asyncio.Task]
+
+    def __init__(self, stream_client: PerpetualStreamClient):
+        super().__init__()
+
+        self.__stream_client = stream_client
+        self.__consumers = {}
+        self.__tasks = {}
+
+    def subscribe(
+        self,
+        key: Hashable,
+        open_stream: Callable[[GapCallback], PerpetualStreamConnection],
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        gap_callback: Optional[GapCallback] = None,
+        name: Optional[str] = None,
+    ) -> StreamConsumer:
+        """
+        Adds a consumer of the stream identified by `key`. `open_stream` creates the stream connection (it receives
+        the gap callback to pass to the `subscribe_to_*` method) and is only called for the first consumer.
+        """
+
+        consumer: StreamConsumer = StreamConsumer(
+            key,
+            self.__remove_consumer,
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            gap_callback=gap_callback,
+            name=name,
+        )
+        self.__consumers.setdefault(key, []).append(consumer)
+
+        if key not in self.__tasks:
+            self.__tasks[key] = asyncio.get_running_loop().create_task(self.__run_stream(key, open_stream))
+
+        return consumer
+
+    def subscribe_to_orderbooks(
+        self,
+        market_name: Optional[str] = None,
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        gap_callback: Optional[GapCallback] = None,
+        name: Optional[str] = None,
+    ) -> StreamConsumer[WrappedStreamResponse[OrderbookUpdateModel]]:
+        return self.subscribe(
+            ("orderbooks", market_name),
+            lambda on_gap: self.__stream_client.subscribe_to_orderbooks(market_name, gap_callback=on_gap),
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            gap_callback=gap_callback,
+            name=name,
+        )
+
+    def subscribe_to_public_trades(
+        self,
+        market_name: Optional[str] = None,
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        gap_callback: Optional[GapCallback] = None,
+        name: Optional[str] = None,
+    ) -> StreamConsumer[WrappedStreamResponse[List[PublicTradeModel]]]:
+        return self.subscribe(
+            ("publicTrades", market_name),
+            lambda on_gap: self.__stream_client.subscribe_to_public_trades(market_name, gap_callback=on_gap),
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            gap_callback=gap_callback,
+            name=name,
+        )
+
+    def subscribe_to_funding_rates(
+        self,
+        market_name: Optional[str] = None,
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        gap_callback: Optional[GapCallback] = None,
+        name: Optional[str] = None,
+    ) -> StreamConsumer[WrappedStreamResponse[FundingRateModel]]:
+        return self.subscribe(
+            ("funding", market_name),
+            lambda on_gap: self.__stream_client.subscribe_to_funding_rates(market_name, gap_callback=on_gap),
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            gap_callback=gap_callback,
+            name=name,
+        )
+
+    def subscribe_to_candles(
+        self,
+        market_name: str,
+        candle_type: CandleType,
+        interval: CandleInterval,
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        gap_callback: Optional[GapCallback] = None,
+        name: Optional[str] = None,
+    ) -> StreamConsumer[WrappedStreamResponse[List[CandleModel]]]:
+        return self.subscribe(
+            ("candles", market_name, candle_type, interval),
+            lambda on_gap: self.__stream_client.subscribe_to_candles(
+                market_name, candle_type, interval, gap_callback=on_gap
+            ),
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            gap_callback=gap_callback,
+            name=name,
+        )
+
+    def subscribe_to_account_updates(
+        self,
+        api_key: str,
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        gap_callback: Optional[GapCallback] = None,
+        name: Optional[str] = None,
+    ) -> StreamConsumer[WrappedStreamResponse[AccountStreamDataModel]]:
+        return self.subscribe(
+            ("account", api_key),
+            lambda on_gap: self.__stream_client.subscribe_to_account_updates(api_key, gap_callback=on_gap),
+            max_queue_size=max_queue_size,
+            overflow_policy=overflow_policy,
+            gap_callback=gap_callback,
+            name=name,
+        )
+
+    def get_consumer_stats(self) -> List[StreamConsumerStats]:
+        return [consumer.stats for consumers in self.__consumers.values() for consumer in consumers]
+
+    async def close(self):
+        tasks = list(self.__tasks.values())
+
+        for consumers in list(self.__consumers.values()):
+            for consumer in list(consumers):
+                consumer.close()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __run_stream(self, key: Hashable, open_stream: Callable[[GapCallback], PerpetualStreamConnection]):
+        def on_gap(gap: StreamGap):
+            for consumer in self.__consumers.get(key, []):
+                consumer.notify_gap(gap)
+
+        error: Optional[BaseException] = None
+        stream: Optional[PerpetualStreamConnection] = None
+
+        try:
+            stream = connected_stream = await open_stream(on_gap)
+
+            async for event in connected_stream:
+                # A consumer with `OverflowPolicy.BLOCK` can suspend the loop, consumers may come and go meanwhile
+                for consumer in list(self.__consumers.get(key, [])):
+                    await consumer.put(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER.error("Stream %s failed: %s", key, e)
+            error = e
+        finally:
+            if stream is not None and not stream.closed:
+                await stream.close()
+
+            if self.__tasks.get(key) is asyncio.current_task():
+                del self.__tasks[key]
+
+                for consumer in self.__consumers.pop(key, []):
+                    consumer.finish(error)
+
+    def __remove_consumer(self, consumer: StreamConsumer):
+        key = consumer.stats.key
+        consumers = self.__consumers.get(key, [])
+
+        if consumer in consumers:
+            consumers.remove(consumer)
+
+        if not consumers:
+            self.__consumers.pop(key, None)
+            task = self.__tasks.pop(key, None)
+
+            if task:
+                task.cancel()
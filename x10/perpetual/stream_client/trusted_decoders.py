@@ -0,0 +1,173 @@
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional, Set, Type, TypeVar, Union
+
+from pydantic import VERSION as PYDANTIC_VERSION
+from pydantic import BaseModel
+
+from x10.perpetual.candles import CandleModel
+from x10.perpetual.orderbooks import OrderbookQuantityModel, OrderbookUpdateModel
+from x10.perpetual.orders import OrderSide
+from x10.perpetual.trades import PublicTradeModel, TradeType
+from x10.utils.http import StreamDataType, WrappedStreamResponse
+from x10.utils.log import get_logger
+from x10.utils.model import X10BaseModel
+
+LOGGER = get_logger(__name__)
+
+ModelType = TypeVar("ModelType", bound=X10BaseModel)
+StreamMsgData = Union[str, bytes]
+
+OrderbookStreamMsg = WrappedStreamResponse[OrderbookUpdateModel]
+PublicTradesStreamMsg = WrappedStreamResponse[List[PublicTradeModel]]
+CandlesStreamMsg = WrappedStreamResponse[List[CandleModel]]
+
+_STREAM_DATA_TYPES = StreamDataType._value2member_map_
+_ORDER_SIDES = frozenset(side.value for side in OrderSide)
+_TRADE_TYPES = frozenset(trade_type.value for trade_type in TradeType)
+_TRUSTED_DECODING_ERRORS = (KeyError, TypeError, ValueError, AttributeError, InvalidOperation)
+# `json.loads` with arguments creates a decoder on every call
+_JSON_DECODER = json.JSONDecoder(parse_float=Decimal)
+
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+# State of the models set up by `_construct`
+_PYDANTIC_STATE_SLOTS = ("__dict__", "__pydantic_fields_set__", "__pydantic_extra__", "__pydantic_private__")
+
+# Optional fields of `WrappedStreamResponse`, only the ones present in the message are in `model_fields_set`
+_WRAPPED_OPTIONAL_FIELDS = ("type", "data", "error")
+
+
+def _supports_direct_construction() -> bool:
+    # `model_construct` is slower than the validation, so the decoders are only worth it with the direct construction
+    return PYDANTIC_VERSION.startswith("2.") and BaseModel.__slots__ == _PYDANTIC_STATE_SLOTS
+
+
+def _construct(
+    model_class: Type[ModelType], fields: Dict[str, Any], fields_set: Optional[Set[str]] = None
+) -> ModelType:
+    # Same state as `model_construct` sets up (`_PYDANTIC_STATE_SLOTS`, the models are frozen and ignore extra
+    # fields), but without the per-field aliases and defaults lookup, which makes `model_construct` slower than the
+    # validation itself. `fields` has to contain every field of the model and `fields_set` the ones present in the
+    # message (all by default), as `model_validate` would set them. Only used if `_supports_direct_construction`,
+    # `test_trusted_decoders.py` compares the results with validated models.
+    model = _new_object(model_class)
+    _set_attribute(model, "__dict__", fields)
+    _set_attribute(model, "__pydantic_fields_set__", set(fields) if fields_set is None else fields_set)
+    _set_attribute(model, "__pydantic_extra__", None)
+    _set_attribute(model, "__pydantic_private__", None)
+
+    return model
+
+
+def _construct_wrapped(msg_model_class: Type[ModelType], msg: Dict[str, Any], data: Any) -> ModelType:
+    msg_type = msg.get("type")
+
+    if msg_type is not None and msg_type not in _STREAM_DATA_TYPES:
+        msg_type = StreamDataType.UNKNOWN
+
+    fields_set = {"ts", "seq"}
+    fields_set.update(field for field in _WRAPPED_OPTIONAL_FIELDS if field in msg)
+
+    return _construct(
+        msg_model_class,
+        {"type": msg_type, "data": data, "error": msg.get("error"), "ts": int(msg["ts"]), "seq": int(msg["seq"])},
+        fields_set,
+    )
+
+
+def _decode_orderbook_levels(levels: List[Dict[str, Any]]) -> List[OrderbookQuantityModel]:
+    return [
+        _construct(OrderbookQuantityModel, {"qty": Decimal(level["q"]), "price": Decimal(level["p"])})
+        for level in levels
+    ]
+
+
+def _decode_orderbook(data: Dict[str, Any]) -> OrderbookUpdateModel:
+    return _construct(
+        OrderbookUpdateModel,
+        {"market": data["m"], "bid": _decode_orderbook_levels(data["b"]), "ask": _decode_orderbook_levels(data["a"])},
+    )
+
+
+def _decode_public_trade(data: Dict[str, Any]) -> PublicTradeModel:
+    side = data["S"]
+    trade_type = data["tT"]
+
+    if side not in _ORDER_SIDES or trade_type not in _TRADE_TYPES:
+        raise ValueError(f"Unexpected trade side or type: {side}, {trade_type}")
+
+    # Enums are stored by value, same as validated models do (see `use_enum_values` in `X10BaseModel`)
+    return _construct(
+        PublicTradeModel,
+        {
+            "id": int(data["i"]),
+            "market": data["m"],
+            "side": side,
+            "trade_type": trade_type,
+            "timestamp": int(data["T"]),
+            "price": Decimal(data["p"]),
+            "qty": Decimal(data["q"]),
+        },
+    )
+
+
+def _decode_candle(data: Dict[str, Any]) -> CandleModel:
+    volume = data.get("v")
+    fields = {
+        "open": Decimal(data["o"]),
+        "low": Decimal(data["l"]),
+        "high": Decimal(data["h"]),
+        "close": Decimal(data["c"]),
+        "volume": Decimal(volume) if volume is not None else None,
+        "timestamp": int(data["T"]),
+    }
+
+    if "v" in data:
+        return _construct(CandleModel, fields)
+
+    return _construct(CandleModel, fields, {"open", "low", "high", "close", "timestamp"})
+
+
+def _decode_list(
+    decode_item: Callable[[Dict[str, Any]], ModelType]
+) -> Callable[[List[Dict[str, Any]]], List[ModelType]]:
+    return lambda items: [decode_item(item) for item in items]
+
+
+def _create_trusted_decoder(
+    msg_model_class: Type[ModelType], decode_data: Callable[[Any], Any]
+) -> Callable[[StreamMsgData], ModelType]:
+    if not _supports_direct_construction():
+        LOGGER.warning(
+            "Trusted decoding isn't supported with pydantic %s, validating %s messages",
+            PYDANTIC_VERSION,
+            msg_model_class.__name__,
+        )
+
+        return msg_model_class.model_validate_json
+
+    def decode(raw_msg: StreamMsgData) -> ModelType:
+        try:
+            msg = _JSON_DECODER.decode(raw_msg if isinstance(raw_msg, str) else raw_msg.decode())
+            data = msg.get("data")
+
+            return _construct_wrapped(msg_model_class, msg, decode_data(data) if data is not None else None)
+        except _TRUSTED_DECODING_ERRORS as e:
+            # Unexpected message shape: the validation either handles it or raises a descriptive error
+            LOGGER.debug("Trusted decoding failed, validating the message: %s", e)
+
+            return msg_model_class.model_validate_json(raw_msg)
+
+    return decode
+
+
+# Decoders of the high-volume public streams (see `PerpetualStreamClient(trusted_decoding=True)`).
+# The messages are parsed with `json` and the models are built from the known fields directly, skipping the pydantic
+# validation (with a supported pydantic version, otherwise the decoders validate). The result is equal to the validated
+# model. Messages which don't have the expected shape are validated as usual. Small messages (e.g. funding rates) are
+# validated faster than they can be built in Python, so there is no decoder for them (see
+# `examples/stream_decoding_benchmark.py`).
+decode_orderbook_msg = _create_trusted_decoder(OrderbookStreamMsg, _decode_orderbook)
+decode_public_trades_msg = _create_trusted_decoder(PublicTradesStreamMsg, _decode_list(_decode_public_trade))
+decode_candles_msg = _create_trusted_decoder(CandlesStreamMsg, _decode_list(_decode_candle))
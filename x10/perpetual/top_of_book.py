@@ -0,0 +1,325 @@
+import asyncio
+import dataclasses
+import decimal
+import math
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from x10.errors import X10Error
+from x10.perpetual.configuration import EndpointConfig
+from x10.perpetual.markets import TradingConfigModel
+from x10.perpetual.orderbook import OrderBook, OrderBookEngine, SnapshotProvider
+from x10.perpetual.orderbook_manager import OrderBookManager
+from x10.perpetual.orderbooks import OrderbookUpdateModel
+from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
+from x10.perpetual.trading_client.markets_information_module import (
+    MarketsInformationModule,
+)
+from x10.utils.http import WrappedStreamResponse
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+TABLE_MAGIC = 0x78313054_4F420001
+MAX_MARKET_NAME_LENGTH = 32
+
+HEADER_DTYPE = np.dtype([("magic", np.uint64), ("rows_count", np.uint64)], align=True)
+ROW_DTYPE = np.dtype(
+    [
+        # Seqlock counter, odd while the row is being written
+        ("version", np.int64),
+        ("market", f"S{MAX_MARKET_NAME_LENGTH}"),
+        # `seq` and `ts` of the last orderbooks message applied
+        ("seq", np.int64),
+        ("ts", np.int64),
+        ("bid_price", np.float64),
+        ("bid_qty", np.float64),
+        ("ask_price", np.float64),
+        ("ask_qty", np.float64),
+        ("mark_price", np.float64),
+    ],
+    align=True,
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class TopOfBook:
+    market: str
+    seq: int
+    ts: int
+    # `nan` if the side of the book is empty (or the mark price wasn't published yet)
+    bid_price: float
+    bid_qty: float
+    ask_price: float
+    ask_qty: float
+    mark_price: float
+
+
+class TopOfBookTable:
+    """
+    Best bid/ask, sizes and mark price of every market in a fixed-layout shared memory table, for strategy processes
+    which don't run their own streams.
+
+    The table has one writer (see `TopOfBookPublisher`) and any number of reader processes which attach to it by
+    name. Every row is guarded by a seqlock: the writer makes the row version odd while it writes the row, readers
+    copy the row and retry if the version changed meanwhile, so neither side takes a lock and the readers never
+    block the writer. The prices are float64 (the readers get numbers, not `Decimal` objects).
+
+    The seqlock relies on the stores of the writer being seen in order by the readers, which holds on x86-64.
+    """
+
+    __shm: shared_memory.SharedMemory
+    __is_owner: bool
+    __rows: np.ndarray
+    __versions: np.ndarray
+    __indexes: Dict[str, int]
+
+    @staticmethod
+    def create(market_names: List[str], name: Optional[str] = None) -> "TopOfBookTable":
+        for market_name in market_names:
+            if len(market_name.encode()) > MAX_MARKET_NAME_LENGTH:
+                raise ValueError(f"Market name {market_name} is longer than {MAX_MARKET_NAME_LENGTH} bytes")
+
+        shm = shared_memory.SharedMemory(
+            name=name, create=True, size=HEADER_DTYPE.itemsize + ROW_DTYPE.itemsize * len(market_names)
+        )
+        header: np.ndarray = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+        header["rows_count"] = len(market_names)
+        rows: np.ndarray = np.ndarray(
+            (len(market_names),), dtype=ROW_DTYPE, buffer=shm.buf, offset=HEADER_DTYPE.itemsize
+        )
+        rows[:] = np.zeros((), dtype=ROW_DTYPE)
+        rows["market"] = [market_name.encode() for market_name in market_names]
+        for field in ["bid_price", "bid_qty", "ask_price", "ask_qty", "mark_price"]:
+            rows[field] = np.nan
+        # Written last, readers check it before reading the rows
+        header["magic"] = TABLE_MAGIC
+        del header, rows
+
+        return TopOfBookTable(shm, is_owner=True)
+
+    @staticmethod
+    def attach(name: str) -> "TopOfBookTable":
+        shm = shared_memory.SharedMemory(name=name)
+        # The table is unlinked by its owner, not by the resource tracker of a reader process (Python < 3.13 tracks
+        # attached segments too)
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+
+        return TopOfBookTable(shm, is_owner=False)
+
+    def __init__(self, shm: shared_memory.SharedMemory, *, is_owner: bool):
+        """
+        Use `TopOfBookTable.create` or `TopOfBookTable.attach`.
+        """
+
+        super().__init__()
+
+        header: np.ndarray = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+
+        if int(header["magic"]) != TABLE_MAGIC:
+            raise X10Error(f"Shared memory {shm.name} is not a top of book table")
+
+        self.__shm = shm
+        self.__is_owner = is_owner
+        self.__rows = np.ndarray(
+            (int(header["rows_count"]),), dtype=ROW_DTYPE, buffer=shm.buf, offset=HEADER_DTYPE.itemsize
+        )
+        self.__versions = self.__rows["version"]
+        self.__indexes = {market.decode(): index for index, market in enumerate(self.__rows["market"])}
+
+    @property
+    def name(self) -> str:
+        return self.__shm.name
+
+    @property
+    def market_names(self) -> List[str]:
+        return list(self.__indexes)
+
+    def __contains__(self, market_name: str) -> bool:
+        return market_name in self.__indexes
+
+    def write(
+        self,
+        market_name: str,
+        *,
+        seq: int,
+        ts: int,
+        bid_price: float,
+        bid_qty: float,
+        ask_price: float,
+        ask_qty: float,
+    ):
+        """
+        Writes the top of the book of a market (only one process may write to the table).
+        """
+
+        index = self.__indexes[market_name]
+        row = self.__rows[index]
+        version = self.__versions[index]
+
+        self.__versions[index] = version + 1
+        row["seq"] = seq
+        row["ts"] = ts
+        row["bid_price"] = bid_price
+        row["bid_qty"] = bid_qty
+        row["ask_price"] = ask_price
+        row["ask_qty"] = ask_qty
+        self.__versions[index] = version + 2
+
+    def write_mark_price(self, market_name: str, mark_price: float):
+        index = self.__indexes[market_name]
+        version = self.__versions[index]
+
+        self.__versions[index] = version + 1
+        self.__rows[index]["mark_price"] = mark_price
+        self.__versions[index] = version + 2
+
+    def read(self, market_name: str, *, max_retries: int = 10_000) -> TopOfBook:
+        """
+        Returns a consistent copy of the row of a market.
+        """
+
+        index = self.__indexes[market_name]
+        rows = self.__rows
+        versions = self.__versions
+
+        for _ in range(max_retries):
+            version = versions[index]
+
+            if version & 1:
+                continue
+
+            # Copies the row into a tuple of Python numbers
+            _, _, seq, ts, bid_price, bid_qty, ask_price, ask_qty, mark_price = rows[index].item()
+
+            if versions[index] == version:
+                return TopOfBook(
+                    market=market_name,
+                    seq=seq,
+                    ts=ts,
+                    bid_price=bid_price,
+                    bid_qty=bid_qty,
+                    ask_price=ask_price,
+                    ask_qty=ask_qty,
+                    mark_price=mark_price,
+                )
+
+        raise X10Error(f"The {market_name} row is being written for too long (the writer died while writing it?)")
+
+    def read_all(self, *, max_retries: int = 10_000) -> np.ndarray:
+        """
+        Returns a copy of the table (a structured array with `ROW_DTYPE`), every row is consistent.
+        """
+
+        rows = self.__rows
+        versions = self.__versions
+        versions_before = versions.copy()
+        snapshot = rows.copy()
+
+        for _ in range(max_retries):
+            torn = (versions_before & 1).astype(bool) | (versions != versions_before)
+
+            if not torn.any():
+                return snapshot
+
+            # Only the rows written meanwhile are copied again
+            versions_before[torn] = versions[torn]
+            snapshot[torn] = rows[torn]
+
+        raise X10Error("The table rows are being written for too long (the writer died while writing them?)")
+
+    def close(self):
+        del self.__rows, self.__versions
+        self.__shm.close()
+
+        if self.__is_owner:
+            # A reader process forked from the owner shares its resource tracker and unregistered the table
+            resource_tracker.register(self.__shm._name, "shared_memory")  # type: ignore[attr-defined]
+            self.__shm.unlink()
+
+
+class TopOfBookPublisher:
+    """
+    Publishes the top of the books of the markets of a `TopOfBookTable` from one all-markets orderbooks stream
+    (see `OrderBookManager`), and the mark prices with `update_mark_price` or `poll_mark_prices`.
+    """
+
+    __table: TopOfBookTable
+    __manager: OrderBookManager
+
+    def __init__(
+        self,
+        table: TopOfBookTable,
+        endpoint_config: EndpointConfig,
+        *,
+        stream_client: Optional[PerpetualStreamClient] = None,
+        engine: OrderBookEngine = OrderBookEngine.DECIMAL,
+        trading_configs: Optional[Dict[str, TradingConfigModel]] = None,
+        snapshot_provider: Optional[SnapshotProvider] = None,
+    ):
+        super().__init__()
+
+        self.__table = table
+        self.__manager = OrderBookManager(
+            endpoint_config,
+            stream_client=stream_client,
+            engine=engine,
+            trading_configs=trading_configs,
+            snapshot_provider=snapshot_provider,
+            update_callback=self.__publish,
+        )
+
+    @property
+    def table(self) -> TopOfBookTable:
+        return self.__table
+
+    def start(self):
+        for market_name in self.__table.market_names:
+            self.__manager.acquire(market_name)
+
+    def update_mark_price(self, market_name: str, mark_price: decimal.Decimal):
+        self.__table.write_mark_price(market_name, float(mark_price))
+
+    async def poll_mark_prices(self, markets_info: MarketsInformationModule, interval_seconds: float = 1):
+        """
+        Publishes the mark prices of the markets every `interval_seconds`, until cancelled.
+        """
+
+        market_names = self.__table.market_names
+
+        while True:
+            try:
+                markets = await markets_info.get_markets(market_names=market_names)
+
+                for market in markets.data or []:
+                    self.update_mark_price(market.name, market.market_stats.mark_price)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.error("Failed to fetch the mark prices: %s", e)
+
+            await asyncio.sleep(interval_seconds)
+
+    async def close(self):
+        await self.__manager.close()
+
+    def __publish(self, orderbook: OrderBook, event: WrappedStreamResponse[OrderbookUpdateModel]):
+        assert event.data is not None
+
+        if event.data.market not in self.__table:
+            return
+
+        best_bid = orderbook.best_bid()
+        best_ask = orderbook.best_ask()
+
+        self.__table.write(
+            event.data.market,
+            seq=event.seq,
+            ts=event.ts,
+            bid_price=float(best_bid.price) if best_bid else math.nan,
+            bid_qty=float(best_bid.amount) if best_bid else math.nan,
+            ask_price=float(best_ask.price) if best_ask else math.nan,
+            ask_qty=float(best_ask.amount) if best_ask else math.nan,
+        )
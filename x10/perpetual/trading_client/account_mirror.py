@@ -0,0 +1,279 @@
+import asyncio
+import dataclasses
+import time
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+from x10.perpetual.accounts import AccountStreamDataModel
+from x10.perpetual.balances import BalanceModel
+from x10.perpetual.positions import PositionModel, PositionSide
+from x10.perpetual.stream_client.perpetual_stream_connection import (
+    PerpetualStreamConnection,
+    StreamGap,
+)
+from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
+from x10.utils.http import WrappedStreamResponse
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+DEFAULT_MAX_STALENESS_SECONDS = 5
+
+
+@dataclasses.dataclass
+class AccountMirrorStats:
+    # Getter calls served from the mirror
+    hits: int = 0
+    # Getter calls which went to REST (the mirror was not fresh)
+    misses: int = 0
+    events_applied: int = 0
+    seeds: int = 0
+    # Gaps of the stream, the mirror is not served until it is seeded again
+    invalidations: int = 0
+
+
+class AccountStateMirror:
+    """
+    Latest positions (by market) and balance of the account, updated from the account stream and seeded from REST.
+
+    `AccountModule.get_positions` and `AccountModule.get_balance` are served from the mirror while it is fresh (see
+    `AccountModule` `account_mirror`): the account stream of `start` is connected, the mirror was seeded after the
+    last gap of the stream, and the stream sent a message or the mirror was seeded within `max_staleness_seconds`.
+    The account stream only sends changes, so a quiet account makes the mirror stale after `max_staleness_seconds`,
+    the next getter call fetches the data from REST and seeds the mirror again. Without a live stream the mirror is
+    never served, the REST responses alone don't keep it up to date.
+    """
+
+    __max_staleness_seconds: float
+    __clock: Callable[[], float]
+    __positions: Dict[str, PositionModel]
+    __positions_applied_at: Dict[str, float]
+    __balance: Optional[BalanceModel]
+    __positions_synced_at: Optional[float]
+    __balance_synced_at: Optional[float]
+    __invalidated_at: Optional[float]
+    __last_message_at: Optional[float]
+    __stream_live: bool
+    __stats: AccountMirrorStats
+    __stream_task: Optional[asyncio.Task]
+
+    def __init__(
+        self,
+        *,
+        max_staleness_seconds: float = DEFAULT_MAX_STALENESS_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param max_staleness_seconds: How long the mirror is served without a stream message or a REST seed.
+        """
+
+        super().__init__()
+
+        self.__max_staleness_seconds = max_staleness_seconds
+        self.__clock = clock
+        self.__positions = {}
+        self.__positions_applied_at = {}
+        self.__balance = None
+        self.__positions_synced_at = None
+        self.__balance_synced_at = None
+        self.__invalidated_at = None
+        self.__last_message_at = None
+        self.__stream_live = False
+        self.__stats = AccountMirrorStats()
+        self.__stream_task = None
+
+    @property
+    def stats(self) -> AccountMirrorStats:
+        return self.__stats
+
+    @property
+    def is_stream_live(self) -> bool:
+        """
+        `True` while the account stream of `start` is connected, since the last gap or `invalidate`.
+        """
+
+        return self.__stream_live
+
+    @property
+    def positions_staleness_seconds(self) -> Optional[float]:
+        """
+        Seconds since the positions were last known to be up to date, `None` if they are not synced (or the stream is
+        not live).
+        """
+
+        return self.__get_staleness_seconds(self.__positions_synced_at)
+
+    @property
+    def balance_staleness_seconds(self) -> Optional[float]:
+        return self.__get_staleness_seconds(self.__balance_synced_at)
+
+    def now(self) -> float:
+        return self.__clock()
+
+    def get_positions(
+        self, *, market_names: Optional[List[str]] = None, position_side: Optional[PositionSide] = None
+    ) -> Optional[List[PositionModel]]:
+        """
+        Returns the open positions, `None` if the mirror is not fresh.
+        """
+
+        if not self.__is_fresh(self.__positions_synced_at):
+            self.__stats.misses += 1
+            return None
+
+        self.__stats.hits += 1
+        positions = (
+            self.__positions.values()
+            if market_names is None
+            else [self.__positions[market] for market in market_names if market in self.__positions]
+        )
+
+        if position_side is None:
+            return list(positions)
+
+        return [position for position in positions if position.side == position_side.value]
+
+    def get_balance(self) -> Optional[BalanceModel]:
+        """
+        Returns the balance, `None` if the mirror is not fresh (or the account has no balance).
+        """
+
+        if not self.__is_fresh(self.__balance_synced_at) or self.__balance is None:
+            self.__stats.misses += 1
+            return None
+
+        self.__stats.hits += 1
+
+        return self.__balance
+
+    def apply_event(self, event: WrappedStreamResponse[AccountStreamDataModel]):
+        self.__last_message_at = self.__clock()
+        data = event.data
+
+        if data is None:
+            return
+
+        self.__stats.events_applied += 1
+
+        for position in data.positions or []:
+            self.__apply_position(position)
+
+        if data.balance is not None:
+            self.__apply_balance(data.balance)
+
+    def seed_positions(self, positions: List[PositionModel], requested_at: float):
+        """
+        Replaces the positions with all open positions from REST.
+
+        :param requested_at: `now()` before the request was sent, the positions updated by the stream later are kept.
+        """
+
+        self.__stats.seeds += 1
+        markets = {position.market for position in positions}
+
+        for market in list(self.__positions):
+            if market not in markets and self.__positions_applied_at[market] < requested_at:
+                del self.__positions[market]
+
+        for position in positions:
+            # Includes the positions closed by the stream meanwhile
+            if self.__positions_applied_at.get(position.market, requested_at) > requested_at:
+                continue
+
+            self.__apply_position(position)
+
+        self.__positions_synced_at = max(requested_at, self.__positions_synced_at or requested_at)
+
+    def seed_balance(self, balance: BalanceModel, requested_at: float):
+        self.__stats.seeds += 1
+        self.__apply_balance(balance)
+        self.__balance_synced_at = max(requested_at, self.__balance_synced_at or requested_at)
+
+    def on_stream_gap(self, gap: StreamGap):
+        """
+        Gap callback of the account stream.
+        """
+
+        LOGGER.warning("Account stream gap (%s), the account mirror needs a new seed", gap.reason.value)
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        The mirror is not served until the stream delivers messages again and the mirror is seeded again.
+        """
+
+        self.__stats.invalidations += 1
+        self.__invalidated_at = self.__clock()
+        self.__stream_live = False
+
+    def start(self, stream_client: PerpetualStreamClient, api_key: str):
+        """
+        Subscribes to the account stream of `api_key` and applies its messages until `close`.
+        """
+
+        if self.__stream_task is None:
+            self.__stream_task = asyncio.get_running_loop().create_task(self.__run_stream(stream_client, api_key))
+
+    async def close(self):
+        task, self.__stream_task = self.__stream_task, None
+
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def __run_stream(self, stream_client: PerpetualStreamClient, api_key: str):
+        stream: Optional[PerpetualStreamConnection] = None
+
+        try:
+            stream = connected_stream = await stream_client.subscribe_to_account_updates(
+                api_key, gap_callback=self.on_stream_gap
+            )
+            # The seeds requested before the subscription miss the messages sent until then
+            self.__invalidated_at = self.__clock()
+            self.__stream_live = True
+
+            async for event in connected_stream:
+                # The gaps are reported with the first message of the reconnected stream
+                self.__stream_live = True
+                self.apply_event(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER.error("Account stream failed: %s", e)
+        finally:
+            # Nothing updates the mirror anymore
+            self.invalidate()
+
+            if stream is not None and not stream.closed:
+                await stream.close()
+
+    def __apply_position(self, position: PositionModel):
+        known_position = self.__positions.get(position.market)
+
+        if known_position is not None and known_position.updated_at > position.updated_at:
+            return
+
+        if position.size == Decimal(0):
+            self.__positions.pop(position.market, None)
+        else:
+            self.__positions[position.market] = position
+
+        self.__positions_applied_at[position.market] = self.__clock()
+
+    def __apply_balance(self, balance: BalanceModel):
+        if self.__balance is None or self.__balance.updated_time <= balance.updated_time:
+            self.__balance = balance
+
+    def __get_staleness_seconds(self, synced_at: Optional[float]) -> Optional[float]:
+        if not self.__stream_live or synced_at is None:
+            return None
+
+        if self.__invalidated_at is not None and synced_at <= self.__invalidated_at:
+            return None
+
+        return self.__clock() - max(synced_at, self.__last_message_at or synced_at)
+
+    def __is_fresh(self, synced_at: Optional[float]) -> bool:
+        staleness_seconds = self.__get_staleness_seconds(synced_at)
+
+        return staleness_seconds is not None and staleness_seconds <= self.__max_staleness_seconds
@@ -1,38 +1,89 @@
 from decimal import Decimal
-from typing import Callable, List, Optional
+from typing import AsyncIterator, Callable, List, Optional
 
-from x10.perpetual.accounts import AccountLeverage
+from x10.perpetual.accounts import AccountLeverage, StarkPerpetualAccount
 from x10.perpetual.assets import (
     AssetOperationModel,
     AssetOperationStatus,
     AssetOperationType,
 )
 from x10.perpetual.balances import BalanceModel
+from x10.perpetual.configuration import EndpointConfig
 from x10.perpetual.contract import call_stark_perpetual_deposit
 from x10.perpetual.fees import TradingFeeModel
 from x10.perpetual.orders import OpenOrderModel, OrderSide, OrderType
 from x10.perpetual.positions import PositionHistoryModel, PositionModel, PositionSide
 from x10.perpetual.trades import AccountTradeModel, TradeType
+from x10.perpetual.trading_client.account_mirror import AccountStateMirror
 from x10.perpetual.trading_client.base_module import BaseModule
 from x10.perpetual.transfer_object import create_transfer_object
 from x10.perpetual.withdrawal_object import create_withdrawal_object
+from x10.utils.cache import SingleFlight
 from x10.utils.http import (
+    ClientSessionProvider,
+    ResponseStatus,
     WrappedApiResponse,
+    iterate_pages,
     send_get_request,
     send_patch_request,
     send_post_request,
 )
 from x10.utils.model import EmptyModel
+from x10.utils.rate_limit import RequestScheduler
 
 
 class AccountModule(BaseModule):
+    __account_mirror: Optional[AccountStateMirror]
+    __mirror_seeds: SingleFlight[str, WrappedApiResponse]
+
+    def __init__(
+        self,
+        endpoint_config: EndpointConfig,
+        *,
+        api_key: Optional[str] = None,
+        stark_account: Optional[StarkPerpetualAccount] = None,
+        session_provider: Optional[ClientSessionProvider] = None,
+        request_scheduler: Optional[RequestScheduler] = None,
+        account_mirror: Optional[AccountStateMirror] = None,
+    ):
+        """
+        :param account_mirror: Serves `get_positions` and `get_balance` while it is fresh, the REST responses seed
+        it otherwise (the positions are then fetched for all markets and filtered locally).
+        """
+
+        super().__init__(
+            endpoint_config,
+            api_key=api_key,
+            stark_account=stark_account,
+            session_provider=session_provider,
+            request_scheduler=request_scheduler,
+        )
+
+        self.__account_mirror = account_mirror
+        self.__mirror_seeds = SingleFlight()
+
+    @property
+    def account_mirror(self) -> Optional[AccountStateMirror]:
+        return self.__account_mirror
+
     async def get_balance(self) -> WrappedApiResponse[BalanceModel]:
         """
         https://api.docs.extended.exchange/#get-balance
         """
 
-        url = self._get_url("/user/balance")
-        return await send_get_request(await self.get_session(), url, BalanceModel, api_key=self._get_api_key())
+        mirror = self.__account_mirror
+
+        if mirror is None:
+            return await self.__fetch_balance()
+
+        balance = mirror.get_balance()
+
+        if balance is not None:
+            return WrappedApiResponse[BalanceModel].model_construct(
+                status=ResponseStatus.OK.value, data=balance  # type: ignore[arg-type]
+            )
+
+        return await self.__mirror_seeds.run("balance", lambda: self.__seed_balance(mirror))
 
     async def get_positions(
         self, *, market_names: Optional[List[str]] = None, position_side: Optional[PositionSide] = None
@@ -41,8 +92,65 @@ class AccountModule(BaseModule):
         https://api.docs.extended.exchange/#get-positions
         """
 
+        mirror = self.__account_mirror
+
+        if mirror is None:
+            return await self.__fetch_positions(market_names=market_names, position_side=position_side)
+
+        positions = mirror.get_positions(market_names=market_names, position_side=position_side)
+
+        if positions is None:
+            response = await self.__mirror_seeds.run("positions", lambda: self.__seed_positions(mirror))
+            positions = [
+                position
+                for position in response.data or []
+                if (market_names is None or position.market in market_names)
+                and (position_side is None or position.side == position_side.value)
+            ]
+
+        return WrappedApiResponse[List[PositionModel]].model_construct(
+            status=ResponseStatus.OK.value, data=positions  # type: ignore[arg-type]
+        )
+
+    async def __fetch_balance(self) -> WrappedApiResponse[BalanceModel]:
+        url = self._get_url("/user/balance")
+        return await send_get_request(
+            await self.get_session(),
+            url,
+            BalanceModel,
+            api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
+        )
+
+    async def __fetch_positions(
+        self, *, market_names: Optional[List[str]] = None, position_side: Optional[PositionSide] = None
+    ) -> WrappedApiResponse[List[PositionModel]]:
         url = self._get_url("/user/positions", query={"market": market_names, "side": position_side})
-        return await send_get_request(await self.get_session(), url, List[PositionModel], api_key=self._get_api_key())
+        return await send_get_request(
+            await self.get_session(),
+            url,
+            List[PositionModel],
+            api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
+        )
+
+    async def __seed_balance(self, mirror: AccountStateMirror) -> WrappedApiResponse[BalanceModel]:
+        requested_at = mirror.now()
+        response = await self.__fetch_balance()
+
+        if response.data is not None:
+            mirror.seed_balance(response.data, requested_at)
+
+        return response
+
+    async def __seed_positions(self, mirror: AccountStateMirror) -> WrappedApiResponse[List[PositionModel]]:
+        requested_at = mirror.now()
+        response = await self.__fetch_positions()
+
+        if response.data is not None:
+            mirror.seed_positions(response.data, requested_at)
+
+        return response
 
     async def get_positions_history(
         self,
@@ -60,7 +168,26 @@ class AccountModule(BaseModule):
             query={"market": market_names, "side": position_side, "cursor": cursor, "limit": limit},
         )
         return await send_get_request(
-            await self.get_session(), url, List[PositionHistoryModel], api_key=self._get_api_key()
+            await self.get_session(),
+            url,
+            List[PositionHistoryModel],
+            api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
+        )
+
+    def iter_positions_history(
+        self,
+        market_names: Optional[List[str]] = None,
+        position_side: Optional[PositionSide] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[PositionHistoryModel]:
+        """
+        Iterates over all pages of `get_positions_history`, prefetching the next page while the current one
+        is being consumed.
+        """
+
+        return iterate_pages(
+            lambda cursor: self.get_positions_history(market_names, position_side, cursor=cursor, limit=limit)
         )
 
     async def get_open_orders(
@@ -77,7 +204,13 @@ class AccountModule(BaseModule):
             "/user/orders",
             query={"market": market_names, "type": order_type, "side": order_side},
         )
-        return await send_get_request(await self.get_session(), url, List[OpenOrderModel], api_key=self._get_api_key())
+        return await send_get_request(
+            await self.get_session(),
+            url,
+            List[OpenOrderModel],
+            api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
+        )
 
     async def get_orders_history(
         self,
@@ -95,7 +228,29 @@ class AccountModule(BaseModule):
             "/user/orders/history",
             query={"market": market_names, "type": order_type, "side": order_side, "cursor": cursor, "limit": limit},
         )
-        return await send_get_request(await self.get_session(), url, List[OpenOrderModel], api_key=self._get_api_key())
+        return await send_get_request(
+            await self.get_session(),
+            url,
+            List[OpenOrderModel],
+            api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
+        )
+
+    def iter_orders_history(
+        self,
+        market_names: Optional[List[str]] = None,
+        order_type: Optional[OrderType] = None,
+        order_side: Optional[OrderSide] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[OpenOrderModel]:
+        """
+        Iterates over all pages of `get_orders_history`, prefetching the next page while the current one
+        is being consumed.
+        """
+
+        return iterate_pages(
+            lambda cursor: self.get_orders_history(market_names, order_type, order_side, cursor=cursor, limit=limit)
+        )
 
     async def get_trades(
         self,
@@ -113,7 +268,11 @@ class AccountModule(BaseModule):
         )
 
         return await send_get_request(
-            await self.get_session(), url, List[AccountTradeModel], api_key=self._get_api_key()
+            await self.get_session(),
+            url,
+            List[AccountTradeModel],
+            api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
         )
 
     async def get_fees(self, *, market_names: List[str]) -> WrappedApiResponse[List[TradingFeeModel]]:
@@ -122,7 +281,13 @@ class AccountModule(BaseModule):
         """
 
         url = self._get_url("/user/fees", query={"market": market_names})
-        return await send_get_request(await self.get_session(), url, List[TradingFeeModel], api_key=self._get_api_key())
+        return await send_get_request(
+            await self.get_session(),
+            url,
+            List[TradingFeeModel],
+            api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
+        )
 
     async def get_leverage(self, market_names: List[str]) -> WrappedApiResponse[List[AccountLeverage]]:
         """
@@ -130,7 +295,13 @@ class AccountModule(BaseModule):
         """
 
         url = self._get_url("/user/leverage", query={"market": market_names})
-        return await send_get_request(await self.get_session(), url, List[AccountLeverage], api_key=self._get_api_key())
+        return await send_get_request(
+            await self.get_session(),
+            url,
+            List[AccountLeverage],
+            api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
+        )
 
     async def update_leverage(self, market_name: str, leverage: Decimal) -> WrappedApiResponse[EmptyModel]:
         """
@@ -145,6 +316,7 @@ class AccountModule(BaseModule):
             EmptyModel,
             json=request_model.to_api_request_json(),
             api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
         )
 
     async def transfer(
@@ -172,6 +344,7 @@ class AccountModule(BaseModule):
             EmptyModel,
             json=request_model.to_api_request_json(),
             api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
         )
 
     async def slow_withdrawal(
@@ -194,6 +367,7 @@ class AccountModule(BaseModule):
             int,
             json=payload,
             api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
         )
 
     async def asset_operations(
@@ -219,7 +393,30 @@ class AccountModule(BaseModule):
             },
         )
         return await send_get_request(
-            await self.get_session(), url, List[AssetOperationModel], api_key=self._get_api_key()
+            await self.get_session(),
+            url,
+            List[AssetOperationModel],
+            api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
+        )
+
+    def iter_asset_operations(
+        self,
+        operations_type: Optional[List[AssetOperationType]] = None,
+        operations_status: Optional[List[AssetOperationStatus]] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[AssetOperationModel]:
+        """
+        Iterates over all pages of `asset_operations`, prefetching the next page while the current one
+        is being consumed.
+        """
+
+        return iterate_pages(
+            lambda cursor: self.asset_operations(
+                operations_type, operations_status, start_time, end_time, cursor=cursor, limit=limit
+            )
         )
 
     async def deposit(self, amount: Decimal, get_eth_private_key: Callable[[], str]) -> str:
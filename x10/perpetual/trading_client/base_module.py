@@ -5,14 +5,16 @@ import aiohttp
 from x10.errors import X10Error
 from x10.perpetual.accounts import StarkPerpetualAccount
 from x10.perpetual.configuration import EndpointConfig
-from x10.utils.http import CLIENT_TIMEOUT, get_url
+from x10.utils.http import ClientSessionProvider, get_url
+from x10.utils.rate_limit import RequestScheduler
 
 
 class BaseModule:
     __endpoint_config: EndpointConfig
     __api_key: Optional[str]
     __stark_account: Optional[StarkPerpetualAccount]
-    __session: Optional[aiohttp.ClientSession]
+    __session_provider: ClientSessionProvider
+    __request_scheduler: Optional[RequestScheduler]
 
     def __init__(
         self,
@@ -20,12 +22,15 @@ class BaseModule:
         *,
         api_key: Optional[str] = None,
         stark_account: Optional[StarkPerpetualAccount] = None,
+        session_provider: Optional[ClientSessionProvider] = None,
+        request_scheduler: Optional[RequestScheduler] = None,
     ):
         super().__init__()
         self.__endpoint_config = endpoint_config
         self.__api_key = api_key
         self.__stark_account = stark_account
-        self.__session = None
+        self.__session_provider = session_provider or ClientSessionProvider()
+        self.__request_scheduler = request_scheduler
 
     def _get_url(self, path: str, *, query: Optional[Dict] = None, **path_params) -> str:
         return get_url(f"{self.__endpoint_config.api_base_url}{path}", query=query, **path_params)
@@ -45,14 +50,11 @@ class BaseModule:
 
         return self.__stark_account
 
-    async def get_session(self) -> aiohttp.ClientSession:
-        if self.__session is None:
-            created_session = aiohttp.ClientSession(timeout=CLIENT_TIMEOUT)
-            self.__session = created_session
+    def _get_request_scheduler(self) -> Optional[RequestScheduler]:
+        return self.__request_scheduler
 
-        return self.__session
+    async def get_session(self) -> aiohttp.ClientSession:
+        return await self.__session_provider.get_session()
 
     async def close_session(self):
-        if self.__session:
-            await self.__session.close()
-            self.__session = None
+        await self.__session_provider.close()
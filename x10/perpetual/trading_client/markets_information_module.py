@@ -17,7 +17,9 @@ class MarketsInformationModule(BaseModule):
         """
 
         url = self._get_url("/info/markets", query={"market": market_names})
-        return await send_get_request(await self.get_session(), url, List[MarketModel])
+        return await send_get_request(
+            await self.get_session(), url, List[MarketModel], request_scheduler=self._get_request_scheduler()
+        )
 
     async def get_market_statistics(self, *, market_name: str):
         """
@@ -25,7 +27,9 @@ class MarketsInformationModule(BaseModule):
         """
 
         url = self._get_url("/info/markets/<market>/stats", market=market_name)
-        return await send_get_request(await self.get_session(), url, MarketStatsModel)
+        return await send_get_request(
+            await self.get_session(), url, MarketStatsModel, request_scheduler=self._get_request_scheduler()
+        )
 
     async def get_candles_history(
         self,
@@ -50,7 +54,9 @@ class MarketsInformationModule(BaseModule):
                 "endTime": to_epoch_millis(end_time) if end_time else None,
             },
         )
-        return await send_get_request(await self.get_session(), url, List[CandleModel])
+        return await send_get_request(
+            await self.get_session(), url, List[CandleModel], request_scheduler=self._get_request_scheduler()
+        )
 
     async def get_funding_rates_history(self, *, market_name: str, start_time: datetime, end_time: datetime):
         """
@@ -65,7 +71,9 @@ class MarketsInformationModule(BaseModule):
                 "endTime": to_epoch_millis(end_time),
             },
         )
-        return await send_get_request(await self.get_session(), url, List[FundingRateModel])
+        return await send_get_request(
+            await self.get_session(), url, List[FundingRateModel], request_scheduler=self._get_request_scheduler()
+        )
 
     async def get_orderbook_snapshot(self, *, market_name: str):
         """
@@ -73,4 +81,6 @@ class MarketsInformationModule(BaseModule):
         """
 
         url = self._get_url("/info/markets/<market>/orderbook", market=market_name)
-        return await send_get_request(await self.get_session(), url, OrderbookUpdateModel)
+        return await send_get_request(
+            await self.get_session(), url, OrderbookUpdateModel, request_scheduler=self._get_request_scheduler()
+        )
@@ -0,0 +1,126 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from x10.perpetual.accounts import AccountLeverage
+from x10.perpetual.fees import TradingFeeModel
+from x10.perpetual.markets import MarketModel
+from x10.perpetual.trading_client.account_module import AccountModule
+from x10.perpetual.trading_client.markets_information_module import (
+    MarketsInformationModule,
+)
+from x10.utils.cache import TtlCache
+from x10.utils.http import WrappedApiResponse
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+DEFAULT_METADATA_TTL_SECONDS = 300
+
+MarketNamesKey = Optional[Tuple[str, ...]]
+
+
+def _to_key(market_names: Optional[List[str]]) -> MarketNamesKey:
+    return tuple(sorted(market_names)) if market_names is not None else None
+
+
+def _to_market_names(key: MarketNamesKey) -> Optional[List[str]]:
+    return list(key) if key is not None else None
+
+
+class MarketMetadataCache:
+    """
+    TTL cache for rarely changing market metadata: markets, trading fees and leverage.
+
+    Concurrent lookups of the same data share one request. Cached leverage has to be invalidated
+    (see `invalidate_leverage`) after it is changed via `AccountModule.update_leverage`.
+    """
+
+    __markets_cache: TtlCache[MarketNamesKey, WrappedApiResponse[List[MarketModel]]]
+    __fees_cache: TtlCache[MarketNamesKey, WrappedApiResponse[List[TradingFeeModel]]]
+    __leverage_cache: TtlCache[MarketNamesKey, WrappedApiResponse[List[AccountLeverage]]]
+    __markets_by_name: Tuple[Optional[WrappedApiResponse[List[MarketModel]]], Dict[str, MarketModel]]
+    __refresh_task: Optional[asyncio.Task]
+
+    def __init__(
+        self,
+        markets_info_module: MarketsInformationModule,
+        account_module: AccountModule,
+        *,
+        ttl_seconds: float = DEFAULT_METADATA_TTL_SECONDS,
+    ):
+        super().__init__()
+
+        self.__markets_cache = TtlCache(
+            lambda key: markets_info_module.get_markets(market_names=_to_market_names(key)), ttl_seconds
+        )
+        self.__fees_cache = TtlCache(
+            lambda key: account_module.get_fees(market_names=_to_market_names(key) or []), ttl_seconds
+        )
+        self.__leverage_cache = TtlCache(
+            lambda key: account_module.get_leverage(_to_market_names(key) or []), ttl_seconds
+        )
+        self.__markets_by_name = (None, {})
+        self.__refresh_task = None
+
+    async def get_markets(self, *, market_names: Optional[List[str]] = None) -> WrappedApiResponse[List[MarketModel]]:
+        return await self.__markets_cache.get(_to_key(market_names))
+
+    async def get_markets_by_name(self) -> Dict[str, MarketModel]:
+        markets = await self.get_markets()
+        cached_markets, markets_by_name = self.__markets_by_name
+
+        if cached_markets is not markets:
+            markets_by_name = {market.name: market for market in markets.data or []}
+            self.__markets_by_name = (markets, markets_by_name)
+
+        return markets_by_name
+
+    async def get_fees(self, *, market_names: List[str]) -> WrappedApiResponse[List[TradingFeeModel]]:
+        return await self.__fees_cache.get(_to_key(market_names))
+
+    async def get_leverage(self, market_names: List[str]) -> WrappedApiResponse[List[AccountLeverage]]:
+        return await self.__leverage_cache.get(_to_key(market_names))
+
+    def invalidate_markets(self):
+        self.__markets_cache.clear()
+
+    def invalidate_fees(self):
+        self.__fees_cache.clear()
+
+    def invalidate_leverage(self):
+        self.__leverage_cache.clear()
+
+    def invalidate(self):
+        self.invalidate_markets()
+        self.invalidate_fees()
+        self.invalidate_leverage()
+
+    async def refresh(self):
+        await asyncio.gather(
+            self.__markets_cache.refresh(), self.__fees_cache.refresh(), self.__leverage_cache.refresh()
+        )
+
+    def start_background_refresh(self, interval_seconds: float) -> asyncio.Task:
+        """
+        Periodically reloads all cached metadata, so that lookups on the hot path never wait for a reload.
+        Use an interval shorter than the TTL.
+        """
+
+        async def refresh_loop():
+            while True:
+                await asyncio.sleep(interval_seconds)
+
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    LOGGER.warning("Failed to refresh market metadata: %s", e)
+
+        self.stop_background_refresh()
+        self.__refresh_task = asyncio.get_running_loop().create_task(refresh_loop())
+
+        return self.__refresh_task
+
+    def stop_background_refresh(self):
+        if self.__refresh_task:
+            self.__refresh_task.cancel()
+            self.__refresh_task = None
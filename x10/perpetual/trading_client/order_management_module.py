@@ -1,5 +1,7 @@
+from functools import partial
 from typing import List, Optional
 
+from x10.perpetual.order_trace import OrderStage, OrderTrace
 from x10.perpetual.orders import PerpetualOrderModel, PlacedOrderModel
 from x10.perpetual.trading_client.base_module import BaseModule
 from x10.utils.http import send_delete_request, send_post_request
@@ -17,24 +19,36 @@ class _MassCancelRequestModel(X10BaseModel):
 
 
 class OrderManagementModule(BaseModule):
-    async def place_order(self, order: PerpetualOrderModel):
+    async def place_order(self, order: PerpetualOrderModel, *, trace: Optional[OrderTrace] = None):
         """
         Placed new order on the exchange.
 
         :param order: Order object created by `create_order_object` method.
+        :param trace: Receives the times of the serialization, the request and the response (see `OrderTracer`).
 
         https://api.docs.extended.exchange/#create-order
         """
         LOGGER.debug("Placing an order: id=%s", order.id)
 
         url = self._get_url("/user/order")
+        body = order.to_api_request_body()
+
+        if trace:
+            trace.mark(OrderStage.SERIALIZED)
+
         response = await send_post_request(
             await self.get_session(),
             url,
             PlacedOrderModel,
-            json=order.to_api_request_json(),
+            data=body,
             api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
+            request_sent_callback=partial(trace.mark, OrderStage.REQUEST_SENT) if trace else None,
         )
+
+        if trace:
+            trace.mark(OrderStage.RESPONSE_RECEIVED)
+
         return response
 
     async def cancel_order(self, order_id: int):
@@ -43,7 +57,13 @@ class OrderManagementModule(BaseModule):
         """
 
         url = self._get_url("/user/order/<order_id>", order_id=order_id)
-        return await send_delete_request(await self.get_session(), url, EmptyModel, api_key=self._get_api_key())
+        return await send_delete_request(
+            await self.get_session(),
+            url,
+            EmptyModel,
+            api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
+        )
 
     async def cancel_order_by_external_id(self, order_external_id: str):
         """
@@ -51,7 +71,13 @@ class OrderManagementModule(BaseModule):
         """
 
         url = self._get_url("/user/order", query={"externalId": order_external_id})
-        return await send_delete_request(await self.get_session(), url, EmptyModel, api_key=self._get_api_key())
+        return await send_delete_request(
+            await self.get_session(),
+            url,
+            EmptyModel,
+            api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
+        )
 
     async def mass_cancel(
         self,
@@ -78,4 +104,5 @@ class OrderManagementModule(BaseModule):
             EmptyModel,
             json=request_model.to_api_request_json(exclude_none=True),
             api_key=self._get_api_key(),
+            request_scheduler=self._get_request_scheduler(),
         )
@@ -4,22 +4,35 @@ from typing import Dict, Optional
 
 from x10.perpetual.accounts import StarkPerpetualAccount
 from x10.perpetual.configuration import EndpointConfig
+from x10.perpetual.fees import DEFAULT_FEES
 from x10.perpetual.markets import MarketModel
-from x10.perpetual.order_object import create_order_object
+from x10.perpetual.order_factory import MarketOrderFactory
+from x10.perpetual.order_trace import OrderTrace
 from x10.perpetual.orders import (
     OrderSide,
     PlacedOrderModel,
     SelfTradeProtectionLevel,
     TimeInForce,
 )
+from x10.perpetual.trading_client.account_mirror import AccountStateMirror
 from x10.perpetual.trading_client.account_module import AccountModule
 from x10.perpetual.trading_client.info_module import InfoModule
 from x10.perpetual.trading_client.markets_information_module import (
     MarketsInformationModule,
 )
+from x10.perpetual.trading_client.metadata_cache import (
+    DEFAULT_METADATA_TTL_SECONDS,
+    MarketMetadataCache,
+)
 from x10.perpetual.trading_client.order_management_module import OrderManagementModule
-from x10.utils.http import WrappedApiResponse
+from x10.utils.http import (
+    DEFAULT_CONNECTION_POOL_CONFIG,
+    ClientSessionProvider,
+    ConnectionPoolConfig,
+    WrappedApiResponse,
+)
 from x10.utils.log import get_logger
+from x10.utils.rate_limit import RequestScheduler
 
 LOGGER = get_logger(__name__)
 
@@ -29,13 +42,15 @@ class PerpetualTradingClient:
     X10 Perpetual Trading Client for the X10 REST API v1.
     """
 
-    __markets: Dict[str, MarketModel] | None
     __stark_account: StarkPerpetualAccount
+    __session_provider: ClientSessionProvider
 
     __info_module: InfoModule
     __markets_info_module: MarketsInformationModule
     __account_module: AccountModule
     __order_management_module: OrderManagementModule
+    __metadata_cache: MarketMetadataCache
+    __order_factories: Dict[str, MarketOrderFactory]
 
     async def place_order(
         self,
@@ -48,21 +63,22 @@ class PerpetualTradingClient:
         expire_time: Optional[datetime] = None,
         time_in_force: TimeInForce = TimeInForce.GTT,
         self_trade_protection_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT,
+        trace: Optional[OrderTrace] = None,
     ) -> WrappedApiResponse[PlacedOrderModel]:
+        """
+        :param trace: Receives the times of the order creation stages and of the request (see `OrderTracer`).
+        """
+
         if not self.__stark_account:
             raise ValueError("Stark account is not set")
 
-        if not self.__markets:
-            markets = await self.__markets_info_module.get_markets()
-            self.__markets = {m.name: m for m in markets.data}
+        markets = await self.__metadata_cache.get_markets_by_name()
 
-        market = self.__markets.get(market_name)
+        market = markets.get(market_name)
         if not market:
             raise ValueError(f"Market {market_name} not found")
 
-        order = create_order_object(
-            self.__stark_account,
-            market,
+        order = self.__get_order_factory(market).create_order(
             amount_of_synthetic,
             price,
             side,
@@ -71,27 +87,81 @@ class PerpetualTradingClient:
             expire_time,
             time_in_force=time_in_force,
             self_trade_protection_level=self_trade_protection_level,
+            trace=trace,
         )
 
-        return await self.__order_management_module.place_order(order)
+        return await self.__order_management_module.place_order(order, trace=trace)
+
+    def __get_order_factory(self, market: MarketModel) -> MarketOrderFactory:
+        fees = self.__stark_account.trading_fee.get(market.name, DEFAULT_FEES)
+        factory = self.__order_factories.get(market.name)
+
+        # Markets are re-fetched when the metadata cache expires, fees can be updated on the account.
+        # Identity checks are enough: the cache returns the same objects until the next reload.
+        if factory is None or factory.market is not market or factory.fees is not fees:
+            factory = MarketOrderFactory(self.__stark_account, market, fees)
+            self.__order_factories[market.name] = factory
+
+        return factory
 
     async def close(self):
-        await self.__markets_info_module.close_session()
-        await self.__account_module.close_session()
-        await self.__order_management_module.close_session()
+        self.__metadata_cache.stop_background_refresh()
+        # All modules share one session, so it is enough to close it once
+        await self.__session_provider.close()
 
-    def __init__(self, endpoint_config: EndpointConfig, stark_account: StarkPerpetualAccount | None = None):
-        api_key = stark_account.api_key if stark_account else None
+    def __init__(
+        self,
+        endpoint_config: EndpointConfig,
+        stark_account: StarkPerpetualAccount | None = None,
+        *,
+        connection_pool_config: ConnectionPoolConfig = DEFAULT_CONNECTION_POOL_CONFIG,
+        request_scheduler: Optional[RequestScheduler] = None,
+        metadata_ttl_seconds: float = DEFAULT_METADATA_TTL_SECONDS,
+        account_mirror: Optional[AccountStateMirror] = None,
+    ):
+        """
+        :param connection_pool_config: Settings of the HTTP connection pool shared by all modules.
+        :param request_scheduler: Optional client-side rate limiter all REST requests go through.
+        :param metadata_ttl_seconds: How long markets, fees and leverage are kept in `metadata_cache`.
+        :param account_mirror: Opt-in stream-backed mirror serving `account.get_positions` and `account.get_balance`
+        while it is fresh (see `AccountStateMirror`, its stream is started with `AccountStateMirror.start`).
+        """
 
-        self.__markets = None
+        api_key = stark_account.api_key if stark_account else None
 
         if stark_account:
             self.__stark_account = stark_account
 
-        self.__info_module = InfoModule(endpoint_config)
-        self.__markets_info_module = MarketsInformationModule(endpoint_config, api_key=api_key)
-        self.__account_module = AccountModule(endpoint_config, api_key=api_key, stark_account=stark_account)
-        self.__order_management_module = OrderManagementModule(endpoint_config, api_key=api_key)
+        self.__session_provider = ClientSessionProvider(connection_pool_config)
+        self.__info_module = InfoModule(
+            endpoint_config,
+            session_provider=self.__session_provider,
+            request_scheduler=request_scheduler,
+        )
+        self.__markets_info_module = MarketsInformationModule(
+            endpoint_config,
+            api_key=api_key,
+            session_provider=self.__session_provider,
+            request_scheduler=request_scheduler,
+        )
+        self.__account_module = AccountModule(
+            endpoint_config,
+            api_key=api_key,
+            stark_account=stark_account,
+            session_provider=self.__session_provider,
+            request_scheduler=request_scheduler,
+            account_mirror=account_mirror,
+        )
+        self.__order_management_module = OrderManagementModule(
+            endpoint_config,
+            api_key=api_key,
+            session_provider=self.__session_provider,
+            request_scheduler=request_scheduler,
+        )
+        self.__metadata_cache = MarketMetadataCache(
+            self.__markets_info_module, self.__account_module, ttl_seconds=metadata_ttl_seconds
+        )
+        self.__order_factories = {}
 
     @property
     def info(self):
@@ -108,3 +178,7 @@ class PerpetualTradingClient:
     @property
     def orders(self):
         return self.__order_management_module
+
+    @property
+    def metadata_cache(self):
+        return self.__metadata_cache
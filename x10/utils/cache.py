@@ -0,0 +1,104 @@
+import asyncio
+import time
+from functools import partial
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+
+class SingleFlight(Generic[KeyType, ValueType]):
+    """
+    Coalesces concurrent calls with the same key: only the first caller runs the factory, the others
+    await its result. Cancelling one of the callers doesn't cancel the shared call.
+    """
+
+    __in_flight: Dict[KeyType, asyncio.Future]
+
+    def __init__(self):
+        super().__init__()
+
+        self.__in_flight = {}
+
+    @property
+    def in_flight_count(self):
+        return len(self.__in_flight)
+
+    async def run(self, key: KeyType, factory: Callable[[], Awaitable[ValueType]]) -> ValueType:
+        future = self.__in_flight.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self.__in_flight[key] = future
+            future.add_done_callback(partial(self.__on_done, key))
+
+        return await asyncio.shield(future)
+
+    def __on_done(self, key: KeyType, future: asyncio.Future):
+        if self.__in_flight.get(key) is future:
+            del self.__in_flight[key]
+
+        # Mark the exception as retrieved, callers which are still waiting get it via `shield`
+        if not future.cancelled():
+            future.exception()
+
+
+class TtlCache(Generic[KeyType, ValueType]):
+    """
+    Async read-through cache. Values expire `ttl_seconds` after they were loaded, concurrent loads of the same
+    key are coalesced.
+    """
+
+    __loader: Callable[[KeyType], Awaitable[ValueType]]
+    __ttl_seconds: float
+    __entries: Dict[KeyType, Tuple[float, ValueType]]
+    __single_flight: SingleFlight[KeyType, ValueType]
+    __generation: int
+
+    def __init__(
+        self,
+        loader: Callable[[KeyType], Awaitable[ValueType]],
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+
+        self.__loader = loader
+        self.__ttl_seconds = ttl_seconds
+        self.__clock = clock
+        self.__entries = {}
+        self.__single_flight = SingleFlight()
+        self.__generation = 0
+
+    async def get(self, key: KeyType) -> ValueType:
+        entry = self.__entries.get(key)
+
+        if entry is not None and self.__clock() - entry[0] < self.__ttl_seconds:
+            return entry[1]
+
+        return await self.__single_flight.run(key, partial(self.__load, key))
+
+    async def refresh(self):
+        """
+        Reloads all cached keys.
+        """
+
+        await asyncio.gather(*[self.__load(key) for key in list(self.__entries)])
+
+    def invalidate(self, key: KeyType):
+        self.__generation += 1
+        self.__entries.pop(key, None)
+
+    def clear(self):
+        self.__generation += 1
+        self.__entries.clear()
+
+    async def __load(self, key: KeyType) -> ValueType:
+        generation = self.__generation
+        value = await self.__loader(key)
+
+        # Don't resurrect an entry which was invalidated while it was being loaded
+        if generation == self.__generation:
+            self.__entries[key] = (self.__clock(), value)
+
+        return value
@@ -0,0 +1,357 @@
+"""
+Fixed-base precomputation for the pure-Python Stark crypto fallback (used when `fast_stark_crypto` is not
+available).
+
+The Pedersen hash adds one constant point per set bit of each input element, and signing multiplies the curve
+generator by the nonce. Both work with fixed points, so all sums of the points covered by every 8-bit window of
+the input are precomputed: a hash or a generator multiplication then takes one table lookup and one point addition
+per window instead of one addition (or doubling) per bit. Additions are done in Jacobian coordinates, so there is a
+single modular inversion per operation.
+
+The tables take ~1.5 MB. They are built on first use, persisted to a cache file and memory-mapped on later loads.
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from vendor.starkware.crypto.signature import (
+    ALPHA,
+    CONSTANT_POINTS,
+    EC_GEN,
+    EC_ORDER,
+    FIELD_PRIME,
+    N_ELEMENT_BITS_ECDSA,
+    N_ELEMENT_BITS_HASH,
+    SHIFT_POINT,
+    ECSignature,
+    generate_k_rfc6979,
+    inv_mod_curve_size,
+)
+from vendor.starkware.crypto.signature.math_utils import ECPoint, div_mod
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+WINDOW_BITS = 8
+WINDOW_SIZE = 2**WINDOW_BITS
+WINDOW_MASK = WINDOW_SIZE - 1
+WINDOWS_COUNT = 32
+
+COORDINATE_BYTES = 32
+ENTRY_BYTES = 2 * COORDINATE_BYTES
+TABLE_BYTES = WINDOWS_COUNT * WINDOW_SIZE * ENTRY_BYTES
+
+# Tables: the 1st and the 2nd Pedersen hash element, the curve generator
+PEDERSEN_TABLES_COUNT = 2
+GENERATOR_TABLE_INDEX = PEDERSEN_TABLES_COUNT
+TABLES_COUNT = PEDERSEN_TABLES_COUNT + 1
+
+CACHE_FILE_MAGIC = b"X10FBT01"
+CACHE_FILE_HEADER_BYTES = len(CACHE_FILE_MAGIC) + hashlib.sha256().digest_size
+CACHE_FILE_BYTES = CACHE_FILE_HEADER_BYTES + TABLES_COUNT * TABLE_BYTES
+CACHE_FILE_PATH_ENV = "X10_FIXED_BASE_TABLES_PATH"
+
+assert N_ELEMENT_BITS_HASH <= WINDOWS_COUNT * WINDOW_BITS
+assert EC_ORDER.bit_length() <= WINDOWS_COUNT * WINDOW_BITS
+
+# Point in Jacobian coordinates (x = X / Z^2, y = Y / Z^3), `None` is the point at infinity
+JacobianPoint = Optional[Tuple[int, int, int]]
+
+
+def _affine_add(point1: ECPoint, point2: ECPoint) -> ECPoint:
+    if point1[0] == point2[0]:
+        assert point1[1] == point2[1], "Point at infinity"
+        m = div_mod(3 * point1[0] * point1[0] + ALPHA, 2 * point1[1], FIELD_PRIME)
+    else:
+        m = div_mod(point1[1] - point2[1], point1[0] - point2[0], FIELD_PRIME)
+
+    x = (m * m - point1[0] - point2[0]) % FIELD_PRIME
+    y = (m * (point1[0] - x) - point1[1]) % FIELD_PRIME
+
+    return x, y
+
+
+def _jacobian_double(point: JacobianPoint) -> JacobianPoint:
+    if point is None or point[1] == 0:
+        return None
+
+    p = FIELD_PRIME
+    x, y, z = point
+    yy = y * y % p
+    s = 4 * x * yy % p
+    zz = z * z % p
+    m = (3 * x * x + ALPHA * zz * zz) % p
+    x3 = (m * m - 2 * s) % p
+
+    return x3, (m * (s - x3) - 8 * yy * yy) % p, 2 * y * z % p
+
+
+def _jacobian_add_affine(point1: JacobianPoint, x2: int, y2: int) -> JacobianPoint:
+    if point1 is None:
+        return x2, y2, 1
+
+    p = FIELD_PRIME
+    x1, y1, z1 = point1
+    z1z1 = z1 * z1 % p
+    h = (x2 * z1z1 - x1) % p
+    r = (y2 * z1 * z1z1 - y1) % p
+
+    if h == 0:
+        return _jacobian_double(point1) if r == 0 else None
+
+    hh = h * h % p
+    hhh = h * hh % p
+    v = x1 * hh % p
+    x3 = (r * r - hhh - 2 * v) % p
+
+    return x3, (r * (v - x3) - y1 * hhh) % p, z1 * h % p
+
+
+def _to_affine(point: JacobianPoint) -> ECPoint:
+    assert point is not None, "Point at infinity"
+
+    x, y, z = point
+    z_inv = pow(z, -1, FIELD_PRIME)
+    z_inv_2 = z_inv * z_inv % FIELD_PRIME
+
+    return x * z_inv_2 % FIELD_PRIME, y * z_inv_2 * z_inv % FIELD_PRIME
+
+
+def _encode_point(point: ECPoint) -> bytes:
+    return point[0].to_bytes(COORDINATE_BYTES, "big") + point[1].to_bytes(COORDINATE_BYTES, "big")
+
+
+def _write_entry(table: bytearray, window: int, digit: int, point: ECPoint):
+    entry_start = (window * WINDOW_SIZE + digit) * ENTRY_BYTES
+    entry_end = entry_start + ENTRY_BYTES
+    table[entry_start:entry_end] = _encode_point(point)
+
+
+def _build_pedersen_table(points: Sequence[ECPoint]) -> bytes:
+    """
+    Entry `d` of window `w` is the sum of `points[w * WINDOW_BITS + i]` for every bit `i` set in `d`.
+    """
+
+    table = bytearray(TABLE_BYTES)
+
+    for window in range(WINDOWS_COUNT):
+        first_point, last_point = window * WINDOW_BITS, (window + 1) * WINDOW_BITS
+        window_points = points[first_point:last_point]
+        entries: List[Optional[ECPoint]] = [None] * WINDOW_SIZE
+
+        for digit in range(1, 2 ** len(window_points)):
+            lowest_bit = (digit & -digit).bit_length() - 1
+            rest = entries[digit & (digit - 1)]
+            point = window_points[lowest_bit]
+            entries[digit] = _affine_add(rest, point) if rest else point
+            _write_entry(table, window, digit, entries[digit])  # type: ignore[arg-type]
+
+    return bytes(table)
+
+
+def _build_generator_table(generator: ECPoint) -> bytes:
+    """
+    Entry `d` of window `w` is `d * 2^(w * WINDOW_BITS) * generator`.
+    """
+
+    table = bytearray(TABLE_BYTES)
+    base = generator
+
+    for window in range(WINDOWS_COUNT):
+        point = base
+
+        for digit in range(1, WINDOW_SIZE):
+            _write_entry(table, window, digit, point)
+            point = _affine_add(point, base)
+
+        # `point` is `WINDOW_SIZE * base` now
+        base = point
+
+    return bytes(table)
+
+
+@lru_cache(maxsize=None)
+def _get_tables_digest() -> bytes:
+    digest = hashlib.sha256()
+
+    for point in [SHIFT_POINT, EC_GEN]:
+        digest.update(_encode_point(point))
+
+    for index in range(PEDERSEN_TABLES_COUNT):
+        for point in _get_pedersen_points(index):
+            digest.update(_encode_point(point))
+
+    return digest.digest()
+
+
+def _get_pedersen_points(element_index: int) -> List[ECPoint]:
+    first_point = 2 + element_index * N_ELEMENT_BITS_HASH
+    last_point = first_point + N_ELEMENT_BITS_HASH
+
+    return [(point[0], point[1]) for point in CONSTANT_POINTS[first_point:last_point]]
+
+
+def build_tables() -> bytes:
+    """
+    Builds the contents of the cache file: header followed by the Pedersen and the generator tables.
+    """
+
+    tables = [_build_pedersen_table(_get_pedersen_points(index)) for index in range(PEDERSEN_TABLES_COUNT)]
+    tables.append(_build_generator_table((EC_GEN[0], EC_GEN[1])))
+
+    return CACHE_FILE_MAGIC + _get_tables_digest() + b"".join(tables)
+
+
+def get_default_cache_file_path() -> str:
+    if os.environ.get(CACHE_FILE_PATH_ENV):
+        return os.environ[CACHE_FILE_PATH_ENV]
+
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(cache_dir, "x10", "fixed_base_tables.bin")
+
+
+def _is_valid_cache_file(data) -> bool:
+    return len(data) == CACHE_FILE_BYTES and data[:CACHE_FILE_HEADER_BYTES] == CACHE_FILE_MAGIC + _get_tables_digest()
+
+
+def _write_cache_file(path: str, data: bytes):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    # Write to a temporary file first, so that concurrent readers never see a partially written file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".fixed_base_tables.")
+
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _map_cache_file(path: str) -> Optional[mmap.mmap]:
+    try:
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if _is_valid_cache_file(data):
+        return data
+
+    data.close()
+
+    return None
+
+
+class FixedBaseTables:
+    """
+    Read-only view of the precomputed tables. `data` is either a memory-mapped cache file or an in-memory buffer.
+    """
+
+    __data: memoryview
+
+    def __init__(self, data):
+        super().__init__()
+
+        assert _is_valid_cache_file(data), "Invalid fixed-base tables"
+
+        self.__data = memoryview(data)[CACHE_FILE_HEADER_BYTES:]
+
+    @staticmethod
+    def load(path: Optional[str] = None) -> "FixedBaseTables":
+        """
+        Memory-maps the cache file, building and persisting the tables first if the file is missing or stale.
+        If the file can't be written, the tables are kept in memory.
+        """
+
+        path = path or get_default_cache_file_path()
+        mapped_data = _map_cache_file(path)
+
+        if mapped_data is not None:
+            return FixedBaseTables(mapped_data)
+
+        LOGGER.info("Building fixed-base tables: %s", path)
+        data = build_tables()
+
+        try:
+            _write_cache_file(path, data)
+        except OSError as e:
+            LOGGER.warning("Failed to persist fixed-base tables to %s: %s", path, e)
+            return FixedBaseTables(data)
+
+        return FixedBaseTables(_map_cache_file(path) or data)
+
+    def __multiply(self, table_index: int, scalar: int, acc: JacobianPoint) -> JacobianPoint:
+        data = self.__data
+        offset = table_index * TABLE_BYTES
+
+        while scalar:
+            digit = scalar & WINDOW_MASK
+
+            if digit:
+                x_start = offset + digit * ENTRY_BYTES
+                y_start = x_start + COORDINATE_BYTES
+                y_end = y_start + COORDINATE_BYTES
+                x = int.from_bytes(data[x_start:y_start], "big")
+                y = int.from_bytes(data[y_start:y_end], "big")
+                acc = _jacobian_add_affine(acc, x, y)
+
+            scalar >>= WINDOW_BITS
+            offset += WINDOW_SIZE * ENTRY_BYTES
+
+        return acc
+
+    def pedersen_hash_as_point(self, *elements: int) -> ECPoint:
+        assert len(elements) <= PEDERSEN_TABLES_COUNT
+
+        acc: JacobianPoint = (SHIFT_POINT[0], SHIFT_POINT[1], 1)
+
+        for index, element in enumerate(elements):
+            assert 0 <= element < FIELD_PRIME
+            acc = self.__multiply(index, element, acc)
+
+        return _to_affine(acc)
+
+    def pedersen_hash(self, *elements: int) -> int:
+        return self.pedersen_hash_as_point(*elements)[0]
+
+    def multiply_generator(self, scalar: int) -> ECPoint:
+        assert 0 < scalar < EC_ORDER
+
+        return _to_affine(self.__multiply(GENERATOR_TABLE_INDEX, scalar, None))
+
+    def sign(self, msg_hash: int, priv_key: int, seed: Optional[int] = None) -> ECSignature:
+        """
+        Same as `vendor.starkware.crypto.signature.sign`, with the `k * EC_GEN` multiplication done via the tables.
+        """
+
+        assert 0 <= msg_hash < 2**N_ELEMENT_BITS_ECDSA, "Message not signable."
+
+        while True:
+            k = generate_k_rfc6979(msg_hash, priv_key, seed)
+            seed = 1 if seed is None else seed + 1
+
+            r = self.multiply_generator(k)[0]
+            if not (1 <= r < 2**N_ELEMENT_BITS_ECDSA):
+                continue
+
+            if (msg_hash + r * priv_key) % EC_ORDER == 0:
+                continue
+
+            w = div_mod(k, msg_hash + r * priv_key, EC_ORDER)
+            if not (1 <= w < 2**N_ELEMENT_BITS_ECDSA):
+                continue
+
+            return r, inv_mod_curve_size(w)
+
+
+@lru_cache(maxsize=None)
+def get_fixed_base_tables() -> FixedBaseTables:
+    return FixedBaseTables.load()
@@ -1,26 +1,110 @@
+import asyncio
 import itertools
 import re
+from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import aiohttp
 from aiohttp import ClientResponse, ClientTimeout
+from aiohttp.tcp_helpers import tcp_nodelay
 from pydantic import GetCoreSchemaHandler
 from pydantic_core import CoreSchema, core_schema
 
 from x10.config import DEFAULT_REQUEST_TIMEOUT_SECONDS, USER_AGENT
 from x10.errors import X10Error
+from x10.utils.cache import SingleFlight
 from x10.utils.log import get_logger
 from x10.utils.model import X10BaseModel
+from x10.utils.rate_limit import RateLimitException, RequestScheduler
 
 LOGGER = get_logger(__name__)
 CLIENT_TIMEOUT = ClientTimeout(total=DEFAULT_REQUEST_TIMEOUT_SECONDS)
 
 ApiResponseType = TypeVar("ApiResponseType", bound=Union[int, X10BaseModel, Sequence[X10BaseModel]])
+PageItemType = TypeVar("PageItemType", bound=X10BaseModel)
 
 
-class RateLimitException(X10Error):
-    pass
+@dataclass(frozen=True)
+class ConnectionPoolConfig:
+    """
+    Tuning knobs for the `aiohttp.TCPConnector` backing a client session.
+    """
+
+    # Total number of simultaneous connections (0 -- unlimited)
+    limit: int = 100
+    # Number of simultaneous connections to the same endpoint (0 -- unlimited)
+    limit_per_host: int = 0
+    # Idle time (in seconds) after which a pooled connection is closed
+    keepalive_timeout: float = 60
+    # Time (in seconds) to cache DNS lookups for (None -- cache forever)
+    ttl_dns_cache: Optional[int] = 300
+    tcp_nodelay: bool = True
+
+
+DEFAULT_CONNECTION_POOL_CONFIG = ConnectionPoolConfig()
+
+
+class _TunedTCPConnector(aiohttp.TCPConnector):
+    def __init__(self, pool_config: ConnectionPoolConfig):
+        super().__init__(
+            limit=pool_config.limit,
+            limit_per_host=pool_config.limit_per_host,
+            keepalive_timeout=pool_config.keepalive_timeout,
+            ttl_dns_cache=pool_config.ttl_dns_cache,
+        )
+        self.__tcp_nodelay = pool_config.tcp_nodelay
+
+    async def _wrap_create_connection(self, *args, **kwargs):
+        transport, protocol = await super()._wrap_create_connection(*args, **kwargs)
+        # `aiohttp` enables `TCP_NODELAY` for every new connection, so only the opt-out has to be applied
+        if not self.__tcp_nodelay:
+            tcp_nodelay(transport, False)
+        return transport, protocol
+
+
+def create_session(pool_config: ConnectionPoolConfig = DEFAULT_CONNECTION_POOL_CONFIG) -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(connector=_TunedTCPConnector(pool_config), timeout=CLIENT_TIMEOUT)
+
+
+class ClientSessionProvider:
+    """
+    Lazily opens a single `aiohttp.ClientSession` which can be shared between several API modules,
+    so that they use one connection pool.
+    """
+
+    __pool_config: ConnectionPoolConfig
+    __session: Optional[aiohttp.ClientSession]
+
+    def __init__(self, pool_config: ConnectionPoolConfig = DEFAULT_CONNECTION_POOL_CONFIG):
+        super().__init__()
+        self.__pool_config = pool_config
+        self.__session = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self.__session is None:
+            self.__session = create_session(self.__pool_config)
+
+        return self.__session
+
+    async def close(self):
+        if self.__session:
+            session = self.__session
+            self.__session = None
+            await session.close()
 
 
 class NotAuthorizedException(X10Error):
@@ -83,12 +167,64 @@ class WrappedStreamResponse(X10BaseModel, Generic[ApiResponseType]):
     seq: int
 
 
+__RESPONSE_MODELS: Dict[Any, Type[WrappedApiResponse]] = {}
+# Concurrent identical GET requests (same session, URL, headers and response type) share one HTTP call
+__GET_REQUESTS: SingleFlight[Any, Any] = SingleFlight()
+
+
+def get_response_model(model_class: Type[ApiResponseType]) -> Type[WrappedApiResponse[ApiResponseType]]:
+    """
+    Returns `WrappedApiResponse` parametrized with `model_class` (e.g. `MarketModel` or `List[MarketModel]`).
+    Parametrized models (and their compiled validators) are built once per response type and reused.
+    """
+
+    response_model = __RESPONSE_MODELS.get(model_class)
+
+    if response_model is None:
+        # Read this to get more context re the type ignore:
+        # https://github.com/python/mypy/issues/13619
+        response_model = WrappedApiResponse[model_class]  # type: ignore[valid-type]
+        __RESPONSE_MODELS[model_class] = response_model
+
+    return response_model
+
+
 def parse_response_to_model(
-    response_text: str, model_class: Type[ApiResponseType]
+    response_text: Union[str, bytes], model_class: Type[ApiResponseType]
 ) -> WrappedApiResponse[ApiResponseType]:
-    # Read this to get more context re the type ignore:
-    # https://github.com/python/mypy/issues/13619
-    return WrappedApiResponse[model_class].model_validate_json(response_text)  # type: ignore[valid-type]
+    return get_response_model(model_class).model_validate_json(response_text)
+
+
+async def iterate_pages(
+    fetch_page: Callable[[Optional[int]], Awaitable[WrappedApiResponse[List[PageItemType]]]],
+) -> AsyncIterator[PageItemType]:
+    """
+    Streams the records of a cursor-paginated endpoint page by page.
+
+    `fetch_page` is called with the cursor of the page to fetch (`None` for the first page). The next page
+    is requested while the records of the current one are being consumed, so at most two pages are held
+    in memory at a time (the page size is controlled by the endpoint `limit`).
+    """
+
+    cursor: Optional[int] = None
+    next_page_task: Optional[asyncio.Future] = asyncio.ensure_future(fetch_page(cursor))
+
+    try:
+        while next_page_task is not None:
+            page = await next_page_task
+            next_page_task = None
+            records = page.data or []
+            next_cursor = page.pagination.cursor if page.pagination else None
+
+            if records and next_cursor is not None and next_cursor != cursor:
+                cursor = next_cursor
+                next_page_task = asyncio.ensure_future(fetch_page(cursor))
+
+            for record in records:
+                yield record
+    finally:
+        if next_page_task is not None:
+            next_page_task.cancel()
 
 
 def get_url(template: str, *, query: Optional[Dict[str, str | List[str]]] = None, **path_params):
@@ -134,13 +270,22 @@ async def send_get_request(
     api_key: Optional[str] = None,
     request_headers: Optional[Dict[str, str]] = None,
     response_code_to_exception: Optional[Dict[int, Type[Exception]]] = None,
+    request_scheduler: Optional[RequestScheduler] = None,
 ) -> WrappedApiResponse[ApiResponseType]:
     headers = __get_headers(api_key=api_key, request_headers=request_headers)
-    LOGGER.debug("Sending GET %s", url)
-    async with session.get(url, headers=headers) as response:
-        response_text = await response.text()
-        handle_known_errors(url, response_code_to_exception, response, response_text)
-        return parse_response_to_model(response_text, model_class)
+
+    async def send_request():
+        LOGGER.debug("Sending GET %s", url)
+        async with session.get(url, headers=headers) as response:
+            response_body = await response.read()
+            handle_known_errors(url, response_code_to_exception, response, response_body)
+            return parse_response_to_model(response_body, model_class)
+
+    request_key = (session, url, model_class, tuple(sorted(headers.items())))
+
+    return await __GET_REQUESTS.run(
+        request_key, lambda: __schedule_request(request_scheduler, "GET", url, send_request)
+    )
 
 
 async def send_post_request(
@@ -149,20 +294,34 @@ async def send_post_request(
     model_class: Type[ApiResponseType],
     *,
     json: Any = None,
+    data: Optional[bytes] = None,
     api_key: Optional[str] = None,
     request_headers: Optional[Dict[str, str]] = None,
     response_code_to_exception: Optional[Dict[int, Type[Exception]]] = None,
+    request_scheduler: Optional[RequestScheduler] = None,
+    request_sent_callback: Optional[Callable[[], None]] = None,
 ) -> WrappedApiResponse[ApiResponseType]:
+    """
+    :param data: Already serialized JSON body, instead of `json` (see `X10BaseModel.to_api_request_body`).
+    :param request_sent_callback: Called right before the request is sent (after the rate limiter, on every retry).
+    """
+
     headers = __get_headers(api_key=api_key, request_headers=request_headers)
-    LOGGER.debug("Sending POST %s, headers=%s", url, headers)
-    async with session.post(url, json=json, headers=headers) as response:
-        response_text = await response.text()
-        handle_known_errors(url, response_code_to_exception, response, response_text)
-        response_model = parse_response_to_model(response_text, model_class)
-        if (response_model.status != ResponseStatus.OK.value) or (response_model.error is not None):
-            LOGGER.error("Error response from POST %s: %s", url, response_model.error)
-            raise ValueError(f"Error response from POST {url}: {response_model.error}")
-        return response_model
+
+    async def send_request():
+        LOGGER.debug("Sending POST %s, headers=%s", url, headers)
+        if request_sent_callback:
+            request_sent_callback()
+        async with session.post(url, json=json, data=data, headers=headers) as response:
+            response_body = await response.read()
+            handle_known_errors(url, response_code_to_exception, response, response_body)
+            response_model = parse_response_to_model(response_body, model_class)
+            if (response_model.status != ResponseStatus.OK.value) or (response_model.error is not None):
+                LOGGER.error("Error response from POST %s: %s", url, response_model.error)
+                raise ValueError(f"Error response from POST {url}: {response_model.error}")
+            return response_model
+
+    return await __schedule_request(request_scheduler, "POST", url, send_request)
 
 
 async def send_patch_request(
@@ -174,16 +333,21 @@ async def send_patch_request(
     api_key: Optional[str] = None,
     request_headers: Optional[Dict[str, str]] = None,
     response_code_to_exception: Optional[Dict[int, Type[Exception]]] = None,
+    request_scheduler: Optional[RequestScheduler] = None,
 ) -> WrappedApiResponse[ApiResponseType]:
     headers = __get_headers(api_key=api_key, request_headers=request_headers)
-    LOGGER.debug("Sending PATCH %s, headers=%s, data=%s", url, headers, json)
-    async with session.patch(url, json=json, headers=headers) as response:
-        response_text = await response.text()
-        if response_text == "":
-            LOGGER.error("Empty HTTP %s response from PATCH %s", response.status, url)
-            response_text = '{"status": "OK"}'
-        handle_known_errors(url, response_code_to_exception, response, response_text)
-        return parse_response_to_model(response_text, model_class)
+
+    async def send_request():
+        LOGGER.debug("Sending PATCH %s, headers=%s, data=%s", url, headers, json)
+        async with session.patch(url, json=json, headers=headers) as response:
+            response_body = await response.read()
+            if response_body == b"":
+                LOGGER.error("Empty HTTP %s response from PATCH %s", response.status, url)
+                response_body = b'{"status": "OK"}'
+            handle_known_errors(url, response_code_to_exception, response, response_body)
+            return parse_response_to_model(response_body, model_class)
+
+    return await __schedule_request(request_scheduler, "PATCH", url, send_request)
 
 
 async def send_delete_request(
@@ -194,18 +358,47 @@ async def send_delete_request(
     api_key: Optional[str] = None,
     request_headers: Optional[Dict[str, str]] = None,
     response_code_to_exception: Optional[Dict[int, Type[Exception]]] = None,
+    request_scheduler: Optional[RequestScheduler] = None,
 ):
     headers = __get_headers(api_key=api_key, request_headers=request_headers)
-    LOGGER.debug("Sending DELETE %s, headers=%s", url, headers)
-    async with session.delete(url, headers=headers) as response:
-        response_text = await response.text()
-        handle_known_errors(url, response_code_to_exception, response, response_text)
-        return parse_response_to_model(response_text, model_class)
+
+    async def send_request():
+        LOGGER.debug("Sending DELETE %s, headers=%s", url, headers)
+        async with session.delete(url, headers=headers) as response:
+            response_body = await response.read()
+            handle_known_errors(url, response_code_to_exception, response, response_body)
+            return parse_response_to_model(response_body, model_class)
+
+    return await __schedule_request(request_scheduler, "DELETE", url, send_request)
+
+
+async def __schedule_request(
+    request_scheduler: Optional[RequestScheduler],
+    method: str,
+    url: str,
+    send_request: Callable[[], Awaitable[WrappedApiResponse[ApiResponseType]]],
+) -> WrappedApiResponse[ApiResponseType]:
+    if request_scheduler is None:
+        return await send_request()
+
+    return await request_scheduler.schedule(method, url, send_request)
 
 
 def handle_known_errors(
-    url, response_code_handler: Optional[Dict[int, Type[Exception]]], response: ClientResponse, response_text: str
+    url,
+    response_code_handler: Optional[Dict[int, Type[Exception]]],
+    response: ClientResponse,
+    response_text: Union[str, bytes],
 ):
+    is_handled_status = response_code_handler is not None and response.status in response_code_handler
+
+    if response.status < 300 and not is_handled_status:
+        return
+
+    if isinstance(response_text, bytes):
+        # Only error responses are decoded, successful ones are validated straight from bytes
+        response_text = response_text.decode(response.get_encoding(), errors="replace")
+
     if response.status == 401:
         LOGGER.error("Unauthorized response from POST %s: %s", url, response_text)
         raise NotAuthorizedException(f"Unauthorized response from POST {url}: {response_text}")
@@ -214,7 +407,7 @@ def handle_known_errors(
         LOGGER.error("Rate limited response from POST %s: %s", url, response_text)
         raise RateLimitException(f"Rate limited response from POST {url}: {response}")
 
-    if response_code_handler and response.status in response_code_handler:
+    if response_code_handler and is_handled_status:
         raise response_code_handler[response.status](response_text)
 
     if response.status > 299:
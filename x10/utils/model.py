@@ -49,6 +49,13 @@ class X10BaseModel(BaseModel):
     def to_api_request_json(self, *, exclude_none: bool = False):
         return self.model_dump(mode="json", by_alias=True, exclude_none=exclude_none)
 
+    def to_api_request_body(self, *, exclude_none: bool = False) -> bytes:
+        """
+        Same as `to_api_request_json`, serialized to the JSON request body.
+        """
+
+        return self.model_dump_json(by_alias=True, exclude_none=exclude_none).encode()
+
 
 HexValue = Annotated[
     int,
@@ -0,0 +1,196 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+
+from x10.errors import X10Error
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+ScheduledResultType = TypeVar("ScheduledResultType")
+
+
+class RateLimitException(X10Error):
+    pass
+
+
+class EndpointClass(Enum):
+    ORDER_ENTRY = "ORDER_ENTRY"
+    CANCEL = "CANCEL"
+    ACCOUNT_READ = "ACCOUNT_READ"
+    MARKET_INFO = "MARKET_INFO"
+    OTHER = "OTHER"
+
+
+@dataclass(frozen=True)
+class RateLimitBudget:
+    # Sustained number of requests per second
+    rate: float
+    # Number of requests which can be sent at once after an idle period
+    burst: int
+
+
+@dataclass(frozen=True)
+class BackoffPolicy:
+    # Number of retries of a rate limited (HTTP 429) request before `RateLimitException` is raised
+    max_retries: int = 3
+    base_delay_seconds: float = 0.1
+    max_delay_seconds: float = 5
+
+
+@dataclass
+class RequestSchedulerStats:
+    # Requests which had to wait for the budget to refill
+    queued: int = 0
+    # Requests which were rejected with HTTP 429
+    throttled: int = 0
+    # Requests which were re-sent after HTTP 429
+    retried: int = 0
+
+
+DEFAULT_BACKOFF_POLICY = BackoffPolicy()
+DEFAULT_RATE_LIMIT_BUDGETS: Dict[EndpointClass, RateLimitBudget] = {
+    EndpointClass.ORDER_ENTRY: RateLimitBudget(rate=10, burst=20),
+    EndpointClass.CANCEL: RateLimitBudget(rate=10, burst=20),
+    EndpointClass.ACCOUNT_READ: RateLimitBudget(rate=4, burst=8),
+    EndpointClass.MARKET_INFO: RateLimitBudget(rate=4, burst=8),
+    EndpointClass.OTHER: RateLimitBudget(rate=2, burst=4),
+}
+
+
+def classify_request(method: str, url: str) -> EndpointClass:
+    path = urlparse(url).path.rstrip("/")
+
+    if "/info/" in path:
+        return EndpointClass.MARKET_INFO
+    if method == "DELETE" and "/user/order" in path:
+        return EndpointClass.CANCEL
+    if method == "POST" and path.endswith("/user/order/massCancel"):
+        return EndpointClass.CANCEL
+    if method == "POST" and path.endswith("/user/order"):
+        return EndpointClass.ORDER_ENTRY
+    if method == "GET" and "/user/" in path:
+        return EndpointClass.ACCOUNT_READ
+
+    return EndpointClass.OTHER
+
+
+class TokenBucket:
+    """
+    Token bucket which hands out tokens to waiters in FIFO order.
+    """
+
+    __rate: float
+    __capacity: float
+    __tokens: float
+    __updated_at: float
+    __lock: asyncio.Lock
+
+    def __init__(self, budget: RateLimitBudget, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+
+        assert budget.rate > 0
+        assert budget.burst >= 1
+
+        self.__rate = budget.rate
+        self.__capacity = budget.burst
+        self.__tokens = budget.burst
+        self.__clock = clock
+        self.__updated_at = clock()
+        self.__lock = asyncio.Lock()
+
+    async def acquire(self) -> bool:
+        """
+        Takes one token, waiting for the bucket to refill if needed. Returns `True` if the caller had to wait.
+        """
+
+        async with self.__lock:
+            self.__refill()
+            waited = False
+
+            while self.__tokens < 1:
+                waited = True
+                await asyncio.sleep((1 - self.__tokens) / self.__rate)
+                self.__refill()
+
+            self.__tokens -= 1
+
+            return waited
+
+    def drain(self):
+        """
+        Empties the bucket, e.g. after the server reported that the budget is exhausted.
+        """
+
+        self.__refill()
+        self.__tokens = min(self.__tokens, 0)
+
+    def __refill(self):
+        now = self.__clock()
+        self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated_at) * self.__rate)
+        self.__updated_at = now
+
+
+class RequestScheduler:
+    """
+    Client-side rate limiter for REST requests. Every endpoint class gets its own token bucket, and requests
+    rejected with HTTP 429 are retried with jittered exponential backoff.
+    """
+
+    __buckets: Dict[EndpointClass, TokenBucket]
+    __stats: Dict[EndpointClass, RequestSchedulerStats]
+    __backoff_policy: BackoffPolicy
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[EndpointClass, RateLimitBudget]] = None,
+        backoff_policy: BackoffPolicy = DEFAULT_BACKOFF_POLICY,
+    ):
+        super().__init__()
+
+        budgets = {**DEFAULT_RATE_LIMIT_BUDGETS, **(budgets or {})}
+
+        self.__buckets = {endpoint_class: TokenBucket(budget) for endpoint_class, budget in budgets.items()}
+        self.__stats = {endpoint_class: RequestSchedulerStats() for endpoint_class in EndpointClass}
+        self.__backoff_policy = backoff_policy
+
+    @property
+    def stats(self) -> Dict[EndpointClass, RequestSchedulerStats]:
+        return self.__stats
+
+    async def schedule(
+        self, method: str, url: str, send_request: Callable[[], Awaitable[ScheduledResultType]]
+    ) -> ScheduledResultType:
+        endpoint_class = classify_request(method, url)
+        bucket = self.__buckets[endpoint_class]
+        stats = self.__stats[endpoint_class]
+        attempt = 0
+
+        while True:
+            if await bucket.acquire():
+                stats.queued += 1
+
+            try:
+                return await send_request()
+            except RateLimitException:
+                stats.throttled += 1
+                bucket.drain()
+
+                if attempt >= self.__backoff_policy.max_retries:
+                    raise
+
+                delay = self.__get_backoff_delay(attempt)
+                attempt += 1
+                stats.retried += 1
+
+                LOGGER.warning("Rate limited %s %s, retry #%s in %.3fs", method, url, attempt, delay)
+                await asyncio.sleep(delay)
+
+    def __get_backoff_delay(self, attempt: int) -> float:
+        # "Full jitter" backoff: a random delay up to the exponentially growing cap
+        cap = min(self.__backoff_policy.max_delay_seconds, self.__backoff_policy.base_delay_seconds * 2**attempt)
+        return random.uniform(0, cap)
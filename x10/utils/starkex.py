@@ -1,7 +1,15 @@
 import math
+import os
 import random
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 from datetime import datetime, timedelta
-from typing import Callable
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, Tuple
 
 from x10.perpetual.amounts import ROUNDING_FEE_CONTEXT, StarkAmount, StarkOrderAmounts
 from x10.utils.log import get_logger
@@ -17,6 +25,9 @@ HOURS_IN_DAY = 24
 SETTLEMENT_BUFFER_HOURS = HOURS_IN_DAY * 7
 SECONDS_IN_HOUR = 60 * 60
 
+# Arguments of `get_limit_order_msg` (without `hash_function`)
+LimitOrderHashParams = Tuple[int, int, int, int, int, int, int, int, int, int]
+
 
 def import_pedersen_hash_func():
     try:
@@ -26,12 +37,12 @@ def import_pedersen_hash_func():
             return ph_fast(first, second)
 
     except ImportError as e:
-        from vendor.starkware.crypto.signature import pedersen_hash as ph_slow
+        from x10.utils.fixed_base import get_fixed_base_tables
 
         LOGGER.warning("COULD NOT IMPORT RUST CRYPTO - USING SLOW PYTHON PEDERSEN IMPL: %s", e.msg)
 
         def _pedersen_hash(first: int, second: int) -> int:
-            return ph_slow(first, second)
+            return get_fixed_base_tables().pedersen_hash(first, second)
 
     return _pedersen_hash
 
@@ -50,12 +61,12 @@ def import_sign_func():
             )
 
     except ImportError as e:
-        from vendor.starkware.crypto.signature import sign as __sign_slow
+        from x10.utils.fixed_base import get_fixed_base_tables
 
         LOGGER.warning("COULD NOT IMPORT RUST CRYPTO - USING SLOW PYTHON SIGN IMPL: %s", e.msg)
 
         def _sign(private_key: int, msg_hash: int) -> tuple[int, int]:
-            return __sign_slow(priv_key=private_key, msg_hash=msg_hash)
+            return get_fixed_base_tables().sign(priv_key=private_key, msg_hash=msg_hash)
 
     return _sign
 
@@ -293,6 +304,18 @@ def get_limit_order_msg(
     )
 
 
+@lru_cache(maxsize=1024)
+def get_limit_order_msg_prefix(
+    asset_id_sell: int,
+    asset_id_buy: int,
+    asset_id_fee: int,
+    hash_function: Callable[[int, int], int] = pedersen_hash,
+) -> int:
+    # The first two hashes of a limit order message only depend on the market and the order side,
+    # so they are computed once per (sell asset, buy asset, fee asset) and reused for every order
+    return hash_function(hash_function(asset_id_sell, asset_id_buy), asset_id_fee)
+
+
 def get_limit_order_msg_without_bounds(
     asset_id_synthetic: int,
     asset_id_collateral: int,
@@ -313,8 +336,7 @@ def get_limit_order_msg_without_bounds(
         asset_id_sell, asset_id_buy = asset_id_synthetic, asset_id_collateral
         amount_sell, amount_buy = amount_synthetic, amount_collateral
 
-    msg = hash_function(asset_id_sell, asset_id_buy)
-    msg = hash_function(msg, asset_id_fee)
+    msg = get_limit_order_msg_prefix(asset_id_sell, asset_id_buy, asset_id_fee, hash_function)
     packed_message0 = amount_sell
     packed_message0 = packed_message0 * 2**64 + amount_buy
     packed_message0 = packed_message0 * 2**64 + max_amount_fee
@@ -373,13 +395,13 @@ def get_price_msg(
     return hash_function(first_number, second_number)
 
 
-def hash_order(
+def get_order_hash_params(
     amounts: StarkOrderAmounts,
     is_buying_synthetic: bool,
     nonce: int,
     position_id: int,
     expiration_timestamp: datetime,
-) -> int:
+) -> LimitOrderHashParams:
     amount_synthetic: StarkAmount = amounts.synthetic_amount_internal.to_stark_amount(
         rounding_context=amounts.rounding_context
     )
@@ -387,27 +409,135 @@ def hash_order(
         rounding_context=amounts.rounding_context
     )
     max_fee: StarkAmount = amounts.fee_amount_internal.to_stark_amount(rounding_context=ROUNDING_FEE_CONTEXT)
-    synthetic_asset = amount_synthetic.asset
-    collateral_asset = amount_collateral.asset
 
+    return get_order_hash_params_from_stark_amounts(
+        int(amount_synthetic.asset.settlement_external_id, base=16),
+        int(amount_collateral.asset.settlement_external_id, base=16),
+        is_buying_synthetic,
+        (amount_synthetic.value, amount_collateral.value, max_fee.value),
+        nonce,
+        position_id,
+        expiration_timestamp,
+    )
+
+
+def get_order_hash_params_from_stark_amounts(
+    synthetic_asset_id: int,
+    collateral_asset_id: int,
+    is_buying_synthetic: bool,
+    stark_amounts: Tuple[int, int, int],
+    nonce: int,
+    position_id: int,
+    expiration_timestamp: datetime,
+) -> LimitOrderHashParams:
+    """
+    Same as `get_order_hash_params` for already converted synthetic, collateral and fee amounts.
+    """
+
+    (amount_synthetic, amount_collateral, max_fee) = stark_amounts
     expire_time_with_buffer = expiration_timestamp + timedelta(days=14)
     expire_time_with_buffer_as_hours = math.ceil(expire_time_with_buffer.timestamp() / SECONDS_IN_HOUR)
 
-    return get_limit_order_msg(
-        int(synthetic_asset.settlement_external_id, base=16),
-        int(collateral_asset.settlement_external_id, base=16),
+    return (
+        synthetic_asset_id,
+        collateral_asset_id,
         1 if is_buying_synthetic else 0,
-        int(collateral_asset.settlement_external_id, base=16),
-        amount_synthetic.value,
-        amount_collateral.value,
-        max_fee.value,
+        collateral_asset_id,
+        amount_synthetic,
+        amount_collateral,
+        max_fee,
         nonce,
         position_id,
         expire_time_with_buffer_as_hours,
-        pedersen_hash,
     )
 
 
+def hash_order(
+    amounts: StarkOrderAmounts,
+    is_buying_synthetic: bool,
+    nonce: int,
+    position_id: int,
+    expiration_timestamp: datetime,
+) -> int:
+    return hash_order_params(
+        get_order_hash_params(amounts, is_buying_synthetic, nonce, position_id, expiration_timestamp)
+    )
+
+
+def hash_order_params(hash_params: LimitOrderHashParams) -> int:
+    return get_limit_order_msg(*hash_params, hash_function=pedersen_hash)
+
+
+def create_signing_executor(max_workers: Optional[int] = None, *, use_threads: bool = False) -> Executor:
+    """
+    Creates an executor for `hash_and_sign_orders`.
+
+    Worker processes parallelize the hashing for both the native and the pure Python crypto implementations, the
+    orders are signed in the calling process (the signer, and so the private key, is not sent to the workers).
+    Worker threads hash and sign, which only helps if the native extension releases the GIL. This is not detected,
+    `use_threads` is the caller's choice.
+    """
+
+    if use_threads:
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="x10-signing")
+
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+
+def _hash_chunk(orders_hash_params: Sequence[LimitOrderHashParams]) -> List[int]:
+    return [hash_order_params(hash_params) for hash_params in orders_hash_params]
+
+
+def _sign_hashes(
+    signer: Callable[[int], Tuple[int, int]], order_hashes: Sequence[int]
+) -> List[Tuple[int, Tuple[int, int]]]:
+    return [(order_hash, signer(order_hash)) for order_hash in order_hashes]
+
+
+def _hash_and_sign_chunk(
+    signer: Callable[[int], Tuple[int, int]], orders_hash_params: Sequence[LimitOrderHashParams]
+) -> List[Tuple[int, Tuple[int, int]]]:
+    return _sign_hashes(signer, _hash_chunk(orders_hash_params))
+
+
+def hash_and_sign_orders(
+    orders_hash_params: Sequence[LimitOrderHashParams],
+    signer: Callable[[int], Tuple[int, int]],
+    *,
+    executor: Optional[Executor] = None,
+    chunk_size: Optional[int] = None,
+) -> List[Tuple[int, Tuple[int, int]]]:
+    """
+    Hashes and signs a batch of limit orders, returns `(order_hash, (r, s))` in the order of the input.
+
+    With an `executor` the batch is split into chunks which are processed in parallel. The workers of a process pool
+    only hash the orders, `signer` is called in the calling thread so the private key never leaves the process.
+    Without an executor, or if the executor is broken, the batch is processed in the calling thread.
+    """
+
+    if executor is None or len(orders_hash_params) <= 1:
+        return _hash_and_sign_chunk(signer, orders_hash_params)
+
+    if chunk_size is None:
+        chunk_size = math.ceil(len(orders_hash_params) / (os.cpu_count() or 1))
+
+    chunks = []
+    for chunk_start in range(0, len(orders_hash_params), chunk_size):
+        chunk_end = chunk_start + chunk_size
+        chunks.append(orders_hash_params[chunk_start:chunk_end])
+
+    try:
+        if isinstance(executor, ProcessPoolExecutor):
+            hash_futures = [executor.submit(_hash_chunk, chunk) for chunk in chunks]
+            return _sign_hashes(signer, [order_hash for future in hash_futures for order_hash in future.result()])
+
+        futures = [executor.submit(_hash_and_sign_chunk, signer, chunk) for chunk in chunks]
+        return [signed_hash for future in futures for signed_hash in future.result()]
+    except BrokenExecutor as e:
+        LOGGER.warning("Signing executor is broken, signing %s orders in-process: %s", len(orders_hash_params), e)
+        return _hash_and_sign_chunk(signer, orders_hash_params)
+
+
 def generate_nonce():
     # Aligned with the JS implementation (2^31 as the upper bound, not 2^32).
     # https://github.com/starkware-libs/starkware-crypto-utils/blob/dev/src/js/signature.ts#L327
@@ -0,0 +1,15 @@
+import math
+from typing import Sequence
+
+
+def get_percentile(sorted_values: Sequence[float], percentile: float) -> float:
+    """
+    Nearest-rank percentile (0-100) of sorted values, `nan` if there are none.
+    """
+
+    if not sorted_values:
+        return math.nan
+
+    rank = math.ceil(percentile / 100 * len(sorted_values))
+
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]